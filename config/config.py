@@ -55,6 +55,18 @@ class LLMConfig:
     )
     timeout_seconds: int = 30
     max_retries: int = 3
+    use_async_provider: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 7 * 24 * 3600
+    model_list_ttl_seconds: int = 60
+    keep_alive_seconds: int = 1800
+    warmup_interval_seconds: int = 0  # 0 disables periodic warm-up pings
+    model_fallbacks: dict[str, list[str]] = field(default_factory=dict)
+    context_token_budget: int = 1500
+    context_summary_token_budget: int = 300
+    context_ttl_seconds: int = 3600
 
     def __post_init__(self):
         if env_url := os.getenv("OLLAMA_URL"):
@@ -70,10 +82,16 @@ class ImageGenerationConfig:
     image_size: tuple = (512, 512)
     num_inference_steps: int = 20
     guidance_scale: float = 7.5
+    max_batch_size: int = 8  # Images rendered by one pipeline call
+    warm_up_on_start: bool = True  # Load the pipeline when the image service starts
 
     def __post_init__(self):
         if env_model := os.getenv("SD_MODEL_NAME"):
             self.model_name = env_model
+        if env_batch := os.getenv("SD_MAX_BATCH_SIZE"):
+            self.max_batch_size = int(env_batch)
+        if env_warm_up := os.getenv("SD_WARM_UP_ON_START"):
+            self.warm_up_on_start = env_warm_up.lower() == "true"
 
 
 @dataclass
@@ -92,6 +110,12 @@ class ImageIsolationConfig:
     max_processing_time: int = 10  # seconds
     output_format: str = "PNG"  # PNG for transparency support
     uniform_background_color: tuple = (255, 255, 255)
+    quality_batch_workers: int = 1  # > 1 analyzes batch images concurrently
+    quality_batch_backend: str = "thread"  # thread, process
+    quality_batch_early_stop: bool = True  # stop once regeneration is certain
+    result_cache_enabled: bool = True  # reuse results for identical image bytes
+    result_cache_dir: str = ".cache/image_results"
+    result_cache_mb: int = 500
 
     def __post_init__(self):
         if env_enabled := os.getenv("IMAGE_ISOLATION_ENABLED"):
@@ -106,6 +130,16 @@ class ImageIsolationConfig:
             self.model_default = env_model
         if env_threshold := os.getenv("IMAGE_ISOLATION_CONFIDENCE_THRESHOLD"):
             self.detection_confidence_threshold = float(env_threshold)
+        if env_workers := os.getenv("QUALITY_BATCH_WORKERS"):
+            self.quality_batch_workers = int(env_workers)
+        if env_backend := os.getenv("QUALITY_BATCH_BACKEND"):
+            self.quality_batch_backend = env_backend
+        if env_cache_enabled := os.getenv("IMAGE_RESULT_CACHE_ENABLED"):
+            self.result_cache_enabled = env_cache_enabled.lower() == "true"
+        if env_cache_dir := os.getenv("IMAGE_RESULT_CACHE_DIR"):
+            self.result_cache_dir = env_cache_dir
+        if env_cache_mb := os.getenv("IMAGE_RESULT_CACHE_MB"):
+            self.result_cache_mb = int(env_cache_mb)
 
 
 @dataclass
@@ -136,12 +170,25 @@ class SecurityConfig:
     encryption_key: str = "dev-encryption-key-change-in-production"
     password_hash_rounds: int = 12
     session_timeout_hours: int = 24
+    # "memory" (single process) or "database" (shared by all replicas)
+    session_store: str = "memory"
+    # Sliding session refreshes are written at most this often per session
+    session_refresh_interval_seconds: int = 60
+    # "memory" (per process) or "redis" (shared by all replicas)
+    rate_limit_backend: str = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
 
     def __post_init__(self):
         if env_secret := os.getenv("SECRET_KEY"):
             self.secret_key = env_secret
         if env_encryption := os.getenv("ENCRYPTION_KEY"):
             self.encryption_key = env_encryption
+        if env_session_store := os.getenv("SESSION_STORE"):
+            self.session_store = env_session_store
+        if env_rate_limit_backend := os.getenv("RATE_LIMIT_BACKEND"):
+            self.rate_limit_backend = env_rate_limit_backend
+        if env_redis_url := os.getenv("REDIS_URL"):
+            self.rate_limit_redis_url = env_redis_url
 
 
 @dataclass
@@ -321,6 +368,8 @@ class PALDEnhancementConfig:
     bias_job_priority_default: int = 10
     bias_job_max_retries: int = 3
     bias_job_timeout_minutes: int = 30
+    bias_batch_claims: bool = True  # Claim/finalize job batches in one transaction each
+    bias_detector_processes: int = 0  # 0 runs detectors inline in the worker
     
     # Schema evolution settings
     schema_evolution_threshold: int = 5
@@ -0,0 +1,37 @@
+"""add user sessions table
+
+Revision ID: b7d2e9f41c3a
+Revises: acaec84fad99
+Create Date: 2026-10-16 09:12:31.204117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e9f41c3a'
+down_revision = 'acaec84fad99'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sessions shared by all Streamlit replicas (SESSION_STORE=database)
+    op.create_table('user_sessions',
+        sa.Column('session_id', sa.String(length=64), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_role', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('last_accessed', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_index('idx_user_sessions_user', 'user_sessions', ['user_id'])
+    op.create_index('idx_user_sessions_expires', 'user_sessions', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('idx_user_sessions_expires', table_name='user_sessions')
+    op.drop_index('idx_user_sessions_user', table_name='user_sessions')
+    op.drop_table('user_sessions')
@@ -0,0 +1,47 @@
+"""add audit rollup tables
+
+Revision ID: d4a8c1e7f920
+Revises: b7d2e9f41c3a
+Create Date: 2026-10-16 11:04:52.538201
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8c1e7f920'
+down_revision = 'b7d2e9f41c3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Hourly/daily audit_logs aggregates read by the admin dashboard
+    op.create_table('audit_log_rollups',
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('operation', sa.String(length=100), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('latency_sum_ms', sa.BigInteger(), nullable=False),
+        sa.Column('latency_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'operation')
+    )
+    op.create_table('user_daily_activity',
+        sa.Column('activity_date', sa.Date(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.PrimaryKeyConstraint('activity_date', 'user_id')
+    )
+    op.create_table('audit_rollup_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('audit_rollup_state')
+    op.drop_table('user_daily_activity')
+    op.drop_table('audit_log_rollups')
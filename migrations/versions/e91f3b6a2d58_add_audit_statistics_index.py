@@ -0,0 +1,28 @@
+"""add audit statistics index
+
+Revision ID: e91f3b6a2d58
+Revises: d4a8c1e7f920
+Create Date: 2026-10-16 14:21:07.318842
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e91f3b6a2d58'
+down_revision = 'd4a8c1e7f920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Covering index for the GROUP BY queries behind audit statistics
+    op.create_index(
+        'idx_audit_statistics',
+        'audit_logs',
+        ['operation', 'model_used', 'status', 'created_at', 'latency_ms', 'token_usage'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('idx_audit_statistics', table_name='audit_logs')
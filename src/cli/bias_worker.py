@@ -10,11 +10,12 @@ import sys
 from typing import Optional
 
 import click
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from config.config import config
 from src.services.bias_worker import BiasWorker
+from src.services.job_notifications import get_job_notifier
 from src.services.job_queue import JobQueue
 from src.utils.logging import get_logger
 
@@ -34,6 +35,14 @@ class GracefulShutdown:
         self.shutdown = True
 
 
+def create_worker_engine(database_url: str) -> AsyncEngine:
+    """Create the async engine for the worker."""
+    if database_url.startswith("sqlite"):
+        # Several worker processes share one file; wait for the write lock instead of failing
+        return create_async_engine(database_url, connect_args={"timeout": 30})
+    return create_async_engine(database_url)
+
+
 @click.command()
 @click.option(
     "--batch-size",
@@ -43,9 +52,15 @@ class GracefulShutdown:
 )
 @click.option(
     "--poll-interval",
-    default=5,
-    help="Seconds to wait between polling for new jobs",
-    type=int
+    default=5.0,
+    help="Maximum seconds to wait for new jobs while the queue is idle",
+    type=float
+)
+@click.option(
+    "--min-poll-interval",
+    default=0.1,
+    help="Initial idle wait; doubles up to --poll-interval while no jobs arrive",
+    type=float
 )
 @click.option(
     "--max-concurrent",
@@ -53,7 +68,45 @@ class GracefulShutdown:
     help="Maximum number of concurrent job processors",
     type=int
 )
-def main(batch_size: int, poll_interval: int, max_concurrent: int):
+@click.option(
+    "--detector-processes",
+    default=None,
+    help="Size of the process pool for CPU-bound bias detectors (0 runs them inline)",
+    type=int
+)
+@click.option(
+    "--jobs-per-dispatch",
+    default=4,
+    help="Number of jobs sent to a detector process per dispatch",
+    type=int
+)
+@click.option(
+    "--batch-claims/--no-batch-claims",
+    default=None,
+    help="Claim and finalize whole batches in one transaction each (default from config)"
+)
+@click.option(
+    "--database-url",
+    default=None,
+    help="Async SQLAlchemy database URL (defaults to the configured PostgreSQL DSN)"
+)
+@click.option(
+    "--exit-when-idle",
+    is_flag=True,
+    default=False,
+    help="Exit once a poll finds no pending jobs (for one-shot runs and benchmarks)"
+)
+def main(
+    batch_size: int,
+    poll_interval: float,
+    min_poll_interval: float,
+    max_concurrent: int,
+    detector_processes: Optional[int],
+    jobs_per_dispatch: int,
+    batch_claims: Optional[bool],
+    database_url: Optional[str],
+    exit_when_idle: bool,
+):
     """Run bias analysis worker with configurable batch processing."""
     logger.info(f"Starting bias worker (batch_size={batch_size}, poll_interval={poll_interval})")
     
@@ -61,23 +114,36 @@ def main(batch_size: int, poll_interval: int, max_concurrent: int):
     shutdown_handler = GracefulShutdown()
     
     # Create async database engine
-    engine = create_async_engine(config.database.dsn.replace("postgresql://", "postgresql+asyncpg://"))
+    database_url = database_url or config.database.dsn.replace("postgresql://", "postgresql+asyncpg://")
+    engine = create_worker_engine(database_url)
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     
-    # Initialize services
-    job_queue = JobQueue(async_session)
-    worker = BiasWorker(job_queue, batch_size=batch_size, max_concurrent=max_concurrent)
+    # Initialize services; PostgreSQL workers are woken via LISTEN/NOTIFY
+    job_queue = JobQueue(async_session, notifier=get_job_notifier(database_url))
+    worker = BiasWorker(
+        job_queue,
+        batch_size=batch_size,
+        max_concurrent=max_concurrent,
+        batch_claims=batch_claims,
+        detector_processes=detector_processes,
+        jobs_per_dispatch=jobs_per_dispatch,
+    )
     
     async def run_worker():
         """Main worker loop."""
+        total_processed = 0
         try:
-            while not shutdown_handler.shutdown:
-                await worker.process_batch()
-                await asyncio.sleep(poll_interval)
+            total_processed = await worker.run(
+                should_stop=lambda: shutdown_handler.shutdown,
+                min_idle_seconds=min(min_poll_interval, poll_interval),
+                max_idle_seconds=poll_interval,
+                exit_when_idle=exit_when_idle,
+            )
         except Exception as e:
             logger.error(f"Worker error: {e}", exc_info=True)
         finally:
-            logger.info("Worker shutdown complete")
+            logger.info(f"Worker shutdown complete (processed {total_processed} jobs)")
+            worker.close()
             await engine.dispose()
     
     # Run the worker
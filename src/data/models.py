@@ -9,8 +9,10 @@ from datetime import datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -260,6 +262,16 @@ class AuditLog(Base):
         Index("idx_audit_status", "status"),
         Index("idx_audit_created_at", "created_at"),
         Index("idx_audit_parent", "parent_log_id"),
+        # Covers get_audit_statistics, so it never reads table rows
+        Index(
+            "idx_audit_statistics",
+            "operation",
+            "model_used",
+            "status",
+            "created_at",
+            "latency_ms",
+            "token_usage",
+        ),
     )
 
     @validates("status")
@@ -855,3 +867,62 @@ class SchemaVersion(Base):
     
     def __repr__(self):
         return f"<SchemaVersion(version={self.version}, active={self.is_active})>"
+
+
+class UserSession(Base):
+    """Login session shared by all application replicas."""
+    __tablename__ = "user_sessions"
+    
+    session_id = Column(String(64), primary_key=True)
+    user_id = Column(PostgresUUID(as_uuid=True), nullable=False)
+    user_role = Column(String(50), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    last_accessed = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_user_sessions_user", "user_id"),
+        Index("idx_user_sessions_expires", "expires_at"),
+    )
+    
+    def __repr__(self):
+        return f"<UserSession(user_id={self.user_id}, expires_at={self.expires_at})>"
+
+
+class AuditLogRollup(Base):
+    """Hourly and daily audit log aggregates per operation for admin statistics."""
+    __tablename__ = "audit_log_rollups"
+    
+    granularity = Column(String(10), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    operation = Column(String(100), primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(BigInteger, nullable=False, default=0)
+    latency_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AuditLogRollup({self.granularity} {self.bucket_start}, operation={self.operation})>"
+
+
+class UserDailyActivity(Base):
+    """Users with at least one audit log entry per day."""
+    __tablename__ = "user_daily_activity"
+    
+    activity_date = Column(Date, primary_key=True)
+    user_id = Column(PostgresUUID(as_uuid=True), primary_key=True)
+    
+    def __repr__(self):
+        return f"<UserDailyActivity(date={self.activity_date}, user_id={self.user_id})>"
+
+
+class AuditRollupState(Base):
+    """High-water mark of the audit_logs rows included in the rollups."""
+    __tablename__ = "audit_rollup_state"
+    
+    name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<AuditRollupState(name={self.name}, watermark={self.watermark})>"
@@ -4,13 +4,15 @@ Implements the repository pattern for all database entities with CRUD operations
 """
 
 import logging
+from collections.abc import Collection
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, asc, desc
+from sqlalchemy import and_, asc, desc, func, literal, or_, select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 
 from .models import (
     AuditLog,
@@ -52,6 +54,9 @@ from .schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Guards the recursive thread queries against parent_log_id cycles
+MAX_THREAD_DEPTH = 10_000
+
 
 class BaseRepository:
     """Base repository with common CRUD operations."""
@@ -638,30 +643,7 @@ class AuditLogRepository(BaseRepository):
     ) -> list[AuditLog]:
         """Get audit logs with filters."""
         try:
-            query = self.session.query(AuditLog)
-
-            if filters.user_id:
-                query = query.filter(AuditLog.user_id == filters.user_id)
-            if filters.operation:
-                query = query.filter(AuditLog.operation == filters.operation)
-            if filters.model_used:
-                query = query.filter(AuditLog.model_used == filters.model_used)
-            if filters.status:
-                query = query.filter(
-                    AuditLog.status
-                    == (
-                        filters.status.value if hasattr(filters.status, "value") else filters.status
-                    )
-                )
-            if filters.start_date:
-                query = query.filter(AuditLog.created_at >= filters.start_date)
-            if filters.end_date:
-                query = query.filter(AuditLog.created_at <= filters.end_date)
-            if filters.request_id:
-                query = query.filter(AuditLog.request_id == filters.request_id)
-            if filters.parent_log_id:
-                query = query.filter(AuditLog.parent_log_id == filters.parent_log_id)
-
+            query = self.session.query(AuditLog).filter(*self._filter_conditions(filters))
             query = query.order_by(desc(AuditLog.created_at))
 
             if offset:
@@ -674,6 +656,232 @@ class AuditLogRepository(BaseRepository):
             logger.error(f"Error getting filtered audit logs: {e}")
             return []
 
+    def get_statistics(self, filters: AuditLogFilters) -> list[tuple]:
+        """
+        Aggregate audit logs matching the filters in the database.
+
+        Returns:
+            One row per (operation, model_used, status) with the log count,
+            the sum and count of recorded (non-zero) latencies, and the token sum
+        """
+        try:
+            recorded_latency = AuditLog.latency_ms > 0
+            return [
+                tuple(row)
+                for row in self.session.execute(
+                    select(
+                        AuditLog.operation,
+                        AuditLog.model_used,
+                        AuditLog.status,
+                        func.count(),
+                        func.sum(AuditLog.latency_ms).filter(recorded_latency),
+                        func.count().filter(recorded_latency),
+                        func.sum(AuditLog.token_usage),
+                    )
+                    .where(*self._filter_conditions(filters))
+                    .group_by(AuditLog.operation, AuditLog.model_used, AuditLog.status)
+                ).all()
+            ]
+        except Exception as e:
+            logger.error(f"Error aggregating audit logs: {e}")
+            return []
+
+    def get_latency_percentiles(
+        self, filters: AuditLogFilters, percentiles: tuple[int, ...] = (50, 95, 99)
+    ) -> dict[tuple[str, str | None], dict[int, int]]:
+        """
+        Nearest-rank latency percentiles per operation and model.
+
+        Args:
+            filters: Audit log filters
+            percentiles: Percentiles to compute (1-100)
+
+        Returns:
+            Dict mapping (operation, model_used) to {percentile: latency_ms}
+        """
+        try:
+            conditions = [*self._filter_conditions(filters), AuditLog.latency_ms > 0]
+            group = (AuditLog.operation, AuditLog.model_used)
+            result: dict[tuple[str, str | None], dict[int, int]] = {}
+
+            if self.session.get_bind().dialect.name == "postgresql":
+                fractions = postgresql.array([p / 100 for p in percentiles])
+                rows = self.session.execute(
+                    select(
+                        *group,
+                        func.percentile_disc(fractions).within_group(AuditLog.latency_ms),
+                    )
+                    .where(*conditions)
+                    .group_by(*group)
+                ).all()
+                for operation, model_used, values in rows:
+                    result[(operation, model_used)] = dict(zip(percentiles, values, strict=True))
+                return result
+
+            # Portable fallback: rank latencies per group with window functions
+            # and keep only the rows at the requested ranks
+            ranked = (
+                select(
+                    *group,
+                    AuditLog.latency_ms,
+                    func.row_number()
+                    .over(partition_by=group, order_by=AuditLog.latency_ms)
+                    .label("position"),
+                    func.count().over(partition_by=group).label("total"),
+                )
+                .where(*conditions)
+                .subquery()
+            )
+            targets = [ranked.c.position == (p * ranked.c.total + 99) // 100 for p in percentiles]
+            rows = self.session.execute(
+                select(
+                    ranked.c.operation,
+                    ranked.c.model_used,
+                    ranked.c.position,
+                    ranked.c.total,
+                    ranked.c.latency_ms,
+                ).where(or_(*targets))
+            ).all()
+            for operation, model_used, position, total, latency_ms in rows:
+                values = result.setdefault((operation, model_used), {})
+                for p in percentiles:
+                    if position == (p * total + 99) // 100:
+                        values[p] = latency_ms
+            return result
+        except Exception as e:
+            logger.error(f"Error computing audit latency percentiles: {e}")
+            return {}
+
+    def get_thread_roots(self, log_ids: Collection[UUID]) -> dict[UUID, UUID]:
+        """
+        Find the root of the conversation thread of each log with one recursive query.
+
+        Returns:
+            Dict mapping each existing log ID to its root log ID (the topmost
+            ancestor that exists; a root maps to itself)
+        """
+        if not log_ids:
+            return {}
+        try:
+            ancestors = (
+                select(
+                    AuditLog.id.label("log_id"),
+                    AuditLog.id.label("ancestor_id"),
+                    AuditLog.parent_log_id,
+                    literal(0).label("depth"),
+                )
+                .where(AuditLog.id.in_(log_ids))
+                .cte("thread_ancestors", recursive=True)
+            )
+            parent = aliased(AuditLog)
+            ancestors = ancestors.union_all(
+                select(ancestors.c.log_id, parent.id, parent.parent_log_id, ancestors.c.depth + 1)
+                .select_from(ancestors)
+                .join(parent, parent.id == ancestors.c.parent_log_id)
+                .where(ancestors.c.depth < MAX_THREAD_DEPTH)
+            )
+
+            roots: dict[UUID, UUID] = {}
+            depths: dict[UUID, int] = {}
+            for log_id, ancestor_id, depth in self.session.execute(
+                select(ancestors.c.log_id, ancestors.c.ancestor_id, ancestors.c.depth)
+            ):
+                if depth >= depths.get(log_id, -1):
+                    roots[log_id] = ancestor_id
+                    depths[log_id] = depth
+            return roots
+        except Exception as e:
+            logger.error(f"Error resolving audit thread roots: {e}")
+            return {}
+
+    def get_threads(self, root_ids: Collection[UUID]) -> dict[UUID, list[AuditLog]]:
+        """
+        Load whole conversation threads with one recursive query.
+
+        Returns:
+            Dict mapping each root log ID to the logs of its thread, depth
+            first with the newest children first
+        """
+        if not root_ids:
+            return {}
+        try:
+            descendants = (
+                select(
+                    AuditLog.id.label("log_id"),
+                    AuditLog.id.label("root_id"),
+                    literal(0).label("depth"),
+                )
+                .where(AuditLog.id.in_(root_ids))
+                .cte("thread_descendants", recursive=True)
+            )
+            child = aliased(AuditLog)
+            descendants = descendants.union_all(
+                select(child.id, descendants.c.root_id, descendants.c.depth + 1)
+                .select_from(descendants)
+                .join(child, child.parent_log_id == descendants.c.log_id)
+                .where(descendants.c.depth < MAX_THREAD_DEPTH)
+            )
+            rows = self.session.execute(
+                select(AuditLog, descendants.c.root_id).join(
+                    descendants, descendants.c.log_id == AuditLog.id
+                )
+            ).all()
+
+            # A parent_log_id cycle yields each of its logs once per lap until
+            # MAX_THREAD_DEPTH, so children are keyed by ID to keep one copy
+            roots: dict[UUID, AuditLog] = {}
+            children: dict[UUID, dict[UUID, AuditLog]] = {}
+            for log, root_id in rows:
+                if log.id == root_id:
+                    roots[root_id] = log
+                else:
+                    children.setdefault(log.parent_log_id, {})[log.id] = log
+
+            threads: dict[UUID, list[AuditLog]] = {}
+            for root_id, root in roots.items():
+                thread = []
+                visited = set()
+                stack = [root]
+                while stack:
+                    log = stack.pop()
+                    if log.id in visited:
+                        continue
+                    visited.add(log.id)
+                    thread.append(log)
+                    # Pushed oldest first, so the newest child is visited next
+                    stack.extend(
+                        sorted(children.get(log.id, {}).values(), key=lambda c: c.created_at)
+                    )
+                threads[root_id] = thread
+            return threads
+        except Exception as e:
+            logger.error(f"Error loading audit threads: {e}")
+            return {}
+
+    @staticmethod
+    def _filter_conditions(filters: AuditLogFilters) -> list:
+        conditions = []
+        if filters.user_id:
+            conditions.append(AuditLog.user_id == filters.user_id)
+        if filters.operation:
+            conditions.append(AuditLog.operation == filters.operation)
+        if filters.model_used:
+            conditions.append(AuditLog.model_used == filters.model_used)
+        if filters.status:
+            conditions.append(
+                AuditLog.status
+                == (filters.status.value if hasattr(filters.status, "value") else filters.status)
+            )
+        if filters.start_date:
+            conditions.append(AuditLog.created_at >= filters.start_date)
+        if filters.end_date:
+            conditions.append(AuditLog.created_at <= filters.end_date)
+        if filters.request_id:
+            conditions.append(AuditLog.request_id == filters.request_id)
+        if filters.parent_log_id:
+            conditions.append(AuditLog.parent_log_id == filters.parent_log_id)
+        return conditions
+
 
 class FederatedLearningRepository(BaseRepository):
     """Repository for FederatedLearningUpdate entities."""
@@ -335,11 +335,9 @@ class ImageProviderError(ExternalServiceError):
     """Image provider errors."""
 
     def __init__(self, message: str, **kwargs):
-        super().__init__(
-            "Image Provider",
-            message,
-            user_message="The image generation service is temporarily unavailable. Please try again later.",
-            **kwargs,
+        super().__init__("Image Provider", message, **kwargs)
+        self.user_message = (
+            "The image generation service is temporarily unavailable. Please try again later."
         )
 
 
@@ -347,11 +345,8 @@ class ImageGenerationError(ImageProviderError):
     """Image generation specific error."""
 
     def __init__(self, message: str, **kwargs):
-        super().__init__(
-            f"Image generation failed: {message}",
-            user_message="Unable to generate image. Please try again with different settings.",
-            **kwargs,
-        )
+        super().__init__(f"Image generation failed: {message}", **kwargs)
+        self.user_message = "Unable to generate image. Please try again with different settings."
 
 
 # Database Errors
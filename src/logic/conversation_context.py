@@ -0,0 +1,271 @@
+"""
+Conversation context management for GITTE LLM interactions.
+Keeps each conversation within a token budget by folding older turns into a
+running summary, assembles prompt history incrementally and evicts idle
+conversations after a TTL.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text (about four characters per token)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def summarize_turns(turns: list[dict[str, Any]], max_chars_per_turn: int = 160) -> str:
+    """
+    Build an extractive summary line for folded turns.
+
+    Keeps the first sentence of every turn, truncated to ``max_chars_per_turn``,
+    so summarizing never needs an extra LLM round trip.
+    """
+    parts = []
+    for turn in turns:
+        content = " ".join(turn["content"].split())
+        first_sentence = _SENTENCE_END.split(content, maxsplit=1)[0]
+        if len(first_sentence) > max_chars_per_turn:
+            first_sentence = first_sentence[: max_chars_per_turn - 3].rstrip() + "..."
+        parts.append(f"{turn['role'].title()}: {first_sentence}")
+    return " | ".join(parts)
+
+
+@dataclass
+class ConversationWindow:
+    """Bounded state of a single conversation."""
+
+    turns: deque = field(default_factory=deque)
+    rendered: deque = field(default_factory=deque)
+    turn_tokens: deque = field(default_factory=deque)
+    history_tokens: int = 0
+    summary_lines: deque = field(default_factory=deque)
+    summary_tokens: int = 0
+    folded_turns: int = 0
+    total_turns: int = 0
+    last_access: float = field(default_factory=time.monotonic)
+    last_updated: datetime | None = None
+    context_fingerprint: str | None = None
+    system_prompt: str | None = None
+    last_prompt_tokens: int = 0
+    last_prompt_chars: int = 0
+    turn_latencies_ms: deque = field(default_factory=lambda: deque(maxlen=50))
+    _history_text: str | None = None
+
+    def history_text(self) -> str:
+        """Rendered summary plus recent turns, rebuilt only after changes."""
+        if self._history_text is None:
+            text = ""
+            if self.summary_lines:
+                text += "\nSummary of earlier conversation: " + " | ".join(self.summary_lines)
+            text += "".join(self.rendered)
+            self._history_text = text
+        return self._history_text
+
+
+class ConversationContextManager:
+    """
+    Token-budgeted conversation memory shared by LLM logic.
+
+    Each conversation keeps a ring buffer of recent turns within
+    ``history_token_budget``; turns that fall out of the window are folded into a
+    bounded summary. Conversations idle for longer than ``ttl_seconds`` are evicted.
+    """
+
+    def __init__(
+        self,
+        history_token_budget: int = 1500,
+        summary_token_budget: int = 300,
+        max_turns: int = 20,
+        ttl_seconds: int = 3600,
+        max_conversations: int = 10000,
+        summarizer: Callable[[list[dict[str, Any]]], str] | None = None,
+    ):
+        """
+        Initialize conversation context manager.
+
+        Args:
+            history_token_budget: Estimated tokens allowed for recent turns
+            summary_token_budget: Estimated tokens allowed for the folded summary
+            max_turns: Maximum number of recent turns kept verbatim
+            ttl_seconds: Idle time after which a conversation is evicted
+            max_conversations: Hard cap on tracked conversations (LRU eviction)
+            summarizer: Function turning folded turns into a summary line
+        """
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_conversations = max_conversations
+        self.summarizer = summarizer or summarize_turns
+
+        self._windows: OrderedDict[str, ConversationWindow] = OrderedDict()
+        self._lock = threading.RLock()
+        self._evicted = 0
+
+    def get_turns(self, conversation_key: str) -> list[dict[str, Any]]:
+        """Get the recent (unfolded) turns of a conversation."""
+        with self._lock:
+            window = self._touch(conversation_key, create=False)
+            return list(window.turns) if window else []
+
+    def render_history(self, conversation_key: str) -> str:
+        """Get the rendered history block for a conversation's prompt."""
+        with self._lock:
+            window = self._touch(conversation_key, create=False)
+            return window.history_text() if window else ""
+
+    def get_system_prompt(
+        self, conversation_key: str, fingerprint: str, build: Callable[[], str]
+    ) -> str:
+        """
+        Get the cached system prompt for a conversation, rebuilding it on context change.
+
+        Args:
+            conversation_key: Conversation identifier
+            fingerprint: Stable fingerprint of the inputs of ``build``
+            build: Function producing the system prompt
+        """
+        with self._lock:
+            window = self._touch(conversation_key, create=True)
+            if window.context_fingerprint != fingerprint or window.system_prompt is None:
+                window.system_prompt = build()
+                window.context_fingerprint = fingerprint
+            return window.system_prompt
+
+    def add_exchange(self, conversation_key: str, user_message: str, assistant_response: str) -> None:
+        """Append a user/assistant exchange and enforce the token budget."""
+        with self._lock:
+            window = self._touch(conversation_key, create=True)
+            timestamp = datetime.utcnow()
+            for role, content in (("user", user_message), ("assistant", assistant_response)):
+                self._append_turn(
+                    window, {"role": role, "content": content, "timestamp": timestamp.isoformat()}
+                )
+            window.last_updated = timestamp
+            self._enforce_budget(window)
+
+    def record_prompt(
+        self, conversation_key: str, prompt: str, latency_ms: float | None = None
+    ) -> None:
+        """Record prompt size and turn latency for a conversation."""
+        with self._lock:
+            window = self._touch(conversation_key, create=True)
+            window.last_prompt_chars = len(prompt)
+            window.last_prompt_tokens = estimate_tokens(prompt)
+            if latency_ms is not None:
+                window.turn_latencies_ms.append(latency_ms)
+
+    def clear(self, conversation_key: str) -> bool:
+        """Remove a conversation. Returns True if it existed."""
+        with self._lock:
+            return self._windows.pop(conversation_key, None) is not None
+
+    def evict_idle(self) -> int:
+        """Evict conversations idle longer than the TTL. Returns the number evicted."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        evicted = 0
+        with self._lock:
+            # Windows are kept in access order, so expired ones are at the front
+            while self._windows:
+                key, window = next(iter(self._windows.items()))
+                if window.last_access > cutoff:
+                    break
+                del self._windows[key]
+                evicted += 1
+            self._evicted += evicted
+        if evicted:
+            logger.debug(f"Evicted {evicted} idle conversation contexts")
+        return evicted
+
+    def get_conversation_stats(self, conversation_key: str) -> dict[str, Any] | None:
+        """Get size and latency statistics for a conversation."""
+        with self._lock:
+            window = self._windows.get(conversation_key)
+            if window is None:
+                return None
+            latencies = list(window.turn_latencies_ms)
+            return {
+                "message_count": len(window.turns),
+                "total_messages": window.total_turns,
+                "folded_messages": window.folded_turns,
+                "history_tokens": window.history_tokens,
+                "summary_tokens": window.summary_tokens,
+                "last_prompt_tokens": window.last_prompt_tokens,
+                "last_prompt_chars": window.last_prompt_chars,
+                "last_turn_latency_ms": latencies[-1] if latencies else None,
+                "avg_turn_latency_ms": sum(latencies) / len(latencies) if latencies else None,
+                "last_updated": window.last_updated.isoformat() if window.last_updated else None,
+            }
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get manager-wide statistics."""
+        with self._lock:
+            return {
+                "conversations": len(self._windows),
+                "evicted": self._evicted,
+                "history_token_budget": self.history_token_budget,
+                "summary_token_budget": self.summary_token_budget,
+            }
+
+    def _touch(self, conversation_key: str, create: bool) -> ConversationWindow | None:
+        """Look up a window, mark it recently used and run TTL eviction."""
+        self.evict_idle()
+        window = self._windows.get(conversation_key)
+        if window is None:
+            if not create:
+                return None
+            window = ConversationWindow()
+            self._windows[conversation_key] = window
+            while len(self._windows) > self.max_conversations:
+                self._windows.popitem(last=False)
+                self._evicted += 1
+        else:
+            self._windows.move_to_end(conversation_key)
+        window.last_access = time.monotonic()
+        return window
+
+    def _append_turn(self, window: ConversationWindow, turn: dict[str, Any]) -> None:
+        rendered = f"\n{turn['role'].title()}: {turn['content']}"
+        tokens = estimate_tokens(rendered)
+        window.turns.append(turn)
+        window.rendered.append(rendered)
+        window.turn_tokens.append(tokens)
+        window.history_tokens += tokens
+        window.total_turns += 1
+        window._history_text = None
+
+    def _enforce_budget(self, window: ConversationWindow) -> None:
+        """Fold the oldest turns into the summary until the window fits its budget."""
+        folded = []
+        while window.turns and (
+            len(window.turns) > self.max_turns
+            or (window.history_tokens > self.history_token_budget and len(window.turns) > 2)
+        ):
+            folded.append(window.turns.popleft())
+            window.rendered.popleft()
+            window.history_tokens -= window.turn_tokens.popleft()
+
+        if not folded:
+            return
+
+        window.folded_turns += len(folded)
+        line = self.summarizer(folded)
+        if line:
+            window.summary_lines.append(line)
+            window.summary_tokens += estimate_tokens(line)
+            while len(window.summary_lines) > 1 and window.summary_tokens > self.summary_token_budget:
+                window.summary_tokens -= estimate_tokens(window.summary_lines.popleft())
+        window._history_text = None
@@ -3,14 +3,18 @@ LLM Logic Layer for GITTE system.
 Handles business logic for LLM interactions, embodiment chat, and conversation management.
 """
 
+import json
 import logging
-from datetime import datetime
+import time
 from typing import Any
 from uuid import UUID
 
 from config.config import config
+from src.logic.conversation_context import ConversationContextManager
 from src.services.llm_provider import LLMProviderError, LLMResponse, LLMStreamResponse
 from src.services.llm_service import LLMService, get_llm_service
+from src.services.llm_streaming import StreamBatchConfig
+from src.services.performance_monitoring_service import performance_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +25,24 @@ class LLMLogic:
     Handles business rules, conversation context, and embodiment-specific interactions.
     """
 
-    def __init__(self, llm_service: LLMService | None = None):
+    def __init__(
+        self,
+        llm_service: LLMService | None = None,
+        context_manager: ConversationContextManager | None = None,
+    ):
         """
         Initialize LLM logic.
 
         Args:
             llm_service: LLM service instance (defaults to global service)
+            context_manager: Conversation memory (defaults to configured token budgets)
         """
         self.llm_service = llm_service or get_llm_service()
-        self._conversation_contexts: dict[str, list[dict[str, str]]] = {}
+        self.context_manager = context_manager or ConversationContextManager(
+            history_token_budget=config.llm.context_token_budget,
+            summary_token_budget=config.llm.context_summary_token_budget,
+            ttl_seconds=config.llm.context_ttl_seconds,
+        )
 
     def generate_embodiment_response(
         self,
@@ -53,24 +66,23 @@ class LLMLogic:
             LLMResponse: Generated embodiment response
         """
         try:
-            # Build conversation context
+            # Create embodiment-aware prompt from the bounded conversation window
             conversation_key = conversation_id or str(user_id)
-            context_messages = self._get_conversation_context(conversation_key)
-
-            # Create embodiment-aware prompt
             prompt = self._build_embodiment_prompt(
                 user_message=user_message,
                 embodiment_context=embodiment_context,
-                conversation_history=context_messages,
+                conversation_key=conversation_key,
             )
 
             # Generate response
+            start_time = time.perf_counter()
             response = self.llm_service.generate_response(
                 prompt=prompt,
                 model=model,
                 parameters=self._get_embodiment_parameters(),
                 user_id=user_id,
             )
+            latency_ms = (time.perf_counter() - start_time) * 1000
 
             # Update conversation context
             self._update_conversation_context(
@@ -78,6 +90,7 @@ class LLMLogic:
                 user_message=user_message,
                 assistant_response=response.text,
             )
+            self._record_turn(conversation_key, prompt, latency_ms)
 
             logger.info(
                 f"Generated embodiment response for user {user_id}: {len(response.text)} chars"
@@ -98,6 +111,7 @@ class LLMLogic:
         embodiment_context: dict[str, Any] | None = None,
         conversation_id: str | None = None,
         model: str | None = None,
+        batching: StreamBatchConfig | None = None,
     ) -> LLMStreamResponse:
         """
         Generate a streaming response for embodiment chat interaction.
@@ -108,21 +122,20 @@ class LLMLogic:
             embodiment_context: PALD data or embodiment preferences
             conversation_id: Conversation identifier for context
             model: Model to use (defaults to configured default)
+            batching: Fragment coalescing limits, e.g. StreamBatchConfig.for_ui()
 
         Returns:
             LLMStreamResponse: Streaming embodiment response
         """
         try:
-            # Build conversation context
+            # Create embodiment-aware prompt from the bounded conversation window
             conversation_key = conversation_id or str(user_id)
-            context_messages = self._get_conversation_context(conversation_key)
-
-            # Create embodiment-aware prompt
             prompt = self._build_embodiment_prompt(
                 user_message=user_message,
                 embodiment_context=embodiment_context,
-                conversation_history=context_messages,
+                conversation_key=conversation_key,
             )
+            self._record_turn(conversation_key, prompt)
 
             # Generate streaming response
             response = self.llm_service.generate_streaming_response(
@@ -130,6 +143,7 @@ class LLMLogic:
                 model=model,
                 parameters=self._get_embodiment_parameters(),
                 user_id=user_id,
+                batching=batching,
             )
 
             # Note: For streaming, we'll update context after the stream completes
@@ -215,8 +229,7 @@ class LLMLogic:
         Args:
             conversation_id: Conversation identifier
         """
-        if conversation_id in self._conversation_contexts:
-            del self._conversation_contexts[conversation_id]
+        if self.context_manager.clear(conversation_id):
             logger.debug(f"Cleared conversation context for {conversation_id}")
 
     def get_conversation_summary(self, conversation_id: str) -> dict[str, Any]:
@@ -229,12 +242,14 @@ class LLMLogic:
         Returns:
             Dict containing conversation summary
         """
-        context = self._conversation_contexts.get(conversation_id, [])
+        context = self.context_manager.get_turns(conversation_id)
+        stats = self.context_manager.get_conversation_stats(conversation_id) or {}
 
         return {
+            **stats,
             "conversation_id": conversation_id,
             "message_count": len(context),
-            "last_updated": datetime.utcnow().isoformat() if context else None,
+            "last_updated": stats.get("last_updated"),
             "context_length": sum(len(msg["content"]) for msg in context),
         }
 
@@ -243,8 +258,44 @@ class LLMLogic:
         user_message: str,
         embodiment_context: dict[str, Any] | None = None,
         conversation_history: list[dict[str, str]] | None = None,
+        conversation_key: str | None = None,
     ) -> str:
-        """Build a prompt for embodiment chat interaction."""
+        """
+        Build a prompt for embodiment chat interaction.
+
+        With a conversation_key, the system prompt and history come from the
+        conversation's cached window; otherwise conversation_history is rendered.
+        """
+        if conversation_key is not None:
+            fingerprint = json.dumps(embodiment_context or {}, sort_keys=True, default=str)
+            system_prompt = self.context_manager.get_system_prompt(
+                conversation_key,
+                fingerprint,
+                lambda: self._build_embodiment_system_prompt(embodiment_context),
+            )
+            conversation_text = self.context_manager.render_history(conversation_key)
+        else:
+            system_prompt = self._build_embodiment_system_prompt(embodiment_context)
+            conversation_text = ""
+            if conversation_history:
+                for msg in conversation_history[-10:]:  # Keep last 10 messages
+                    role = msg.get("role", "user")
+                    content = msg.get("content", "")
+                    conversation_text += f"\n{role.title()}: {content}"
+
+        # Combine all parts
+        full_prompt = system_prompt
+        if conversation_text:
+            full_prompt += f"\n\nConversation history:{conversation_text}"
+
+        full_prompt += f"\n\nUser: {user_message}\nAssistant:"
+
+        return full_prompt
+
+    def _build_embodiment_system_prompt(
+        self, embodiment_context: dict[str, Any] | None = None
+    ) -> str:
+        """Build the system part of the embodiment prompt."""
 
         # Base system prompt for embodiment
         system_prompt = """You are a personalized learning assistant embodiment. Your role is to help users explore and define their ideal learning companion through natural conversation.
@@ -289,22 +340,7 @@ Key guidelines:
                     f"\n\nUser's embodiment preferences:\n{chr(10).join(context_parts)}"
                 )
 
-        # Build conversation history
-        conversation_text = ""
-        if conversation_history:
-            for msg in conversation_history[-10:]:  # Keep last 10 messages
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                conversation_text += f"\n{role.title()}: {content}"
-
-        # Combine all parts
-        full_prompt = system_prompt
-        if conversation_text:
-            full_prompt += f"\n\nConversation history:{conversation_text}"
-
-        full_prompt += f"\n\nUser: {user_message}\nAssistant:"
-
-        return full_prompt
+        return system_prompt
 
     def _build_image_prompt_generation_prompt(
         self, user_description: str, embodiment_context: dict[str, Any] | None = None
@@ -357,41 +393,29 @@ Generate an optimized image generation prompt (return only the prompt, no explan
         }
 
     def _get_conversation_context(self, conversation_key: str) -> list[dict[str, str]]:
-        """Get conversation context for a conversation."""
-        return self._conversation_contexts.get(conversation_key, [])
+        """Get recent (unsummarized) messages of a conversation."""
+        return self.context_manager.get_turns(conversation_key)
 
     def _update_conversation_context(
         self, conversation_key: str, user_message: str, assistant_response: str
     ) -> None:
         """Update conversation context with new messages."""
-        if conversation_key not in self._conversation_contexts:
-            self._conversation_contexts[conversation_key] = []
-
-        context = self._conversation_contexts[conversation_key]
-
-        # Add user message
-        context.append(
-            {"role": "user", "content": user_message, "timestamp": datetime.utcnow().isoformat()}
-        )
-
-        # Add assistant response
-        context.append(
-            {
-                "role": "assistant",
-                "content": assistant_response,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        )
-
-        # Keep only last 20 messages (10 exchanges) to manage memory
-        if len(context) > 20:
-            context = context[-20:]
-            self._conversation_contexts[conversation_key] = context
+        self.context_manager.add_exchange(conversation_key, user_message, assistant_response)
 
         logger.debug(
-            f"Updated conversation context for {conversation_key}: {len(context)} messages"
+            f"Updated conversation context for {conversation_key}: "
+            f"{len(self.context_manager.get_turns(conversation_key))} messages"
         )
 
+    def _record_turn(
+        self, conversation_key: str, prompt: str, latency_ms: float | None = None
+    ) -> None:
+        """Record prompt size and latency of a chat turn."""
+        self.context_manager.record_prompt(conversation_key, prompt, latency_ms)
+        performance_monitor.record_histogram("llm_prompt_chars", len(prompt), unit="chars")
+        if latency_ms is not None:
+            performance_monitor.record_histogram("llm_turn_latency_ms", latency_ms, unit="ms")
+
 
 # Global LLM logic instance
 _llm_logic: LLMLogic | None = None
@@ -431,10 +455,11 @@ def generate_streaming_embodiment_response(
     embodiment_context: dict[str, Any] | None = None,
     conversation_id: str | None = None,
     model: str | None = None,
+    batching: StreamBatchConfig | None = None,
 ) -> LLMStreamResponse:
     """Generate streaming embodiment response using the global LLM logic."""
     return get_llm_logic().generate_streaming_embodiment_response(
-        user_message, user_id, embodiment_context, conversation_id, model
+        user_message, user_id, embodiment_context, conversation_id, model, batching
     )
 
 
@@ -4,6 +4,7 @@ Business logic for PALD schema management, validation, and evolution.
 """
 
 import logging
+from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 from uuid import UUID
@@ -22,6 +23,8 @@ from src.data.schemas import (
     PALDSchemaVersionResponse,
     PALDValidationResult,
 )
+from src.services.caching_service import invalidate_cache_tags, schema_cache_tag, user_cache_tag
+from src.services.pald_migration_service import MigrationProgress, PALDMigrationService
 from src.services.pald_service import PALDEvolutionService, PALDSchemaService
 
 logger = logging.getLogger(__name__)
@@ -62,6 +65,7 @@ class PALDManager:
             
             # Explicitly commit the transaction
             self.db_session.commit()
+            invalidate_cache_tags(user_cache_tag(user_id))
 
             logger.info(f"Created PALD data for user {user_id}, valid: {validation_result.is_valid}")
 
@@ -104,6 +108,7 @@ class PALDManager:
         existing_pald.updated_at = datetime.utcnow()
 
         updated_pald = self.repository.update(existing_pald)
+        invalidate_cache_tags(user_cache_tag(user_id))
 
         logger.info(f"Updated PALD data {pald_id} for user {user_id}")
 
@@ -217,63 +222,41 @@ class PALDManager:
 
         return PALDSchemaVersionResponse.model_validate(new_schema_version)
 
-    def migrate_pald_data_to_new_schema(self, target_schema_version: str) -> dict[str, Any]:
-        """Migrate existing PALD data to a new schema version."""
-        # Get target schema
-        target_schema_obj = (
-            self.db_session.query(PALDSchemaVersion)
-            .filter(PALDSchemaVersion.version == target_schema_version)
-            .first()
-        )
-
-        if not target_schema_obj:
-            raise ValueError(f"Schema version {target_schema_version} not found")
-
-        # Get all PALD data that needs migration
-        pald_data_to_migrate = (
-            self.db_session.query(PALDData)
-            .filter(PALDData.schema_version != target_schema_version)
-            .all()
-        )
-
-        migration_results = {
-            "total_records": len(pald_data_to_migrate),
-            "successful_migrations": 0,
-            "failed_migrations": 0,
-            "errors": [],
-        }
-
-        for pald_data in pald_data_to_migrate:
-            try:
-                # Validate against new schema
-                validation_result = self.schema_service.validate_pald_data(
-                    pald_data.pald_content, target_schema_version
-                )
-
-                # Update schema version and validation status
-                pald_data.schema_version = target_schema_version
-                pald_data.is_validated = validation_result.is_valid
-                pald_data.validation_errors = (
-                    {"errors": validation_result.errors} if validation_result.errors else None
-                )
-                pald_data.updated_at = datetime.utcnow()
-
-                migration_results["successful_migrations"] += 1
+    def migrate_pald_data_to_new_schema(
+        self,
+        target_schema_version: str,
+        chunk_size: int = 500,
+        dry_run: bool = False,
+        checkpoint_path: str | None = None,
+        progress_callback: Callable[[MigrationProgress], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Migrate existing PALD data to a new schema version.
 
-            except Exception as e:
-                migration_results["failed_migrations"] += 1
-                migration_results["errors"].append(
-                    f"Failed to migrate PALD {pald_data.id}: {str(e)}"
-                )
-                logger.error(f"Failed to migrate PALD data {pald_data.id}: {str(e)}")
+        Streams rows in keyset-paginated chunks and commits per chunk, so memory
+        stays constant and an interrupted run resumes from ``checkpoint_path``.
 
-        self.db_session.commit()
+        Args:
+            target_schema_version: Schema version to migrate to
+            chunk_size: Rows per chunk (page, bulk UPDATE and commit)
+            dry_run: Validate and report without writing anything
+            checkpoint_path: Optional JSON checkpoint file for resuming
+            progress_callback: Called with the progress after every chunk
 
-        logger.info(
-            f"PALD data migration completed: {migration_results['successful_migrations']} successful, {migration_results['failed_migrations']} failed"
+        Returns:
+            Migration results with totals, throughput and (bounded) errors
+        """
+        migration_service = PALDMigrationService(self.db_session, chunk_size=chunk_size)
+        results = migration_service.migrate(
+            target_schema_version,
+            dry_run=dry_run,
+            checkpoint_path=checkpoint_path,
+            progress_callback=progress_callback,
         )
-
-        return migration_results
+        if not dry_run:
+            # Rewrites PALD data of many users at once; drop schema-derived entries
+            invalidate_cache_tags(schema_cache_tag(target_schema_version), schema_cache_tag())
+        return results
 
 
 class PALDSchemaManager:
@@ -350,6 +333,7 @@ class PALDSchemaManager:
         # Clear cache in schema service
         self.schema_service._current_schema_cache = None
         self.schema_service._current_version_cache = None
+        invalidate_cache_tags(schema_cache_tag())
 
         logger.info(f"Activated PALD schema version {version}")
 
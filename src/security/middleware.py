@@ -12,7 +12,9 @@ from typing import Any
 
 import streamlit as st
 
+from config.config import config
 from src.exceptions import RateLimitExceededError, SecurityError, SuspiciousActivityError
+from src.security.rate_limiter import RateLimitBackend, create_rate_limit_backend
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +30,11 @@ class CSRFError(SecurityError):
 class SecurityMiddleware:
     """Security middleware for request processing."""
 
-    def __init__(self):
+    def __init__(self, rate_limiter: RateLimitBackend | None = None):
         self.csrf_tokens: dict[str, dict[str, Any]] = {}
-        self.rate_limits: dict[str, list[float]] = {}
+        self.rate_limiter = rate_limiter or create_rate_limit_backend(
+            config.security.rate_limit_backend, config.security.rate_limit_redis_url
+        )
         self.suspicious_ips: set = set()
 
         # Security configuration
@@ -164,41 +168,31 @@ class SecurityMiddleware:
         if expired_tokens:
             logger.debug(f"Cleaned up {len(expired_tokens)} expired CSRF tokens")
 
-    def check_rate_limit(self, identifier: str, max_requests: int | None = None) -> bool:
+    def check_rate_limit(
+        self, identifier: str, max_requests: int | None = None, window_seconds: int | None = None
+    ) -> bool:
         """
         Check rate limit for identifier (IP, user, etc.).
 
         Args:
             identifier: Unique identifier for rate limiting
             max_requests: Maximum requests allowed (uses default if None)
+            window_seconds: Window length in seconds (uses default if None)
 
         Returns:
             True if within rate limit
         """
         if max_requests is None:
             max_requests = self.rate_limit_max_requests
+        if window_seconds is None:
+            window_seconds = self.rate_limit_window
 
-        current_time = time.time()
-        window_start = current_time - self.rate_limit_window
-
-        # Initialize or get existing request times
-        if identifier not in self.rate_limits:
-            self.rate_limits[identifier] = []
-
-        request_times = self.rate_limits[identifier]
-
-        # Remove old requests outside the window
-        request_times[:] = [t for t in request_times if t > window_start]
-
-        # Check if limit exceeded
-        if len(request_times) >= max_requests:
+        if not self.rate_limiter.hit(identifier, max_requests, window_seconds, time.time()):
             logger.warning(
-                f"Rate limit exceeded for {identifier}: {len(request_times)} requests in {self.rate_limit_window}s"
+                f"Rate limit exceeded for {identifier}: {max_requests} requests in {window_seconds}s"
             )
             return False
 
-        # Add current request
-        request_times.append(current_time)
         return True
 
     def detect_suspicious_activity(self, request_data: dict[str, Any]) -> bool:
@@ -336,7 +330,7 @@ def rate_limit(max_requests: int = 100, window_seconds: int = 60) -> Callable:
             identifier = user_id or "anonymous"
 
             # Check rate limit
-            if not security_middleware.check_rate_limit(identifier, max_requests):
+            if not security_middleware.check_rate_limit(identifier, max_requests, window_seconds):
                 raise RateLimitExceededError(max_requests, window_seconds)
 
             return func(*args, **kwargs)
@@ -499,7 +493,7 @@ def get_security_stats() -> dict[str, Any]:
     """Get security statistics."""
     return {
         "csrf_tokens_active": len(security_middleware.csrf_tokens),
-        "rate_limited_identifiers": len(security_middleware.rate_limits),
+        "rate_limited_identifiers": security_middleware.rate_limiter.tracked_identifiers(),
         "blocked_ips": len(security_middleware.suspicious_ips),
         "suspicious_ips": list(security_middleware.suspicious_ips),
     }
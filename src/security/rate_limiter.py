@@ -0,0 +1,249 @@
+"""
+Rate limiting backends for GITTE system.
+Implements a sliding-window counter with constant state per identifier, kept
+in process memory or in Redis so that limits apply across all replicas.
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage backend of the rate limiter.
+
+    Each identifier keeps the request counts of the current and the previous
+    fixed window. The number of requests in the sliding window ending now is
+    estimated as ``previous * (1 - elapsed_fraction) + current``, so the state
+    per identifier is constant no matter how many requests are allowed. An
+    identifier checked against several limits keeps separate counts for each
+    ``(limit, window_seconds)`` pair.
+    """
+
+    @abstractmethod
+    def hit(self, identifier: str, limit: int, window_seconds: float, now: float) -> bool:
+        """
+        Count a request if it is within the limit.
+
+        Args:
+            identifier: Rate limited identifier (user, IP, ...)
+            limit: Maximum requests per window
+            window_seconds: Window length in seconds
+            now: Current time (seconds since the epoch)
+
+        Returns:
+            True if the request is allowed; rejected requests are not counted
+        """
+
+    @abstractmethod
+    def reset(self, identifier: str) -> None:
+        """Forget the counts of an identifier under every limit."""
+
+    @abstractmethod
+    def purge_idle(self, now: float) -> int:
+        """Drop identifiers that have been idle long enough to have no effect; returns how many."""
+
+    @abstractmethod
+    def tracked_identifiers(self) -> int | None:
+        """Number of (identifier, limit) states, or None if the backend cannot tell cheaply."""
+
+
+def _limit_suffix(limit: int, window_seconds: float) -> str:
+    """Key suffix separating the counts of different limits for one identifier."""
+    return f"{limit}/{window_seconds:g}"
+
+
+def _sliding_window_estimate(
+    previous: int, current: int, window_index: int, now: float, window_seconds: float
+) -> float:
+    """Estimated requests in the sliding window ending at ``now``."""
+    elapsed_fraction = now / window_seconds - window_index
+    return previous * (1.0 - elapsed_fraction) + current
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Process-local rate limit state.
+
+    Identifiers are kept in least-recently-used order, so idle ones are
+    dropped from the front in time proportional to the number removed. A purge
+    runs at most once per ``purge_interval`` seconds as part of ``hit``.
+    """
+
+    def __init__(self, purge_interval: float = 60.0):
+        # (identifier, limit suffix) -> [window_index, previous_count, current_count, last_seen]
+        self._state: OrderedDict[tuple[str, str], list] = OrderedDict()
+        # Suffixes of all limits seen, so reset can find every state of an identifier
+        self._limits: set[str] = set()
+        self._lock = threading.Lock()
+        self._purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._max_window = 0.0
+
+    def hit(self, identifier: str, limit: int, window_seconds: float, now: float) -> bool:
+        window_index = int(now // window_seconds)
+        suffix = _limit_suffix(limit, window_seconds)
+        key = (identifier, suffix)
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = [window_index, 0, 0, now]
+                self._state[key] = state
+                self._limits.add(suffix)
+            else:
+                self._state.move_to_end(key)
+                if state[0] != window_index:
+                    # Roll over: the old current window becomes the previous one
+                    # only if it is directly adjacent
+                    state[1] = state[2] if window_index - state[0] == 1 else 0
+                    state[2] = 0
+                    state[0] = window_index
+                state[3] = now
+
+            if window_seconds > self._max_window:
+                self._max_window = window_seconds
+
+            allowed = (
+                _sliding_window_estimate(state[1], state[2], window_index, now, window_seconds)
+                < limit
+            )
+            if allowed:
+                state[2] += 1
+
+            if now >= self._next_purge:
+                self._purge_idle_locked(now)
+
+        return allowed
+
+    def reset(self, identifier: str) -> None:
+        with self._lock:
+            for suffix in self._limits:
+                self._state.pop((identifier, suffix), None)
+
+    def purge_idle(self, now: float) -> int:
+        with self._lock:
+            return self._purge_idle_locked(now)
+
+    def tracked_identifiers(self) -> int | None:
+        return len(self._state)
+
+    def _purge_idle_locked(self, now: float) -> int:
+        # After two full windows without requests an identifier's counts are
+        # zero anyway; the longest window in use bounds that for every key.
+        cutoff = now - 2 * self._max_window
+        removed = 0
+        while self._state:
+            key, state = next(iter(self._state.items()))
+            if state[3] > cutoff:
+                break
+            del self._state[key]
+            removed += 1
+
+        self._next_purge = now + self._purge_interval
+        if removed:
+            logger.debug(f"Purged {removed} idle rate limit identifiers")
+        return removed
+
+
+# KEYS[1]: identifier and limit key; ARGV: limit, window_seconds, now
+_REDIS_HIT_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local index = math.floor(now / window)
+local state = redis.call('HMGET', KEYS[1], 'i', 'p', 'c')
+local stored = tonumber(state[1])
+local previous = tonumber(state[2]) or 0
+local current = tonumber(state[3]) or 0
+if stored ~= index then
+    if stored ~= nil and index - stored == 1 then previous = current else previous = 0 end
+    current = 0
+end
+if previous * (1 - (now / window - index)) + current >= limit then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'i', index, 'p', previous, 'c', current + 1)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 2000))
+return 1
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Rate limit state shared through Redis.
+
+    Every check is a single atomic script call. Keys expire on their own after
+    two idle windows, so ``purge_idle`` has nothing to do. If Redis is
+    unreachable, limits are enforced per process until it is back.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", key_prefix: str = "gitte:ratelimit:"):
+        if not REDIS_AVAILABLE:
+            raise ImportError("The redis package is required for the redis rate limit backend")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_HIT_SCRIPT)
+        self._key_prefix = key_prefix
+        self._fallback = MemoryRateLimitBackend()
+        # Suffixes of the limits used by this process, so reset can find their keys
+        self._limits: set[str] = set()
+
+    def _key(self, identifier: str, suffix: str) -> str:
+        return f"{self._key_prefix}{identifier}:{suffix}"
+
+    def hit(self, identifier: str, limit: int, window_seconds: float, now: float) -> bool:
+        suffix = _limit_suffix(limit, window_seconds)
+        self._limits.add(suffix)
+        try:
+            result = self._script(
+                keys=[self._key(identifier, suffix)], args=[limit, window_seconds, repr(now)]
+            )
+            return bool(int(result))
+        except redis.RedisError as e:
+            logger.warning(f"Redis rate limit check failed, using local limits: {e}")
+            return self._fallback.hit(identifier, limit, window_seconds, now)
+
+    def reset(self, identifier: str) -> None:
+        self._fallback.reset(identifier)
+        if not self._limits:
+            return
+        try:
+            self._client.delete(*(self._key(identifier, suffix) for suffix in self._limits))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to reset rate limit for {identifier}: {e}")
+
+    def purge_idle(self, now: float) -> int:
+        return self._fallback.purge_idle(now)
+
+    def tracked_identifiers(self) -> int | None:
+        return None
+
+
+def create_rate_limit_backend(kind: str, redis_url: str | None = None) -> RateLimitBackend:
+    """
+    Create a rate limit backend by name.
+
+    Args:
+        kind: "memory" or "redis"
+        redis_url: Redis connection URL for the redis backend
+
+    Raises:
+        ValueError: For unknown backend names
+    """
+    kind = kind.lower()
+    if kind == "memory":
+        return MemoryRateLimitBackend()
+    if kind == "redis":
+        return RedisRateLimitBackend(redis_url) if redis_url else RedisRateLimitBackend()
+    raise ValueError(f"Unknown rate limit backend: {kind}")
@@ -5,14 +5,28 @@ Provides comprehensive statistics, analytics, and reporting for administrators.
 
 import logging
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from typing import Any
 
+from sqlalchemy import func, select
+
 from src.data.database import get_session
+from src.data.models import (
+    ConsentRecord,
+    PALDAttributeCandidate,
+    PALDData,
+    PALDSchemaVersion,
+    User,
+    UserRole,
+)
+from src.services.audit_rollup_service import OperationTotals, get_audit_rollup_service
 from src.services.audit_service import get_audit_service
 
 logger = logging.getLogger(__name__)
 
+CHAT_OPERATION = "chat"
+IMAGE_GENERATION_OPERATION = "image_generation"
+
 
 @dataclass
 class UserStatistics:
@@ -75,10 +89,21 @@ class AdminStatisticsService:
 
     def __init__(self):
         self.audit_service = get_audit_service()
+        self.rollups = get_audit_rollup_service()
+
+    def refresh_rollups(self) -> int:
+        """Roll up new audit log rows if the last refresh is older than the refresh interval."""
+        try:
+            with get_session() as db_session:
+                return self.rollups.refresh_if_due(db_session)
+        except Exception as e:
+            logger.error(f"Error refreshing audit rollups: {e}")
+            return 0
 
     def get_dashboard_statistics(self) -> dict[str, Any]:
         """Get comprehensive dashboard statistics."""
         try:
+            self.refresh_rollups()
             user_stats = self.get_user_statistics()
             system_stats = self.get_system_statistics()
             pald_stats = self.get_pald_statistics()
@@ -135,61 +160,42 @@ class AdminStatisticsService:
     def get_user_statistics(self) -> UserStatistics:
         """Get user-related statistics."""
         try:
-            with get_session() as db_session:
-                # Total users by role
-                total_users_result = db_session.execute("SELECT COUNT(*) FROM users").scalar()
-                admin_users_result = db_session.execute(
-                    "SELECT COUNT(*) FROM users WHERE role = 'ADMIN'"
-                ).scalar()
-                participant_users_result = db_session.execute(
-                    "SELECT COUNT(*) FROM users WHERE role = 'PARTICIPANT'"
-                ).scalar()
-
-                # New users by time period
-                new_users_today_result = db_session.execute(
-                    "SELECT COUNT(*) FROM users WHERE DATE(created_at) = CURRENT_DATE"
-                ).scalar()
-
-                new_users_this_week_result = db_session.execute(
-                    "SELECT COUNT(*) FROM users WHERE created_at >= DATE_TRUNC('week', CURRENT_DATE)"
-                ).scalar()
-
-                new_users_this_month_result = db_session.execute(
-                    "SELECT COUNT(*) FROM users WHERE created_at >= DATE_TRUNC('month', CURRENT_DATE)"
-                ).scalar()
-
-                # Active users (users with recent audit log entries)
-                active_users_today_result = db_session.execute(
-                    """
-                    SELECT COUNT(DISTINCT user_id) FROM audit_logs 
-                    WHERE DATE(created_at) = CURRENT_DATE AND user_id IS NOT NULL
-                """
-                ).scalar()
-
-                active_users_this_week_result = db_session.execute(
-                    """
-                    SELECT COUNT(DISTINCT user_id) FROM audit_logs 
-                    WHERE created_at >= DATE_TRUNC('week', CURRENT_DATE) AND user_id IS NOT NULL
-                """
-                ).scalar()
+            today = datetime.utcnow().date()
+            week_start = today - timedelta(days=today.weekday())
+            month_start = today.replace(day=1)
 
-                active_users_this_month_result = db_session.execute(
-                    """
-                    SELECT COUNT(DISTINCT user_id) FROM audit_logs 
-                    WHERE created_at >= DATE_TRUNC('month', CURRENT_DATE) AND user_id IS NOT NULL
-                """
-                ).scalar()
+            with get_session() as db_session:
+                # All user counts in one pass; range predicates keep created_at indexable
+                users = db_session.execute(
+                    select(
+                        func.count(),
+                        func.count().filter(User.role == UserRole.ADMIN.value),
+                        func.count().filter(User.role == UserRole.PARTICIPANT.value),
+                        func.count().filter(User.created_at >= datetime.combine(today, time.min)),
+                        func.count().filter(
+                            User.created_at >= datetime.combine(week_start, time.min)
+                        ),
+                        func.count().filter(
+                            User.created_at >= datetime.combine(month_start, time.min)
+                        ),
+                    ).select_from(User)
+                ).one()
+
+                # Active users (users with audit log entries) from the daily activity rollup
+                active = self.rollups.active_user_counts(
+                    db_session, {"today": today, "week": week_start, "month": month_start}
+                )
 
                 return UserStatistics(
-                    total_users=total_users_result or 0,
-                    admin_users=admin_users_result or 0,
-                    participant_users=participant_users_result or 0,
-                    new_users_today=new_users_today_result or 0,
-                    new_users_this_week=new_users_this_week_result or 0,
-                    new_users_this_month=new_users_this_month_result or 0,
-                    active_users_today=active_users_today_result or 0,
-                    active_users_this_week=active_users_this_week_result or 0,
-                    active_users_this_month=active_users_this_month_result or 0,
+                    total_users=users[0] or 0,
+                    admin_users=users[1] or 0,
+                    participant_users=users[2] or 0,
+                    new_users_today=users[3] or 0,
+                    new_users_this_week=users[4] or 0,
+                    new_users_this_month=users[5] or 0,
+                    active_users_today=active["today"],
+                    active_users_this_week=active["week"],
+                    active_users_this_month=active["month"],
                 )
 
         except Exception as e:
@@ -200,53 +206,34 @@ class AdminStatisticsService:
         """Get system-wide statistics."""
         try:
             with get_session() as db_session:
-                # Count different types of operations
-                chat_sessions_result = db_session.execute(
-                    "SELECT COUNT(*) FROM audit_logs WHERE operation = 'chat'"
-                ).scalar()
-
-                images_generated_result = db_session.execute(
-                    "SELECT COUNT(*) FROM audit_logs WHERE operation = 'image_generation'"
-                ).scalar()
-
-                pald_records_result = db_session.execute("SELECT COUNT(*) FROM pald_data").scalar()
-                audit_logs_result = db_session.execute("SELECT COUNT(*) FROM audit_logs").scalar()
-                consent_records_result = db_session.execute(
-                    "SELECT COUNT(*) FROM consent_records"
-                ).scalar()
+                # Audit log figures per operation from the rollups
+                totals = self.rollups.operation_totals(db_session)
+                overall = OperationTotals.combine(totals.values())
+
+                pald_records_result, consent_records_result = db_session.execute(
+                    select(
+                        select(func.count()).select_from(PALDData).scalar_subquery(),
+                        select(func.count()).select_from(ConsentRecord).scalar_subquery(),
+                    )
+                ).one()
 
                 # Average session duration (mock calculation)
                 avg_session_duration = 15.5  # Would be calculated from actual session data
 
-                # Average response time
-                avg_response_time_result = db_session.execute(
-                    "SELECT AVG(latency_ms) FROM audit_logs WHERE latency_ms IS NOT NULL"
-                ).scalar()
-
-                # Error rate
-                total_operations_result = db_session.execute(
-                    "SELECT COUNT(*) FROM audit_logs"
-                ).scalar()
-                error_operations_result = db_session.execute(
-                    "SELECT COUNT(*) FROM audit_logs WHERE status = 'error'"
-                ).scalar()
-
-                error_rate = 0.0
-                if total_operations_result and total_operations_result > 0:
-                    error_rate = (error_operations_result / total_operations_result) * 100
-
                 # System uptime (mock - would be calculated from system start time)
                 uptime_hours = 72.5
 
                 return SystemStatistics(
-                    total_chat_sessions=chat_sessions_result or 0,
-                    total_images_generated=images_generated_result or 0,
+                    total_chat_sessions=totals.get(CHAT_OPERATION, OperationTotals()).requests,
+                    total_images_generated=totals.get(
+                        IMAGE_GENERATION_OPERATION, OperationTotals()
+                    ).requests,
                     total_pald_records=pald_records_result or 0,
-                    total_audit_logs=audit_logs_result or 0,
+                    total_audit_logs=overall.requests,
                     total_consent_records=consent_records_result or 0,
                     avg_session_duration_minutes=avg_session_duration,
-                    avg_response_time_ms=float(avg_response_time_result or 0),
-                    error_rate_percent=error_rate,
+                    avg_response_time_ms=overall.avg_latency_ms,
+                    error_rate_percent=overall.error_rate_percent,
                     uptime_hours=uptime_hours,
                 )
 
@@ -258,52 +245,46 @@ class AdminStatisticsService:
         """Get PALD-related statistics."""
         try:
             with get_session() as db_session:
-                # Basic PALD counts
-                total_pald_result = db_session.execute("SELECT COUNT(*) FROM pald_data").scalar()
-
-                unique_schemas_result = db_session.execute(
-                    "SELECT COUNT(DISTINCT schema_version) FROM pald_data"
-                ).scalar()
+                # All PALD counts in one round trip
+                counts = db_session.execute(
+                    select(
+                        select(func.count()).select_from(PALDData).scalar_subquery(),
+                        select(func.count(PALDData.schema_version.distinct())).scalar_subquery(),
+                        select(func.count())
+                        .select_from(PALDAttributeCandidate)
+                        .scalar_subquery(),
+                        select(func.count())
+                        .select_from(PALDAttributeCandidate)
+                        .where(PALDAttributeCandidate.added_to_schema.is_(True))
+                        .scalar_subquery(),
+                        select(func.count()).select_from(PALDSchemaVersion).scalar_subquery(),
+                    )
+                ).one()
 
                 # Average coverage (mock calculation)
                 avg_coverage = 75.5  # Would be calculated from actual PALD data
 
-                # Attribute candidates
-                attribute_candidates_result = db_session.execute(
-                    "SELECT COUNT(*) FROM pald_attribute_candidates"
-                ).scalar()
-
-                attributes_added_result = db_session.execute(
-                    "SELECT COUNT(*) FROM pald_attribute_candidates WHERE added_to_schema = true"
-                ).scalar()
-
                 # Most common attributes
                 most_common_result = db_session.execute(
-                    """
-                    SELECT attribute_name, mention_count 
-                    FROM pald_attribute_candidates 
-                    ORDER BY mention_count DESC 
-                    LIMIT 5
-                """
-                ).fetchall()
+                    select(
+                        PALDAttributeCandidate.attribute_name, PALDAttributeCandidate.mention_count
+                    )
+                    .order_by(PALDAttributeCandidate.mention_count.desc())
+                    .limit(5)
+                ).all()
 
                 most_common_attributes = [
                     (row.attribute_name, row.mention_count) for row in most_common_result
                 ]
 
-                # Schema evolution events
-                schema_evolution_result = db_session.execute(
-                    "SELECT COUNT(*) FROM pald_schema_versions"
-                ).scalar()
-
                 return PALDStatistics(
-                    total_pald_records=total_pald_result or 0,
-                    unique_schema_versions=unique_schemas_result or 0,
+                    total_pald_records=counts[0] or 0,
+                    unique_schema_versions=counts[1] or 0,
                     avg_coverage_percent=avg_coverage,
-                    attribute_candidates=attribute_candidates_result or 0,
-                    attributes_added_to_schema=attributes_added_result or 0,
+                    attribute_candidates=counts[2] or 0,
+                    attributes_added_to_schema=counts[3] or 0,
                     most_common_attributes=most_common_attributes,
-                    schema_evolution_events=schema_evolution_result or 0,
+                    schema_evolution_events=counts[4] or 0,
                 )
 
         except Exception as e:
@@ -315,19 +296,15 @@ class AdminStatisticsService:
         try:
             with get_session() as db_session:
                 # Average response times by operation
-                llm_response_time_result = db_session.execute(
-                    """
-                    SELECT AVG(latency_ms) FROM audit_logs 
-                    WHERE operation = 'chat' AND latency_ms IS NOT NULL
-                """
-                ).scalar()
-
-                image_generation_time_result = db_session.execute(
-                    """
-                    SELECT AVG(latency_ms) FROM audit_logs 
-                    WHERE operation = 'image_generation' AND latency_ms IS NOT NULL
-                """
-                ).scalar()
+                totals = self.rollups.operation_totals(db_session)
+                # Rollups are hourly, so the recent window starts on the hour
+                # 24 to 25 hours ago
+                now = datetime.utcnow()
+                window_start = (now - timedelta(hours=24)).replace(
+                    minute=0, second=0, microsecond=0
+                )
+                window_hours = (now - window_start).total_seconds() / 3600
+                recent = self.rollups.operation_totals(db_session, since=window_start)
 
                 # Database query time (mock)
                 db_query_time = 25.0
@@ -335,42 +312,28 @@ class AdminStatisticsService:
                 # Peak concurrent users (mock - would be calculated from session data)
                 peak_concurrent = 15
 
-                # Requests per hour
-                requests_per_hour_result = db_session.execute(
-                    """
-                    SELECT COUNT(*) / 24.0 FROM audit_logs 
-                    WHERE created_at >= NOW() - INTERVAL '24 hours'
-                """
-                ).scalar()
-
                 # Cache hit rate (mock)
                 cache_hit_rate = 85.5
 
-                # Error rate by operation
-                error_rates_result = db_session.execute(
-                    """
-                    SELECT 
-                        operation,
-                        COUNT(*) as total,
-                        COUNT(CASE WHEN status = 'error' THEN 1 END) as errors
-                    FROM audit_logs 
-                    WHERE created_at >= NOW() - INTERVAL '24 hours'
-                    GROUP BY operation
-                """
-                ).fetchall()
-
-                error_rate_by_operation = {}
-                for row in error_rates_result:
-                    if row.total > 0:
-                        error_rate = (row.errors / row.total) * 100
-                        error_rate_by_operation[row.operation] = error_rate
+                # Error rate by operation over the recent window
+                error_rate_by_operation = {
+                    operation: operation_totals.error_rate_percent
+                    for operation, operation_totals in recent.items()
+                    if operation_totals.requests > 0
+                }
 
                 return PerformanceStatistics(
-                    avg_llm_response_time_ms=float(llm_response_time_result or 0),
-                    avg_image_generation_time_ms=float(image_generation_time_result or 0),
+                    avg_llm_response_time_ms=totals.get(
+                        CHAT_OPERATION, OperationTotals()
+                    ).avg_latency_ms,
+                    avg_image_generation_time_ms=totals.get(
+                        IMAGE_GENERATION_OPERATION, OperationTotals()
+                    ).avg_latency_ms,
                     avg_database_query_time_ms=db_query_time,
                     peak_concurrent_users=peak_concurrent,
-                    requests_per_hour=float(requests_per_hour_result or 0),
+                    requests_per_hour=(
+                        OperationTotals.combine(recent.values()).requests / window_hours
+                    ),
                     cache_hit_rate_percent=cache_hit_rate,
                     error_rate_by_operation=error_rate_by_operation,
                 )
@@ -0,0 +1,485 @@
+"""
+Async Ollama provider for GITTE system.
+Runs requests on a pooled httpx.AsyncClient, coalesces identical in-flight
+requests into one upstream call and exposes a sync bridge for LLMProvider callers.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Coroutine, Iterator
+from dataclasses import replace
+from typing import Any, TypeVar
+
+import httpx
+
+from config.config import config
+from src.exceptions import LLMConnectionError, LLMModelError, LLMProviderError, LLMTimeoutError
+from src.services.llm_provider import LLMProvider, LLMRequest, LLMResponse, LLMStreamResponse
+from src.services.llm_streaming import StreamBatchConfig, StreamMetrics, ollama_text_stream
+from src.utils.circuit_breaker import CircuitBreakerConfig, circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """Runs a private asyncio event loop on a daemon thread for sync callers."""
+
+    def __init__(self, name: str = "llm-async-bridge"):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop, started on first access."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(self._loop, ready), name=self.name, daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """
+        Run a coroutine on the bridge loop and block until it completes.
+
+        Raises:
+            RuntimeError: If called from the bridge loop thread itself
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("EventLoopThread.run() cannot be called from its own loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def stop(self) -> None:
+        """Stop the loop and join the thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+
+
+class AsyncOllamaProvider(LLMProvider):
+    """
+    Ollama provider backed by a shared async connection pool.
+
+    Async callers use the ``a``-prefixed coroutines directly; the ``LLMProvider``
+    methods run the same coroutines on a background event loop.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout: int | None = None,
+        max_retries: int | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        coalesce_requests: bool = True,
+        stream_batching: StreamBatchConfig | None = None,
+        bridge: EventLoopThread | None = None,
+    ):
+        """
+        Initialize async Ollama provider.
+
+        Args:
+            base_url: Ollama server URL (defaults to config)
+            timeout: Request timeout in seconds (defaults to config)
+            max_retries: Connection retry attempts (defaults to config)
+            max_connections: Connection limit for the Ollama host (defaults to config)
+            max_keepalive_connections: Idle connections kept open (defaults to config)
+            coalesce_requests: Share one upstream call between identical in-flight requests
+            stream_batching: Default fragment coalescing for streams (defaults to passthrough)
+            bridge: Event loop thread for sync callers (defaults to a private one)
+        """
+        self.base_url = (base_url or config.llm.ollama_url).rstrip("/")
+        self.timeout = timeout or config.llm.timeout_seconds
+        self.max_retries = max_retries or config.llm.max_retries
+        self.max_connections = max_connections or config.llm.max_connections
+        self.max_keepalive_connections = (
+            max_keepalive_connections or config.llm.max_keepalive_connections
+        )
+        self.coalesce_requests = coalesce_requests
+        self.stream_batching = stream_batching or StreamBatchConfig()
+        self._bridge = bridge or EventLoopThread()
+
+        # Both are only touched from the loop that owns the client
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "upstream_requests": 0, "coalesced_requests": 0}
+
+        logger.info(
+            f"Initialized AsyncOllamaProvider with base_url={self.base_url}, "
+            f"timeout={self.timeout}s, max_connections={self.max_connections}"
+        )
+
+    # ------------------------------------------------------------------
+    # Sync LLMProvider interface (bridged)
+    # ------------------------------------------------------------------
+
+    @circuit_breaker(
+        name="ollama_llm",
+        config=CircuitBreakerConfig(
+            failure_threshold=3,
+            recovery_timeout=30,
+            success_threshold=2,
+            timeout=30,
+            expected_exceptions=(
+                LLMProviderError,
+                LLMConnectionError,
+                LLMTimeoutError,
+                LLMModelError,
+            ),
+        ),
+    )
+    def generate_response(self, request: LLMRequest) -> LLMResponse:
+        """Generate response from Ollama via the async pool."""
+        return self._bridge.run(self.agenerate_response(request))
+
+    def generate_streaming_response(self, request: LLMRequest) -> LLMStreamResponse:
+        """Generate streaming response from Ollama via the async pool."""
+        batching = request.batching or self.stream_batching
+        payload = self._build_payload(request, stream=True)
+        # Started before the request: connection setup, model load and prompt
+        # evaluation are the bulk of the time to first token
+        metrics = StreamMetrics()
+        response = self._bridge.run(self._open_stream(payload))
+
+        def text_generator():
+            chunks = self._iter_sync(response.aiter_bytes(batching.read_chunk_size))
+            try:
+                yield from ollama_text_stream(chunks, batching, metrics)
+            except LLMProviderError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in streaming response: {e}")
+                raise LLMProviderError(f"Streaming error: {e}") from e
+            finally:
+                self._bridge.run(response.aclose())
+
+        return LLMStreamResponse(
+            text_stream=text_generator(),
+            model=request.model,
+            request_id=request.request_id,
+            metadata={"streaming": True, "stream_metrics": metrics},
+        )
+
+    def list_models(self) -> dict[str, Any]:
+        """List available models from Ollama."""
+        return self._bridge.run(self.alist_models())
+
+    def list_running_models(self) -> dict[str, dict[str, Any]] | None:
+        """List models currently loaded by Ollama."""
+        return self._bridge.run(self.alist_running_models())
+
+    def health_check(self) -> bool:
+        """Check Ollama service health."""
+        return self._bridge.run(self.ahealth_check())
+
+    def get_model_info(self, model: str) -> dict[str, Any]:
+        """Get information about a specific model."""
+        return self._bridge.run(self.aget_model_info(model))
+
+    def close(self) -> None:
+        """Close the connection pool and stop the bridge loop."""
+        if self._client is not None:
+            try:
+                self._bridge.run(self.aclose())
+            except Exception as e:
+                logger.warning(f"Error closing async LLM client: {e}")
+        self._bridge.stop()
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """Get request and coalescing counters."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["inflight"] = len(self._inflight)
+        stats["max_connections"] = self.max_connections
+        stats["max_keepalive_connections"] = self.max_keepalive_connections
+        return stats
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def agenerate_response(self, request: LLMRequest) -> LLMResponse:
+        """
+        Generate a response, sharing the upstream call with identical in-flight requests.
+
+        Args:
+            request: LLM request
+
+        Returns:
+            LLMResponse carrying the caller's request_id
+        """
+        self._count("requests")
+        if not self.coalesce_requests:
+            return await self._generate_upstream(request)
+
+        key = self._coalesce_key(request)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count("coalesced_requests")
+            result: LLMResponse = await asyncio.shield(pending)
+            return replace(
+                result,
+                request_id=request.request_id,
+                metadata={**(result.metadata or {}), "coalesced": True},
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._generate_upstream(request)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when no follower is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def alist_models(self) -> dict[str, Any]:
+        """List available models from Ollama."""
+        try:
+            response = await self._request("GET", "/api/tags")
+        except Exception as e:
+            logger.error(f"Failed to list models: {e}")
+            raise LLMProviderError(f"Failed to list models: {e}") from e
+
+        formatted_models = {}
+        for model in response.get("models", []):
+            name = model.get("name", "unknown")
+            formatted_models[name] = {
+                "name": name,
+                "size": model.get("size", 0),
+                "modified_at": model.get("modified_at"),
+                "digest": model.get("digest"),
+                "details": model.get("details", {}),
+            }
+
+        logger.debug(f"Listed {len(formatted_models)} models from Ollama")
+        return {"models": formatted_models, "count": len(formatted_models)}
+
+    async def alist_running_models(self) -> dict[str, dict[str, Any]] | None:
+        """List models currently loaded by Ollama (/api/ps)."""
+        try:
+            response = await self._request("GET", "/api/ps")
+        except Exception as e:
+            logger.warning(f"Failed to list running models: {e}")
+            return None
+
+        return {
+            model.get("name", "unknown"): {
+                "name": model.get("name", "unknown"),
+                "digest": model.get("digest"),
+                "expires_at": model.get("expires_at"),
+                "size_vram": model.get("size_vram", 0),
+            }
+            for model in response.get("models", [])
+        }
+
+    async def ahealth_check(self) -> bool:
+        """Check Ollama service health."""
+        try:
+            await self._request("GET", "/api/tags")
+            return True
+        except Exception as e:
+            logger.warning(f"Ollama health check failed: {e}")
+            return False
+
+    async def aget_model_info(self, model: str) -> dict[str, Any]:
+        """Get information about a specific model."""
+        try:
+            response = await self._request("POST", "/api/show", {"name": model})
+        except Exception as e:
+            logger.error(f"Failed to get model info for {model}: {e}")
+            raise LLMModelError(f"Failed to get model info for {model}: {e}") from e
+
+        return {
+            "name": model,
+            "modelfile": response.get("modelfile", ""),
+            "parameters": response.get("parameters", {}),
+            "template": response.get("template", ""),
+            "details": response.get("details", {}),
+            "model_info": response.get("model_info", {}),
+        }
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client, creating it on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            if self._client is not None:
+                self._discard_client(self._client, self._client_loop)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+                transport=httpx.AsyncHTTPTransport(retries=self.max_retries),
+            )
+            self._client_loop = loop
+        return self._client
+
+    @staticmethod
+    def _discard_client(
+        client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None
+    ) -> None:
+        """Close a client created on another loop, so its pooled connections are released."""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            # The loop is gone and its connections with it; nothing can await aclose()
+            logger.debug("Dropping async LLM client of a stopped event loop")
+
+    async def _generate_upstream(self, request: LLMRequest) -> LLMResponse:
+        """Send a non-streaming generate request to Ollama."""
+        start_time = time.time()
+        self._count("upstream_requests")
+
+        logger.debug(
+            f"Sending async request to Ollama: model={request.model}, "
+            f"prompt_length={len(request.prompt)}"
+        )
+        response = await self._request(
+            "POST", "/api/generate", self._build_payload(request, stream=False)
+        )
+
+        latency_ms = int((time.time() - start_time) * 1000)
+        response_text = response.get("response", "")
+
+        return LLMResponse(
+            text=response_text,
+            model=request.model,
+            tokens_used=self._extract_token_count(response),
+            latency_ms=latency_ms,
+            request_id=request.request_id,
+            metadata={
+                "ollama_response": response,
+                "prompt_length": len(request.prompt),
+                "response_length": len(response_text),
+            },
+        )
+
+    async def _request(
+        self, method: str, endpoint: str, payload: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Make HTTP request to Ollama API and map transport errors."""
+        try:
+            response = await self._get_client().request(method, endpoint, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(self.timeout) from e
+        except httpx.ConnectError as e:
+            raise LLMConnectionError(f"Failed to connect to Ollama at {self.base_url}: {e}") from e
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 404):
+                raise LLMModelError(f"Model or endpoint not found: {e}") from e
+            raise LLMProviderError(f"HTTP error {e.response.status_code}: {e}") from e
+        except json.JSONDecodeError as e:
+            raise LLMProviderError("Invalid JSON response from Ollama") from e
+        except httpx.HTTPError as e:
+            raise LLMProviderError(f"Request to Ollama failed: {e}") from e
+
+    async def _open_stream(self, payload: dict[str, Any]) -> httpx.Response:
+        """Open a streaming generate request and return the unread response."""
+        client = self._get_client()
+        try:
+            response = await client.send(
+                client.build_request("POST", "/api/generate", json=payload), stream=True
+            )
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(self.timeout) from e
+        except httpx.ConnectError as e:
+            raise LLMConnectionError(f"Failed to connect to Ollama at {self.base_url}: {e}") from e
+        except httpx.HTTPError as e:
+            raise LLMProviderError(f"Streaming request to Ollama failed: {e}") from e
+
+        if response.is_error:
+            await response.aclose()
+            raise LLMProviderError(f"HTTP error {response.status_code} from Ollama stream")
+        return response
+
+    def _iter_sync(self, aiterator: AsyncIterator[T]) -> Iterator[T]:
+        """Pull items from an async iterator through the bridge loop."""
+
+        done = object()
+
+        async def _next() -> Any:
+            try:
+                return await aiterator.__anext__()
+            except StopAsyncIteration:
+                return done
+
+        while (item := self._bridge.run(_next())) is not done:
+            yield item
+
+    @staticmethod
+    def _build_payload(request: LLMRequest, stream: bool) -> dict[str, Any]:
+        """Build the /api/generate payload."""
+        return {
+            "model": request.model,
+            "prompt": request.prompt,
+            "stream": stream,
+            **request.parameters,
+        }
+
+    @staticmethod
+    def _coalesce_key(request: LLMRequest) -> str:
+        """Key identifying requests that produce the same upstream call."""
+        raw = json.dumps(
+            [request.model, request.prompt, request.parameters], sort_keys=True, default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _extract_token_count(response: dict[str, Any]) -> int | None:
+        """Extract token count from Ollama response."""
+        if "eval_count" in response:
+            return response["eval_count"]
+        text = response.get("response", "")
+        return len(text.split()) if text else None
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
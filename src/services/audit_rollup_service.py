@@ -0,0 +1,373 @@
+"""
+Audit log rollups for GITTE admin statistics.
+Maintains hourly and daily per-operation aggregates of audit_logs and the set
+of active users per day, updated incrementally from the rows added since the
+previous refresh. Statistics read the rollups plus the small tail of rows that
+have not been rolled up yet, so they stay exact and cheap at any table size.
+"""
+
+import logging
+import time as time_module
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import Date, cast, delete, func, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.data.models import (
+    AuditLog,
+    AuditLogRollup,
+    AuditLogStatus,
+    AuditRollupState,
+    UserDailyActivity,
+)
+
+logger = logging.getLogger(__name__)
+
+HOUR = "hour"
+DAY = "day"
+
+# Statuses counted as errors ("error" is still written by older callers)
+ERROR_STATUSES = (AuditLogStatus.FAILED.value, "error")
+
+_STATE_NAME = "audit_logs"
+
+
+@dataclass
+class OperationTotals:
+    """Aggregated audit log figures for one operation (or several combined)."""
+
+    requests: int = 0
+    errors: int = 0
+    latency_sum_ms: int = 0
+    latency_count: int = 0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.latency_sum_ms / self.latency_count if self.latency_count else 0.0
+
+    @property
+    def error_rate_percent(self) -> float:
+        return self.errors / self.requests * 100 if self.requests else 0.0
+
+    def add(self, requests: Any, errors: Any, latency_sum_ms: Any, latency_count: Any) -> None:
+        self.requests += int(requests or 0)
+        self.errors += int(errors or 0)
+        self.latency_sum_ms += int(latency_sum_ms or 0)
+        self.latency_count += int(latency_count or 0)
+
+    @classmethod
+    def combine(cls, totals: Iterable["OperationTotals"]) -> "OperationTotals":
+        combined = cls()
+        for item in totals:
+            combined.add(item.requests, item.errors, item.latency_sum_ms, item.latency_count)
+        return combined
+
+
+def _hour_bucket(dialect: str):
+    """Start of the hour of AuditLog.created_at (literal arguments keep GROUP BY valid)."""
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column("'hour'"), AuditLog.created_at)
+    return func.strftime(literal_column("'%Y-%m-%d %H:00:00.000000'"), AuditLog.created_at)
+
+
+def _day_bucket(dialect: str):
+    """Date of AuditLog.created_at."""
+    if dialect == "postgresql":
+        return cast(AuditLog.created_at, Date)
+    return func.date(AuditLog.created_at)
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _as_date(value: date | datetime | str) -> date:
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _tail_filter(watermark: datetime | None, since: datetime | None) -> list:
+    """Select rows newer than the watermark and not before ``since`` with a single range bound."""
+    if watermark is not None and (since is None or watermark >= since):
+        return [AuditLog.created_at > watermark]
+    if since is not None:
+        return [AuditLog.created_at >= since]
+    return []
+
+
+def _upsert(dialect: str):
+    if dialect == "postgresql":
+        return postgresql_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    raise NotImplementedError(f"Audit rollups are not supported on {dialect}")
+
+
+class AuditRollupService:
+    """Incrementally maintained audit log rollups (PostgreSQL and SQLite)."""
+
+    def __init__(
+        self,
+        settle_seconds: float = 300,
+        refresh_interval_seconds: float = 60,
+        hourly_retention_days: int = 35,
+    ):
+        """
+        Initialize the rollup service.
+
+        Args:
+            settle_seconds: Rows are rolled up once they are this old, so that
+                their final status (completed/failed) is counted
+            refresh_interval_seconds: Minimum time between refreshes triggered
+                through ``refresh_if_due``
+            hourly_retention_days: Hourly rollups older than this are deleted;
+                daily rollups are kept
+        """
+        self.settle = timedelta(seconds=settle_seconds)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.hourly_retention = timedelta(days=hourly_retention_days)
+        self._last_refresh: float | None = None
+
+    def refresh_if_due(self, db_session: Session) -> int:
+        """Refresh unless this process refreshed within the refresh interval."""
+        if (
+            self._last_refresh is not None
+            and time_module.monotonic() - self._last_refresh < self.refresh_interval_seconds
+        ):
+            return 0
+        rolled_up = self.refresh(db_session)
+        self._last_refresh = time_module.monotonic()
+        return rolled_up
+
+    def refresh(self, db_session: Session, now: datetime | None = None) -> int:
+        """
+        Roll up the audit rows added since the previous refresh.
+
+        The state row is locked for the duration of the transaction, so
+        concurrent refreshes from several replicas never count a row twice.
+
+        Args:
+            db_session: Database session; the caller commits
+            now: Current UTC time (defaults to ``datetime.utcnow()``)
+
+        Returns:
+            int: Number of audit rows rolled up
+        """
+        now = now or datetime.utcnow()
+        upper = now - self.settle
+        dialect = db_session.get_bind().dialect.name
+
+        state = db_session.execute(
+            select(AuditRollupState).where(AuditRollupState.name == _STATE_NAME).with_for_update()
+        ).scalar_one_or_none()
+        if state is None:
+            state = AuditRollupState(name=_STATE_NAME, watermark=None)
+            db_session.add(state)
+            db_session.flush()
+        if state.watermark is not None and state.watermark >= upper:
+            return 0
+
+        window = [AuditLog.created_at <= upper]
+        if state.watermark is not None:
+            window.append(AuditLog.created_at > state.watermark)
+
+        hour = _hour_bucket(dialect)
+        grouped = db_session.execute(
+            select(
+                hour,
+                AuditLog.operation,
+                func.count(),
+                func.count().filter(AuditLog.status.in_(ERROR_STATUSES)),
+                func.sum(AuditLog.latency_ms),
+                func.count(AuditLog.latency_ms),
+            )
+            .where(*window)
+            .group_by(hour, AuditLog.operation)
+        ).all()
+
+        aggregates: dict[tuple[str, datetime, str], OperationTotals] = {}
+        rolled_up = 0
+        for bucket, operation, requests, errors, latency_sum, latency_count in grouped:
+            bucket = _as_datetime(bucket)
+            for key in ((HOUR, bucket, operation), (DAY, bucket.replace(hour=0), operation)):
+                aggregates.setdefault(key, OperationTotals()).add(
+                    requests, errors, latency_sum, latency_count
+                )
+            rolled_up += requests
+
+        if aggregates:
+            self._upsert_rollups(db_session, dialect, aggregates)
+            day = _day_bucket(dialect)
+            active = db_session.execute(
+                select(day, AuditLog.user_id)
+                .where(*window, AuditLog.user_id.is_not(None))
+                .group_by(day, AuditLog.user_id)
+            ).all()
+            if active:
+                statement = _upsert(dialect)(UserDailyActivity.__table__).on_conflict_do_nothing()
+                db_session.execute(
+                    statement,
+                    [{"activity_date": _as_date(d), "user_id": user_id} for d, user_id in active],
+                )
+
+        state.watermark = upper
+        db_session.execute(
+            delete(AuditLogRollup).where(
+                AuditLogRollup.granularity == HOUR,
+                AuditLogRollup.bucket_start < now - self.hourly_retention,
+            )
+        )
+        db_session.flush()
+
+        if rolled_up:
+            logger.debug(f"Rolled up {rolled_up} audit log rows up to {upper.isoformat()}")
+        return rolled_up
+
+    def _upsert_rollups(
+        self,
+        db_session: Session,
+        dialect: str,
+        aggregates: dict[tuple[str, datetime, str], OperationTotals],
+    ) -> None:
+        table = AuditLogRollup.__table__
+        statement = _upsert(dialect)(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.granularity, table.c.bucket_start, table.c.operation],
+            set_={
+                name: table.c[name] + statement.excluded[name]
+                for name in ("request_count", "error_count", "latency_sum_ms", "latency_count")
+            },
+        )
+        db_session.execute(
+            statement,
+            [
+                {
+                    "granularity": granularity,
+                    "bucket_start": bucket_start,
+                    "operation": operation,
+                    "request_count": totals.requests,
+                    "error_count": totals.errors,
+                    "latency_sum_ms": totals.latency_sum_ms,
+                    "latency_count": totals.latency_count,
+                }
+                for (granularity, bucket_start, operation), totals in aggregates.items()
+            ],
+        )
+
+    def get_watermark(self, db_session: Session) -> datetime | None:
+        """Creation time up to which audit rows are included in the rollups."""
+        return db_session.execute(
+            select(AuditRollupState.watermark).where(AuditRollupState.name == _STATE_NAME)
+        ).scalar_one_or_none()
+
+    def operation_totals(
+        self, db_session: Session, since: datetime | None = None
+    ) -> dict[str, OperationTotals]:
+        """
+        Audit log totals per operation.
+
+        Args:
+            db_session: Database session
+            since: Only count rows from the start of this hour on (all time if None)
+
+        Returns:
+            Dict mapping operation to its totals
+        """
+        watermark = self.get_watermark(db_session)
+        totals: dict[str, OperationTotals] = {}
+
+        if watermark is not None:
+            rollup_filter = [AuditLogRollup.granularity == (DAY if since is None else HOUR)]
+            if since is not None:
+                since = since.replace(minute=0, second=0, microsecond=0)
+                rollup_filter.append(AuditLogRollup.bucket_start >= since)
+            rows = db_session.execute(
+                select(
+                    AuditLogRollup.operation,
+                    func.sum(AuditLogRollup.request_count),
+                    func.sum(AuditLogRollup.error_count),
+                    func.sum(AuditLogRollup.latency_sum_ms),
+                    func.sum(AuditLogRollup.latency_count),
+                )
+                .where(*rollup_filter)
+                .group_by(AuditLogRollup.operation)
+            ).all()
+            for operation, *values in rows:
+                totals.setdefault(operation, OperationTotals()).add(*values)
+        elif since is not None:
+            since = since.replace(minute=0, second=0, microsecond=0)
+
+        # The tail (rows newer than the watermark) is small; it is read through
+        # the created_at index and summed here, since grouping in SQL lets the
+        # planner prefer the operation index and scan the whole table
+        rows = db_session.execute(
+            select(AuditLog.operation, AuditLog.status, AuditLog.latency_ms).where(
+                *_tail_filter(watermark, since)
+            )
+        )
+        for operation, status, latency_ms in rows:
+            totals.setdefault(operation, OperationTotals()).add(
+                1, status in ERROR_STATUSES, latency_ms, latency_ms is not None
+            )
+
+        return totals
+
+    def active_user_counts(self, db_session: Session, periods: dict[str, date]) -> dict[str, int]:
+        """
+        Count distinct users with audit log entries per period, in one pass.
+
+        Args:
+            db_session: Database session
+            periods: Dict mapping a period name to its first day
+
+        Returns:
+            Dict mapping each period name to its number of active users
+        """
+        if not periods:
+            return {}
+        watermark = self.get_watermark(db_session)
+        earliest = min(periods.values())
+        day = _day_bucket(db_session.get_bind().dialect.name)
+
+        tail_filter = _tail_filter(watermark, datetime.combine(earliest, time.min))
+        activity = union_all(
+            select(UserDailyActivity.user_id, UserDailyActivity.activity_date.label("day")).where(
+                UserDailyActivity.activity_date >= earliest
+            ),
+            select(AuditLog.user_id, day.label("day")).where(
+                *tail_filter, AuditLog.user_id.is_not(None)
+            ),
+        ).subquery()
+        last_active = (
+            select(activity.c.user_id, func.max(activity.c.day).label("last_day"))
+            .group_by(activity.c.user_id)
+            .subquery()
+        )
+
+        row = db_session.execute(
+            select(
+                *(
+                    func.count().filter(last_active.c.last_day >= first_day).label(name)
+                    for name, first_day in periods.items()
+                )
+            ).select_from(last_active)
+        ).one()
+        return {name: int(row._mapping[name] or 0) for name in periods}
+
+
+# Global rollup service instance
+_audit_rollup_service: AuditRollupService | None = None
+
+
+def get_audit_rollup_service() -> AuditRollupService:
+    """Get the global audit rollup service instance."""
+    global _audit_rollup_service
+    if _audit_rollup_service is None:
+        _audit_rollup_service = AuditRollupService()
+    return _audit_rollup_service
@@ -3,9 +3,13 @@ Audit Service Layer for GITTE system.
 Provides comprehensive audit logging with write-ahead logging (WAL) for all AI interactions.
 """
 
+import copy
 import csv
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
@@ -20,6 +24,16 @@ from src.data.schemas import AuditLogCreate, AuditLogFilters, AuditLogResponse,
 
 logger = logging.getLogger(__name__)
 
+# How long statistics for a time window are served from memory
+STATISTICS_CACHE_TTL_SECONDS = 60
+# Windows kept at most; callers passing fresh datetimes would otherwise grow the cache
+STATISTICS_CACHE_MAX_ENTRIES = 32
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Logs whose conversation threads are resolved per query during export
+EXPORT_BATCH_SIZE = 500
+
 
 class AuditLogEntry:
     """
@@ -128,6 +142,11 @@ class AuditService:
             self.db_session = get_session_sync()
 
         self.repository = AuditLogRepository(self.db_session)
+        # (start_date, end_date, include_percentiles) -> (computed_at, statistics),
+        # oldest first
+        self._statistics_cache: OrderedDict[tuple, tuple[float, dict[str, Any]]] = OrderedDict()
+        # The global service is shared by Streamlit script threads
+        self._statistics_lock = threading.Lock()
 
     def __del__(self):
         """Clean up database session if we own it."""
@@ -375,61 +394,17 @@ class AuditService:
             List[AuditLogResponse]: Complete conversation thread
         """
         try:
-            # Find root of conversation
-            current_log = self.repository.get_by_id(audit_id)
-            if not current_log:
+            root_id = self.repository.get_thread_roots([audit_id]).get(audit_id)
+            if root_id is None:
                 return []
 
-            # Traverse up to find root
-            root_log = current_log
-            while root_log.parent_log_id:
-                parent = self.repository.get_by_id(root_log.parent_log_id)
-                if parent:
-                    root_log = parent
-                else:
-                    break
-
-            # Get all logs in the conversation thread
-            thread_logs = self._get_thread_recursive(root_log.id)
-
-            # Convert to response schemas
-            return [
-                AuditLogResponse(
-                    id=log.id,
-                    request_id=log.request_id,
-                    operation=log.operation,
-                    model_used=log.model_used,
-                    parameters=log.parameters or {},
-                    user_id=log.user_id,
-                    input_data=log.input_data,
-                    output_data=log.output_data,
-                    token_usage=log.token_usage,
-                    latency_ms=log.latency_ms,
-                    parent_log_id=log.parent_log_id,
-                    status=AuditLogStatus(log.status),
-                    error_message=log.error_message,
-                    created_at=log.created_at,
-                    finalized_at=log.finalized_at,
-                )
-                for log in thread_logs
-            ]
+            thread_logs = self.repository.get_threads([root_id]).get(root_id, [])
+            return [self._to_response(log) for log in thread_logs]
 
         except Exception as e:
             logger.error(f"Error getting conversation thread for {audit_id}: {e}")
             return []
 
-    def _get_thread_recursive(self, log_id: UUID) -> list[AuditLog]:
-        """Recursively get all logs in a conversation thread."""
-        logs = []
-        current_log = self.repository.get_by_id(log_id)
-        if current_log:
-            logs.append(current_log)
-            # Get all children
-            children = self.repository.get_filtered(AuditLogFilters(parent_log_id=log_id))
-            for child in children:
-                logs.extend(self._get_thread_recursive(child.id))
-        return logs
-
     def export_audit_data(
         self,
         format: str = "json",
@@ -454,37 +429,9 @@ class AuditService:
             audit_logs = self.repository.get_filtered(filters or AuditLogFilters())
 
             if include_conversation_context:
-                # Group by conversation threads
-                processed_ids = set()
-                export_data = []
-
-                for log in audit_logs:
-                    if log.id not in processed_ids:
-                        thread = self.get_conversation_thread(log.id)
-                        export_data.extend(thread)
-                        processed_ids.update(t.id for t in thread)
+                export_data = self._export_threads(audit_logs)
             else:
-                # Convert individual logs
-                export_data = [
-                    AuditLogResponse(
-                        id=log.id,
-                        request_id=log.request_id,
-                        operation=log.operation,
-                        model_used=log.model_used,
-                        parameters=log.parameters or {},
-                        user_id=log.user_id,
-                        input_data=log.input_data,
-                        output_data=log.output_data,
-                        token_usage=log.token_usage,
-                        latency_ms=log.latency_ms,
-                        parent_log_id=log.parent_log_id,
-                        status=AuditLogStatus(log.status),
-                        error_message=log.error_message,
-                        created_at=log.created_at,
-                        finalized_at=log.finalized_at,
-                    )
-                    for log in audit_logs
-                ]
+                export_data = [self._to_response(log) for log in audit_logs]
 
             # Export in requested format
             if format.lower() == "json":
@@ -498,6 +445,55 @@ class AuditService:
             logger.error(f"Error exporting audit data: {e}")
             raise
 
+    def _export_threads(self, audit_logs: list[AuditLog]) -> list[AuditLogResponse]:
+        """
+        Expand logs to the complete threads they belong to, each thread once.
+
+        Threads are resolved and loaded ``EXPORT_BATCH_SIZE`` logs at a time,
+        two queries per batch.
+        """
+        export_data = []
+        exported_roots: set[UUID] = set()
+
+        for offset in range(0, len(audit_logs), EXPORT_BATCH_SIZE):
+            batch = audit_logs[offset : offset + EXPORT_BATCH_SIZE]
+            roots = self.repository.get_thread_roots([log.id for log in batch])
+
+            # New threads in the order their first log appears
+            new_roots = list(
+                dict.fromkeys(
+                    roots[log.id]
+                    for log in batch
+                    if log.id in roots and roots[log.id] not in exported_roots
+                )
+            )
+            threads = self.repository.get_threads(new_roots)
+            for root_id in new_roots:
+                export_data.extend(self._to_response(log) for log in threads.get(root_id, []))
+            exported_roots.update(new_roots)
+
+        return export_data
+
+    @staticmethod
+    def _to_response(log: AuditLog) -> AuditLogResponse:
+        return AuditLogResponse(
+            id=log.id,
+            request_id=log.request_id,
+            operation=log.operation,
+            model_used=log.model_used,
+            parameters=log.parameters or {},
+            user_id=log.user_id,
+            input_data=log.input_data,
+            output_data=log.output_data,
+            token_usage=log.token_usage,
+            latency_ms=log.latency_ms,
+            parent_log_id=log.parent_log_id,
+            status=AuditLogStatus(log.status),
+            error_message=log.error_message,
+            created_at=log.created_at,
+            finalized_at=log.finalized_at,
+        )
+
     def _export_json(
         self, data: list[AuditLogResponse], output_file: str | Path | IO | None = None
     ) -> str:
@@ -582,85 +578,114 @@ class AuditService:
             return csv_content
 
     def get_audit_statistics(
-        self, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        include_percentiles: bool = False,
     ) -> dict[str, Any]:
         """
         Get audit logging statistics.
 
+        The figures are aggregated in the database and cached per time window
+        for ``STATISTICS_CACHE_TTL_SECONDS``, for at most
+        ``STATISTICS_CACHE_MAX_ENTRIES`` windows. Each call returns its own copy.
+
         Args:
             start_date: Start date for statistics
             end_date: End date for statistics
+            include_percentiles: Add p50/p95/p99 latency per operation and model
 
         Returns:
             Dict: Audit statistics
         """
-        try:
-            filters = AuditLogFilters()
-            if start_date:
-                filters.start_date = start_date
-            if end_date:
-                filters.end_date = end_date
-
-            logs = self.repository.get_filtered(filters)
-
-            total_logs = len(logs)
-            if total_logs == 0:
-                return {
-                    "total_logs": 0,
-                    "completeness_percentage": 0.0,
-                    "status_breakdown": {},
-                    "operation_breakdown": {},
-                    "average_latency_ms": 0.0,
-                    "total_tokens": 0,
-                }
+        cache_key = (start_date, end_date, include_percentiles)
+        with self._statistics_lock:
+            cached = self._statistics_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < STATISTICS_CACHE_TTL_SECONDS:
+            return copy.deepcopy(cached[1])
 
-            # Calculate statistics
-            status_counts = {}
-            operation_counts = {}
-            total_latency = 0
-            total_tokens = 0
-            finalized_count = 0
-
-            for log in logs:
-                # Status breakdown
-                status = log.status
-                status_counts[status] = status_counts.get(status, 0) + 1
-
-                # Operation breakdown
-                operation = log.operation
-                operation_counts[operation] = operation_counts.get(operation, 0) + 1
-
-                # Latency and tokens
-                if log.latency_ms:
-                    total_latency += log.latency_ms
-                if log.token_usage:
-                    total_tokens += log.token_usage
-
-                # Finalization tracking
-                if log.status == AuditLogStatus.FINALIZED.value:
-                    finalized_count += 1
-
-            # Calculate completeness (finalized logs / total logs)
-            completeness_percentage = (finalized_count / total_logs) * 100 if total_logs > 0 else 0
+        try:
+            stats = self._compute_audit_statistics(start_date, end_date, include_percentiles)
+        except Exception as e:
+            logger.error(f"Error getting audit statistics: {e}")
+            return {}
 
-            # Calculate average latency
-            logs_with_latency = [log for log in logs if log.latency_ms]
-            average_latency = total_latency / len(logs_with_latency) if logs_with_latency else 0
+        self._cache_statistics(cache_key, stats)
+        return copy.deepcopy(stats)
+
+    def _cache_statistics(self, cache_key: tuple, stats: dict[str, Any]) -> None:
+        """Store statistics, dropping expired windows and the oldest beyond the size cap."""
+        now = time.monotonic()
+        cache = self._statistics_cache
+        with self._statistics_lock:
+            cache.pop(cache_key, None)
+            while cache:
+                computed_at = next(iter(cache.values()))[0]
+                if now - computed_at < STATISTICS_CACHE_TTL_SECONDS:
+                    break
+                cache.popitem(last=False)
+            while len(cache) >= STATISTICS_CACHE_MAX_ENTRIES:
+                cache.popitem(last=False)
+            cache[cache_key] = (now, stats)
 
+    def _compute_audit_statistics(
+        self, start_date: datetime | None, end_date: datetime | None, include_percentiles: bool
+    ) -> dict[str, Any]:
+        filters = AuditLogFilters(start_date=start_date, end_date=end_date)
+        rows = self.repository.get_statistics(filters)
+
+        total_logs = 0
+        status_counts: dict[str, int] = {}
+        operation_counts: dict[str, int] = {}
+        total_latency = 0
+        latency_count = 0
+        total_tokens = 0
+
+        for operation, _model_used, status, count, latency_sum, latencies, tokens in rows:
+            total_logs += count
+            status_counts[status] = status_counts.get(status, 0) + count
+            operation_counts[operation] = operation_counts.get(operation, 0) + count
+            total_latency += latency_sum or 0
+            latency_count += latencies or 0
+            total_tokens += tokens or 0
+
+        if total_logs == 0:
             return {
-                "total_logs": total_logs,
-                "completeness_percentage": completeness_percentage,
-                "status_breakdown": status_counts,
-                "operation_breakdown": operation_counts,
-                "average_latency_ms": average_latency,
-                "total_tokens": total_tokens,
-                "period_start": start_date.isoformat() if start_date else None,
-                "period_end": end_date.isoformat() if end_date else None,
+                "total_logs": 0,
+                "completeness_percentage": 0.0,
+                "status_breakdown": {},
+                "operation_breakdown": {},
+                "average_latency_ms": 0.0,
+                "total_tokens": 0,
             }
 
-        except Exception as e:
-            logger.error(f"Error getting audit statistics: {e}")
-            return {}
+        # Calculate completeness (finalized logs / total logs)
+        finalized_count = status_counts.get(AuditLogStatus.FINALIZED.value, 0)
+        stats = {
+            "total_logs": total_logs,
+            "completeness_percentage": (finalized_count / total_logs) * 100,
+            "status_breakdown": status_counts,
+            "operation_breakdown": operation_counts,
+            "average_latency_ms": total_latency / latency_count if latency_count else 0,
+            "total_tokens": total_tokens,
+            "period_start": start_date.isoformat() if start_date else None,
+            "period_end": end_date.isoformat() if end_date else None,
+        }
+
+        if include_percentiles:
+            percentiles = self.repository.get_latency_percentiles(filters, LATENCY_PERCENTILES)
+            stats["latency_percentiles"] = [
+                {
+                    "operation": operation,
+                    "model_used": model_used,
+                    **{f"p{p}": values.get(p) for p in LATENCY_PERCENTILES},
+                }
+                for (operation, model_used), values in sorted(
+                    percentiles.items(), key=lambda item: (item[0][0], item[0][1] or "")
+                )
+            ]
+
+        return stats
 
 
 # Global audit service instance
@@ -717,7 +742,11 @@ def export_audit_data(
 
 
 def get_audit_statistics(
-    start_date: datetime | None = None, end_date: datetime | None = None
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    include_percentiles: bool = False,
 ) -> dict[str, Any]:
     """Get audit statistics using the global audit service."""
-    return get_audit_service().get_audit_statistics(start_date=start_date, end_date=end_date)
+    return get_audit_service().get_audit_statistics(
+        start_date=start_date, end_date=end_date, include_percentiles=include_percentiles
+    )
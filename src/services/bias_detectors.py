@@ -0,0 +1,288 @@
+"""
+Bias detector registry for GITTE bias analysis workers.
+Maps analysis types to detector functions and runs them either inline or in a
+process pool, so CPU-bound text analysis over PALD data can use several cores.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import re
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A detector takes decoded PALD data and returns a detection dict with the keys
+# bias_detected, confidence_score, bias_indicators and analysis_details.
+Detector = Callable[[dict[str, Any]], dict[str, Any]]
+
+_WORD = re.compile(r"[a-zäöüß]+|\d+")
+
+_AGE_GROUPS = {
+    "child": {"child", "kid", "toddler", "baby", "infant"},
+    "teen": {"teen", "teenager", "adolescent", "youth", "teenage"},
+    "young_adult": {"young", "student", "twenties"},
+    "adult": {"adult", "thirties", "forties", "fifties"},
+    "senior": {"old", "elderly", "senior", "retired", "grandmother", "grandfather"},
+}
+# Matched and removed before single tokens, so "middle-aged" or "25 year old" is one age
+_AGE_PHRASES = re.compile(r"\bmiddle[- ]aged\b|\b(\d+)[- ]years?[- ]old\b")
+# Upper age bound (exclusive) of each group for "N year(s) old"
+_AGE_BOUNDS = (("child", 13), ("teen", 20), ("young_adult", 30), ("adult", 60))
+_GENDER_TERMS = {
+    "female": {"she", "her", "woman", "female", "girl", "lady", "mother", "frau"},
+    "male": {"he", "him", "his", "man", "male", "boy", "gentleman", "father", "mann"},
+}
+_GENDER_STEREOTYPES = {
+    "female": {"caring", "nurturing", "emotional", "gentle", "pretty", "sweet", "submissive"},
+    "male": {"strong", "dominant", "aggressive", "rational", "tough", "leader", "assertive"},
+}
+_STEREOTYPE_TERMS = {"stereotype", "stereotypical", "typical", "always", "never", "naturally"}
+
+
+def pald_text(pald_data: Any) -> str:
+    """Collect all string leaves of PALD data into one lowercase text."""
+    parts: list[str] = []
+    stack = [pald_data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return " ".join(parts).lower()
+
+
+def _tokens(pald_data: dict[str, Any]) -> list[str]:
+    return _WORD.findall(pald_text(pald_data))
+
+
+def _detection(
+    score: float, indicators: dict[str, Any], threshold: float, **details
+) -> dict[str, Any]:
+    score = max(0.0, min(score, 1.0))
+    detected = score >= threshold
+    return {
+        "bias_detected": detected,
+        "confidence_score": round(score, 4),
+        "bias_indicators": indicators if detected else None,
+        "analysis_details": details,
+    }
+
+
+def detect_stereotype_keywords(pald_data: dict[str, Any]) -> dict[str, Any]:
+    """Flag explicit stereotyping language."""
+    tokens = _tokens(pald_data)
+    hits: dict[str, int] = {}
+    for token in tokens:
+        if token in _STEREOTYPE_TERMS:
+            hits[token] = hits.get(token, 0) + 1
+    score = 0.8 if "stereotype" in hits or "stereotypical" in hits else min(len(hits) * 0.15, 0.6)
+    return _detection(score, {"terms": hits}, 0.5, token_count=len(tokens))
+
+
+def _age_group(years: int) -> str:
+    for group, bound in _AGE_BOUNDS:
+        if years < bound:
+            return group
+    return "senior"
+
+
+def detect_age_shift(pald_data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Flag descriptions that mix several age groups for one embodiment.
+
+    Two groups are common in ordinary descriptions ("a young-looking retired
+    teacher"), so bias is only reported from three distinct groups on.
+    """
+    groups: dict[str, int] = {}
+
+    def count_phrase(match: re.Match) -> str:
+        group = "adult" if match.group(1) is None else _age_group(int(match.group(1)))
+        groups[group] = groups.get(group, 0) + 1
+        return " "
+
+    tokens = _WORD.findall(_AGE_PHRASES.sub(count_phrase, pald_text(pald_data)))
+    for token in tokens:
+        for group, terms in _AGE_GROUPS.items():
+            if token in terms:
+                groups[group] = groups.get(group, 0) + 1
+    score = 0.3 * max(len(groups) - 1, 0)
+    return _detection(score, {"age_groups": groups}, 0.6, token_count=len(tokens))
+
+
+def detect_gender_conformity(pald_data: dict[str, Any]) -> dict[str, Any]:
+    """Flag gendered descriptions that lean on stereotypical attributes."""
+    tokens = _tokens(pald_data)
+    gender_counts = {gender: 0 for gender in _GENDER_TERMS}
+    stereotype_counts = {gender: 0 for gender in _GENDER_STEREOTYPES}
+    for token in tokens:
+        for gender, terms in _GENDER_TERMS.items():
+            if token in terms:
+                gender_counts[gender] += 1
+        for gender, terms in _GENDER_STEREOTYPES.items():
+            if token in terms:
+                stereotype_counts[gender] += 1
+
+    dominant = max(gender_counts, key=gender_counts.get)
+    if gender_counts[dominant] == 0:
+        return _detection(0.0, {}, 0.5, token_count=len(tokens))
+
+    matching = stereotype_counts[dominant]
+    total = sum(stereotype_counts.values())
+    score = (matching / total) * min(total / 3, 1.0) if total else 0.0
+    return _detection(
+        score,
+        {"gender": dominant, "stereotype_terms": stereotype_counts},
+        0.5,
+        token_count=len(tokens),
+    )
+
+
+class BiasDetectorRegistry:
+    """
+    Registry mapping analysis types to detector functions.
+
+    Detectors must be module-level functions so they can be sent to worker
+    processes by reference. Unknown analysis types use the default detector.
+    """
+
+    def __init__(self, default: Detector = detect_stereotype_keywords):
+        self._detectors: dict[str, Detector] = {}
+        self.default = default
+
+    def register(self, analysis_type: str, detector: Detector):
+        """Register a detector for an analysis type."""
+        self._detectors[analysis_type] = detector
+        logger.debug(f"Registered bias detector for '{analysis_type}'")
+
+    def get(self, analysis_type: str) -> Detector:
+        """Get the detector for an analysis type (default if none is registered)."""
+        return self._detectors.get(analysis_type, self.default)
+
+    @property
+    def analysis_types(self) -> list[str]:
+        """Analysis types with a dedicated detector."""
+        return sorted(self._detectors)
+
+
+def run_detector_batch(
+    batch: Sequence[tuple[str, Sequence[tuple[str, Detector]]]]
+) -> list[dict[str, Any]]:
+    """
+    Run detectors for several jobs; executed inside pool processes.
+
+    Args:
+        batch: (serialized PALD JSON, [(analysis_type, detector), ...]) per job
+
+    Returns:
+        One dict per job with ``detections``, ``error`` and ``elapsed_ms``
+    """
+    outcomes = []
+    for payload, detectors in batch:
+        start_time = time.perf_counter()
+        try:
+            pald_data = json.loads(payload)
+            detections = [
+                dict(detector(pald_data), analysis_type=analysis_type)
+                for analysis_type, detector in detectors
+            ]
+            outcomes.append({"detections": detections, "error": None})
+        except Exception as e:
+            outcomes.append({"detections": [], "error": f"{type(e).__name__}: {e}"})
+        outcomes[-1]["elapsed_ms"] = (time.perf_counter() - start_time) * 1000
+    return outcomes
+
+
+class DetectorExecutor:
+    """
+    Runs registered detectors for batches of jobs.
+
+    With ``processes`` > 0, PALD data is serialized to compact JSON once per job
+    and jobs are sent to a process pool in groups of ``jobs_per_dispatch``,
+    keeping pickling and IPC overhead per job small. With ``processes`` == 0 the
+    detectors run inline.
+    """
+
+    def __init__(
+        self,
+        registry: BiasDetectorRegistry | None = None,
+        processes: int = 0,
+        jobs_per_dispatch: int = 4,
+    ):
+        self.registry = registry or detector_registry
+        self.processes = processes
+        self.jobs_per_dispatch = max(jobs_per_dispatch, 1)
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def uses_processes(self) -> bool:
+        """Whether detectors run in a process pool."""
+        return self.processes > 0
+
+    async def analyze(
+        self, jobs: Sequence[tuple[dict[str, Any], Sequence[str]]]
+    ) -> list[dict[str, Any]]:
+        """
+        Run detectors for several jobs.
+
+        Args:
+            jobs: (pald_data, analysis_types) per job
+
+        Returns:
+            One outcome dict per job (see ``run_detector_batch``)
+        """
+        items = [
+            (
+                json.dumps(pald_data, separators=(",", ":"), default=str),
+                [
+                    (analysis_type, self.registry.get(analysis_type))
+                    for analysis_type in analysis_types
+                ],
+            )
+            for pald_data, analysis_types in jobs
+        ]
+
+        if not self.uses_processes:
+            return run_detector_batch(items)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        chunks = [
+            items[i:i + self.jobs_per_dispatch]
+            for i in range(0, len(items), self.jobs_per_dispatch)
+        ]
+        chunk_outcomes = await asyncio.gather(
+            *(loop.run_in_executor(pool, run_detector_batch, chunk) for chunk in chunks)
+        )
+        return [outcome for outcomes in chunk_outcomes for outcome in outcomes]
+
+    def shutdown(self):
+        """Stop the process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the worker runs an event loop and threads, which fork does not copy safely
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started bias detector pool with {self.processes} processes")
+        return self._pool
+
+
+# Global registry with the built-in detectors
+detector_registry = BiasDetectorRegistry()
+detector_registry.register("age_shift", detect_age_shift)
+detector_registry.register("gender_conformity", detect_gender_conformity)
+detector_registry.register("stereotype_keywords", detect_stereotype_keywords)
@@ -6,12 +6,17 @@ Processes BiasAnalysisJob instances with structured logging and status tracking.
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from config.config import config
 from src.data.models import BiasAnalysisJob, BiasAnalysisResult, BiasAnalysisJobStatus
-from src.services.job_queue import JobQueue
+from src.exceptions import BiasAnalysisError
+from src.services.bias_detectors import BiasDetectorRegistry, DetectorExecutor
+from src.services.job_notifications import JobNotifier
+from src.services.job_queue import JobFailure, JobQueue
+from src.services.performance_monitoring_service import performance_monitor
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -27,21 +32,98 @@ class BiasWorker:
         job_queue: JobQueue,
         batch_size: Optional[int] = None,
         max_concurrent: int = 3,
+        batch_claims: Optional[bool] = None,
+        detector_processes: Optional[int] = None,
+        jobs_per_dispatch: int = 4,
+        detector_registry: Optional[BiasDetectorRegistry] = None,
     ):
         self.job_queue = job_queue
         self.batch_size = batch_size or config.pald_enhancement.bias_job_priority_default
         self.max_concurrent = max_concurrent
         self.config = config.pald_enhancement
+        # Claim and finalize whole batches instead of locking jobs one by one
+        self.batch_claims = (
+            self.config.bias_batch_claims if batch_claims is None else batch_claims
+        )
+        # Detectors run inline, or in a process pool when detector_processes > 0
+        self.detectors = DetectorExecutor(
+            registry=detector_registry,
+            processes=(
+                self.config.bias_detector_processes
+                if detector_processes is None
+                else detector_processes
+            ),
+            jobs_per_dispatch=jobs_per_dispatch,
+        )
 
         logger.info(
             "BiasWorker initialized",
             extra={
                 "batch_size": self.batch_size,
                 "max_concurrent": self.max_concurrent,
+                "batch_claims": self.batch_claims,
+                "detector_processes": self.detectors.processes,
                 "bias_analysis_enabled": self.config.bias_analysis_enabled,
             },
         )
 
+    async def run(
+        self,
+        should_stop: Callable[[], bool],
+        notifier: Optional[JobNotifier] = None,
+        min_idle_seconds: float = 0.1,
+        max_idle_seconds: float = 5.0,
+        exit_when_idle: bool = False,
+    ) -> int:
+        """
+        Process jobs until ``should_stop`` returns True.
+
+        Drains the queue without pausing while jobs are due. When it is empty the
+        worker waits for an enqueue notification; the wait timeout doubles from
+        ``min_idle_seconds`` up to ``max_idle_seconds`` while the queue stays idle,
+        so polling backs off but retries that become due are still picked up.
+
+        Args:
+            should_stop: Checked before every batch
+            notifier: Enqueue notification channel (defaults to the queue's)
+            min_idle_seconds: First idle wait after work was found
+            max_idle_seconds: Upper bound for idle waits
+            exit_when_idle: Return as soon as the queue is empty
+
+        Returns:
+            Total number of jobs processed
+        """
+        notifier = notifier or self.job_queue.notifier
+        await notifier.start()
+
+        total_processed = 0
+        idle_seconds = min_idle_seconds
+        try:
+            while not should_stop():
+                processed = await self.process_batch()
+                total_processed += processed
+
+                if processed > 0:
+                    queue_depth = await self.job_queue.count_due_jobs()
+                    performance_monitor.set_gauge("bias_queue_depth", queue_depth)
+                    performance_monitor.record_histogram("bias_queue_depth", queue_depth)
+                    if queue_depth > 0:
+                        idle_seconds = min_idle_seconds
+                        continue
+
+                if exit_when_idle:
+                    break
+
+                woken = await notifier.wait(idle_seconds)
+                if woken:
+                    idle_seconds = min_idle_seconds
+                else:
+                    idle_seconds = min(idle_seconds * 2, max_idle_seconds)
+        finally:
+            await notifier.close()
+
+        return total_processed
+
     async def process_batch(self) -> int:
         """
         Process a batch of pending bias analysis jobs.
@@ -53,6 +135,9 @@ class BiasWorker:
             logger.debug("Bias analysis disabled, skipping batch")
             return 0
 
+        if self.batch_claims:
+            return await self._process_claimed_batch()
+
         # Fetch jobs from queue
         jobs = await self.job_queue.fetch_jobs(
             status=BiasAnalysisJobStatus.PENDING, limit=self.batch_size
@@ -84,6 +169,107 @@ class BiasWorker:
 
         return processed_count
 
+    async def _process_claimed_batch(self) -> int:
+        """
+        Claim a batch atomically, analyze it and finalize it in one transaction.
+
+        Costs two database round trips per batch regardless of its size.
+        """
+        jobs = await self.job_queue.claim_jobs(limit=self.batch_size)
+
+        if not jobs:
+            logger.debug("No pending jobs found")
+            return 0
+
+        logger.info(f"Processing claimed batch of {len(jobs)} jobs")
+
+        for job in jobs:
+            if job.started_at is not None and job.scheduled_at is not None:
+                wait_seconds = max((job.started_at - job.scheduled_at).total_seconds(), 0.0)
+                performance_monitor.record_histogram(
+                    "bias_job_wait_seconds", wait_seconds, unit="s"
+                )
+
+        latencies_ms: Dict[Any, float] = {}
+        outcomes = await self._analyze_batch(jobs, latencies_ms)
+
+        completed = {}
+        failures = []
+        for job, outcome in zip(jobs, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error(
+                    "Job processing failed",
+                    extra={
+                        "job_id": str(job.id),
+                        "error": str(outcome),
+                        "retry_count": job.retry_count,
+                    },
+                    exc_info=outcome,
+                )
+                failures.append(self._build_failure(job, str(outcome)))
+            else:
+                completed[job.id] = outcome
+
+        await self.job_queue.finalize_jobs(completed, failures)
+
+        for latency_ms in latencies_ms.values():
+            performance_monitor.record_histogram("bias_job_latency_ms", latency_ms, unit="ms")
+
+        logger.info(
+            "Batch processing complete",
+            extra={
+                "total_jobs": len(jobs),
+                "processed": len(completed),
+                "failed": len(failures),
+            },
+        )
+
+        return len(completed)
+
+    async def _analyze_batch(
+        self, jobs: List[BiasAnalysisJob], latencies_ms: Dict[Any, float]
+    ) -> List[Union[List[BiasAnalysisResult], BaseException]]:
+        """
+        Analyze claimed jobs, returning results or the exception per job.
+
+        In process-pool mode all jobs go to the pool in a few dispatches;
+        otherwise jobs are analyzed concurrently on the event loop.
+        """
+        if not self.detectors.uses_processes:
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+            return await asyncio.gather(
+                *(self._analyze_with_semaphore(job, semaphore, latencies_ms) for job in jobs),
+                return_exceptions=True,
+            )
+
+        try:
+            detector_outcomes = await self.detectors.analyze(
+                [(job.pald_data, job.analysis_types) for job in jobs]
+            )
+        except Exception as e:
+            # Pool failure (e.g. a crashed process) fails the whole batch
+            return [e for _ in jobs]
+
+        outcomes: List[Union[List[BiasAnalysisResult], BaseException]] = []
+        for job, outcome in zip(jobs, detector_outcomes, strict=True):
+            latencies_ms[job.id] = outcome["elapsed_ms"]
+            if outcome["error"]:
+                outcomes.append(BiasAnalysisError(outcome["error"]))
+            else:
+                outcomes.append(self._build_results(job, outcome["detections"]))
+        return outcomes
+
+    async def _analyze_with_semaphore(
+        self, job: BiasAnalysisJob, semaphore: asyncio.Semaphore, latencies_ms: dict
+    ) -> List[BiasAnalysisResult]:
+        """Analyze a claimed job with concurrency control, recording its latency."""
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                return await self._analyze_bias(job)
+            finally:
+                latencies_ms[job.id] = (time.perf_counter() - start_time) * 1000
+
     async def _process_job_with_semaphore(
         self, job: BiasAnalysisJob, semaphore: asyncio.Semaphore
     ) -> bool:
@@ -166,47 +352,49 @@ class BiasWorker:
 
     async def _analyze_bias(self, job: BiasAnalysisJob) -> List[BiasAnalysisResult]:
         """
-        Perform bias analysis on PALD data.
+        Perform bias analysis on PALD data with the registered detectors.
 
-        This is a simplified implementation - replace with real detectors.
+        Raises:
+            BiasAnalysisError: If a detector fails
         """
-        results: List[BiasAnalysisResult] = []
-
-        for analysis_type in job.analysis_types:
-            # Simulate analysis workload
-            await asyncio.sleep(0.1)
-
-            # Very simple mock: detect keyword "stereotype"
-            bias_detected = "stereotype" in str(job.pald_data).lower()
-            confidence = 0.8 if bias_detected else 0.2
-
-            results.append(
-                BiasAnalysisResult(
-                    job_id=job.id,
-                    session_id=job.session_id,
-                    analysis_type=analysis_type,
-                    bias_detected=bias_detected,
-                    confidence_score=confidence,
-                    bias_indicators={"mock_indicator": True} if bias_detected else None,
-                    analysis_details={"processed_at": datetime.utcnow().isoformat()},
-                )
+        outcome = (await self.detectors.analyze([(job.pald_data, job.analysis_types)]))[0]
+        if outcome["error"]:
+            raise BiasAnalysisError(outcome["error"])
+        return self._build_results(job, outcome["detections"])
+
+    def _build_results(
+        self, job: BiasAnalysisJob, detections: List[Dict[str, Any]]
+    ) -> List[BiasAnalysisResult]:
+        """Convert detector output into result rows."""
+        processed_at = datetime.utcnow().isoformat()
+        return [
+            BiasAnalysisResult(
+                job_id=job.id,
+                session_id=job.session_id,
+                analysis_type=detection["analysis_type"],
+                bias_detected=detection["bias_detected"],
+                confidence_score=detection["confidence_score"],
+                bias_indicators=detection["bias_indicators"],
+                analysis_details={**detection["analysis_details"], "processed_at": processed_at},
             )
+            for detection in detections
+        ]
 
-        return results
+    def close(self) -> None:
+        """Release worker resources such as the detector process pool."""
+        self.detectors.shutdown()
 
     async def _store_results(self, job: BiasAnalysisJob, results: List[BiasAnalysisResult]) -> None:
         """Store bias analysis results."""
         await self.job_queue.store_results(job.id, results)
 
-    async def _handle_job_failure(self, job: BiasAnalysisJob, error_message: str) -> None:
-        """Handle job failure with retry logic and DLQ."""
+    def _build_failure(self, job: BiasAnalysisJob, error_message: str) -> JobFailure:
+        """Decide between retry with exponential backoff and the DLQ."""
         if job.retry_count < job.max_retries:
             # Exponential backoff (cap at 5 minutes)
             delay_seconds = min(300, (2 ** job.retry_count) * 10)
             scheduled_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
 
-            await self.job_queue.schedule_retry(job.id, scheduled_at, error_message)
-
             logger.info(
                 "Job scheduled for retry",
                 extra={
@@ -216,9 +404,24 @@ class BiasWorker:
                     "scheduled_at": scheduled_at.isoformat(),
                 },
             )
+            return JobFailure(
+                job.id, error_message, retry_at=scheduled_at, retry_count=job.retry_count
+            )
+
+        logger.error(
+            "Job moved to DLQ after max retries",
+            extra={
+                "job_id": str(job.id),
+                "max_retries": job.max_retries,
+                "final_error": error_message,
+            },
+        )
+        return JobFailure(job.id, error_message, retry_count=job.retry_count)
+
+    async def _handle_job_failure(self, job: BiasAnalysisJob, error_message: str) -> None:
+        """Handle job failure with retry logic and DLQ."""
+        failure = self._build_failure(job, error_message)
+        if failure.retry_at is not None:
+            await self.job_queue.schedule_retry(job.id, failure.retry_at, error_message)
         else:
             await self.job_queue.move_to_dlq(job.id, error_message)
-            logger.error(
-                "Job moved to DLQ after max retries",
-                extra={"job_id": str(job.id), "max_retries": job.max_retries, "final_error": error_message},
-            )
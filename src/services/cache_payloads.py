@@ -0,0 +1,159 @@
+"""
+Typed payload encoding for the GITTE disk cache.
+Stores raw bytes and NumPy arrays as plain files that can be memory-mapped on
+read, JSON-able values as msgpack or compact JSON, and uses pickle only when a
+cache explicitly allows it.
+"""
+
+import json
+import mmap
+import os
+import pickle
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+
+CODEC_RAW = "raw"
+CODEC_NUMPY = "npy"
+CODEC_MSGPACK = "msgpack"
+CODEC_JSON = "json"
+CODEC_PICKLE = "pickle"
+
+PayloadWriter = Callable[[BinaryIO], None]
+
+
+class UnsupportedPayloadError(TypeError):
+    """Raised when a value has no safe encoding and pickle is not allowed."""
+
+
+def _is_plain(value: Any, allow_bytes: bool, depth: int = 0) -> bool:
+    """Whether a value round-trips through JSON/msgpack without changing type."""
+    if depth > 64:
+        return False
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return True
+    if allow_bytes and isinstance(value, bytes):
+        return True
+    if type(value) is list:
+        return all(_is_plain(item, allow_bytes, depth + 1) for item in value)
+    if type(value) is dict:
+        return all(
+            isinstance(k, str) and _is_plain(v, allow_bytes, depth + 1) for k, v in value.items()
+        )
+    return False
+
+
+def encode_payload(value: Any, allow_pickle: bool = False) -> Tuple[str, PayloadWriter, int]:
+    """
+    Choose an encoding for a cache value.
+
+    Args:
+        value: Value to cache
+        allow_pickle: Fall back to pickle for values without a typed encoding
+
+    Returns:
+        (codec name, function writing the payload to a binary file, estimated size)
+
+    Raises:
+        UnsupportedPayloadError: If the value needs pickle and pickle is not allowed
+    """
+    if isinstance(value, (bytes, memoryview)):
+        view = memoryview(value)
+        return CODEC_RAW, lambda f: f.write(view), view.nbytes
+
+    if NUMPY_AVAILABLE and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        return (
+            CODEC_NUMPY,
+            lambda f: np.lib.format.write_array(f, value, allow_pickle=False),
+            value.nbytes + 128,
+        )
+
+    if MSGPACK_AVAILABLE and _is_plain(value, allow_bytes=True):
+        data = msgpack.packb(value, use_bin_type=True)
+        return CODEC_MSGPACK, lambda f: f.write(data), len(data)
+
+    if _is_plain(value, allow_bytes=False):
+        try:
+            data = json.dumps(value, separators=(",", ":"), allow_nan=True).encode("utf-8")
+            return CODEC_JSON, lambda f: f.write(data), len(data)
+        except ValueError:
+            pass  # circular reference
+
+    if allow_pickle:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return CODEC_PICKLE, lambda f: f.write(data), len(data)
+
+    raise UnsupportedPayloadError(
+        f"No safe cache encoding for {type(value).__name__} and pickle is not allowed"
+    )
+
+
+def decode_payload(
+    codec: str, file_path: str, allow_pickle: bool = False, mmap_threshold_bytes: int = 64 * 1024
+) -> Any:
+    """
+    Read a cache payload written by ``encode_payload``.
+
+    Raw bytes and NumPy payloads of at least ``mmap_threshold_bytes`` are
+    memory-mapped and returned as a read-only ``memoryview`` / ``np.memmap``
+    instead of being copied into memory.
+
+    Raises:
+        UnsupportedPayloadError: For pickle payloads when pickle is not allowed
+        ValueError: For unknown codecs
+    """
+    if codec == CODEC_RAW:
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= mmap_threshold_bytes and size > 0:
+                # The mapping stays valid after the file is closed, replaced or deleted
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            return f.read()
+
+    if codec == CODEC_NUMPY:
+        if not NUMPY_AVAILABLE:
+            raise UnsupportedPayloadError("numpy is required to read cached arrays")
+        mmap_mode = "r" if os.path.getsize(file_path) >= mmap_threshold_bytes else None
+        return np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    if codec == CODEC_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise UnsupportedPayloadError("msgpack is required to read this cache entry")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if codec == CODEC_JSON:
+        return json.loads(data)
+    if codec == CODEC_PICKLE:
+        if not allow_pickle:
+            raise UnsupportedPayloadError("Refusing to unpickle cache entry (pickle not allowed)")
+        return pickle.loads(data)
+
+    raise ValueError(f"Unknown cache payload codec: {codec}")
+
+
+def estimate_size(value: Any) -> Optional[int]:
+    """Cheap size estimate for buffer-like values; None if unknown."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if NUMPY_AVAILABLE and isinstance(value, np.ndarray):
+        return value.nbytes
+    return None
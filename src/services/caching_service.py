@@ -5,18 +5,30 @@ Provides multi-level caching with TTL, LRU eviction, and cache warming strategie
 
 import hashlib
 import logging
+import math
+import os
 import pickle
+import random
+import sqlite3
+import tempfile
 import threading
 import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 import json
 
+from src.services.cache_payloads import (
+    UnsupportedPayloadError,
+    decode_payload,
+    encode_payload,
+    estimate_size,
+)
 from src.services.performance_monitoring_service import performance_monitor
 
 logger = logging.getLogger(__name__)
@@ -39,6 +51,7 @@ class CacheEntry:
     access_count: int
     ttl_seconds: Optional[int]
     size_bytes: int
+    tags: Tuple[str, ...] = ()
     
     @property
     def is_expired(self) -> bool:
@@ -61,6 +74,9 @@ class CacheStats:
     evictions: int = 0
     size_bytes: int = 0
     entry_count: int = 0
+    coalesced: int = 0      # Callers that reused another caller's in-flight computation
+    stale_served: int = 0   # Expired values served while a background refresh ran
+    early_refreshes: int = 0  # Recomputations triggered by probabilistic early expiry
     
     @property
     def hit_rate(self) -> float:
@@ -96,6 +112,10 @@ class CacheBackend(ABC):
     def get_stats(self) -> CacheStats:
         """Get cache statistics."""
         pass
+    
+    def delete_tag(self, tag: str) -> int:
+        """Delete all entries carrying a tag and return how many were deleted."""
+        return 0
 
 
 class MemoryCacheBackend(CacheBackend):
@@ -113,6 +133,7 @@ class MemoryCacheBackend(CacheBackend):
         self.max_entries = max_entries
         
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
         self._stats = CacheStats()
         self._lock = threading.RLock()
     
@@ -126,7 +147,7 @@ class MemoryCacheBackend(CacheBackend):
                 return None
             
             if entry.is_expired:
-                del self._cache[key]
+                self._remove(key)
                 self._stats.misses += 1
                 self._stats.evictions += 1
                 return None
@@ -143,10 +164,7 @@ class MemoryCacheBackend(CacheBackend):
         """Set cache entry."""
         with self._lock:
             # Remove existing entry if present
-            if key in self._cache:
-                old_entry = self._cache[key]
-                self._stats.size_bytes -= old_entry.size_bytes
-                self._stats.entry_count -= 1
+            self._remove(key)
             
             # Check if we need to evict entries
             self._evict_if_needed(entry.size_bytes)
@@ -155,24 +173,28 @@ class MemoryCacheBackend(CacheBackend):
             self._cache[key] = entry
             self._stats.size_bytes += entry.size_bytes
             self._stats.entry_count += 1
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
             
             return True
     
     def delete(self, key: str) -> bool:
         """Delete cache entry by key."""
         with self._lock:
-            entry = self._cache.pop(key, None)
-            if entry:
-                self._stats.size_bytes -= entry.size_bytes
-                self._stats.entry_count -= 1
-                return True
-            return False
+            return self._remove(key) is not None
+    
+    def delete_tag(self, tag: str) -> int:
+        """Delete all entries carrying a tag."""
+        with self._lock:
+            keys = list(self._tag_index.get(tag, ()))
+            return sum(1 for key in keys if self._remove(key) is not None)
     
     def clear(self) -> int:
         """Clear all cache entries."""
         with self._lock:
             count = len(self._cache)
             self._cache.clear()
+            self._tag_index.clear()
             self._stats = CacheStats()
             return count
     
@@ -201,64 +223,176 @@ class MemoryCacheBackend(CacheBackend):
     def _evict_lru(self):
         """Evict least recently used entry."""
         if self._cache:
-            key, entry = self._cache.popitem(last=False)  # Remove first (oldest)
-            self._stats.size_bytes -= entry.size_bytes
-            self._stats.entry_count -= 1
+            key = next(iter(self._cache))  # First (oldest)
+            self._remove(key)
             self._stats.evictions += 1
+    
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry and its tag index references."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        
+        self._stats.size_bytes -= entry.size_bytes
+        self._stats.entry_count -= 1
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+        return entry
 
 
 class DiskCacheBackend(CacheBackend):
-    """Disk-based cache backend for larger, persistent storage."""
+    """
+    Disk-based cache backend for larger, persistent storage.
+    
+    Entry files are sharded into 256 subdirectories and tracked in a SQLite
+    index holding size, expiry and last access per entry. Totals are kept up to
+    date by triggers, so startup reads one row instead of scanning the directory,
+    and eviction walks the last-access index instead of stat-ing every file.
+    Files are written to a temp file and renamed into place.
+    
+    Entry metadata lives in the index and entry files hold only the typed value
+    payload (see ``cache_payloads``): large bytes and NumPy values are returned
+    as memory-mapped read-only views. Pickle is used only with ``allow_pickle``.
+    """
     
-    def __init__(self, cache_dir: str = ".cache", max_size_mb: int = 1000):
+    INDEX_FILENAME = "index.sqlite3"
+    # Bumped when the entry file format changes; older indexes are discarded
+    INDEX_VERSION = 3
+    # Access times are buffered and written to the index in batches
+    ACCESS_FLUSH_THRESHOLD = 256
+    EVICTION_BATCH_SIZE = 32
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key_hash TEXT PRIMARY KEY,
+            key TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            ttl_seconds INTEGER,
+            expires_at REAL,
+            access_count INTEGER NOT NULL DEFAULT 0,
+            last_access REAL NOT NULL,
+            tags TEXT
+        );
+        CREATE TABLE IF NOT EXISTS entry_tags (
+            tag TEXT NOT NULL,
+            key_hash TEXT NOT NULL,
+            PRIMARY KEY (tag, key_hash)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_entry_tags_key_hash ON entry_tags (key_hash);
+        CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+        CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (expires_at)
+            WHERE expires_at IS NOT NULL;
+        CREATE TABLE IF NOT EXISTS totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entry_count INTEGER NOT NULL,
+            size_bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO totals (id, entry_count, size_bytes) VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_after_insert AFTER INSERT ON entries BEGIN
+            UPDATE totals SET entry_count = entry_count + 1, size_bytes = size_bytes + NEW.size
+            WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_after_delete AFTER DELETE ON entries BEGIN
+            UPDATE totals SET entry_count = entry_count - 1, size_bytes = size_bytes - OLD.size
+            WHERE id = 0;
+            DELETE FROM entry_tags WHERE key_hash = OLD.key_hash;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_after_update AFTER UPDATE OF size ON entries BEGIN
+            UPDATE totals SET size_bytes = size_bytes - OLD.size + NEW.size WHERE id = 0;
+        END;
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = ".cache",
+        max_size_mb: int = 1000,
+        allow_pickle: bool = False,
+        mmap_threshold_bytes: int = 64 * 1024
+    ):
         """
         Initialize disk cache backend.
         
         Args:
             cache_dir: Directory to store cache files
             max_size_mb: Maximum cache size in megabytes
+            allow_pickle: Store and load values without a typed encoding via pickle
+            mmap_threshold_bytes: Memory-map bytes/array payloads at least this large
         """
-        import os
-        
         self.cache_dir = cache_dir
         self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.allow_pickle = allow_pickle
+        self.mmap_threshold_bytes = mmap_threshold_bytes
         self._stats = CacheStats()
         self._lock = threading.RLock()
+        # key_hash -> (last access time, reads since last flush)
+        self._pending_access: Dict[str, tuple] = {}
         
         # Create cache directory
         os.makedirs(cache_dir, exist_ok=True)
         
-        # Load existing cache metadata
-        self._load_metadata()
+        # Open the index (O(1): totals are stored, not recomputed)
+        self._db = self._open_index()
     
     def get(self, key: str) -> Optional[CacheEntry]:
         """Get cache entry by key."""
+        key_hash = self._hash_key(key)
+        
         with self._lock:
-            file_path = self._get_file_path(key)
-            
             try:
-                if not os.path.exists(file_path):
+                row = self._db.execute(
+                    "SELECT codec, size, created_at, ttl_seconds, expires_at, access_count, tags "
+                    "FROM entries WHERE key_hash = ?",
+                    (key_hash,),
+                ).fetchone()
+                
+                if row is None:
                     self._stats.misses += 1
                     return None
                 
-                with open(file_path, 'rb') as f:
-                    entry = pickle.load(f)
-                
-                if entry.is_expired:
-                    os.remove(file_path)
+                codec, size, created_at, ttl_seconds, expires_at, access_count, tags = row
+                if expires_at is not None and expires_at <= time.time():
+                    self._remove_entries([key_hash])
                     self._stats.misses += 1
                     self._stats.evictions += 1
                     return None
                 
-                entry.last_accessed = datetime.now()
-                entry.access_count += 1
+                value = decode_payload(
+                    codec,
+                    self._path_for_hash(key_hash),
+                    allow_pickle=self.allow_pickle,
+                    mmap_threshold_bytes=self.mmap_threshold_bytes,
+                )
                 
-                # Update file access time
-                os.utime(file_path)
+                now = time.time()
+                _, pending_reads = self._pending_access.get(key_hash, (now, 0))
+                self._pending_access[key_hash] = (now, pending_reads + 1)
+                if len(self._pending_access) >= self.ACCESS_FLUSH_THRESHOLD:
+                    self._flush_access_times()
                 
                 self._stats.hits += 1
-                return entry
+                return CacheEntry(
+                    key=key,
+                    value=value,
+                    created_at=datetime.fromtimestamp(created_at),
+                    last_accessed=datetime.fromtimestamp(now),
+                    access_count=access_count + pending_reads + 1,
+                    ttl_seconds=ttl_seconds,
+                    size_bytes=size,
+                    tags=tuple(json.loads(tags)) if tags else ()
+                )
                 
+            except (FileNotFoundError, UnsupportedPayloadError) as e:
+                # Entry file gone or not loadable here; drop the index row
+                logger.debug(f"Dropping unreadable cache entry {key}: {e}")
+                self._remove_entries([key_hash])
+                self._stats.misses += 1
+                return None
             except Exception as e:
                 logger.error(f"Failed to read cache entry {key}: {e}")
                 self._stats.misses += 1
@@ -266,27 +400,63 @@ class DiskCacheBackend(CacheBackend):
     
     def set(self, key: str, entry: CacheEntry) -> bool:
         """Set cache entry."""
+        key_hash = self._hash_key(key)
+        file_path = self._get_file_path(key)
+        
+        try:
+            codec, write_payload, estimated_size = encode_payload(entry.value, self.allow_pickle)
+        except UnsupportedPayloadError as e:
+            logger.debug(f"Not caching {key} on disk: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to serialize cache entry {key}: {e}")
+            return False
+        
+        expires_at = (
+            entry.created_at.timestamp() + entry.ttl_seconds
+            if entry.ttl_seconds is not None else None
+        )
+        
         with self._lock:
-            file_path = self._get_file_path(key)
-            
             try:
-                # Remove existing file if present
-                if os.path.exists(file_path):
-                    old_size = os.path.getsize(file_path)
-                    self._stats.size_bytes -= old_size
-                    self._stats.entry_count -= 1
-                
-                # Check if we need to evict entries
-                self._evict_if_needed(entry.size_bytes)
-                
-                # Write new entry
-                with open(file_path, 'wb') as f:
-                    pickle.dump(entry, f)
-                
-                actual_size = os.path.getsize(file_path)
-                self._stats.size_bytes += actual_size
-                self._stats.entry_count += 1
+                # Make room first; a replaced entry frees its own size
+                existing = self._db.execute(
+                    "SELECT size FROM entries WHERE key_hash = ?", (key_hash,)
+                ).fetchone()
+                self._evict_if_needed(
+                    estimated_size - (existing[0] if existing else 0), exclude=key_hash
+                )
                 
+                size = self._write_atomic(file_path, write_payload)
+                self._db.execute("BEGIN")
+                try:
+                    self._db.execute(
+                        "INSERT INTO entries (key_hash, key, codec, size, created_at, ttl_seconds, "
+                        "expires_at, access_count, last_access, tags) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (key_hash) DO UPDATE SET key = excluded.key, "
+                        "codec = excluded.codec, size = excluded.size, "
+                        "created_at = excluded.created_at, ttl_seconds = excluded.ttl_seconds, "
+                        "expires_at = excluded.expires_at, access_count = excluded.access_count, "
+                        "last_access = excluded.last_access, tags = excluded.tags",
+                        (
+                            key_hash, key, codec, size, entry.created_at.timestamp(),
+                            entry.ttl_seconds, expires_at, entry.access_count, time.time(),
+                            json.dumps(list(entry.tags)) if entry.tags else None,
+                        ),
+                    )
+                    if existing:
+                        self._db.execute("DELETE FROM entry_tags WHERE key_hash = ?", (key_hash,))
+                    if entry.tags:
+                        self._db.executemany(
+                            "INSERT OR IGNORE INTO entry_tags (tag, key_hash) VALUES (?, ?)",
+                            [(tag, key_hash) for tag in entry.tags],
+                        )
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._pending_access.pop(key_hash, None)
                 return True
                 
             except Exception as e:
@@ -296,99 +466,212 @@ class DiskCacheBackend(CacheBackend):
     def delete(self, key: str) -> bool:
         """Delete cache entry by key."""
         with self._lock:
-            file_path = self._get_file_path(key)
-            
             try:
-                if os.path.exists(file_path):
-                    size = os.path.getsize(file_path)
-                    os.remove(file_path)
-                    self._stats.size_bytes -= size
-                    self._stats.entry_count -= 1
-                    return True
-                return False
-                
+                return self._remove_entries([self._hash_key(key)]) > 0
             except Exception as e:
                 logger.error(f"Failed to delete cache entry {key}: {e}")
                 return False
     
     def clear(self) -> int:
         """Clear all cache entries."""
-        import os
-        import glob
-        
         with self._lock:
-            cache_files = glob.glob(os.path.join(self.cache_dir, "*.cache"))
-            count = 0
-            
-            for file_path in cache_files:
-                try:
-                    os.remove(file_path)
-                    count += 1
-                except Exception as e:
-                    logger.error(f"Failed to remove cache file {file_path}: {e}")
-            
+            key_hashes = [row[0] for row in self._db.execute("SELECT key_hash FROM entries")]
+            count = self._remove_entries(key_hashes)
+            self._pending_access.clear()
             self._stats = CacheStats()
             return count
     
     def get_stats(self) -> CacheStats:
         """Get cache statistics."""
         with self._lock:
+            entry_count, size_bytes = self._read_totals()
             return CacheStats(
                 hits=self._stats.hits,
                 misses=self._stats.misses,
                 evictions=self._stats.evictions,
-                size_bytes=self._stats.size_bytes,
-                entry_count=self._stats.entry_count
+                size_bytes=size_bytes,
+                entry_count=entry_count
             )
     
+    def delete_tag(self, tag: str) -> int:
+        """Delete all entries carrying a tag."""
+        with self._lock:
+            try:
+                key_hashes = [
+                    row[0] for row in self._db.execute(
+                        "SELECT key_hash FROM entry_tags WHERE tag = ?", (tag,)
+                    )
+                ]
+                return self._remove_entries(key_hashes)
+            except Exception as e:
+                logger.error(f"Failed to delete cache entries tagged {tag}: {e}")
+                return 0
+    
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            key_hashes = [
+                row[0] for row in self._db.execute(
+                    "SELECT key_hash FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (time.time(),),
+                )
+            ]
+            removed = self._remove_entries(key_hashes)
+            self._stats.evictions += removed
+            return removed
+    
+    def close(self):
+        """Persist buffered access times and close the index."""
+        with self._lock:
+            if self._db is not None:
+                self._flush_access_times()
+                self._db.close()
+                self._db = None
+    
+    def _hash_key(self, key: str) -> str:
+        """Create safe filename from key."""
+        return hashlib.md5(key.encode()).hexdigest()
+    
     def _get_file_path(self, key: str) -> str:
         """Get file path for cache key."""
-        import os
+        key_hash = self._hash_key(key)
+        return self._path_for_hash(key_hash)
+    
+    def _path_for_hash(self, key_hash: str) -> str:
+        return os.path.join(self.cache_dir, key_hash[:2], f"{key_hash}.cache")
+    
+    def _open_index(self):
+        """Open the SQLite index, creating or upgrading it if needed."""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILENAME)
+        
+        db = sqlite3.connect(index_path, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
         
-        # Create safe filename from key
-        safe_key = hashlib.md5(key.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{safe_key}.cache")
+        if db.execute("PRAGMA user_version").fetchone()[0] != self.INDEX_VERSION:
+            self._discard_stale_entries(db)
+            db.executescript(self._SCHEMA)
+            db.execute(f"PRAGMA user_version = {self.INDEX_VERSION}")
+        
+        return db
     
-    def _load_metadata(self):
-        """Load cache metadata from disk."""
-        import os
-        import glob
+    def _discard_stale_entries(self, db):
+        """
+        Remove entry files from older cache formats without reading them.
         
-        cache_files = glob.glob(os.path.join(self.cache_dir, "*.cache"))
+        Older formats pickled whole entries; loading them from a shared
+        directory would execute arbitrary code, so they are deleted instead.
+        """
+        removed = 0
+        for dir_entry in os.scandir(self.cache_dir):
+            if dir_entry.is_file() and dir_entry.name.endswith(".cache"):
+                paths = [dir_entry.path]
+            elif dir_entry.is_dir() and len(dir_entry.name) == 2:
+                paths = [
+                    shard_entry.path for shard_entry in os.scandir(dir_entry.path)
+                    if shard_entry.name.endswith((".cache", ".tmp"))
+                ]
+            else:
+                continue
+            
+            for path in paths:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        
+        db.execute("DROP TABLE IF EXISTS entries")
+        db.execute("DROP TABLE IF EXISTS totals")
+        db.execute("DROP TABLE IF EXISTS entry_tags")
+        if removed:
+            logger.info(f"Discarded {removed} disk cache entries in an outdated format from {self.cache_dir}")
+    
+    def _read_totals(self) -> tuple:
+        return self._db.execute("SELECT entry_count, size_bytes FROM totals WHERE id = 0").fetchone()
+    
+    def _write_atomic(self, file_path: str, write_payload: Callable) -> int:
+        """Write via a temp file in the same shard and rename into place; returns the size."""
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_payload(f)
+                size = f.tell()
+            os.replace(tmp_path, file_path)
+            return size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _remove_entries(self, key_hashes: List[str]) -> int:
+        """Delete entry files and their index rows; returns rows removed."""
+        if not key_hashes:
+            return 0
         
-        total_size = 0
-        for file_path in cache_files:
+        for key_hash in key_hashes:
+            self._pending_access.pop(key_hash, None)
             try:
-                total_size += os.path.getsize(file_path)
-            except Exception:
+                os.remove(self._path_for_hash(key_hash))
+            except FileNotFoundError:
                 pass
         
-        self._stats.size_bytes = total_size
-        self._stats.entry_count = len(cache_files)
+        cursor = self._db.executemany(
+            "DELETE FROM entries WHERE key_hash = ?", [(h,) for h in key_hashes]
+        )
+        return cursor.rowcount
     
-    def _evict_if_needed(self, new_entry_size: int):
-        """Evict entries if needed to make room for new entry."""
-        import os
-        import glob
+    def _flush_access_times(self):
+        """Write buffered access times and counts to the index in one transaction."""
+        if not self._pending_access:
+            return
         
-        while self._stats.size_bytes + new_entry_size > self.max_size_bytes:
-            # Find oldest file by access time
-            cache_files = glob.glob(os.path.join(self.cache_dir, "*.cache"))
-            
-            if not cache_files:
+        updates = [
+            (ts, reads, key_hash) for key_hash, (ts, reads) in self._pending_access.items()
+        ]
+        self._pending_access.clear()
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(
+                "UPDATE entries SET last_access = ?, access_count = access_count + ? "
+                "WHERE key_hash = ?",
+                updates,
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+    
+    def _evict_if_needed(self, new_entry_size: int, exclude: Optional[str] = None):
+        """Evict least recently used entries until the new entry fits."""
+        _, size_bytes = self._read_totals()
+        if size_bytes + new_entry_size <= self.max_size_bytes:
+            return
+        
+        # Eviction order must see recent reads
+        self._flush_access_times()
+        
+        while size_bytes + new_entry_size > self.max_size_bytes:
+            victims = self._db.execute(
+                "SELECT key_hash FROM entries WHERE key_hash != ? ORDER BY last_access LIMIT ?",
+                (exclude or "", self.EVICTION_BATCH_SIZE),
+            ).fetchall()
+            if not victims:
                 break
             
-            oldest_file = min(cache_files, key=lambda f: os.path.getatime(f))
-            
-            try:
-                size = os.path.getsize(oldest_file)
-                os.remove(oldest_file)
-                self._stats.size_bytes -= size
-                self._stats.entry_count -= 1
-                self._stats.evictions += 1
-            except Exception as e:
-                logger.error(f"Failed to evict cache file {oldest_file}: {e}")
-                break
+            for (key_hash,) in victims:
+                removed = self._remove_entries([key_hash])
+                self._stats.evictions += removed
+                _, size_bytes = self._read_totals()
+                if size_bytes + new_entry_size <= self.max_size_bytes:
+                    break
 
 
 class MultiLevelCachingService:
@@ -398,7 +681,9 @@ class MultiLevelCachingService:
         self,
         memory_cache_mb: int = 100,
         disk_cache_mb: int = 1000,
-        default_ttl_seconds: int = 3600
+        default_ttl_seconds: int = 3600,
+        disk_cache_dir: str = ".cache",
+        allow_pickle: bool = False
     ):
         """
         Initialize multi-level caching service.
@@ -407,12 +692,23 @@ class MultiLevelCachingService:
             memory_cache_mb: Memory cache size in MB
             disk_cache_mb: Disk cache size in MB
             default_ttl_seconds: Default TTL for cache entries
+            disk_cache_dir: Directory for the disk cache
+            allow_pickle: Let the disk cache pickle values without a typed encoding
         """
         self.default_ttl_seconds = default_ttl_seconds
         
         # Initialize cache backends
         self.memory_cache = MemoryCacheBackend(memory_cache_mb)
-        self.disk_cache = DiskCacheBackend(max_size_mb=disk_cache_mb)
+        self.disk_cache = DiskCacheBackend(
+            cache_dir=disk_cache_dir, max_size_mb=disk_cache_mb, allow_pickle=allow_pickle
+        )
+        
+        # Bumped by invalidate_tag so in-flight computations can detect invalidation
+        self._tag_generations: Dict[str, int] = {}
+        
+        # Single-flight / stale-while-revalidate counters of the @cached decorator
+        self.decorator_stats = CacheStats()
+        self._decorator_stats_lock = threading.Lock()
         
         # Cache warming configuration
         self.warm_cache_on_startup = True
@@ -455,7 +751,8 @@ class MultiLevelCachingService:
         key: str,
         value: Any,
         ttl_seconds: Optional[int] = None,
-        cache_level: CacheLevel = CacheLevel.MEMORY
+        cache_level: CacheLevel = CacheLevel.MEMORY,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
         """
         Set value in cache.
@@ -465,6 +762,8 @@ class MultiLevelCachingService:
             value: Value to cache
             ttl_seconds: Time to live (uses default if None)
             cache_level: Which cache level to use
+            tags: Tags for invalidating the entry with ``invalidate_tag``
+                (see ``user_cache_tag``, ``schema_cache_tag``, ``model_cache_tag``)
             
         Returns:
             True if successfully cached
@@ -472,11 +771,13 @@ class MultiLevelCachingService:
         if ttl_seconds is None:
             ttl_seconds = self.default_ttl_seconds
         
-        # Calculate size
-        try:
-            size_bytes = len(pickle.dumps(value))
-        except Exception:
-            size_bytes = 1024  # Estimate if serialization fails
+        # Calculate size (buffers are measured directly instead of serialized)
+        size_bytes = estimate_size(value)
+        if size_bytes is None:
+            try:
+                size_bytes = len(pickle.dumps(value))
+            except Exception:
+                size_bytes = 1024  # Estimate if serialization fails
         
         entry = CacheEntry(
             key=key,
@@ -485,7 +786,8 @@ class MultiLevelCachingService:
             last_accessed=datetime.now(),
             access_count=0,
             ttl_seconds=ttl_seconds,
-            size_bytes=size_bytes
+            size_bytes=size_bytes,
+            tags=tuple(dict.fromkeys(tags)) if tags else ()
         )
         
         success = False
@@ -521,6 +823,38 @@ class MultiLevelCachingService:
         
         return memory_deleted or disk_deleted
     
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Delete every entry carrying a tag from all cache levels.
+        
+        Args:
+            tag: Tag to invalidate
+            
+        Returns:
+            Number of entries deleted (memory and disk copies counted separately)
+        """
+        with self._decorator_stats_lock:
+            self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+        removed = self.memory_cache.delete_tag(tag) + self.disk_cache.delete_tag(tag)
+        if removed:
+            logger.debug(f"Invalidated {removed} cache entries tagged {tag}")
+        performance_monitor.increment_counter("cache_tag_invalidations", 1)
+        return removed
+    
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Invalidate several tags; returns the total number of entries deleted."""
+        return sum(self.invalidate_tag(tag) for tag in tags)
+    
+    def tag_generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Snapshot how often each tag has been invalidated.
+        
+        Compare snapshots taken before and after computing a value to avoid
+        caching a result that was invalidated while it was being computed.
+        """
+        with self._decorator_stats_lock:
+            return tuple(self._tag_generations.get(tag, 0) for tag in tags)
+    
     def clear(self, cache_level: Optional[CacheLevel] = None) -> int:
         """
         Clear cache entries.
@@ -542,12 +876,27 @@ class MultiLevelCachingService:
         return total_cleared
     
     def get_stats(self) -> Dict[str, CacheStats]:
-        """Get statistics for all cache levels."""
+        """Get statistics for all cache levels and the @cached decorator."""
+        with self._decorator_stats_lock:
+            decorator_stats = CacheStats(**self.decorator_stats.__dict__)
         return {
             "memory": self.memory_cache.get_stats(),
-            "disk": self.disk_cache.get_stats()
+            "disk": self.disk_cache.get_stats(),
+            "decorator": decorator_stats
         }
     
+    def record_decorator_event(self, event: str, count: int = 1):
+        """
+        Count a @cached decorator event.
+        
+        Args:
+            event: CacheStats field (coalesced, stale_served, early_refreshes, hits, misses)
+            count: Amount to add
+        """
+        with self._decorator_stats_lock:
+            setattr(self.decorator_stats, event, getattr(self.decorator_stats, event) + count)
+        performance_monitor.increment_counter(f"cache_{event}", count)
+    
     def warm_cache(self, warm_functions: List[Callable] = None):
         """
         Warm cache by pre-loading frequently accessed data.
@@ -573,53 +922,255 @@ class MultiLevelCachingService:
         Returns:
             Number of entries cleaned up
         """
-        # For now, expired entries are cleaned up on access
-        # This could be enhanced with a background cleanup task
-        return 0
+        # Memory entries are dropped on access; the disk index finds expired ones directly
+        return self.disk_cache.purge_expired()
 
 
 # Global caching service instance
 cache_service = MultiLevelCachingService()
 
 
+# Tag conventions for entries derived from user, schema or model state
+PALD_SCHEMA_TAG = "pald_schema"
+
+
+def user_cache_tag(user_id: Any) -> str:
+    """Tag for entries derived from a user's data (PALD, consent)."""
+    return f"user:{user_id}"
+
+
+def schema_cache_tag(version: Optional[str] = None) -> str:
+    """Tag for entries derived from a PALD schema version (or from any schema if None)."""
+    return f"{PALD_SCHEMA_TAG}:{version}" if version else PALD_SCHEMA_TAG
+
+
+def model_cache_tag(model_digest: str) -> str:
+    """Tag for entries derived from a specific model build."""
+    return f"model:{model_digest}"
+
+
+def invalidate_cache_tags(*tags: str) -> int:
+    """
+    Invalidate tags in the global cache without letting cache errors break the caller.
+    
+    Returns:
+        Number of entries deleted
+    """
+    try:
+        return cache_service.invalidate_tags(tags)
+    except Exception as e:
+        logger.warning(f"Cache invalidation for {tags} failed: {e}")
+        return 0
+
+
+class _Flight:
+    """A computation in progress for one cache key."""
+    
+    __slots__ = ("done", "result", "error")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent computations of the same key into one call."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+    
+    def begin(self, key: str) -> tuple:
+        """
+        Join or start the computation for a key.
+        
+        Returns:
+            (flight, is_leader); only the leader computes and must call ``finish``
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+    
+    def finish(self, key: str, flight: _Flight, result: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's result (or error) to waiting callers."""
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+    
+    def in_flight(self, key: str) -> bool:
+        """Whether a computation for the key is running."""
+        with self._lock:
+            return key in self._flights
+
+
+# Marks values stored by @cached together with their freshness metadata
+_CACHED_RECORD_MARKER = "__cached_record__"
+# Followers stop waiting for a stuck leader after this long and compute themselves
+SINGLE_FLIGHT_WAIT_SECONDS = 120.0
+
+_single_flight = SingleFlight()
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        return _refresh_executor
+
+
 def cached(
     key_func: Optional[Callable] = None,
     ttl_seconds: Optional[int] = None,
-    cache_level: CacheLevel = CacheLevel.MEMORY
+    cache_level: CacheLevel = CacheLevel.MEMORY,
+    stale_ttl_seconds: int = 0,
+    early_expiry_beta: float = 0.0,
+    single_flight: bool = True,
+    tags: Optional[Union[Iterable[str], Callable[..., Iterable[str]]]] = None
 ):
     """
     Decorator to cache function results.
     
+    Concurrent misses for the same key are coalesced: one caller computes the
+    result while the others wait for it. With ``stale_ttl_seconds``, a value
+    that has expired keeps being served for that long while a background thread
+    recomputes it. With ``early_expiry_beta`` > 0, a value is recomputed
+    shortly before it expires with a probability that grows as expiry nears and
+    with how long the function takes ("XFetch"), so popular keys are refreshed
+    by one caller instead of expiring for everyone at once.
+    
     Args:
         key_func: Function to generate cache key from args/kwargs
         ttl_seconds: Time to live for cached result
         cache_level: Which cache level to use
+        stale_ttl_seconds: How long an expired value may be served while it is refreshed
+        early_expiry_beta: Early expiry factor (0 disables, 1.0 is the usual setting)
+        single_flight: Let only one caller per key compute a missing value
+        tags: Tags for cached results, or a function of the call's args/kwargs returning them
     """
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
+        def make_key(args, kwargs) -> str:
             if key_func:
-                cache_key = key_func(*args, **kwargs)
-            else:
-                # Default key generation
-                key_parts = [func.__name__]
-                key_parts.extend(str(arg) for arg in args)
-                key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                cache_key = ":".join(key_parts)
-            
-            # Try to get from cache
-            cached_result = cache_service.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+                return key_func(*args, **kwargs)
+            # Default key generation
+            key_parts = [func.__name__]
+            key_parts.extend(str(arg) for arg in args)
+            key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            return ":".join(key_parts)
+        
+        def compute_and_store(cache_key, args, kwargs):
+            entry_tags = list(tags(*args, **kwargs) if callable(tags) else tags or ())
+            generations = cache_service.tag_generations(entry_tags)
             
-            # Execute function and cache result
+            start_time = time.perf_counter()
             with performance_monitor.time_operation(f"cache_miss_{func.__name__}"):
                 result = func(*args, **kwargs)
             
-            cache_service.set(cache_key, result, ttl_seconds, cache_level)
+            # Skip storing if one of the tags was invalidated while computing
+            if result is not None and cache_service.tag_generations(entry_tags) == generations:
+                ttl = ttl_seconds if ttl_seconds is not None else cache_service.default_ttl_seconds
+                record = {
+                    _CACHED_RECORD_MARKER: True,
+                    "value": result,
+                    "fresh_until": time.time() + ttl,
+                    "compute_seconds": time.perf_counter() - start_time,
+                }
+                cache_service.set(
+                    cache_key, record, ttl + stale_ttl_seconds, cache_level, tags=entry_tags
+                )
             return result
         
+        def compute_single_flight(cache_key, args, kwargs):
+            if not single_flight:
+                return compute_and_store(cache_key, args, kwargs)
+            
+            flight, is_leader = _single_flight.begin(cache_key)
+            if not is_leader:
+                cache_service.record_decorator_event("coalesced")
+                if flight.done.wait(SINGLE_FLIGHT_WAIT_SECONDS):
+                    if flight.error is not None:
+                        raise flight.error
+                    return flight.result
+                logger.warning(f"Timed out waiting for in-flight computation of {cache_key}")
+                return compute_and_store(cache_key, args, kwargs)
+            
+            try:
+                result = compute_and_store(cache_key, args, kwargs)
+            except BaseException as e:
+                _single_flight.finish(cache_key, flight, error=e)
+                raise
+            _single_flight.finish(cache_key, flight, result=result)
+            return result
+        
+        def refresh_in_background(cache_key, args, kwargs):
+            flight, is_leader = _single_flight.begin(cache_key)
+            if not is_leader:
+                return  # Someone is already recomputing this key
+            
+            def run():
+                try:
+                    result = compute_and_store(cache_key, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"Background refresh of {cache_key} failed: {e}")
+                    _single_flight.finish(cache_key, flight, error=e)
+                else:
+                    _single_flight.finish(cache_key, flight, result=result)
+            
+            try:
+                _get_refresh_executor().submit(run)
+            except RuntimeError as e:  # Interpreter shutting down
+                _single_flight.finish(cache_key, flight, error=e)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(args, kwargs)
+            
+            # Try to get from cache
+            record = cache_service.get(cache_key)
+            if isinstance(record, dict) and record.get(_CACHED_RECORD_MARKER):
+                now = time.time()
+                fresh_until = record["fresh_until"]
+                
+                if now < fresh_until:
+                    if early_expiry_beta > 0 and (
+                        now - record["compute_seconds"] * early_expiry_beta
+                        * math.log(1.0 - random.random()) >= fresh_until
+                    ):
+                        if stale_ttl_seconds > 0:
+                            if not _single_flight.in_flight(cache_key):
+                                cache_service.record_decorator_event("early_refreshes")
+                                refresh_in_background(cache_key, args, kwargs)
+                        else:
+                            flight, is_leader = _single_flight.begin(cache_key)
+                            if is_leader:
+                                # Only this caller recomputes; everyone else keeps the cached value
+                                cache_service.record_decorator_event("early_refreshes")
+                                try:
+                                    result = compute_and_store(cache_key, args, kwargs)
+                                except BaseException as e:
+                                    _single_flight.finish(cache_key, flight, error=e)
+                                    raise
+                                _single_flight.finish(cache_key, flight, result=result)
+                                return result
+                    return record["value"]
+                
+                if now < fresh_until + stale_ttl_seconds:
+                    cache_service.record_decorator_event("stale_served")
+                    refresh_in_background(cache_key, args, kwargs)
+                    return record["value"]
+            
+            # Execute function (once per key across concurrent callers) and cache result
+            return compute_single_flight(cache_key, args, kwargs)
+        
         return wrapper
     return decorator
 
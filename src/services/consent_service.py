@@ -12,6 +12,7 @@ from src.data.models import ConsentType
 from src.data.repositories import ConsentRepository
 from src.data.schemas import ConsentRecordResponse
 from src.logic.consent import ConsentLogic
+from src.services.caching_service import invalidate_cache_tags, user_cache_tag
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +63,9 @@ class ConsentService:
             with get_session() as session:
                 self._session = session
                 consent_logic = self._get_consent_logic()
-                return consent_logic.record_consent(user_id, consent_type, consent_given, metadata)
+                result = consent_logic.record_consent(user_id, consent_type, consent_given, metadata)
+            invalidate_cache_tags(user_cache_tag(user_id))
+            return result
         except Exception as e:
             logger.error(f"Service error recording consent: {e}")
             raise
@@ -91,7 +94,9 @@ class ConsentService:
             with get_session() as session:
                 self._session = session
                 consent_logic = self._get_consent_logic()
-                return consent_logic.withdraw_consent(user_id, consent_type, reason)
+                result = consent_logic.withdraw_consent(user_id, consent_type, reason)
+            invalidate_cache_tags(user_cache_tag(user_id))
+            return result
         except Exception as e:
             logger.error(f"Service error withdrawing consent: {e}")
             raise
@@ -256,7 +261,9 @@ class ConsentService:
             with get_session() as session:
                 self._session = session
                 consent_logic = self._get_consent_logic()
-                return consent_logic.record_bulk_consent(user_id, consents, metadata)
+                result = consent_logic.record_bulk_consent(user_id, consents, metadata)
+            invalidate_cache_tags(user_cache_tag(user_id))
+            return result
         except Exception as e:
             logger.error(f"Service error recording bulk consent: {e}")
             raise
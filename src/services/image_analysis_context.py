@@ -0,0 +1,92 @@
+"""
+Shared image analysis context for GITTE image pipeline.
+Decodes an image once and lazily memoizes the derived planes that quality
+detection and isolation stages compute from it.
+"""
+
+import hashlib
+from functools import cached_property
+from pathlib import Path
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class ImageAnalysisContext:
+    """
+    One image file, decoded on first use, with derived planes computed at most once.
+
+    Pass a context instead of a path to every stage that analyzes the same
+    image (``ImageQualityDetector.detect_faulty_image``,
+    ``ImageIsolationService.isolate_person``, ...). The planes are read-only
+    views shared between stages and must not be modified in place.
+    """
+
+    def __init__(self, path: Union[str, Path], image: Optional[np.ndarray] = None):
+        """
+        Initialize the context.
+
+        Args:
+            path: Path of the image file
+            image: Already decoded BGR image, to skip decoding the file
+        """
+        self.path = str(path)
+        if image is not None:
+            self.__dict__["image"] = image
+
+    @classmethod
+    def of(cls, source: Union[str, Path, "ImageAnalysisContext"]) -> "ImageAnalysisContext":
+        """Return ``source`` if it is a context, otherwise a new context for the path."""
+        return source if isinstance(source, cls) else cls(source)
+
+    @cached_property
+    def image(self) -> Optional[np.ndarray]:
+        """BGR image as decoded by OpenCV, or None if the file cannot be decoded."""
+        return cv2.imread(self.path)
+
+    @cached_property
+    def content_hash(self) -> Optional[str]:
+        """SHA-256 hex digest of the file bytes, or None if the file cannot be read."""
+        digest = hashlib.sha256()
+        try:
+            with open(self.path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+
+    @cached_property
+    def hsv(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
+
+    @cached_property
+    def edges(self) -> np.ndarray:
+        """Canny edges (thresholds 50/150) of the grayscale plane."""
+        return cv2.Canny(self.gray, 50, 150)
+
+    @cached_property
+    def sobel_x(self) -> np.ndarray:
+        return cv2.Sobel(self.gray, cv2.CV_64F, 1, 0, ksize=3)
+
+    @cached_property
+    def sobel_y(self) -> np.ndarray:
+        return cv2.Sobel(self.gray, cv2.CV_64F, 0, 1, ksize=3)
+
+    @cached_property
+    def gradient_magnitude(self) -> np.ndarray:
+        return np.sqrt(self.sobel_x**2 + self.sobel_y**2)
+
+    @cached_property
+    def pil_image(self) -> Image.Image:
+        """RGB PIL view of the decoded image."""
+        return Image.fromarray(cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+
+    def __repr__(self) -> str:
+        return f"ImageAnalysisContext({self.path!r})"
@@ -6,9 +6,9 @@ Provides automated image isolation, background removal, and quality detection ca
 import logging
 import os
 import time
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import cv2
 import numpy as np
@@ -34,7 +34,8 @@ from src.utils.ux_error_handler import (
 from src.utils.circuit_breaker import circuit_breaker, CircuitBreakerConfig
 from src.services.performance_monitoring_service import monitor_performance, performance_monitor
 from src.services.lazy_loading_service import lazy_resource, lazy_loader, PersonDetectionModel, BackgroundRemovalModel
-from src.services.caching_service import cached, cache_service
+from src.services.image_analysis_context import ImageAnalysisContext
+from src.services.image_result_cache import ImageResultCache, config_fingerprint, to_plain
 
 logger = logging.getLogger(__name__)
 
@@ -87,17 +88,34 @@ class ImageIsolationConfig:
     model_default: str = "u2net"
 
 
+# Settings each cached result depends on
+_QUALITY_CACHE_FIELDS = ("detection_confidence_threshold",)
+_MASK_CACHE_FIELDS = ("detection_confidence_threshold", "edge_refinement_enabled")
+_OUTPUT_CACHE_FIELDS = _MASK_CACHE_FIELDS + (
+    "background_removal_method",
+    "fallback_to_original",
+    "output_format",
+    "uniform_background_color",
+    "model_default",
+)
+
+
 class ImageIsolationService:
     """Service for automated image isolation and background removal."""
     
-    def __init__(self, config: ImageIsolationConfig):
+    def __init__(
+        self, config: ImageIsolationConfig, result_cache: Optional[ImageResultCache] = None
+    ):
         """
         Initialize image isolation service.
         
         Args:
             config: Configuration for isolation service
+            result_cache: Cache of quality analyses, masks and isolated outputs by
+                image content (no caching if None)
         """
         self.config = config
+        self.result_cache = result_cache
         
         # Register lazy-loaded resources
         lazy_loader.register_resource(PersonDetectionModel())
@@ -289,12 +307,13 @@ class ImageIsolationService:
         circuit_breaker_name="image_isolation",
         fallback_func=lambda self, image_path: self._create_fallback_result(image_path),
     )
-    def isolate_person(self, image_path: str) -> IsolationResult:
+    def isolate_person(self, image_path: Union[str, ImageAnalysisContext]) -> IsolationResult:
         """
         Isolate person from background in image with comprehensive error handling.
         
         Args:
-            image_path: Path to input image
+            image_path: Path to input image, or its analysis context (reuses
+                the image already decoded by earlier stages)
             
         Returns:
             IsolationResult with isolated image and metadata
@@ -305,6 +324,8 @@ class ImageIsolationService:
             ImageCorruptionError: When image cannot be loaded
         """
         start_time = time.time()
+        context = ImageAnalysisContext.of(image_path)
+        image_path = context.path
         
         # Check if feature is enabled
         if not self.config.enabled:
@@ -321,24 +342,35 @@ class ImageIsolationService:
         # Validate image file
         self._validate_image_file(image_path)
         
-        # Load image with error handling
-        image = self._load_image_safely(image_path)
-        
-        # Detect person in image using enhanced detection
-        person_detection = self._enhance_person_detection_with_fallback(image)
+        # Same bytes and settings as an earlier run
+        cached_result = self._restore_cached_isolation(context, start_time)
+        if cached_result is not None:
+            return cached_result
         
-        if not person_detection["detected"]:
-            raise PersonDetectionError(
-                "No person detected in image",
-                detection_method=person_detection.get("method", "unknown"),
-            )
+        # Load image with error handling
+        image = self._load_image_safely(context)
         
-        # Create mask for person isolation
-        mask = self._create_person_mask_with_fallback(image, person_detection)
+        cached_mask = self._get_cached_mask(context)
+        if cached_mask is not None:
+            mask, confidence = cached_mask
+        else:
+            # Detect person in image using enhanced detection
+            person_detection = self._enhance_person_detection_with_fallback(image)
+            
+            if not person_detection["detected"]:
+                raise PersonDetectionError(
+                    "No person detected in image",
+                    detection_method=person_detection.get("method", "unknown"),
+                )
+            
+            # Create mask for person isolation
+            mask = self._create_person_mask_with_fallback(image, person_detection)
+            confidence = person_detection["confidence"]
+            self._cache_mask(context, mask, confidence)
         
         # Apply background removal with fallback
         isolated_image_path = self._apply_background_removal_with_fallback(
-            image_path, mask, person_detection["confidence"]
+            context, mask, confidence
         )
         
         processing_time = time.time() - start_time
@@ -347,25 +379,30 @@ class ImageIsolationService:
         if processing_time > self.config.max_processing_time:
             raise ImageTimeoutError("person_isolation", self.config.max_processing_time)
         
-        return IsolationResult(
+        result = IsolationResult(
             success=True,
             isolated_image_path=isolated_image_path,
             original_image_path=image_path,
-            confidence_score=person_detection["confidence"],
+            confidence_score=confidence,
             processing_time=processing_time,
             method_used=self.config.background_removal_method
         )
+        self._cache_isolation(context, result)
+        return result
     
     @with_image_error_handling(operation="quality_analysis", fallback_to_original=False)
     @with_retry(cfg=RetryConfig(**IMAGE_RETRY))
     @monitor_performance("image_quality_analysis")
-    @cached(key_func=lambda self, image_path: f"quality:{image_path}", ttl_seconds=300)
-    def analyze_image_quality(self, image_path: str) -> QualityAnalysis:
+    def analyze_image_quality(
+        self, image_path: Union[str, ImageAnalysisContext]
+    ) -> QualityAnalysis:
         """
         Analyze image for quality issues and person detection with error handling.
         
+        Results are cached by image content when a result cache is configured.
+        
         Args:
-            image_path: Path to image to analyze
+            image_path: Path to image to analyze, or its analysis context
             
         Returns:
             QualityAnalysis with validation results
@@ -373,10 +410,21 @@ class ImageIsolationService:
         Raises:
             ImageCorruptionError: When image cannot be loaded
         """
+        context = ImageAnalysisContext.of(image_path)
+        image_path = context.path
+        
         # Validate and load image
         try:
             self._validate_image_file(image_path)
-            image = self._load_image_safely(image_path)
+            if self.result_cache is not None:
+                record = self.result_cache.get(
+                    "quality_analysis",
+                    context.content_hash,
+                    config_fingerprint(self.config, _QUALITY_CACHE_FIELDS),
+                )
+                if record is not None:
+                    return QualityAnalysis(**record)
+            image = self._load_image_safely(context)
         except Exception:
             # Return structured failure analysis as expected by tests
             return QualityAnalysis(
@@ -442,7 +490,7 @@ class ImageIsolationService:
             not any(issue in ["person_detection_failed", "quality_assessment_failed"] for issue in issues)
         )
         
-        return QualityAnalysis(
+        analysis = QualityAnalysis(
             is_valid=is_valid,
             person_detected=person_detected,
             person_count=person_count,
@@ -450,11 +498,25 @@ class ImageIsolationService:
             issues=issues,
             confidence_scores=confidence_scores
         )
+        if self.result_cache is not None:
+            self.result_cache.set(
+                "quality_analysis",
+                context.content_hash,
+                config_fingerprint(self.config, _QUALITY_CACHE_FIELDS),
+                to_plain(asdict(analysis)),
+            )
+        return analysis
     
-    def create_transparent_background(self, image_path: str, mask: np.ndarray) -> str:
+    def create_transparent_background(
+        self, image_path: Union[str, ImageAnalysisContext], mask: np.ndarray
+    ) -> str:
         """Create image with transparent background using mask."""
         # Load original image
-        image = Image.open(image_path).convert("RGBA")
+        if isinstance(image_path, ImageAnalysisContext):
+            image = image_path.pil_image.convert("RGBA")
+            image_path = image_path.path
+        else:
+            image = Image.open(image_path).convert("RGBA")
         
         # Convert mask to PIL format
         mask_pil = Image.fromarray((mask * 255).astype(np.uint8), mode="L")
@@ -476,11 +538,16 @@ class ImageIsolationService:
         return str(output_path)
     
     def create_uniform_background(
-        self, image_path: str, mask: np.ndarray, color: Tuple[int, int, int]
+        self,
+        image_path: Union[str, ImageAnalysisContext],
+        mask: np.ndarray,
+        color: Tuple[int, int, int],
     ) -> str:
         """Create image with uniform color background using mask."""
         # Load original image
-        image = cv2.imread(image_path)
+        context = ImageAnalysisContext.of(image_path)
+        image = context.image
+        image_path = context.path
         
         # Create background with uniform color
         background = np.full_like(image, color[::-1])  # BGR format for OpenCV
@@ -575,34 +642,29 @@ class ImageIsolationService:
         # If we have bounding boxes, create mask from them
         if "bounding_boxes" in person_detection and person_detection["bounding_boxes"]:
             for (x, y, w, h), weight in person_detection["bounding_boxes"]:
-                # Create a soft mask with higher confidence in center
+                # Create a soft elliptical mask with higher confidence in center
                 center_x, center_y = x + w // 2, y + h // 2
+                top, bottom = max(0, y), min(height, y + h)
+                left, right = max(0, x), min(width, x + w)
+                if top >= bottom or left >= right:
+                    continue
                 
-                # Create elliptical mask
-                for i in range(max(0, y), min(height, y + h)):
-                    for j in range(max(0, x), min(width, x + w)):
-                        # Distance from center, normalized
-                        dx = (j - center_x) / (w / 2)
-                        dy = (i - center_y) / (h / 2)
-                        distance = np.sqrt(dx * dx + dy * dy)
-                        
-                        if distance <= 1.0:
-                            # Soft falloff from center
-                            mask_value = max(0, 1.0 - distance * 0.3)
-                            mask[i, j] = max(mask[i, j], mask_value)
+                distance = self._elliptical_distance(
+                    (left, right), (top, bottom), center_x, center_y, w / 2, h / 2
+                )
+                # Soft falloff from center
+                box_mask = np.where(distance <= 1.0, 1.0 - distance * 0.3, 0.0)
+                region = mask[top:bottom, left:right]
+                np.maximum(region, box_mask, out=region, casting="same_kind")
         else:
             # Fallback: assume person is in center of image
             center_x, center_y = width // 2, height // 2
             radius_x, radius_y = width // 3, height // 3
             
-            for i in range(height):
-                for j in range(width):
-                    dx = (j - center_x) / radius_x
-                    dy = (i - center_y) / radius_y
-                    distance = np.sqrt(dx * dx + dy * dy)
-                    
-                    if distance <= 1.0:
-                        mask[i, j] = max(0, 1.0 - distance * 0.5)
+            distance = self._elliptical_distance(
+                (0, width), (0, height), center_x, center_y, radius_x, radius_y
+            )
+            mask[:] = np.where(distance <= 1.0, 1.0 - distance * 0.5, 0.0)
         
         # Apply edge refinement if enabled
         if self.config.edge_refinement_enabled:
@@ -610,6 +672,20 @@ class ImageIsolationService:
         
         return mask
     
+    @staticmethod
+    def _elliptical_distance(
+        x_range: Tuple[int, int],
+        y_range: Tuple[int, int],
+        center_x: int,
+        center_y: int,
+        radius_x: float,
+        radius_y: float,
+    ) -> np.ndarray:
+        """Normalized distance from the ellipse center for each pixel of a rectangle."""
+        dx = (np.arange(*x_range) - center_x) / radius_x
+        dy = (np.arange(*y_range) - center_y) / radius_y
+        return np.sqrt((dx * dx)[np.newaxis, :] + (dy * dy)[:, np.newaxis])
+    
     def _refine_mask_edges(self, mask: np.ndarray, image: np.ndarray) -> np.ndarray:
         """Refine mask edges using image gradients."""
         # Convert to grayscale for edge detection
@@ -638,14 +714,15 @@ class ImageIsolationService:
         
         return refined_mask
     
-    def _apply_rembg_removal(self, image_path: str) -> str:
+    def _apply_rembg_removal(self, image_path: Union[str, ImageAnalysisContext]) -> str:
         """Apply rembg-based background removal."""
+        context = ImageAnalysisContext.of(image_path)
+        image_path = context.path
         try:
             from rembg import remove
-            from PIL import Image
             
             # Load input image
-            input_image = Image.open(image_path)
+            input_image = context.pil_image
             
             # Apply background removal
             if self.background_remover is not None:
@@ -667,9 +744,91 @@ class ImageIsolationService:
         except Exception as e:
             logger.error(f"Rembg background removal failed: {e}")
             # Fallback to mask-based removal
-            image = cv2.imread(image_path)
-            mask = self._create_fallback_mask(image)
-            return self.create_transparent_background(image_path, mask)
+            mask = self._create_fallback_mask(context.image)
+            return self.create_transparent_background(context, mask)
+    
+    def _get_cached_mask(
+        self, context: ImageAnalysisContext
+    ) -> Optional[Tuple[np.ndarray, float]]:
+        """Person mask and detection confidence cached for this image content."""
+        if self.result_cache is None:
+            return None
+        fingerprint = config_fingerprint(self.config, _MASK_CACHE_FIELDS)
+        info = self.result_cache.get("mask_info", context.content_hash, fingerprint)
+        mask = self.result_cache.get("mask", context.content_hash, fingerprint)
+        if info is None or mask is None:
+            return None
+        return mask, info["confidence"]
+    
+    def _cache_mask(self, context: ImageAnalysisContext, mask: np.ndarray, confidence: float):
+        if self.result_cache is None:
+            return
+        fingerprint = config_fingerprint(self.config, _MASK_CACHE_FIELDS)
+        self.result_cache.set("mask", context.content_hash, fingerprint, mask)
+        self.result_cache.set(
+            "mask_info", context.content_hash, fingerprint, {"confidence": float(confidence)}
+        )
+    
+    def _restore_cached_isolation(
+        self, context: ImageAnalysisContext, start_time: float
+    ) -> Optional[IsolationResult]:
+        """
+        Recreate the isolated output of an earlier run on the same image content.
+        
+        The output file is written next to the input image under the name the
+        original run produced, so the result matches a fresh isolation.
+        """
+        if self.result_cache is None:
+            return None
+        fingerprint = config_fingerprint(self.config, _OUTPUT_CACHE_FIELDS)
+        info = self.result_cache.get("isolation_info", context.content_hash, fingerprint)
+        output = self.result_cache.get("isolation_output", context.content_hash, fingerprint)
+        if info is None or output is None:
+            return None
+        
+        input_path = Path(context.path)
+        output_path = input_path.parent / f"{input_path.stem}{info['output_suffix']}"
+        try:
+            output_path.write_bytes(output)
+        except OSError as e:
+            logger.warning(f"Could not restore cached isolation output {output_path}: {e}")
+            return None
+        
+        return IsolationResult(
+            success=True,
+            isolated_image_path=str(output_path),
+            original_image_path=context.path,
+            confidence_score=info["confidence_score"],
+            processing_time=time.time() - start_time,
+            method_used=info["method_used"]
+        )
+    
+    def _cache_isolation(self, context: ImageAnalysisContext, result: IsolationResult):
+        if self.result_cache is None or not result.isolated_image_path:
+            return
+        input_stem = Path(context.path).stem
+        output_path = Path(result.isolated_image_path)
+        if output_path.parent != Path(context.path).parent or not output_path.name.startswith(
+            input_stem
+        ):
+            return
+        try:
+            output = output_path.read_bytes()
+        except OSError:
+            return
+        
+        fingerprint = config_fingerprint(self.config, _OUTPUT_CACHE_FIELDS)
+        self.result_cache.set("isolation_output", context.content_hash, fingerprint, output)
+        self.result_cache.set(
+            "isolation_info",
+            context.content_hash,
+            fingerprint,
+            {
+                "output_suffix": output_path.name[len(input_stem):],
+                "confidence_score": float(result.confidence_score),
+                "method_used": result.method_used,
+            },
+        )
     
     def _validate_image_file(self, image_path: str):
         """
@@ -696,12 +855,12 @@ class ImageIsolationService:
         if path.stat().st_size == 0:
             raise ImageCorruptionError(image_path)
     
-    def _load_image_safely(self, image_path: str) -> np.ndarray:
+    def _load_image_safely(self, image_path: Union[str, ImageAnalysisContext]) -> np.ndarray:
         """
         Load image with error handling.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or its analysis context
             
         Returns:
             Loaded image as numpy array
@@ -709,20 +868,23 @@ class ImageIsolationService:
         Raises:
             ImageCorruptionError: If image cannot be loaded
         """
+        context = ImageAnalysisContext.of(image_path)
         try:
-            image = cv2.imread(image_path)
+            image = context.image
             if image is None:
-                raise ImageCorruptionError(image_path)
+                raise ImageCorruptionError(context.path)
             return image
         except Exception as e:
-            raise ImageCorruptionError(image_path) from e
+            raise ImageCorruptionError(context.path) from e
     
-    def _create_fallback_result(self, image_path: str) -> IsolationResult:
+    def _create_fallback_result(
+        self, image_path: Union[str, ImageAnalysisContext]
+    ) -> IsolationResult:
         """
         Create fallback result when isolation completely fails.
         
         Args:
-            image_path: Path to original image
+            image_path: Path to original image, or its analysis context
             
         Returns:
             IsolationResult with fallback configuration
@@ -730,7 +892,7 @@ class ImageIsolationService:
         return IsolationResult(
             success=False,
             isolated_image_path=None,
-            original_image_path=image_path,
+            original_image_path=ImageAnalysisContext.of(image_path).path,
             confidence_score=0.0,
             processing_time=0.0,
             method_used="error_fallback",
@@ -806,13 +968,13 @@ class ImageIsolationService:
             return self._create_fallback_mask(image)
     
     def _apply_background_removal_with_fallback(
-        self, image_path: str, mask: np.ndarray, confidence: float
+        self, image_path: Union[str, ImageAnalysisContext], mask: np.ndarray, confidence: float
     ) -> str:
         """
         Apply background removal with fallback methods.
         
         Args:
-            image_path: Path to input image
+            image_path: Path to input image, or its analysis context
             mask: Person mask
             confidence: Detection confidence
             
@@ -975,7 +1137,7 @@ class ImageIsolationService:
         }
     
     def _apply_background_removal(
-        self, image_path: str, mask: np.ndarray, confidence: float
+        self, image_path: Union[str, ImageAnalysisContext], mask: np.ndarray, confidence: float
     ) -> str:
         """Apply background removal based on configuration."""
         if self.config.background_removal_method == "rembg":
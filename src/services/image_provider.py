@@ -5,9 +5,12 @@ Provides abstraction layer for different image generation services with Stable D
 
 import hashlib
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
@@ -42,11 +45,18 @@ class ImageResult:
     parameters: dict[str, Any] | None = None
     request_id: str | None = None
     metadata: dict[str, Any] | None = None
+    # Pending write of image_path when the image is saved in the background
+    save_future: Future | None = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         if self.request_id is None:
             self.request_id = str(uuid4())
 
+    def wait_until_saved(self, timeout: float | None = None) -> None:
+        """Block until image_path has been written (returns at once for synchronous saves)."""
+        if self.save_future is not None:
+            self.save_future.result(timeout)
+
 
 @dataclass
 class ImageRequest:
@@ -133,8 +143,29 @@ class Text2ImageProvider(ABC):
         pass
 
 
+STABLE_DIFFUSION_CIRCUIT = CircuitBreakerConfig(
+    failure_threshold=2,
+    recovery_timeout=60,
+    success_threshold=1,
+    timeout=120,
+    expected_exceptions=(ImageProviderError, ImageGenerationError, ModelLoadError),
+)
+
+AVATAR_NEGATIVE_PROMPT = "blurry, low quality, distorted, deformed"
+
+
 class StableDiffusionProvider(Text2ImageProvider):
-    """Stable Diffusion image provider implementation using Diffusers."""
+    """
+    Stable Diffusion image provider implementation using Diffusers.
+
+    The pipeline is loaded once and kept warm for the lifetime of the provider.
+    ``generate_batch`` renders several requests in a single pipeline call with
+    one seeded generator per image, reusing the text embeddings of prompts it
+    has encoded before, and writes the PNG files on a background thread.
+    """
+
+    # Encoded (prompt, negative prompt) pairs kept for reuse
+    PROMPT_EMBEDDING_CACHE_SIZE = 32
 
     def __init__(
         self,
@@ -142,6 +173,7 @@ class StableDiffusionProvider(Text2ImageProvider):
         device: str | None = None,
         output_dir: str | None = None,
         enable_cpu_fallback: bool = True,
+        max_batch_size: int = 8,
     ):
         """
         Initialize Stable Diffusion provider.
@@ -151,6 +183,7 @@ class StableDiffusionProvider(Text2ImageProvider):
             device: Device to use (auto-detected if None)
             output_dir: Output directory for images
             enable_cpu_fallback: Whether to fallback to CPU if GPU fails
+            max_batch_size: Most images rendered by one pipeline call
         """
         if not DIFFUSERS_AVAILABLE:
             raise ModelLoadError(
@@ -170,6 +203,10 @@ class StableDiffusionProvider(Text2ImageProvider):
         self.device = self._select_device(device)
         self.pipeline = None
         self._model_loaded = False
+        self.max_batch_size = max(max_batch_size, 1)
+        self._prompt_embeddings: OrderedDict[tuple, tuple] = OrderedDict()
+        self._embedding_lock = threading.Lock()
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sd-save")
 
         logger.info(
             f"Initialized StableDiffusionProvider with model={self.model_name}, device={self.device}"
@@ -222,6 +259,7 @@ class StableDiffusionProvider(Text2ImageProvider):
 
             load_time = time.time() - start_time
             self._model_loaded = True
+            self._prompt_embeddings.clear()
 
             logger.info(f"Model loaded successfully in {load_time:.2f}s on device: {self.device}")
 
@@ -241,6 +279,7 @@ class StableDiffusionProvider(Text2ImageProvider):
                     )
                     self.pipeline = self.pipeline.to(self.device)
                     self._model_loaded = True
+                    self._prompt_embeddings.clear()
                     logger.info("Successfully loaded model on CPU")
                 except Exception as cpu_error:
                     logger.error(f"CPU fallback also failed: {cpu_error}")
@@ -248,19 +287,28 @@ class StableDiffusionProvider(Text2ImageProvider):
             else:
                 raise ModelLoadError(f"Failed to load model: {e}")
 
-    @circuit_breaker(
-        name="stable_diffusion",
-        config=CircuitBreakerConfig(
-            failure_threshold=2,
-            recovery_timeout=60,
-            success_threshold=1,
-            timeout=120,
-            expected_exceptions=(ImageProviderError, ImageGenerationError, ModelLoadError),
-        ),
-    )
+    def warm_up(self) -> None:
+        """Load the model and run one minimal generation so the first request is not slowed."""
+        self._load_model()
+        with torch.inference_mode():
+            self.pipeline(
+                prompt="",
+                width=64,
+                height=64,
+                num_inference_steps=1,
+                output_type="latent",
+            )
+        logger.info(f"Stable Diffusion pipeline warmed up on {self.device}")
+
+    @circuit_breaker(name="stable_diffusion", config=STABLE_DIFFUSION_CIRCUIT)
     @handle_errors(context={"service": "stable_diffusion"})
     def generate_image(self, request: ImageRequest) -> ImageResult:
-        """Generate image from text prompt using Stable Diffusion."""
+        """
+        Generate image from text prompt using Stable Diffusion.
+
+        Only the first image is returned; use ``generate_images`` to get all
+        ``request.num_images`` images.
+        """
         start_time = time.time()
 
         try:
@@ -338,27 +386,205 @@ class StableDiffusionProvider(Text2ImageProvider):
             logger.error(f"Image generation failed after {generation_time:.2f}s: {e}")
             raise ImageGenerationError(f"Failed to generate image: {e}")
 
+    def generate_images(self, request: ImageRequest) -> list[ImageResult]:
+        """Generate all ``request.num_images`` images of a request in one pipeline call."""
+        return self.generate_batch([request])
+
+    @circuit_breaker(name="stable_diffusion", config=STABLE_DIFFUSION_CIRCUIT)
+    @handle_errors(context={"service": "stable_diffusion"})
+    def generate_batch(self, requests: list[ImageRequest]) -> list[ImageResult]:
+        """
+        Generate the images of several requests with as few pipeline calls as possible.
+
+        Requests sharing size, step count and guidance scale are rendered
+        together, up to ``max_batch_size`` images per call. Image ``k`` of a
+        request uses seed ``request.seed + k`` in its own generator, so it comes
+        out the same regardless of batching. Files are written in the
+        background; call ``ImageResult.wait_until_saved`` before reading them.
+
+        Args:
+            requests: Image generation requests
+
+        Returns:
+            One result per image, in request order
+
+        Raises:
+            ImageGenerationError: If generation fails
+        """
+        start_time = time.time()
+
+        try:
+            self._load_model()
+
+            if not self._model_loaded or self.pipeline is None:
+                raise ImageGenerationError("Model not loaded")
+
+            # (request, seed, index within request) per image, grouped by shared settings
+            groups: dict[tuple, list[tuple[ImageRequest, int, int]]] = {}
+            for request in requests:
+                base_seed = request.seed
+                if base_seed is None:
+                    base_seed = int(torch.randint(0, 2**31 - 1, (1,)).item())
+                settings = (
+                    request.width,
+                    request.height,
+                    request.num_inference_steps,
+                    request.guidance_scale,
+                )
+                groups.setdefault(settings, []).extend(
+                    (request, base_seed + k, k) for k in range(max(request.num_images, 1))
+                )
+
+            images: dict[tuple[str, int], tuple[Image.Image, int, float]] = {}
+            for items in groups.values():
+                for offset in range(0, len(items), self.max_batch_size):
+                    chunk = items[offset:offset + self.max_batch_size]
+                    chunk_start = time.time()
+                    rendered = self._render(chunk)
+                    per_image_time = (time.time() - chunk_start) / len(chunk)
+                    for (request, seed, k), image in zip(chunk, rendered, strict=True):
+                        images[(request.request_id, k)] = (image, seed, per_image_time)
+
+            timestamp = int(time.time())
+            results = []
+            for request in requests:
+                prompt_hash = hashlib.md5(
+                    request.prompt.encode(), usedforsecurity=False
+                ).hexdigest()[:8]
+                for k in range(max(request.num_images, 1)):
+                    image, seed, per_image_time = images[(request.request_id, k)]
+                    image_path = (
+                        self.output_dir / f"embodiment_{timestamp}_{prompt_hash}_{seed}.png"
+                    )
+                    results.append(
+                        ImageResult(
+                            image_path=str(image_path),
+                            image_data=image,
+                            generation_time=per_image_time,
+                            model_used=self.model_name,
+                            parameters={
+                                "prompt": request.prompt,
+                                "negative_prompt": request.negative_prompt,
+                                "width": request.width,
+                                "height": request.height,
+                                "num_inference_steps": request.num_inference_steps,
+                                "guidance_scale": request.guidance_scale,
+                                "seed": seed,
+                            },
+                            request_id=request.request_id,
+                            metadata={
+                                "device": self.device,
+                                "model_name": self.model_name,
+                                "generation_timestamp": timestamp,
+                                "batch_size": len(requests),
+                            },
+                            save_future=self._save_executor.submit(
+                                image.save, image_path, format="PNG"
+                            ),
+                        )
+                    )
+
+            logger.info(
+                f"Generated {len(results)} images in {len(groups)} setting group(s), "
+                f"time={time.time() - start_time:.2f}s"
+            )
+            return results
+
+        except ImageGenerationError:
+            raise
+        except Exception as e:
+            generation_time = time.time() - start_time
+            logger.error(f"Batch image generation failed after {generation_time:.2f}s: {e}")
+            raise ImageGenerationError(f"Failed to generate images: {e}") from e
+
+    def _render(self, items: list[tuple[ImageRequest, int, int]]) -> list[Image.Image]:
+        """Run one pipeline call for images sharing size, steps and guidance."""
+        request = items[0][0]
+        guided = request.guidance_scale > 1.0
+        embeddings = [
+            self._encode_prompt(item_request.prompt, item_request.negative_prompt, guided)
+            for item_request, _, _ in items
+        ]
+        # CPU generators are reproducible across devices; MPS has no generator support
+        generator_device = "cpu" if self.device == "mps" else self.device
+        generators = [
+            torch.Generator(device=generator_device).manual_seed(seed) for _, seed, _ in items
+        ]
+
+        with torch.inference_mode():
+            result = self.pipeline(
+                prompt_embeds=torch.cat([prompt for prompt, _ in embeddings]),
+                negative_prompt_embeds=(
+                    torch.cat([negative for _, negative in embeddings]) if guided else None
+                ),
+                width=request.width,
+                height=request.height,
+                num_inference_steps=request.num_inference_steps,
+                guidance_scale=request.guidance_scale,
+                generator=generators,
+            )
+        return list(result.images)
+
+    def _encode_prompt(self, prompt: str, negative_prompt: str | None, guided: bool) -> tuple:
+        """Text embeddings of a prompt pair, encoded once and kept in a small LRU."""
+        key = (prompt, negative_prompt or "", guided)
+        with self._embedding_lock:
+            embeddings = self._prompt_embeddings.get(key)
+            if embeddings is not None:
+                self._prompt_embeddings.move_to_end(key)
+                return embeddings
+
+        with torch.inference_mode():
+            embeddings = self.pipeline.encode_prompt(
+                prompt,
+                getattr(self.pipeline, "_execution_device", self.device),
+                1,
+                guided,
+                negative_prompt,
+            )
+
+        with self._embedding_lock:
+            self._prompt_embeddings[key] = embeddings
+            while len(self._prompt_embeddings) > self.PROMPT_EMBEDDING_CACHE_SIZE:
+                self._prompt_embeddings.popitem(last=False)
+        return embeddings
+
     def generate_avatar_variations(
         self, base_prompt: str, variations: list[str]
     ) -> list[ImageResult]:
-        """Generate multiple avatar variations from a base prompt."""
+        """
+        Generate multiple avatar variations from a base prompt.
+
+        All variations are rendered in one batch. If the batch fails (e.g. out
+        of memory), they are generated one at a time and failed variations are
+        skipped.
+        """
+        requests = [
+            ImageRequest(
+                prompt=f"{base_prompt}, {variation}",
+                negative_prompt=AVATAR_NEGATIVE_PROMPT,
+                width=512,
+                height=512,
+                num_inference_steps=20,
+                guidance_scale=7.5,
+                seed=42 + i,  # Different seed for each variation
+            )
+            for i, variation in enumerate(variations)
+        ]
+        if not requests:
+            return []
+
+        try:
+            results = self.generate_batch(requests)
+            logger.info(f"Generated {len(results)} avatar variations in one batch")
+            return results
+        except Exception as e:
+            logger.warning(f"Batched variation generation failed, generating one at a time: {e}")
+
         results = []
 
-        for i, variation in enumerate(variations):
+        for i, (variation, request) in enumerate(zip(variations, requests, strict=True)):
             try:
-                # Combine base prompt with variation
-                combined_prompt = f"{base_prompt}, {variation}"
-
-                request = ImageRequest(
-                    prompt=combined_prompt,
-                    negative_prompt="blurry, low quality, distorted, deformed",
-                    width=512,
-                    height=512,
-                    num_inference_steps=20,
-                    guidance_scale=7.5,
-                    seed=42 + i,  # Different seed for each variation
-                )
-
                 result = self.generate_image(request)
                 results.append(result)
 
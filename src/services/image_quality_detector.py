@@ -4,16 +4,23 @@ Provides comprehensive faulty image detection and quality validation capabilitie
 """
 
 import logging
+import multiprocessing
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
 from PIL import Image, ImageStat
 
+from src.services.image_analysis_context import ImageAnalysisContext
+from src.services.image_result_cache import ImageResultCache, config_fingerprint, to_plain
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +55,12 @@ class QualityDetectionConfig:
     min_image_size: Tuple[int, int] = (256, 256)
     max_image_size: Tuple[int, int] = (2048, 2048)
     supported_formats: List[str] = None
+    # Batch analysis: workers > 1 analyze images concurrently on a "thread"
+    # or "process" pool; early stop skips the rest of a batch once the
+    # regeneration decision can no longer change
+    batch_workers: int = 1
+    batch_backend: str = "thread"
+    batch_early_stop: bool = False
     
     def __post_init__(self):
         if self.supported_formats is None:
@@ -66,6 +79,7 @@ class DetectionResult:
     processing_time: float
     recommendations: List[str]
     details: Optional[str] = None
+    stage_timings: Dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -79,33 +93,63 @@ class BatchProcessingResult:
     common_issues: List[FaultyImageReason]
     batch_quality_score: float
     processing_time: float
+    analyzed_images: int = 0
+    stopped_early: bool = False
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+
+
+# Settings that do not change a detection result
+_BATCH_FIELDS = ("batch_workers", "batch_backend", "batch_early_stop")
 
 
 class ImageQualityDetector:
     """Detector for image quality and content validation."""
     
-    def __init__(self, config: QualityDetectionConfig):
+    def __init__(
+        self, config: QualityDetectionConfig, result_cache: Optional[ImageResultCache] = None
+    ):
         """
         Initialize image quality detector.
         
         Args:
             config: Configuration for quality detection
+            result_cache: Cache of detection results by image content (no caching if None)
         """
         self.config = config
+        self.result_cache = result_cache
+        self._cache_fingerprint = config_fingerprint(
+            config, [name for name in asdict(config) if name not in _BATCH_FIELDS]
+        )
         self.person_classifier = self._load_person_classifier()
         self.quality_analyzer = self._load_quality_analyzer()
+        self._local = threading.local()
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
         
-    def detect_faulty_image(self, image_path: str) -> DetectionResult:
+    def detect_faulty_image(self, image_path: Union[str, ImageAnalysisContext]) -> DetectionResult:
         """
         Comprehensive faulty image detection.
         
+        The image is decoded once and shared by all detection stages; pass an
+        ImageAnalysisContext to share it with later stages (e.g. isolation) too.
+        
         Args:
-            image_path: Path to image to analyze
+            image_path: Path to image to analyze, or its analysis context
             
         Returns:
             DetectionResult with detailed analysis
         """
         start_time = time.time()
+        context = ImageAnalysisContext.of(image_path)
+        image_path = context.path
+        stage_timings = {}
+        
+        def timed(stage, function, *args, **kwargs):
+            stage_start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stage_timings[stage] = time.perf_counter() - stage_start
         
         try:
             if not self.config.enabled:
@@ -120,7 +164,7 @@ class ImageQualityDetector:
                 )
             
             # Basic file validation
-            file_validation = self._validate_image_file(image_path)
+            file_validation = timed("validation", self._validate_image_file, image_path)
             if file_validation["is_faulty"]:
                 return DetectionResult(
                     is_faulty=True,
@@ -130,12 +174,26 @@ class ImageQualityDetector:
                     person_count=0,
                     processing_time=time.time() - start_time,
                     recommendations=file_validation["recommendations"],
-                    details=file_validation["details"]
+                    details=file_validation["details"],
+                    stage_timings=stage_timings
+                )
+            
+            # Same bytes and settings as an earlier run
+            if self.result_cache is not None:
+                record = timed(
+                    "cache",
+                    self.result_cache.get,
+                    "detection",
+                    context.content_hash,
+                    self._cache_fingerprint,
                 )
+                if record is not None:
+                    return _detection_from_record(
+                        record, time.time() - start_time, stage_timings
+                    )
             
             # Load and validate image
-            image = cv2.imread(image_path)
-            if image is None:
+            if timed("decode", getattr, context, "image") is None:
                 return DetectionResult(
                     is_faulty=True,
                     reasons=[FaultyImageReason.CORRUPTED_IMAGE],
@@ -144,7 +202,8 @@ class ImageQualityDetector:
                     person_count=0,
                     processing_time=time.time() - start_time,
                     recommendations=["Regenerate image with different parameters"],
-                    details="Could not load image file"
+                    details="Could not load image file",
+                    stage_timings=stage_timings
                 )
             
             # Perform comprehensive analysis
@@ -153,7 +212,7 @@ class ImageQualityDetector:
             recommendations = []
             
             # Person detection analysis
-            person_analysis = self.detect_people(image_path)
+            person_analysis = timed("person_detection", self.detect_people, context)
             quality_metrics.update(person_analysis["metrics"])
             
             if not person_analysis["person_detected"]:
@@ -164,7 +223,12 @@ class ImageQualityDetector:
                 recommendations.append("Use more specific prompts to generate single person")
             
             # Subject type validation
-            subject_analysis = self.validate_subject_type(image_path)
+            subject_analysis = timed(
+                "subject_validation",
+                self.validate_subject_type,
+                context,
+                person_detection=person_analysis,
+            )
             quality_metrics.update(subject_analysis["metrics"])
             
             if not subject_analysis["is_person"]:
@@ -172,7 +236,7 @@ class ImageQualityDetector:
                 recommendations.append("Modify prompt to focus on human subjects")
             
             # Image quality assessment
-            quality_analysis = self.assess_image_quality(image_path)
+            quality_analysis = timed("quality_assessment", self.assess_image_quality, context)
             quality_metrics.update(quality_analysis["metrics"])
             
             # Check individual quality metrics
@@ -210,7 +274,7 @@ class ImageQualityDetector:
                 quality_metrics, processing_time
             )
             
-            return DetectionResult(
+            result = DetectionResult(
                 is_faulty=is_faulty,
                 reasons=reasons,
                 confidence_score=confidence_score,
@@ -218,8 +282,17 @@ class ImageQualityDetector:
                 person_count=person_analysis["person_count"],
                 processing_time=processing_time,
                 recommendations=recommendations,
-                details=f"Overall quality score: {quality_analysis['overall_score']:.2f}"
+                details=f"Overall quality score: {quality_analysis['overall_score']:.2f}",
+                stage_timings=stage_timings
             )
+            if self.result_cache is not None:
+                self.result_cache.set(
+                    "detection",
+                    context.content_hash,
+                    self._cache_fingerprint,
+                    _detection_to_record(result),
+                )
+            return result
             
         except Exception as e:
             processing_time = time.time() - start_time
@@ -233,21 +306,23 @@ class ImageQualityDetector:
                 person_count=0,
                 processing_time=processing_time,
                 recommendations=["Regenerate image due to processing error"],
-                details=f"Detection error: {str(e)}"
+                details=f"Detection error: {str(e)}",
+                stage_timings=stage_timings
             )
     
-    def detect_people(self, image_path: str) -> Dict:
+    def detect_people(self, image_path: Union[str, ImageAnalysisContext]) -> Dict:
         """
         Detect people in image and return count and bounding boxes.
         
         Args:
-            image_path: Path to image to analyze
+            image_path: Path to image to analyze, or its analysis context
             
         Returns:
             Dict with detection results and metrics
         """
         try:
-            image = cv2.imread(image_path)
+            context = ImageAnalysisContext.of(image_path)
+            image = context.image
             if image is None:
                 return {
                     "person_detected": False,
@@ -287,7 +362,7 @@ class ImageQualityDetector:
                 }
             else:
                 # Fallback: use simple heuristics
-                return self._fallback_person_detection(image)
+                return self._fallback_person_detection(context)
                 
         except Exception as e:
             logger.error(f"Person detection failed: {e}")
@@ -299,22 +374,20 @@ class ImageQualityDetector:
                 "metrics": {"person_detection_confidence": 0.0}
             }
     
-    def assess_image_quality(self, image_path: str) -> Dict:
+    def assess_image_quality(self, image_path: Union[str, ImageAnalysisContext]) -> Dict:
         """
         Assess overall image quality (blur, noise, corruption).
         
         Args:
-            image_path: Path to image to analyze
+            image_path: Path to image to analyze, or its analysis context
             
         Returns:
             Dict with quality metrics and scores
         """
         try:
-            # Load image in both OpenCV and PIL formats
-            cv_image = cv2.imread(image_path)
-            pil_image = Image.open(image_path)
+            context = ImageAnalysisContext.of(image_path)
             
-            if cv_image is None or pil_image is None:
+            if context.image is None:
                 return {
                     "blur_score": 0.0,
                     "noise_score": 1.0,
@@ -324,8 +397,7 @@ class ImageQualityDetector:
                     "metrics": {}
                 }
             
-            # Convert to grayscale for analysis
-            gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
+            gray = context.gray
             
             # Blur detection using Laplacian variance
             laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
@@ -341,10 +413,10 @@ class ImageQualityDetector:
             contrast_score = np.std(gray) / 255.0
             
             # Sharpness assessment using gradient magnitude
-            sharpness_score = self._assess_sharpness(gray)
+            sharpness_score = self._assess_sharpness(context)
             
             # Color distribution analysis (for PIL image)
-            color_metrics = self._analyze_color_distribution(pil_image)
+            color_metrics = self._analyze_color_distribution(context.pil_image)
             
             # Calculate overall quality score
             overall_score = float(
@@ -386,19 +458,25 @@ class ImageQualityDetector:
                 "metrics": {}
             }
     
-    def validate_subject_type(self, image_path: str) -> Dict:
+    def validate_subject_type(
+        self,
+        image_path: Union[str, ImageAnalysisContext],
+        person_detection: Optional[Dict] = None,
+    ) -> Dict:
         """
         Validate that image contains appropriate subject (person).
         
         Args:
-            image_path: Path to image to analyze
+            image_path: Path to image to analyze, or its analysis context
+            person_detection: Result of ``detect_people`` for this image, if
+                already computed
             
         Returns:
             Dict with subject validation results
         """
         try:
-            image = cv2.imread(image_path)
-            if image is None:
+            context = ImageAnalysisContext.of(image_path)
+            if context.image is None:
                 return {
                     "is_person": False,
                     "confidence": 0.0,
@@ -407,13 +485,14 @@ class ImageQualityDetector:
                 }
             
             # Use person detection as primary subject validation
-            person_detection = self.detect_people(image_path)
+            if person_detection is None:
+                person_detection = self.detect_people(context)
             
             # Additional heuristics for subject validation
             subject_confidence = person_detection["confidence"]
             
             # Analyze image composition for human-like features
-            composition_score = self._analyze_human_composition(image)
+            composition_score = self._analyze_human_composition(context)
             
             # Combine scores
             final_confidence = float(subject_confidence * 0.7 + composition_score * 0.3)
@@ -446,6 +525,10 @@ class ImageQualityDetector:
         """
         Analyze batch of images for automatic regeneration decision.
         
+        Images are analyzed on ``config.batch_workers`` workers. With
+        ``config.batch_early_stop`` the remaining images are skipped as soon as
+        regeneration is certain; the result then covers the analyzed images.
+        
         Args:
             image_paths: List of image paths to analyze
             
@@ -466,31 +549,40 @@ class ImageQualityDetector:
                     processing_time=0.0
                 )
             
-            # Analyze each image
+            # Analyze images as they finish, stopping once the decision is settled
             results = []
-            for image_path in image_paths:
-                result = self.detect_faulty_image(image_path)
-                results.append(result)
+            reason_counts = {}
+            faulty_images = 0
+            stopped_early = False
+            analysis = self.iter_batch_results(image_paths)
+            try:
+                for _, result in analysis:
+                    results.append(result)
+                    faulty_images += result.is_faulty
+                    for reason in result.reasons:
+                        reason_counts[reason] = reason_counts.get(reason, 0) + 1
+                    
+                    remaining = len(image_paths) - len(results)
+                    if (
+                        remaining
+                        and self.config.batch_early_stop
+                        and self._regeneration_settled(
+                            len(image_paths), faulty_images, reason_counts, remaining
+                        )
+                    ):
+                        stopped_early = True
+                        break
+            finally:
+                analysis.close()
             
             # Calculate batch statistics
-            total_images = len(results)
-            faulty_images = sum(1 for r in results if r.is_faulty)
-            faulty_percentage = (faulty_images / total_images) * 100
+            analyzed_images = len(results)
+            faulty_percentage = (faulty_images / analyzed_images) * 100
             
             # Calculate average quality score
             quality_scores = [r.confidence_score for r in results if r.confidence_score > 0]
             batch_quality_score = np.mean(quality_scores) if quality_scores else 0.0
             
-            # Find common issues
-            all_reasons = []
-            for result in results:
-                all_reasons.extend(result.reasons)
-            
-            # Count reason frequencies
-            reason_counts = {}
-            for reason in all_reasons:
-                reason_counts[reason] = reason_counts.get(reason, 0) + 1
-            
             # Get most common issues (appearing in >30% of faulty images)
             common_threshold = max(1, faulty_images * 0.3)
             common_issues = [
@@ -506,16 +598,31 @@ class ImageQualityDetector:
                 FaultyImageReason.CORRUPTED_IMAGE in common_issues
             )
             
+            # Total time spent per detection stage across the analyzed images
+            stage_timings = {}
+            for result in results:
+                for stage, seconds in result.stage_timings.items():
+                    stage_timings[stage] = stage_timings.get(stage, 0.0) + seconds
+            
             processing_time = time.time() - start_time
             
+            if stopped_early:
+                logger.info(
+                    f"Batch analysis stopped after {analyzed_images} of "
+                    f"{len(image_paths)} images: regeneration required"
+                )
+            
             return BatchProcessingResult(
-                total_images=total_images,
+                total_images=len(image_paths),
                 faulty_images=faulty_images,
                 faulty_percentage=faulty_percentage,
                 should_regenerate=should_regenerate,
                 common_issues=common_issues,
                 batch_quality_score=batch_quality_score,
-                processing_time=processing_time
+                processing_time=processing_time,
+                analyzed_images=analyzed_images,
+                stopped_early=stopped_early,
+                stage_timings=stage_timings
             )
             
         except Exception as e:
@@ -532,6 +639,92 @@ class ImageQualityDetector:
                 processing_time=processing_time
             )
     
+    def iter_batch_results(
+        self, image_paths: List[Union[str, ImageAnalysisContext]]
+    ) -> Iterator[Tuple[str, DetectionResult]]:
+        """
+        Analyze images concurrently, yielding each result as soon as it is ready.
+        
+        With a single worker the images are analyzed lazily in order. Closing
+        the iterator early cancels the images that have not started yet.
+        
+        Args:
+            image_paths: Image paths (or analysis contexts) to analyze
+            
+        Yields:
+            (image path, DetectionResult) in completion order
+        """
+        if self.config.batch_workers <= 1 or len(image_paths) <= 1:
+            for image_path in image_paths:
+                yield ImageAnalysisContext.of(image_path).path, self.detect_faulty_image(image_path)
+            return
+        
+        executor = self._get_executor()
+        if self.config.batch_backend == "process":
+            # Decoded images stay in this process; workers load from disk
+            futures = {
+                executor.submit(_detect_in_worker, ImageAnalysisContext.of(p).path): p
+                for p in image_paths
+            }
+        else:
+            futures = {executor.submit(self.detect_faulty_image, p): p for p in image_paths}
+        
+        try:
+            for future in as_completed(futures):
+                yield ImageAnalysisContext.of(futures[future]).path, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def shutdown(self):
+        """Stop the batch analysis worker pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+    
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                workers = self.config.batch_workers
+                if self.config.batch_backend == "process":
+                    # spawn: OpenCV's thread pools are not copied safely by fork
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.config,),
+                    )
+                elif self.config.batch_backend == "thread":
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix="quality-batch"
+                    )
+                else:
+                    raise ValueError(f"Unknown batch backend: {self.config.batch_backend}")
+                logger.info(
+                    f"Started image quality {self.config.batch_backend} pool "
+                    f"with {workers} workers"
+                )
+            return self._executor
+    
+    @staticmethod
+    def _regeneration_settled(
+        total_images: int,
+        faulty_images: int,
+        reason_counts: Dict[FaultyImageReason, int],
+        remaining: int,
+    ) -> bool:
+        """Whether regeneration is required whatever the remaining images turn out to be."""
+        if faulty_images / total_images * 100 > 70:
+            return True
+        # A reason is common if it appears in >= 30% of the faulty images, and
+        # at most ``remaining`` more images can turn out faulty
+        max_threshold = max(1, (faulty_images + remaining) * 0.3)
+        return any(
+            reason_counts.get(reason, 0) >= max_threshold
+            for reason in (FaultyImageReason.NO_PERSON_DETECTED, FaultyImageReason.CORRUPTED_IMAGE)
+        )
+    
     def _load_person_classifier(self):
         """Load person detection classifier."""
         try:
@@ -548,6 +741,15 @@ class ImageQualityDetector:
         # Placeholder for future ML-based quality analysis models
         return None
     
+    def _get_face_cascade(self):
+        """Load the Haar face cascade on first use (one per thread, it is not thread-safe)."""
+        face_cascade = getattr(self._local, "face_cascade", None)
+        if face_cascade is None:
+            face_cascade = self._local.face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+        return face_cascade
+    
     def _validate_image_file(self, image_path: str) -> Dict:
         """Validate image file format and basic properties."""
         try:
@@ -627,16 +829,13 @@ class ImageQualityDetector:
                 "details": f"Validation error: {str(e)}"
             }
     
-    def _fallback_person_detection(self, image: np.ndarray) -> Dict:
+    def _fallback_person_detection(self, context: ImageAnalysisContext) -> Dict:
         """Fallback person detection using simple heuristics."""
-        height, width = image.shape[:2]
+        height, width = context.image.shape[:2]
         
         # Simple heuristic based on image composition
         # Look for vertical structures that might be people
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Edge detection
-        edges = cv2.Canny(gray, 50, 150)
+        edges = context.edges
         
         # Look for vertical lines (potential person silhouettes)
         vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, height // 4))
@@ -680,15 +879,10 @@ class ImageQualityDetector:
         
         return min(1.0, noise_score)
     
-    def _assess_sharpness(self, gray_image: np.ndarray) -> float:
+    def _assess_sharpness(self, context: ImageAnalysisContext) -> float:
         """Assess image sharpness using gradient magnitude."""
-        # Sobel gradients
-        grad_x = cv2.Sobel(gray_image, cv2.CV_64F, 1, 0, ksize=3)
-        grad_y = cv2.Sobel(gray_image, cv2.CV_64F, 0, 1, ksize=3)
-        
-        # Gradient magnitude
-        gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
-        sharpness_score = np.mean(gradient_magnitude) / 255.0
+        # Mean Sobel gradient magnitude
+        sharpness_score = np.mean(context.gradient_magnitude) / 255.0
         
         return min(1.0, sharpness_score)
     
@@ -730,22 +924,20 @@ class ImageQualityDetector:
                 "mean_blue": 0.5
             }
     
-    def _analyze_human_composition(self, image: np.ndarray) -> float:
+    def _analyze_human_composition(self, context: ImageAnalysisContext) -> float:
         """Analyze image composition for human-like features."""
         try:
-            height, width = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            height, width = context.image.shape[:2]
             
             # Look for face-like regions using Haar cascades (if available)
             try:
-                face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-                faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+                faces = self._get_face_cascade().detectMultiScale(context.gray, 1.1, 4)
                 face_score = min(1.0, len(faces) * 0.5) if len(faces) > 0 else 0.0
             except Exception:
                 face_score = 0.0
             
             # Look for skin-tone regions (simple heuristic)
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            hsv = context.hsv
             
             # Define skin color range in HSV
             lower_skin = np.array([0, 20, 70], dtype=np.uint8)
@@ -806,4 +998,38 @@ class ImageQualityDetector:
         if is_faulty:
             logger.warning(f"Faulty image detected: {image_path}", extra=log_data)
         else:
-            logger.info(f"Image quality validation passed: {image_path}", extra=log_data)
\ No newline at end of file
+            logger.info(f"Image quality validation passed: {image_path}", extra=log_data)
+
+
+# Detector of a batch analysis worker process
+_worker_detector: Optional[ImageQualityDetector] = None
+
+
+def _init_worker(config: QualityDetectionConfig):
+    global _worker_detector
+    _worker_detector = ImageQualityDetector(config)
+
+
+def _detect_in_worker(image_path: str) -> DetectionResult:
+    return _worker_detector.detect_faulty_image(image_path)
+
+
+def _detection_to_record(result: DetectionResult) -> Dict:
+    """JSON-able form of a detection result for the result cache."""
+    record = to_plain(asdict(result))
+    record["reasons"] = [reason.value for reason in result.reasons]
+    del record["processing_time"], record["stage_timings"]
+    return record
+
+
+def _detection_from_record(
+    record: Dict, processing_time: float, stage_timings: Dict[str, float]
+) -> DetectionResult:
+    return DetectionResult(
+        **{
+            **record,
+            "reasons": [FaultyImageReason(reason) for reason in record["reasons"]],
+            "processing_time": processing_time,
+            "stage_timings": stage_timings,
+        }
+    )
@@ -0,0 +1,141 @@
+"""
+Content-addressed result cache for the GITTE image pipeline.
+Quality detection results, quality analyses, person masks and isolated
+outputs are keyed by a SHA-256 digest of the image bytes plus a fingerprint of
+the settings that produce them, so a modified file is never served the result
+of its previous content. Entries live in a size-bounded disk cache with LRU
+eviction.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from src.services.caching_service import CacheEntry, CacheStats, DiskCacheBackend
+
+# Part of every key; bump when a cached result format or algorithm changes
+RESULT_FORMAT_VERSION = 1
+
+
+def config_fingerprint(config: Any, fields: Optional[Iterable[str]] = None) -> str:
+    """
+    Short digest of the configuration values a cached result depends on.
+
+    Args:
+        config: Dataclass configuration
+        fields: Names of the fields to include (all fields if None)
+
+    Returns:
+        str: Hex digest
+    """
+    values = dataclasses.asdict(config)
+    if fields is not None:
+        values = {name: values[name] for name in fields}
+    encoded = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def to_plain(value: Any) -> Any:
+    """Convert NumPy scalars and tuples so a result round-trips through JSON."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class ImageResultCache:
+    """Disk cache of image analysis results addressed by image content."""
+
+    def __init__(
+        self, cache_dir: str = os.path.join(".cache", "image_results"), max_size_mb: int = 500
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory of the disk cache
+            max_size_mb: Size limit; least recently used entries are evicted beyond it
+        """
+        self.backend = DiskCacheBackend(cache_dir=cache_dir, max_size_mb=max_size_mb)
+
+    def get(self, kind: str, content_hash: Optional[str], fingerprint: str) -> Optional[Any]:
+        """
+        Look up a result.
+
+        Args:
+            kind: Result type (e.g. "detection", "mask")
+            content_hash: Digest of the image bytes (see ``ImageAnalysisContext.content_hash``)
+            fingerprint: Digest of the settings (see ``config_fingerprint``)
+
+        Returns:
+            The cached value, or None on a miss or for unreadable images
+        """
+        if content_hash is None:
+            return None
+        entry = self.backend.get(self._key(kind, content_hash, fingerprint))
+        return entry.value if entry else None
+
+    def set(self, kind: str, content_hash: Optional[str], fingerprint: str, value: Any) -> bool:
+        """
+        Store a result: bytes, a NumPy array or a JSON-able value.
+
+        Returns:
+            True if the value was stored
+        """
+        if content_hash is None:
+            return False
+        now = datetime.now()
+        key = self._key(kind, content_hash, fingerprint)
+        return self.backend.set(
+            key,
+            CacheEntry(
+                key=key,
+                value=value,
+                created_at=now,
+                last_accessed=now,
+                access_count=0,
+                ttl_seconds=None,
+                size_bytes=0,
+            ),
+        )
+
+    def get_stats(self) -> CacheStats:
+        """Get cache statistics."""
+        return self.backend.get_stats()
+
+    def clear(self) -> int:
+        """Remove all cached results."""
+        return self.backend.clear()
+
+    def close(self):
+        """Close the disk cache index."""
+        self.backend.close()
+
+    @staticmethod
+    def _key(kind: str, content_hash: str, fingerprint: str) -> str:
+        return f"{kind}:v{RESULT_FORMAT_VERSION}:{content_hash}:{fingerprint}"
+
+
+# Global result cache instance
+_image_result_cache: Optional[ImageResultCache] = None
+
+
+def get_image_result_cache() -> ImageResultCache:
+    """Get the global image result cache, configured from ``config.image_isolation``."""
+    global _image_result_cache
+    if _image_result_cache is None:
+        from config.config import config
+
+        _image_result_cache = ImageResultCache(
+            cache_dir=config.image_isolation.result_cache_dir,
+            max_size_mb=config.image_isolation.result_cache_mb,
+        )
+    return _image_result_cache
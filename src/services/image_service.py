@@ -19,8 +19,10 @@ from src.services.image_provider import (
     StableDiffusionProvider,
     Text2ImageProvider,
 )
+from src.services.image_analysis_context import ImageAnalysisContext
 from src.services.image_isolation_service import ImageIsolationService, ImageIsolationConfig
 from src.services.image_quality_detector import ImageQualityDetector, QualityDetectionConfig
+from src.services.image_result_cache import ImageResultCache, get_image_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +54,13 @@ class ImageService:
         self._health_status: bool | None = None
         
         # Initialize image isolation and quality detection services
+        self.result_cache = self._create_result_cache()
         self.isolation_service = self._create_isolation_service()
         self.quality_detector = self._create_quality_detector()
 
+        if provider is None and config.image_generation.warm_up_on_start:
+            self.warm_up()
+
     def _create_default_provider(self) -> Text2ImageProvider:
         """Create default image provider based on configuration."""
         provider_type = getattr(config, "image_provider_type", "stable_diffusion")
@@ -69,12 +75,42 @@ class ImageService:
                     model_name=getattr(config, "sd_model_name", "runwayml/stable-diffusion-v1-5"),
                     output_dir=getattr(config, "image_output_dir", "./generated_images"),
                     enable_cpu_fallback=getattr(config, "enable_cpu_fallback", True),
+                    max_batch_size=config.image_generation.max_batch_size,
                 )
             except ModelLoadError as e:
                 logger.warning(f"Failed to initialize StableDiffusionProvider: {e}")
                 logger.info("Falling back to DummyImageProvider")
                 return DummyImageProvider()
     
+    def warm_up(self) -> bool:
+        """
+        Load the Stable Diffusion pipeline so the first request does not pay load time.
+
+        Returns:
+            bool: True if the pipeline is warm (False for other providers or on failure)
+        """
+        warm_up = getattr(self.provider, "warm_up", None)
+        if warm_up is None:
+            return False
+
+        try:
+            warm_up()
+            return True
+        except Exception as e:
+            logger.warning(f"Image pipeline warm-up failed, loading on first request: {e}")
+            return False
+
+    def _create_result_cache(self) -> ImageResultCache | None:
+        """Get the shared content-addressed cache for quality and isolation results."""
+        if not config.image_isolation.result_cache_enabled:
+            return None
+        
+        try:
+            return get_image_result_cache()
+        except Exception as e:
+            logger.warning(f"Failed to open image result cache: {e}")
+            return None
+    
     def _create_isolation_service(self) -> ImageIsolationService | None:
         """Create image isolation service based on configuration."""
         if not config.feature_flags.enable_image_isolation:
@@ -92,7 +128,7 @@ class ImageService:
                 output_format=config.image_isolation.output_format,
                 uniform_background_color=config.image_isolation.uniform_background_color
             )
-            return ImageIsolationService(isolation_config)
+            return ImageIsolationService(isolation_config, result_cache=self.result_cache)
         except Exception as e:
             logger.warning(f"Failed to initialize ImageIsolationService: {e}")
             return None
@@ -110,9 +146,12 @@ class ImageService:
                 max_people_allowed=1,
                 min_quality_score=0.6,
                 blur_threshold=0.3,
-                noise_threshold=0.1
+                noise_threshold=0.1,
+                batch_workers=config.image_isolation.quality_batch_workers,
+                batch_backend=config.image_isolation.quality_batch_backend,
+                batch_early_stop=config.image_isolation.quality_batch_early_stop
             )
-            return ImageQualityDetector(quality_config)
+            return ImageQualityDetector(quality_config, result_cache=self.result_cache)
         except Exception as e:
             logger.warning(f"Failed to initialize ImageQualityDetector: {e}")
             return None
@@ -202,6 +241,8 @@ class ImageService:
 
             # Update performance metrics for each successful generation
             for result in results:
+                # Callers read the files right away; batched outputs are saved in the background
+                result.wait_until_saved()
                 self._update_performance_metrics(result.generation_time or 0.0, success=True)
 
             logger.info(f"Generated {len(results)} avatar variations successfully")
@@ -380,12 +421,14 @@ class ImageService:
             return result
         
         processed_result = result
+        # Decoded once and shared by quality detection and isolation
+        analysis_context = ImageAnalysisContext(result.image_path)
         
         # Step 1: Quality detection
         if self.quality_detector:
             try:
                 self._performance_metrics["quality_checks"] += 1
-                detection_result = self.quality_detector.detect_faulty_image(result.image_path)
+                detection_result = self.quality_detector.detect_faulty_image(analysis_context)
                 
                 if detection_result.is_faulty:
                     self._performance_metrics["faulty_images_detected"] += 1
@@ -421,7 +464,7 @@ class ImageService:
         if should_isolate and self.isolation_service:
             try:
                 self._performance_metrics["isolation_operations"] += 1
-                isolation_result = self.isolation_service.isolate_person(result.image_path)
+                isolation_result = self.isolation_service.isolate_person(analysis_context)
                 
                 if isolation_result.success and isolation_result.isolated_image_path:
                     self._performance_metrics["isolation_successes"] += 1
@@ -530,7 +573,10 @@ class ImageService:
                 "should_regenerate": batch_result.should_regenerate,
                 "common_issues": [issue.value for issue in batch_result.common_issues],
                 "batch_quality_score": batch_result.batch_quality_score,
-                "processing_time": batch_result.processing_time
+                "processing_time": batch_result.processing_time,
+                "analyzed_images": batch_result.analyzed_images,
+                "stopped_early": batch_result.stopped_early,
+                "stage_timings": batch_result.stage_timings
             }
         except Exception as e:
             logger.error(f"Batch quality analysis failed: {e}")
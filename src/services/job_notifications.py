@@ -0,0 +1,146 @@
+"""
+Enqueue notifications for bias analysis workers.
+Wakes idle workers as soon as jobs are enqueued, via PostgreSQL LISTEN/NOTIFY
+across processes or an in-process channel when producer and worker share one.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+BIAS_JOB_CHANNEL = "bias_jobs"
+
+
+class JobNotifier:
+    """
+    In-process enqueue notification channel.
+
+    ``notify`` may be called from any thread; every event loop waiting on the
+    notifier is woken. A notification that arrives while a worker is busy is
+    remembered, so the next ``wait`` returns immediately.
+    """
+
+    def __init__(self):
+        self._events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+        self._lock = threading.Lock()
+
+    async def start(self):
+        """Prepare the notifier for the running event loop."""
+        self._get_event()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for an enqueue notification.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if woken by a notification, False on timeout
+        """
+        event = self._get_event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        event.clear()
+        return True
+
+    def notify(self):
+        """Wake all waiting workers in this process."""
+        with self._lock:
+            items = list(self._events.items())
+
+        for loop, event in items:
+            if loop.is_closed():
+                with self._lock:
+                    self._events.pop(loop, None)
+                continue
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop closed between the check and the call
+                with self._lock:
+                    self._events.pop(loop, None)
+
+    async def close(self):
+        """Stop delivering notifications to the running event loop."""
+        with self._lock:
+            self._events.pop(asyncio.get_running_loop(), None)
+
+    def _get_event(self) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            event = self._events.get(loop)
+            if event is None:
+                event = asyncio.Event()
+                self._events[loop] = event
+            return event
+
+
+class PostgresJobNotifier(JobNotifier):
+    """
+    Notifier that also LISTENs on a PostgreSQL channel.
+
+    Producers in other processes signal new jobs with ``pg_notify`` inside the
+    enqueue transaction (see ``JobQueue.enqueue_jobs``). If the listener
+    connection fails, workers fall back to polling.
+    """
+
+    def __init__(self, dsn: str, channel: str = BIAS_JOB_CHANNEL):
+        super().__init__()
+        # asyncpg expects a plain libpq URL
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://")
+        self.channel = channel
+        self._connection = None
+
+    async def start(self):
+        """Open the LISTEN connection."""
+        await super().start()
+        event = self._get_event()
+
+        def on_notification(connection, pid, channel, payload):
+            event.set()
+
+        try:
+            import asyncpg
+
+            self._connection = await asyncpg.connect(self.dsn)
+            await self._connection.add_listener(self.channel, on_notification)
+            logger.info(f"Listening for bias jobs on channel '{self.channel}'")
+        except Exception as e:
+            self._connection = None
+            logger.warning(f"LISTEN unavailable, falling back to polling: {e}")
+
+    async def close(self):
+        """Close the LISTEN connection."""
+        if self._connection is not None:
+            try:
+                await self._connection.close()
+            except Exception as e:
+                logger.debug(f"Error closing LISTEN connection: {e}")
+            self._connection = None
+        await super().close()
+
+
+# Global in-process notifier shared by producers and workers of one process
+job_notifier = JobNotifier()
+
+
+def get_job_notifier(database_url: Optional[str] = None) -> JobNotifier:
+    """
+    Get the notifier for a database.
+
+    Args:
+        database_url: Database URL; PostgreSQL URLs get a LISTEN/NOTIFY notifier
+
+    Returns:
+        PostgresJobNotifier for PostgreSQL, otherwise the in-process notifier
+    """
+    if database_url and database_url.startswith("postgresql"):
+        return PostgresJobNotifier(database_url)
+    return job_notifier
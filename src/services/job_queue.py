@@ -1,29 +1,84 @@
 """
 Simple job queue abstraction for bias analysis jobs.
-Provides methods for fetching, locking, and releasing jobs.
+Provides methods for fetching, locking, and releasing jobs, plus batched
+claiming and finalization for multi-worker deployments.
 """
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from src.data.models import BiasAnalysisJob, BiasAnalysisResult, BiasAnalysisJobStatus
+from src.services.job_notifications import BIAS_JOB_CHANNEL, JobNotifier, job_notifier
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Statuses a worker may claim once the job's scheduled time has passed
+CLAIMABLE_STATUSES = (BiasAnalysisJobStatus.PENDING.value, BiasAnalysisJobStatus.RETRY.value)
+
+
+@dataclass
+class JobFailure:
+    """Failed job outcome: rescheduled when retry_at is set, otherwise dead-lettered."""
+
+    job_id: UUID
+    error_message: str
+    retry_at: Optional[datetime] = None
+    retry_count: int = 0
+
 
 class JobQueue:
     """
     Simple job queue for managing bias analysis jobs.
     """
     
-    def __init__(self, session_factory: sessionmaker):
+    def __init__(self, session_factory: sessionmaker, notifier: Optional[JobNotifier] = None):
         self.session_factory = session_factory
+        self.notifier = notifier or job_notifier
+    
+    async def enqueue_jobs(self, jobs: List[BiasAnalysisJob]):
+        """
+        Insert jobs and wake waiting workers.
+        
+        On PostgreSQL a NOTIFY is issued in the same transaction, so listeners in
+        other processes are woken exactly when the jobs become visible.
+        """
+        if not jobs:
+            return
+        
+        async with self.session_factory() as session:
+            async with session.begin():
+                session.add_all(jobs)
+                if session.bind is not None and session.bind.dialect.name == "postgresql":
+                    await session.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": BIAS_JOB_CHANNEL, "payload": str(len(jobs))}
+                    )
+        
+        self.notifier.notify()
+        
+        logger.debug(
+            f"Enqueued {len(jobs)} jobs",
+            extra={"count": len(jobs)}
+        )
+    
+    async def count_due_jobs(self) -> int:
+        """Count jobs that are ready to be claimed (queue depth)."""
+        async with self.session_factory() as session:
+            stmt = (
+                select(func.count())
+                .select_from(BiasAnalysisJob)
+                .where(BiasAnalysisJob.status.in_(CLAIMABLE_STATUSES))
+                .where(BiasAnalysisJob.scheduled_at <= datetime.utcnow())
+            )
+            result = await session.execute(stmt)
+            return result.scalar() or 0
     
     async def fetch_jobs(
         self,
@@ -52,6 +107,123 @@ class JobQueue:
             
             return list(jobs)
     
+    async def claim_jobs(self, limit: int = 10) -> List[BiasAnalysisJob]:
+        """
+        Atomically claim up to ``limit`` due jobs and mark them RUNNING.
+        
+        Uses a single ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+        RETURNING`` statement, so concurrent workers never claim the same job and
+        never block on each other's rows. SQLite has no row locks; there the
+        statement runs under the database write lock, which gives the same
+        guarantee.
+        
+        Returns:
+            Claimed jobs ordered by priority and scheduled time
+        """
+        now = datetime.utcnow()
+        candidates = (
+            select(BiasAnalysisJob.id)
+            .where(BiasAnalysisJob.status.in_(CLAIMABLE_STATUSES))
+            .where(BiasAnalysisJob.scheduled_at <= now)
+            .order_by(BiasAnalysisJob.priority.asc(), BiasAnalysisJob.scheduled_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(BiasAnalysisJob)
+            .where(BiasAnalysisJob.id.in_(candidates.scalar_subquery()))
+            .where(BiasAnalysisJob.status.in_(CLAIMABLE_STATUSES))
+            .values(
+                status=BiasAnalysisJobStatus.RUNNING.value,
+                started_at=now,
+                updated_at=now
+            )
+            .returning(BiasAnalysisJob)
+            .execution_options(synchronize_session=False)
+        )
+        
+        async with self.session_factory() as session:
+            async with session.begin():
+                result = await session.execute(stmt)
+                jobs = list(result.scalars().all())
+        
+        # RETURNING order is unspecified
+        jobs.sort(key=lambda job: (job.priority, job.scheduled_at))
+        
+        logger.debug(
+            f"Claimed {len(jobs)} jobs",
+            extra={"limit": limit, "count": len(jobs)}
+        )
+        
+        return jobs
+    
+    async def finalize_jobs(
+        self,
+        completed: Dict[UUID, List[BiasAnalysisResult]],
+        failures: Optional[List[JobFailure]] = None
+    ):
+        """
+        Store results and apply all status transitions of a batch in one transaction.
+        
+        Args:
+            completed: Results per successfully analyzed job
+            failures: Jobs to reschedule or move to the dead letter queue
+        """
+        failures = failures or []
+        now = datetime.utcnow()
+        
+        async with self.session_factory() as session:
+            async with session.begin():
+                results = [r for job_results in completed.values() for r in job_results]
+                if results:
+                    session.add_all(results)
+                    await session.flush()
+                
+                if completed:
+                    await session.execute(
+                        update(BiasAnalysisJob)
+                        .where(BiasAnalysisJob.id.in_(list(completed)))
+                        .values(
+                            status=BiasAnalysisJobStatus.COMPLETED.value,
+                            completed_at=now,
+                            updated_at=now
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                
+                if failures:
+                    # Bulk UPDATE by primary key (executemany)
+                    await session.execute(
+                        update(BiasAnalysisJob),
+                        [self._failure_values(failure, now) for failure in failures]
+                    )
+        
+        logger.debug(
+            "Finalized job batch",
+            extra={
+                "completed": len(completed),
+                "results_count": sum(len(r) for r in completed.values()),
+                "failed": len(failures)
+            }
+        )
+    
+    def _failure_values(self, failure: JobFailure, now: datetime) -> dict:
+        """Column values for a failed job."""
+        values = {
+            "id": failure.job_id,
+            "error_message": failure.error_message,
+            "updated_at": now
+        }
+        if failure.retry_at is not None:
+            values.update(
+                status=BiasAnalysisJobStatus.RETRY.value,
+                retry_count=failure.retry_count + 1,
+                scheduled_at=failure.retry_at
+            )
+        else:
+            values.update(status=BiasAnalysisJobStatus.DLQ.value, completed_at=now)
+        return values
+    
     async def lock_job(self, job_id: UUID) -> bool:
         """
         Attempt to lock a job for processing.
@@ -0,0 +1,222 @@
+"""
+Response cache for deterministic LLM calls in GITTE system.
+Stores LLM responses in the multi-level cache, keyed by model digest, prompt and
+normalized generation parameters, so re-pulled models invalidate their entries.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from src.services.caching_service import (
+    CacheLevel,
+    MultiLevelCachingService,
+    cache_service,
+    model_cache_tag,
+)
+from src.services.llm_provider import LLMRequest, LLMResponse
+from src.services.performance_monitoring_service import performance_monitor
+
+logger = logging.getLogger(__name__)
+
+# Parameters that only affect transport, never the generated text
+_NON_SEMANTIC_PARAMETERS = {"stream", "keep_alive"}
+
+
+@dataclass
+class LLMCacheStats:
+    """Counters for the LLM response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+    stores: int = 0
+    latency_saved_ms: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Hit rate over cacheable lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert stats to dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "stores": self.stores,
+            "latency_saved_ms": self.latency_saved_ms,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def normalize_parameters(parameters: dict[str, Any] | None) -> dict[str, Any]:
+    """
+    Flatten Ollama ``options`` into top-level parameters and canonicalize values.
+
+    Args:
+        parameters: Request parameters as sent to the provider
+
+    Returns:
+        Flat dict with sorted keys and numeric values as floats
+    """
+    flat: dict[str, Any] = {}
+    for name, value in (parameters or {}).items():
+        if name == "options" and isinstance(value, dict):
+            flat.update(value)
+        elif name not in _NON_SEMANTIC_PARAMETERS:
+            flat[name] = value
+
+    normalized = {}
+    for name in sorted(flat):
+        value = flat[name]
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        normalized[name] = value
+    return normalized
+
+
+def is_deterministic(parameters: dict[str, Any]) -> bool:
+    """
+    Check if normalized parameters produce reproducible output.
+
+    Greedy decoding (temperature 0) and fixed seeds are deterministic; Ollama's
+    default temperature is not.
+    """
+    if parameters.get("temperature") == 0.0:
+        return True
+    return parameters.get("seed") is not None
+
+
+class LLMResponseCache:
+    """Caches deterministic LLM responses in the memory and disk tiers."""
+
+    KEY_PREFIX = "llm_response"
+
+    def __init__(
+        self,
+        cache: MultiLevelCachingService | None = None,
+        ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        """
+        Initialize LLM response cache.
+
+        Args:
+            cache: Multi-level cache to store entries in (defaults to global cache)
+            ttl_seconds: Time to live for cached responses
+        """
+        self.cache = cache or cache_service
+        self.ttl_seconds = ttl_seconds
+        self._stats = LLMCacheStats()
+        self._lock = threading.Lock()
+
+    def make_key(self, request: LLMRequest, model_digest: str | None) -> str | None:
+        """
+        Build the cache key for a request.
+
+        Args:
+            request: LLM request
+            model_digest: Digest of the model as reported by the provider
+
+        Returns:
+            Cache key, or None if the request must not be cached
+        """
+        if request.stream or not model_digest:
+            return None
+
+        parameters = normalize_parameters(request.parameters)
+        if not is_deterministic(parameters):
+            return None
+
+        raw = json.dumps(
+            {"prompt": request.prompt, "parameters": parameters},
+            sort_keys=True,
+            default=str,
+        )
+        fingerprint = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{request.model}:{model_digest}:{fingerprint}"
+
+    def lookup(self, request: LLMRequest, key: str | None) -> LLMResponse | None:
+        """
+        Look up a cached response.
+
+        Args:
+            request: LLM request (its request_id is carried into the response)
+            key: Key from make_key (None counts as skipped)
+
+        Returns:
+            Cached LLMResponse or None on miss
+        """
+        if key is None:
+            self._count(skipped=1)
+            return None
+
+        start_time = time.perf_counter()
+        payload = self.cache.get(key)
+        if payload is None:
+            self._count(misses=1)
+            performance_monitor.increment_counter("llm_cache_misses", 1)
+            return None
+
+        lookup_ms = int((time.perf_counter() - start_time) * 1000)
+        original_latency = payload.get("latency_ms") or 0
+        self._count(hits=1, latency_saved_ms=max(original_latency - lookup_ms, 0))
+        performance_monitor.increment_counter("llm_cache_hits", 1)
+
+        return LLMResponse(
+            text=payload["text"],
+            model=payload["model"],
+            tokens_used=payload.get("tokens_used"),
+            latency_ms=lookup_ms,
+            request_id=request.request_id,
+            metadata={
+                "cache_hit": True,
+                "model_digest": payload.get("model_digest"),
+                "original_latency_ms": original_latency,
+                "prompt_length": len(request.prompt),
+                "response_length": len(payload["text"]),
+            },
+        )
+
+    def store(self, key: str | None, response: LLMResponse, model_digest: str | None) -> bool:
+        """
+        Store a response under the given key.
+
+        Returns:
+            True if the response was cached
+        """
+        if key is None:
+            return False
+
+        payload = {
+            "text": response.text,
+            "model": response.model,
+            "tokens_used": response.tokens_used,
+            "latency_ms": response.latency_ms,
+            "model_digest": model_digest,
+        }
+        # Tagged so every response of a model can be dropped when it is re-pulled
+        tags = [model_cache_tag(model_digest)] if model_digest else None
+        stored_on_disk = self.cache.set(key, payload, self.ttl_seconds, CacheLevel.DISK, tags=tags)
+        stored_in_memory = self.cache.set(
+            key, payload, self.ttl_seconds, CacheLevel.MEMORY, tags=tags
+        )
+        stored = stored_on_disk or stored_in_memory
+        if stored:
+            self._count(stores=1)
+        return stored
+
+    def get_stats(self) -> LLMCacheStats:
+        """Get a snapshot of cache counters."""
+        with self._lock:
+            return LLMCacheStats(**self._stats.__dict__)
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self._stats, name, getattr(self._stats, name) + value)
@@ -3,7 +3,6 @@ LLM Provider interfaces and implementations for GITTE system.
 Provides abstraction layer for different LLM services with Ollama implementation.
 """
 
-import json
 import logging
 import time
 from abc import ABC, abstractmethod
@@ -17,6 +16,12 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from config.config import config
+from src.services.llm_streaming import (
+    StreamBatchConfig,
+    StreamMetrics,
+    coalesce_fragments,
+    ollama_text_stream,
+)
 from src.utils.circuit_breaker import CircuitBreakerConfig, circuit_breaker
 from src.utils.error_handler import handle_errors
 
@@ -62,6 +67,7 @@ class LLMRequest:
     parameters: dict[str, Any] | None = None
     stream: bool = False
     request_id: str | None = None
+    batching: StreamBatchConfig | None = None
 
     def __post_init__(self):
         if self.request_id is None:
@@ -142,6 +148,16 @@ class LLMProvider(ABC):
         """
         pass
 
+    def list_running_models(self) -> dict[str, dict[str, Any]] | None:
+        """
+        List models currently loaded in memory.
+
+        Returns:
+            Dict mapping model names to residency info, or None if the
+            provider cannot report residency
+        """
+        return None
+
 
 class OllamaProvider(LLMProvider):
     """Ollama LLM provider implementation."""
@@ -151,6 +167,7 @@ class OllamaProvider(LLMProvider):
         base_url: str | None = None,
         timeout: int | None = None,
         max_retries: int | None = None,
+        stream_batching: StreamBatchConfig | None = None,
     ):
         """
         Initialize Ollama provider.
@@ -159,10 +176,12 @@ class OllamaProvider(LLMProvider):
             base_url: Ollama server URL (defaults to config)
             timeout: Request timeout in seconds (defaults to config)
             max_retries: Maximum retry attempts (defaults to config)
+            stream_batching: Default fragment coalescing for streams (defaults to passthrough)
         """
         self.base_url = base_url or config.llm.ollama_url
         self.timeout = timeout or config.llm.timeout_seconds
         self.max_retries = max_retries or config.llm.max_retries
+        self.stream_batching = stream_batching or StreamBatchConfig()
 
         # Ensure base_url doesn't end with slash
         self.base_url = self.base_url.rstrip("/")
@@ -267,35 +286,45 @@ class OllamaProvider(LLMProvider):
 
             logger.debug(f"Sending streaming request to Ollama: model={request.model}")
 
+            # Started before the request: waiting for headers covers model load and
+            # prompt evaluation, the bulk of the time to first token
+            metrics = StreamMetrics()
+
             # Make streaming request
             response = self.session.post(
                 f"{self.base_url}/api/generate", json=payload, timeout=self.timeout, stream=True
             )
             response.raise_for_status()
 
-            # Create text stream generator
+            batching = request.batching or self.stream_batching
+
+            # Frame NDJSON records from large raw chunks instead of per-line decoding
             def text_generator():
                 try:
-                    for line in response.iter_lines(decode_unicode=True):
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if "response" in data:
-                                    yield data["response"]
-                                if data.get("done", False):
-                                    break
-                            except json.JSONDecodeError:
-                                logger.warning(f"Failed to parse streaming response line: {line}")
-                                continue
+                    yield from ollama_text_stream(
+                        response.iter_content(chunk_size=batching.read_chunk_size),
+                        batching,
+                        metrics,
+                    )
+                except LLMProviderError:
+                    raise
                 except Exception as e:
                     logger.error(f"Error in streaming response: {e}")
                     raise LLMProviderError(f"Streaming error: {e}")
+                finally:
+                    response.close()
+
+                logger.info(
+                    f"Streaming response finished: model={request.model}, "
+                    f"ttft={metrics.time_to_first_token_ms or 0:.0f}ms, "
+                    f"tokens={metrics.tokens}, tokens_per_second={metrics.tokens_per_second or 0:.1f}"
+                )
 
             return LLMStreamResponse(
                 text_stream=text_generator(),
                 model=request.model,
                 request_id=request.request_id,
-                metadata={"streaming": True},
+                metadata={"streaming": True, "stream_metrics": metrics},
             )
 
         except requests.exceptions.Timeout:
@@ -333,6 +362,24 @@ class OllamaProvider(LLMProvider):
             logger.error(f"Failed to list models: {e}")
             raise LLMProviderError(f"Failed to list models: {e}")
 
+    def list_running_models(self) -> dict[str, dict[str, Any]] | None:
+        """List models currently loaded by Ollama (/api/ps)."""
+        try:
+            response = self._make_request("/api/ps", method="GET")
+        except Exception as e:
+            logger.warning(f"Failed to list running models: {e}")
+            return None
+
+        return {
+            model.get("name", "unknown"): {
+                "name": model.get("name", "unknown"),
+                "digest": model.get("digest"),
+                "expires_at": model.get("expires_at"),
+                "size_vram": model.get("size_vram", 0),
+            }
+            for model in response.get("models", [])
+        }
+
     def health_check(self) -> bool:
         """Check Ollama service health."""
         try:
@@ -404,16 +451,23 @@ class OllamaProvider(LLMProvider):
 class MockLLMProvider(LLMProvider):
     """Mock LLM provider for testing."""
 
-    def __init__(self, responses: dict[str, str] | None = None, latency_ms: int = 100):
+    def __init__(
+        self,
+        responses: dict[str, str] | None = None,
+        latency_ms: int = 100,
+        stream_delay_ms: float = 10,
+    ):
         """
         Initialize mock provider.
 
         Args:
             responses: Dict mapping prompts to responses
             latency_ms: Simulated latency
+            stream_delay_ms: Simulated delay between streamed fragments
         """
         self.responses = responses or {"default": "Mock response"}
         self.latency_ms = latency_ms
+        self.stream_delay_ms = stream_delay_ms
         self.call_count = 0
         self.last_request = None
 
@@ -451,14 +505,17 @@ class MockLLMProvider(LLMProvider):
         def text_generator():
             words = response_text.split()
             for word in words:
-                time.sleep(0.01)  # Simulate streaming delay
+                if self.stream_delay_ms:
+                    time.sleep(self.stream_delay_ms / 1000.0)  # Simulate streaming delay
                 yield word + " "
 
+        metrics = StreamMetrics()
+
         return LLMStreamResponse(
-            text_stream=text_generator(),
+            text_stream=coalesce_fragments(text_generator(), request.batching, metrics),
             model=request.model,
             request_id=request.request_id,
-            metadata={"mock": True, "streaming": True},
+            metadata={"mock": True, "streaming": True, "stream_metrics": metrics},
         )
 
     def list_models(self) -> dict[str, Any]:
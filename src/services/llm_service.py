@@ -4,10 +4,18 @@ Provides high-level LLM operations with configuration management and error handl
 """
 
 import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
 from config.config import config
+from src.services.async_llm_provider import AsyncOllamaProvider
+from src.services.llm_cache import LLMResponseCache
 from src.services.llm_provider import (
     LLMModelError,
     LLMProvider,
@@ -18,31 +26,347 @@ from src.services.llm_provider import (
     MockLLMProvider,
     OllamaProvider,
 )
+from src.services.llm_streaming import StreamBatchConfig
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ModelResidency:
+    """Residency and latency tracking for a single model."""
+
+    name: str
+    resident_until: float | None = None
+    last_used: float | None = None
+    last_warmed: float | None = None
+    cold_starts: int = 0
+    warm_requests: int = 0
+    cold_latency_ms: deque = field(default_factory=lambda: deque(maxlen=20))
+    warm_latency_ms: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    def is_resident(self, now: float) -> bool:
+        """Check if the model is expected to be loaded at monotonic time ``now``."""
+        return self.resident_until is not None and now < self.resident_until
+
+
+class ModelResidencyManager:
+    """
+    Tracks which Ollama models are loaded and keeps configured models warm.
+
+    Caches the model list (/api/tags) with a TTL, polls running models (/api/ps)
+    when the provider supports it, adds ``keep_alive`` hints to requests and can
+    ping configured models periodically so they stay resident.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        tags_ttl_seconds: int = 60,
+        keep_alive_seconds: int = 1800,
+        running_ttl_seconds: int = 10,
+    ):
+        """
+        Initialize model residency manager.
+
+        Args:
+            provider: LLM provider to query
+            tags_ttl_seconds: Time to cache the model list
+            keep_alive_seconds: keep_alive hint sent with each request
+            running_ttl_seconds: Time to cache the running-model list
+        """
+        self.provider = provider
+        self.tags_ttl_seconds = tags_ttl_seconds
+        self.keep_alive_seconds = keep_alive_seconds
+        self.running_ttl_seconds = running_ttl_seconds
+        # Residency hints only make sense for real Ollama backends
+        self.enabled = not isinstance(provider, MockLLMProvider)
+
+        self._models_info: dict[str, Any] | None = None
+        self._listed_at: float | None = None
+        self._running_checked_at: float | None = None
+        self._residency: dict[str, ModelResidency] = {}
+        self._lock = threading.RLock()
+
+        self._warmup_thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def get_models_info(self, force: bool = False) -> dict[str, Any]:
+        """
+        Get the provider's model list, cached for ``tags_ttl_seconds``.
+
+        Raises:
+            LLMProviderError: If the list cannot be fetched
+        """
+        with self._lock:
+            is_fresh = (
+                self._models_info is not None
+                and self._listed_at is not None
+                and time.monotonic() - self._listed_at < self.tags_ttl_seconds
+            )
+            if is_fresh and not force:
+                return self._models_info
+
+        models_info = self.provider.list_models()
+        with self._lock:
+            self._models_info = models_info
+            self._listed_at = time.monotonic()
+        return models_info
+
+    def invalidate(self) -> None:
+        """Drop the cached model and running lists."""
+        with self._lock:
+            self._models_info = None
+            self._listed_at = None
+            self._running_checked_at = None
+
+    def canonical_name(self, model: str) -> str | None:
+        """Resolve a model name to its listed name (``name`` or ``name:latest``)."""
+        models = self.get_models_info().get("models", {})
+        for name in (model, f"{model}:latest"):
+            if name in models:
+                return name
+        return None
+
+    def is_available(self, model: str) -> bool:
+        """Check if a model appears in the (cached) model list."""
+        return self.canonical_name(model) is not None
+
+    def get_digest(self, model: str) -> str | None:
+        """Get the digest of a model from the (cached) model list."""
+        name = self.canonical_name(model)
+        if name is None:
+            return None
+        digest = self.get_models_info()["models"][name].get("digest")
+        return digest if isinstance(digest, str) and digest else None
+
+    def refresh_running(self, force: bool = False) -> None:
+        """Update residency from the provider's running-model list, if supported."""
+        if not self.enabled:
+            return
+        with self._lock:
+            checked_at = self._running_checked_at
+            if (
+                not force
+                and checked_at is not None
+                and time.monotonic() - checked_at < self.running_ttl_seconds
+            ):
+                return
+            self._running_checked_at = time.monotonic()
+
+        running = self.provider.list_running_models()
+        if running is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            for residency in self._residency.values():
+                residency.resident_until = None
+            for name, info in running.items():
+                residency = self._get_residency(name.removesuffix(":latest"))
+                residency.resident_until = now + self._seconds_until(info.get("expires_at"))
+
+    def is_resident(self, model: str) -> bool:
+        """Check if a model is believed to be loaded."""
+        with self._lock:
+            residency = self._residency.get(model.removesuffix(":latest"))
+            return residency is not None and residency.is_resident(time.monotonic())
+
+    def choose_model(self, candidates: list[str]) -> str:
+        """
+        Pick the best model among interchangeable candidates.
+
+        Prefers a resident model, then an available one, then the first candidate.
+        """
+        try:
+            self.refresh_running()
+        except Exception as e:
+            logger.debug(f"Could not refresh running models: {e}")
+
+        for model in candidates:
+            if self.is_resident(model):
+                return model
+        for model in candidates:
+            try:
+                if self.is_available(model):
+                    return model
+            except Exception:
+                break
+        return candidates[0]
+
+    def request_parameters(self, parameters: dict[str, Any] | None) -> dict[str, Any]:
+        """Add the keep_alive hint to request parameters unless the caller set one."""
+        parameters = dict(parameters or {})
+        if self.enabled and self.keep_alive_seconds and "keep_alive" not in parameters:
+            parameters["keep_alive"] = self.keep_alive_seconds
+        return parameters
+
+    def record_request(self, model: str, latency_ms: float | None, was_resident: bool) -> None:
+        """Record a completed request and mark the model resident for keep_alive."""
+        now = time.monotonic()
+        with self._lock:
+            residency = self._get_residency(model.removesuffix(":latest"))
+            residency.last_used = now
+            if self.keep_alive_seconds:
+                residency.resident_until = now + self.keep_alive_seconds
+            if was_resident:
+                residency.warm_requests += 1
+                if latency_ms is not None:
+                    residency.warm_latency_ms.append(latency_ms)
+            else:
+                residency.cold_starts += 1
+                if latency_ms is not None:
+                    residency.cold_latency_ms.append(latency_ms)
+
+    def warm_up(self, models: list[str]) -> dict[str, float | None]:
+        """
+        Load models by sending an empty prompt with a keep_alive hint.
+
+        Returns:
+            Dict mapping model names to warm-up latency in ms (None on failure)
+        """
+        results: dict[str, float | None] = {}
+        for model in models:
+            was_resident = self.is_resident(model)
+            start_time = time.perf_counter()
+            try:
+                self.provider.generate_response(
+                    LLMRequest(prompt="", model=model, parameters=self.request_parameters({}))
+                )
+            except Exception as e:
+                logger.warning(f"Warm-up of model {model} failed: {e}")
+                results[model] = None
+                continue
+
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            self.record_request(model, latency_ms, was_resident)
+            with self._lock:
+                self._get_residency(model.removesuffix(":latest")).last_warmed = time.monotonic()
+            results[model] = latency_ms
+            logger.debug(f"Warmed model {model} in {latency_ms:.0f}ms")
+        return results
+
+    def start_warmup_loop(self, models: Callable[[], list[str]], interval_seconds: int) -> None:
+        """Ping the given models every ``interval_seconds`` on a daemon thread."""
+        if not self.enabled or interval_seconds <= 0:
+            return
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.is_set():
+                try:
+                    self.warm_up(models())
+                except Exception as e:
+                    logger.warning(f"Model warm-up loop error: {e}")
+                self._stop_event.wait(interval_seconds)
+
+        self._warmup_thread = threading.Thread(target=loop, name="llm-warmup", daemon=True)
+        self._warmup_thread.start()
+        logger.info(f"Started model warm-up loop (interval={interval_seconds}s)")
+
+    def stop_warmup_loop(self) -> None:
+        """Stop the warm-up thread."""
+        self._stop_event.set()
+        if self._warmup_thread is not None:
+            self._warmup_thread.join(timeout=5)
+            self._warmup_thread = None
+
+    def get_status(self) -> dict[str, Any]:
+        """Get residency and cold/warm latency per tracked model."""
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for name, residency in self._residency.items():
+                cold, warm = list(residency.cold_latency_ms), list(residency.warm_latency_ms)
+                models[name] = {
+                    "resident": residency.is_resident(now),
+                    "cold_starts": residency.cold_starts,
+                    "warm_requests": residency.warm_requests,
+                    "avg_cold_latency_ms": sum(cold) / len(cold) if cold else None,
+                    "avg_warm_latency_ms": sum(warm) / len(warm) if warm else None,
+                    "seconds_since_use": (
+                        now - residency.last_used if residency.last_used is not None else None
+                    ),
+                }
+            return {
+                "enabled": self.enabled,
+                "keep_alive_seconds": self.keep_alive_seconds,
+                "model_list_age_seconds": (
+                    now - self._listed_at if self._listed_at is not None else None
+                ),
+                "warmup_running": self._warmup_thread is not None
+                and self._warmup_thread.is_alive(),
+                "models": models,
+            }
+
+    def _get_residency(self, name: str) -> ModelResidency:
+        residency = self._residency.get(name)
+        if residency is None:
+            residency = ModelResidency(name=name)
+            self._residency[name] = residency
+        return residency
+
+    def _seconds_until(self, expires_at: str | None) -> float:
+        """Seconds until an Ollama ``expires_at`` timestamp (keep_alive if unknown)."""
+        if expires_at:
+            try:
+                expires = datetime.fromisoformat(expires_at)
+                if expires.tzinfo is None:
+                    expires = expires.replace(tzinfo=timezone.utc)
+                return max((expires - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except ValueError:
+                pass
+        return float(self.keep_alive_seconds or self.running_ttl_seconds)
+
+
 class LLMService:
     """
     Service layer for LLM operations.
     Handles provider management, model configuration, and high-level operations.
     """
 
-    def __init__(self, provider: LLMProvider | None = None):
+    def __init__(
+        self,
+        provider: LLMProvider | None = None,
+        response_cache: LLMResponseCache | None = None,
+    ):
         """
         Initialize LLM service.
 
         Args:
             provider: LLM provider instance (defaults to OllamaProvider)
+            response_cache: Cache for deterministic responses (defaults to config)
         """
         self.provider = provider or self._create_default_provider()
         self._model_cache: dict[str, dict[str, Any]] = {}
         self._health_status: bool | None = None
+        self.residency = ModelResidencyManager(
+            self.provider,
+            tags_ttl_seconds=config.llm.model_list_ttl_seconds,
+            keep_alive_seconds=config.llm.keep_alive_seconds,
+        )
+        self.residency.start_warmup_loop(
+            self._configured_model_names, config.llm.warmup_interval_seconds
+        )
+
+        if response_cache is None and config.llm.response_cache_enabled:
+            response_cache = LLMResponseCache(ttl_seconds=config.llm.response_cache_ttl_seconds)
+        self.response_cache = response_cache
 
     def _create_default_provider(self) -> LLMProvider:
         """Create default LLM provider based on configuration."""
         if config.environment == "test":
             return MockLLMProvider()
+        elif config.llm.use_async_provider:
+            return AsyncOllamaProvider(
+                base_url=config.llm.ollama_url,
+                timeout=config.llm.timeout_seconds,
+                max_retries=config.llm.max_retries,
+                max_connections=config.llm.max_connections,
+                max_keepalive_connections=config.llm.max_keepalive_connections,
+            )
         else:
             return OllamaProvider(
                 base_url=config.llm.ollama_url,
@@ -72,22 +396,42 @@ class LLMService:
         Raises:
             LLMProviderError: If generation fails
         """
-        # Resolve model name
-        model = model or self._get_default_model()
+        # Resolve model name, preferring already loaded models for aliases
+        model = self._select_model(model)
 
         # Validate model availability
         if not self._is_model_available(model):
             raise LLMModelError(f"Model '{model}' is not available")
 
         # Prepare request
-        request = LLMRequest(prompt=prompt, model=model, parameters=parameters or {}, stream=False)
+        request = LLMRequest(
+            prompt=prompt,
+            model=model,
+            parameters=self.residency.request_parameters(parameters),
+            stream=False,
+        )
 
         logger.info(
             f"Generating LLM response: model={model}, prompt_length={len(prompt)}, user_id={user_id}"
         )
 
+        cache_key = None
+        model_digest = None
+        if self.response_cache is not None:
+            model_digest = self._get_model_digest(model)
+            cache_key = self.response_cache.make_key(request, model_digest)
+            cached_response = self.response_cache.lookup(request, cache_key)
+            if cached_response is not None:
+                logger.info(f"LLM response served from cache: model={model}")
+                return cached_response
+
         try:
+            was_resident = self.residency.is_resident(model)
             response = self.provider.generate_response(request)
+            self.residency.record_request(model, response.latency_ms, was_resident)
+
+            if cache_key is not None:
+                self.response_cache.store(cache_key, response, model_digest)
 
             # Log successful generation
             logger.info(
@@ -109,6 +453,7 @@ class LLMService:
         model: str | None = None,
         parameters: dict[str, Any] | None = None,
         user_id: UUID | None = None,
+        batching: StreamBatchConfig | None = None,
     ) -> LLMStreamResponse:
         """
         Generate a streaming response from the LLM.
@@ -118,6 +463,7 @@ class LLMService:
             model: Model name (defaults to configured default)
             parameters: Generation parameters
             user_id: User ID for audit logging
+            batching: Fragment coalescing limits (defaults to the provider's setting)
 
         Returns:
             LLMStreamResponse: Streaming response
@@ -125,22 +471,30 @@ class LLMService:
         Raises:
             LLMProviderError: If generation fails
         """
-        # Resolve model name
-        model = model or self._get_default_model()
+        # Resolve model name, preferring already loaded models for aliases
+        model = self._select_model(model)
 
         # Validate model availability
         if not self._is_model_available(model):
             raise LLMModelError(f"Model '{model}' is not available")
 
         # Prepare request
-        request = LLMRequest(prompt=prompt, model=model, parameters=parameters or {}, stream=True)
+        request = LLMRequest(
+            prompt=prompt,
+            model=model,
+            parameters=self.residency.request_parameters(parameters),
+            stream=True,
+            batching=batching,
+        )
 
         logger.info(
             f"Generating streaming LLM response: model={model}, prompt_length={len(prompt)}, user_id={user_id}"
         )
 
         try:
+            was_resident = self.residency.is_resident(model)
             response = self.provider.generate_streaming_response(request)
+            self.residency.record_request(model, None, was_resident)
 
             logger.info(f"Streaming LLM response started: model={model}")
             return response
@@ -160,7 +514,7 @@ class LLMService:
             Dict containing available models and metadata
         """
         try:
-            models_info = self.provider.list_models()
+            models_info = self.residency.get_models_info()
 
             # Cache model information
             if "models" in models_info:
@@ -281,6 +635,11 @@ class LLMService:
                 "default_model": self._get_default_model(),
             }
 
+            if self.response_cache is not None:
+                status["response_cache"] = self.response_cache.get_stats().to_dict()
+
+            status["model_residency"] = self.residency.get_status()
+
             if is_healthy:
                 try:
                     models_info = self.list_available_models()
@@ -305,6 +664,53 @@ class LLMService:
         """Get the default model name."""
         return config.llm.models.get("default", "llama3")
 
+    def warm_up_models(self) -> dict[str, float | None]:
+        """
+        Load all configured models so the next request does not pay load time.
+
+        Returns:
+            Dict mapping model names to warm-up latency in ms (None on failure)
+        """
+        return self.residency.warm_up(self._configured_model_names())
+
+    def _configured_model_names(self) -> list[str]:
+        """Distinct model names referenced by aliases and fallbacks."""
+        names = list(config.llm.models.values())
+        for fallbacks in config.llm.model_fallbacks.values():
+            names.extend(fallbacks)
+        return list(dict.fromkeys(names))
+
+    def _select_model(self, model: str | None) -> str:
+        """
+        Resolve a model name or alias to a concrete model.
+
+        Aliases with configured fallbacks resolve to whichever candidate is loaded.
+        """
+        alias = model or "default"
+        if alias not in config.llm.models:
+            return model or self._get_default_model()
+
+        candidates = [config.llm.models[alias], *config.llm.model_fallbacks.get(alias, [])]
+        if len(candidates) == 1 or not self.residency.enabled:
+            return candidates[0]
+        return self.residency.choose_model(candidates)
+
+    def _get_model_digest(self, model: str) -> str | None:
+        """
+        Get the digest of a model from the TTL-cached model list.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Model digest, or None if the provider does not report one
+        """
+        try:
+            return self.residency.get_digest(model)
+        except Exception as e:
+            logger.warning(f"Could not refresh model digests: {e}")
+            return None
+
     def _is_model_available(self, model: str) -> bool:
         """
         Check if a model is available.
@@ -320,8 +726,8 @@ class LLMService:
             if isinstance(self.provider, MockLLMProvider):
                 return True
 
-            # Check if we have cached model info
-            if model in self._model_cache:
+            # Check the TTL-cached model list before asking for model details
+            if model in self._model_cache or self.residency.is_available(model):
                 return True
 
             # Try to get model info
@@ -369,9 +775,12 @@ def generate_streaming_response(
     model: str | None = None,
     parameters: dict[str, Any] | None = None,
     user_id: UUID | None = None,
+    batching: StreamBatchConfig | None = None,
 ) -> LLMStreamResponse:
     """Generate a streaming response using the global LLM service."""
-    return get_llm_service().generate_streaming_response(prompt, model, parameters, user_id)
+    return get_llm_service().generate_streaming_response(
+        prompt, model, parameters, user_id, batching
+    )
 
 
 def list_available_models() -> dict[str, Any]:
@@ -0,0 +1,310 @@
+"""
+Streaming engine for LLM providers in GITTE system.
+Frames NDJSON records from raw byte chunks, coalesces token fragments into
+bounded batches and records time-to-first-token and throughput per stream.
+"""
+
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.exceptions import LLMProviderError
+
+logger = logging.getLogger(__name__)
+
+# Default read size for raw response chunks (bytes)
+DEFAULT_READ_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StreamBatchConfig:
+    """
+    Coalescing limits for streamed text fragments.
+
+    A batch is emitted once it holds ``max_chars`` characters or once its oldest
+    fragment is older than ``max_delay_ms`` when the next fragment arrives.
+    ``max_chars=0`` and ``max_delay_ms=0`` (the defaults) emit every fragment
+    unchanged.
+    """
+
+    max_chars: int = 0
+    max_delay_ms: float = 0.0
+    read_chunk_size: int = DEFAULT_READ_CHUNK_SIZE
+
+    def __post_init__(self):
+        if self.max_chars < 0:
+            raise ValueError("max_chars must be >= 0")
+        if self.max_delay_ms < 0:
+            raise ValueError("max_delay_ms must be >= 0")
+        if self.read_chunk_size <= 0:
+            raise ValueError("read_chunk_size must be > 0")
+
+    @property
+    def is_passthrough(self) -> bool:
+        """True if fragments are emitted without coalescing."""
+        return self.max_chars == 0 and self.max_delay_ms == 0
+
+    @classmethod
+    def for_ui(cls) -> "StreamBatchConfig":
+        """Batching suited to Streamlit re-renders (about 20 updates per second)."""
+        return cls(max_chars=256, max_delay_ms=50.0)
+
+
+@dataclass
+class StreamMetrics:
+    """Timing and volume metrics for a single stream."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    finished_at: float | None = None
+    fragments: int = 0
+    batches: int = 0
+    characters: int = 0
+    bytes_read: int = 0
+    records: int = 0
+    malformed_records: int = 0
+    eval_count: int | None = None
+    eval_duration_ns: int | None = None
+    prompt_eval_count: int | None = None
+    done: bool = False
+
+    def mark_fragment(self, text: str) -> None:
+        """Record arrival of a text fragment."""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.fragments += 1
+        self.characters += len(text)
+
+    def finish(self) -> None:
+        """Mark the stream as finished (idempotent)."""
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+
+    @property
+    def time_to_first_token_ms(self) -> float | None:
+        """Milliseconds from stream start until the first fragment arrived."""
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at) * 1000
+
+    @property
+    def duration_ms(self) -> float:
+        """Milliseconds from stream start until finish (or now if still running)."""
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return (end - self.started_at) * 1000
+
+    @property
+    def tokens(self) -> int:
+        """Generated token count, preferring the count reported by the server."""
+        return self.eval_count if self.eval_count is not None else self.fragments
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Client-observed generation rate after the first token."""
+        if self.first_token_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        elapsed = end - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return self.tokens / elapsed
+
+    @property
+    def server_tokens_per_second(self) -> float | None:
+        """Generation rate as reported by the server, if available."""
+        if not self.eval_count or not self.eval_duration_ns:
+            return None
+        return self.eval_count / (self.eval_duration_ns / 1e9)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert metrics to a JSON-serializable dictionary."""
+        return {
+            "time_to_first_token_ms": self.time_to_first_token_ms,
+            "duration_ms": self.duration_ms,
+            "tokens": self.tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "server_tokens_per_second": self.server_tokens_per_second,
+            "fragments": self.fragments,
+            "batches": self.batches,
+            "characters": self.characters,
+            "bytes_read": self.bytes_read,
+            "records": self.records,
+            "malformed_records": self.malformed_records,
+            "prompt_eval_count": self.prompt_eval_count,
+            "done": self.done,
+        }
+
+
+def iter_ndjson_records(
+    chunks: Iterable[bytes | str], metrics: StreamMetrics | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Frame newline-delimited JSON records from arbitrarily sized chunks.
+
+    Splitting happens on raw bytes, so multi-byte UTF-8 characters that straddle
+    chunk boundaries are decoded correctly. All complete lines of a chunk are
+    decoded with a single ``json.loads`` call; if that fails the lines are
+    decoded one by one and malformed lines are logged and skipped.
+
+    Args:
+        chunks: Raw response chunks (bytes or already decoded text)
+        metrics: Optional metrics to update with byte and record counts
+
+    Yields:
+        Dict for each complete JSON record
+    """
+    buffer = b""
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if metrics is not None:
+            metrics.bytes_read += len(chunk)
+
+        if b"\n" not in chunk:
+            buffer += chunk
+            continue
+
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        yield from _parse_lines(lines, metrics)
+
+    yield from _parse_lines([buffer], metrics)
+
+
+def _parse_lines(lines: list[bytes], metrics: StreamMetrics | None) -> list[dict[str, Any]]:
+    """Decode a group of NDJSON lines, batching them into one JSON array when possible."""
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return []
+
+    try:
+        records = json.loads(b"[" + b",".join(lines) + b"]")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        records = [_parse_record(line, metrics) for line in lines]
+        records = [r for r in records if r is not None]
+    else:
+        if metrics is not None:
+            metrics.records += len(records)
+
+    return [r for r in records if isinstance(r, dict)]
+
+
+def _parse_record(line: bytes, metrics: StreamMetrics | None) -> Any:
+    """Parse a single NDJSON line, returning None for malformed lines."""
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.warning(f"Failed to parse streaming response line: {line[:200]!r}")
+        if metrics is not None:
+            metrics.malformed_records += 1
+        return None
+    if metrics is not None:
+        metrics.records += 1
+    return record
+
+
+def iter_ollama_fragments(
+    records: Iterable[dict[str, Any]], metrics: StreamMetrics | None = None
+) -> Iterator[str]:
+    """
+    Extract text fragments from Ollama ``/api/generate`` stream records.
+
+    Stops at the record flagged ``done`` and copies its token statistics into metrics.
+    """
+    for record in records:
+        if "error" in record:
+            raise LLMProviderError(f"Ollama stream error: {record['error']}")
+
+        text = record.get("response")
+        if text:
+            yield text
+
+        if record.get("done", False):
+            if metrics is not None:
+                metrics.done = True
+                metrics.eval_count = record.get("eval_count")
+                metrics.eval_duration_ns = record.get("eval_duration")
+                metrics.prompt_eval_count = record.get("prompt_eval_count")
+            break
+
+
+def coalesce_fragments(
+    fragments: Iterable[str],
+    batch_config: StreamBatchConfig | None = None,
+    metrics: StreamMetrics | None = None,
+    clock: Callable[[], float] = time.perf_counter,
+) -> Iterator[str]:
+    """
+    Merge text fragments into size- or time-bounded batches.
+
+    Args:
+        fragments: Incoming text fragments
+        batch_config: Batch limits (defaults to passthrough)
+        metrics: Optional metrics to update per fragment and batch
+        clock: Monotonic clock in seconds (injectable for tests)
+
+    Yields:
+        Coalesced text batches
+    """
+    batch_config = batch_config or StreamBatchConfig()
+    metrics = metrics if metrics is not None else StreamMetrics()
+
+    try:
+        if batch_config.is_passthrough:
+            for text in fragments:
+                metrics.mark_fragment(text)
+                metrics.batches += 1
+                yield text
+            return
+
+        max_chars = batch_config.max_chars or float("inf")
+        max_delay = batch_config.max_delay_ms / 1000.0
+        pending: list[str] = []
+        pending_chars = 0
+        deadline = 0.0
+
+        for text in fragments:
+            metrics.mark_fragment(text)
+            if not pending:
+                deadline = clock() + max_delay
+            pending.append(text)
+            pending_chars += len(text)
+
+            if pending_chars >= max_chars or (max_delay and clock() >= deadline):
+                metrics.batches += 1
+                yield "".join(pending)
+                pending.clear()
+                pending_chars = 0
+
+        if pending:
+            metrics.batches += 1
+            yield "".join(pending)
+    finally:
+        metrics.finish()
+
+
+def ollama_text_stream(
+    chunks: Iterable[bytes | str],
+    batch_config: StreamBatchConfig | None = None,
+    metrics: StreamMetrics | None = None,
+) -> Iterator[str]:
+    """
+    Full pipeline from raw Ollama response chunks to coalesced text batches.
+
+    Args:
+        chunks: Raw response body chunks
+        batch_config: Batch limits (defaults to passthrough)
+        metrics: Metrics instance to populate
+
+    Returns:
+        Iterator over text batches
+    """
+    metrics = metrics if metrics is not None else StreamMetrics()
+    records = iter_ndjson_records(chunks, metrics)
+    return coalesce_fragments(iter_ollama_fragments(records, metrics), batch_config, metrics)
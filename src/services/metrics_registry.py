@@ -0,0 +1,427 @@
+"""
+Pre-aggregated metrics registry for GITTE system.
+Provides lock-free per-thread counters and log-linear histograms that are merged
+on scrape, interned label sets and Prometheus text exposition.
+"""
+
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelSet]
+
+NO_LABELS: LabelSet = ()
+
+# Histogram resolution: every power of two is split into this many buckets, so
+# a bucket spans at most 1/64 of its value and percentiles (reported at the
+# bucket midpoint) are within ~0.8% of the exact value
+SUB_BUCKETS = 64
+_ZERO_BUCKET = -(2 ** 31)  # values <= 0
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NAME_INVALID = re.compile(r"[^a-zA-Z0-9_:]")
+_LABEL_INVALID = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def bucket_index(value: float) -> int:
+    """Log-linear bucket of a value."""
+    if value <= 0:
+        return _ZERO_BUCKET
+    mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+    return exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def bucket_midpoint(index: int) -> float:
+    """Representative value of a bucket."""
+    if index == _ZERO_BUCKET:
+        return 0.0
+    exponent, sub_bucket = divmod(index, SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub_bucket + 0.5) / (2 * SUB_BUCKETS), exponent)
+
+
+class _HistogramCell:
+    """Histogram state owned by a single thread."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets: Dict[int, int] = {}
+
+
+class _ThreadShard:
+    """Per-thread metric buffers; only the owning thread writes to them."""
+
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.counters: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, _HistogramCell] = {}
+
+
+@dataclass
+class HistogramSnapshot:
+    """Merged view of one histogram series."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    buckets: Dict[int, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "HistogramSnapshot") -> None:
+        """Add another snapshot's observations to this one."""
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimate a percentile (0-100) from the buckets.
+
+        Exact at the extremes; within the bucket resolution everywhere else.
+        """
+        if not self.count:
+            return 0.0
+        if percentile <= 0:
+            return self.min
+        if percentile >= 100:
+            return self.max
+
+        rank = math.ceil(percentile / 100.0 * self.count)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(bucket_midpoint(index), self.min), self.max)
+        return self.max
+
+
+@dataclass
+class MetricsSnapshot:
+    """Point-in-time merge of all thread buffers."""
+
+    counters: Dict[SeriesKey, float] = field(default_factory=dict)
+    gauges: Dict[SeriesKey, float] = field(default_factory=dict)
+    histograms: Dict[SeriesKey, HistogramSnapshot] = field(default_factory=dict)
+    units: Dict[str, str] = field(default_factory=dict)
+
+    def counter_totals(self) -> Dict[str, float]:
+        """Counter values summed over all label sets."""
+        totals: Dict[str, float] = {}
+        for (name, _), value in self.counters.items():
+            totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def histogram_totals(self) -> Dict[str, HistogramSnapshot]:
+        """Histograms merged over all label sets."""
+        totals: Dict[str, HistogramSnapshot] = {}
+        for (name, _), histogram in self.histograms.items():
+            totals.setdefault(name, HistogramSnapshot()).merge(histogram)
+        return totals
+
+
+class MetricsRegistry:
+    """
+    Registry of counters, gauges and histograms.
+
+    Writers update buffers that belong to their own thread, so recording a
+    sample takes no lock and allocates nothing after the first sample of a
+    series. Scrapes merge all thread buffers; buffers of finished threads are
+    folded into a retired total so the number of buffers stays bounded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[_ThreadShard] = []
+        self._retired = _ThreadShard(None)
+        self._label_sets: Dict[LabelSet, LabelSet] = {}
+        self._gauges: Dict[SeriesKey, float] = {}
+        self._units: Dict[str, str] = {}
+
+    def labels(self, labels: Optional[Dict[str, str]]) -> LabelSet:
+        """
+        Intern a label dict as a sorted tuple.
+
+        Callers on hot paths can intern once and pass the result to
+        ``inc_interned`` and ``observe_interned`` to skip the conversion.
+        """
+        if not labels:
+            return NO_LABELS
+        label_set = tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+        return self._label_sets.setdefault(label_set, label_set)
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        """Increment a counter."""
+        key = (name, self.labels(labels) if labels else NO_LABELS)
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + value
+
+    def inc_interned(self, name: str, value: float, label_set: LabelSet) -> None:
+        """Increment a counter with an already interned label set."""
+        key = (name, label_set)
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + value
+
+    def set_gauge(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None, unit: str = ""
+    ) -> None:
+        """Set a gauge (last write wins)."""
+        if unit:
+            self._units[name] = unit
+        self._gauges[(name, self.labels(labels) if labels else NO_LABELS)] = value
+
+    def observe(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None, unit: str = ""
+    ) -> None:
+        """Record a histogram observation."""
+        if unit:
+            self._units[name] = unit
+        self.observe_interned(name, value, self.labels(labels) if labels else NO_LABELS)
+
+    def observe_interned(self, name: str, value: float, label_set: LabelSet) -> None:
+        """Record a histogram observation with an already interned label set."""
+        key = (name, label_set)
+        histograms = self._shard().histograms
+        cell = histograms.get(key)
+        if cell is None:
+            cell = histograms[key] = _HistogramCell()
+        cell.count += 1
+        cell.total += value
+        if value < cell.min:
+            cell.min = value
+        if value > cell.max:
+            cell.max = value
+        index = bucket_index(value)
+        buckets = cell.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Merge all thread buffers into a snapshot."""
+        with self._lock:
+            self._retire_finished_threads()
+            shards = [self._retired, *self._shards]
+            snapshot = MetricsSnapshot(gauges=dict(self._gauges), units=dict(self._units))
+
+            for shard in shards:
+                # Copies are single C-level operations, so they are consistent
+                # with respect to the (GIL-holding) writer thread
+                for key, value in list(shard.counters.items()):
+                    snapshot.counters[key] = snapshot.counters.get(key, 0) + value
+                for key, cell in list(shard.histograms.items()):
+                    histogram = snapshot.histograms.get(key)
+                    if histogram is None:
+                        histogram = snapshot.histograms[key] = HistogramSnapshot()
+                    buckets = dict(cell.buckets)
+                    # Count from the copied buckets so percentiles stay consistent
+                    # even if the owner recorded a sample mid-copy
+                    histogram.merge(
+                        HistogramSnapshot(
+                            sum(buckets.values()), cell.total, cell.min, cell.max, buckets
+                        )
+                    )
+            return snapshot
+
+    def clear(self) -> None:
+        """Drop all metrics. Threads start new buffers on their next sample."""
+        with self._lock:
+            self._local = threading.local()
+            self._shards = []
+            self._retired = _ThreadShard(None)
+            self._gauges = {}
+
+    def render_prometheus(
+        self, namespace: str = "gitte", quantiles: Iterable[float] = DEFAULT_QUANTILES
+    ) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        return render_prometheus(self.snapshot(), namespace, quantiles)
+
+    def _shard(self) -> _ThreadShard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _ThreadShard(threading.current_thread())
+            with self._lock:
+                # Fold exited threads here too, so short-lived threads (one per
+                # Streamlit rerun) do not grow the shard list between snapshots
+                self._retire_finished_threads()
+                self._shards.append(shard)
+                self._local.shard = shard
+            return shard
+
+    def _retire_finished_threads(self) -> None:
+        """Fold buffers of threads that have exited into the retired totals (lock held)."""
+        alive = []
+        for shard in self._shards:
+            if shard.thread is not None and shard.thread.is_alive():
+                alive.append(shard)
+                continue
+            retired = self._retired
+            for key, value in shard.counters.items():
+                retired.counters[key] = retired.counters.get(key, 0) + value
+            for key, cell in shard.histograms.items():
+                target = retired.histograms.get(key)
+                if target is None:
+                    retired.histograms[key] = cell
+                    continue
+                target.count += cell.count
+                target.total += cell.total
+                target.min = min(target.min, cell.min)
+                target.max = max(target.max, cell.max)
+                for index, count in cell.buckets.items():
+                    target.buckets[index] = target.buckets.get(index, 0) + count
+        self._shards = alive
+
+
+def _metric_name(namespace: str, name: str) -> str:
+    full_name = f"{namespace}_{name}" if namespace else name
+    full_name = _NAME_INVALID.sub("_", full_name)
+    return f"_{full_name}" if full_name[:1].isdigit() else full_name
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(label_set: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = [*label_set, *extra]
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        f'{_LABEL_INVALID.sub("_", name)}="'
+        + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        + '"'
+        for name, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+def render_prometheus(
+    snapshot: MetricsSnapshot,
+    namespace: str = "gitte",
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+) -> str:
+    """
+    Render a snapshot in the Prometheus text exposition format.
+
+    Histograms are exposed as summaries (quantiles plus ``_sum``/``_count``).
+    A histogram that shares its name with a counter or gauge is exposed with a
+    ``_distribution`` suffix to keep metric families unique.
+    """
+    quantiles = tuple(quantiles)
+    lines: List[str] = []
+    used_names = set()
+
+    def families(series: Dict[SeriesKey, object]) -> Dict[str, List[Tuple[LabelSet, object]]]:
+        grouped: Dict[str, List[Tuple[LabelSet, object]]] = {}
+        for (name, label_set), value in series.items():
+            grouped.setdefault(name, []).append((label_set, value))
+        return grouped
+
+    for metric_type, series in (("counter", snapshot.counters), ("gauge", snapshot.gauges)):
+        for name, samples in sorted(families(series).items()):
+            metric_name = _metric_name(namespace, name)
+            if metric_name in used_names:
+                continue
+            used_names.add(metric_name)
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for label_set, value in sorted(samples):
+                lines.append(f"{metric_name}{_format_labels(label_set)} {_format_value(value)}")
+
+    for name, samples in sorted(families(snapshot.histograms).items()):
+        metric_name = _metric_name(namespace, name)
+        if metric_name in used_names:
+            metric_name = f"{metric_name}_distribution"
+        used_names.add(metric_name)
+        unit = snapshot.units.get(name)
+        if unit:
+            lines.append(f"# HELP {metric_name} Unit: {unit}")
+        lines.append(f"# TYPE {metric_name} summary")
+        for label_set, histogram in sorted(samples, key=lambda sample: sample[0]):
+            for quantile in quantiles:
+                quantile_label = (("quantile", _format_value(float(quantile))),)
+                lines.append(
+                    f"{metric_name}{_format_labels(label_set, quantile_label)} "
+                    f"{_format_value(histogram.percentile(quantile * 100))}"
+                )
+            lines.append(f"{metric_name}_sum{_format_labels(label_set)} {_format_value(histogram.total)}")
+            lines.append(f"{metric_name}_count{_format_labels(label_set)} {histogram.count}")
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def start_metrics_server(
+    registry: MetricsRegistry,
+    port: int = 9464,
+    host: str = "127.0.0.1",
+    namespace: str = "gitte",
+) -> ThreadingHTTPServer:
+    """
+    Serve ``GET /metrics`` in a daemon thread.
+
+    Args:
+        registry: Registry to expose
+        port: Port to listen on (0 picks a free port)
+        host: Interface to bind; use "0.0.0.0" to let a Prometheus container scrape
+        namespace: Prefix for all metric names
+
+    Returns:
+        The running server; call ``shutdown()`` to stop it
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = registry.render_prometheus(namespace).encode("utf-8")
+            except Exception as e:
+                logger.error(f"Failed to render metrics: {e}")
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("metrics endpoint: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"Serving Prometheus metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,276 @@
+"""
+PALD Migration Service
+Streams PALD data to a new schema version in keyset-paginated chunks with bulk
+updates, per-chunk commits, resumable checkpoints and progress reporting.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src.data.models import PALDData, PALDSchemaVersion
+
+logger = logging.getLogger(__name__)
+
+# Bound the error list so memory stays constant on large databases
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class MigrationProgress:
+    """Running totals of a PALD migration; doubles as the resume checkpoint."""
+
+    target_schema_version: str
+    total_records: int = 0
+    processed: int = 0
+    successful_migrations: int = 0
+    invalid_records: int = 0
+    failed_migrations: int = 0
+    chunks: int = 0
+    last_id: str | None = None
+    dry_run: bool = False
+    elapsed_seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput over the run so far."""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert progress to dictionary."""
+        data = asdict(self)
+        data["rows_per_second"] = self.rows_per_second
+        return data
+
+
+class PALDMigrationService:
+    """
+    Migrates PALD data to a target schema version without loading it all at once.
+
+    Rows are paged by primary key (keyset pagination), validated with a
+    validator compiled once from the target schema and written back with one
+    bulk UPDATE per chunk. Every chunk is committed separately and recorded in an
+    optional checkpoint file, so an interrupted migration resumes where it stopped.
+    """
+
+    def __init__(self, db_session: Session, chunk_size: int = 500):
+        """
+        Initialize PALD migration service.
+
+        Args:
+            db_session: Database session
+            chunk_size: Rows per page, bulk UPDATE and commit
+        """
+        self.db_session = db_session
+        self.chunk_size = chunk_size
+
+    def migrate(
+        self,
+        target_schema_version: str,
+        dry_run: bool = False,
+        checkpoint_path: str | None = None,
+        progress_callback: Callable[[MigrationProgress], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Migrate all PALD data not yet on the target schema version.
+
+        Args:
+            target_schema_version: Schema version to migrate to
+            dry_run: Validate and report without writing anything
+            checkpoint_path: JSON file to resume from and record progress in
+            progress_callback: Called with the progress after every chunk
+
+        Returns:
+            Migration results (see MigrationProgress)
+
+        Raises:
+            ValueError: If the target schema version does not exist
+        """
+        target_schema = self.db_session.execute(
+            select(PALDSchemaVersion.schema_content).where(
+                PALDSchemaVersion.version == target_schema_version
+            )
+        ).scalar_one_or_none()
+
+        if target_schema is None:
+            raise ValueError(f"Schema version {target_schema_version} not found")
+
+        validator = Draft7Validator(target_schema)
+
+        progress = self._load_checkpoint(checkpoint_path, target_schema_version, dry_run)
+        progress.dry_run = dry_run
+        elapsed_before = progress.elapsed_seconds
+        start_time = time.perf_counter()
+
+        # Rows remaining after the checkpoint, plus those already processed
+        progress.total_records = progress.processed + self._count_remaining(
+            target_schema_version, progress.last_id
+        )
+
+        while True:
+            rows = self._fetch_chunk(target_schema_version, progress.last_id)
+            if not rows:
+                break
+
+            updates = self._validate_chunk(rows, validator, target_schema_version, progress)
+
+            if not dry_run:
+                if updates:
+                    self.db_session.execute(update(PALDData), updates)
+                self.db_session.commit()
+
+            progress.last_id = str(rows[-1][0])
+            progress.chunks += 1
+            progress.elapsed_seconds = elapsed_before + time.perf_counter() - start_time
+
+            if not dry_run:
+                self._save_checkpoint(checkpoint_path, progress)
+
+            logger.info(
+                f"PALD migration to {target_schema_version}: {progress.processed}/"
+                f"{progress.total_records} rows ({progress.rows_per_second:.0f} rows/s)"
+            )
+            if progress_callback:
+                progress_callback(progress)
+
+        if dry_run:
+            self.db_session.rollback()
+        elif checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        progress.elapsed_seconds = elapsed_before + time.perf_counter() - start_time
+
+        logger.info(
+            f"PALD data migration completed{' (dry run)' if dry_run else ''}: "
+            f"{progress.successful_migrations} successful, {progress.failed_migrations} failed, "
+            f"{progress.invalid_records} invalid against {target_schema_version}"
+        )
+
+        return progress.to_dict()
+
+    def _fetch_chunk(self, target_schema_version: str, last_id: str | None) -> list[tuple]:
+        """Fetch the next page of (id, pald_content) rows after ``last_id``."""
+        stmt = (
+            select(PALDData.id, PALDData.pald_content)
+            .where(PALDData.schema_version != target_schema_version)
+            .order_by(PALDData.id)
+            .limit(self.chunk_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(PALDData.id > self._parse_id(last_id))
+        return list(self.db_session.execute(stmt).all())
+
+    def _count_remaining(self, target_schema_version: str, last_id: str | None) -> int:
+        stmt = (
+            select(func.count())
+            .select_from(PALDData)
+            .where(PALDData.schema_version != target_schema_version)
+        )
+        if last_id is not None:
+            stmt = stmt.where(PALDData.id > self._parse_id(last_id))
+        return self.db_session.execute(stmt).scalar() or 0
+
+    def _validate_chunk(
+        self,
+        rows: list[tuple],
+        validator: Draft7Validator,
+        target_schema_version: str,
+        progress: MigrationProgress,
+    ) -> list[dict[str, Any]]:
+        """Validate a chunk and build the parameter sets for its bulk UPDATE."""
+        now = datetime.utcnow()
+        updates = []
+
+        for pald_id, pald_content in rows:
+            progress.processed += 1
+            try:
+                error = best_match(validator.iter_errors(pald_content))
+                errors = (
+                    [
+                        f"Validation error at {'.'.join(str(p) for p in error.absolute_path)}: "
+                        f"{error.message}"
+                    ]
+                    if error is not None
+                    else []
+                )
+            except Exception as e:
+                progress.failed_migrations += 1
+                if len(progress.errors) < MAX_REPORTED_ERRORS:
+                    progress.errors.append(f"Failed to migrate PALD {pald_id}: {str(e)}")
+                logger.error(f"Failed to migrate PALD data {pald_id}: {str(e)}")
+                continue
+
+            if errors:
+                progress.invalid_records += 1
+            progress.successful_migrations += 1
+            updates.append(
+                {
+                    "id": pald_id,
+                    "schema_version": target_schema_version,
+                    "is_validated": not errors,
+                    "validation_errors": {"errors": errors} if errors else None,
+                    "updated_at": now,
+                }
+            )
+
+        return updates
+
+    def _parse_id(self, value: str) -> Any:
+        """Convert a checkpointed id back to the column's Python type."""
+        python_type = PALDData.id.type.python_type
+        return python_type(value) if python_type is not str else value
+
+    def _load_checkpoint(
+        self, checkpoint_path: str | None, target_schema_version: str, dry_run: bool
+    ) -> MigrationProgress:
+        """Load the checkpoint for this target version, or start fresh."""
+        if dry_run or not checkpoint_path or not os.path.exists(checkpoint_path):
+            return MigrationProgress(target_schema_version=target_schema_version)
+
+        try:
+            with open(checkpoint_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable migration checkpoint {checkpoint_path}: {e}")
+            return MigrationProgress(target_schema_version=target_schema_version)
+
+        if data.get("target_schema_version") != target_schema_version:
+            logger.warning(
+                f"Ignoring migration checkpoint for {data.get('target_schema_version')}, "
+                f"target is {target_schema_version}"
+            )
+            return MigrationProgress(target_schema_version=target_schema_version)
+
+        data.pop("rows_per_second", None)
+        progress = MigrationProgress(**data)
+        logger.info(f"Resuming PALD migration after id {progress.last_id} ({progress.processed} rows done)")
+        return progress
+
+    def _save_checkpoint(self, checkpoint_path: str | None, progress: MigrationProgress) -> None:
+        """Write the checkpoint atomically (temp file + rename)."""
+        if not checkpoint_path:
+            return
+
+        directory = os.path.dirname(os.path.abspath(checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(progress.to_dict(), f)
+            os.replace(tmp_path, checkpoint_path)
+        except OSError as e:
+            logger.warning(f"Could not write migration checkpoint {checkpoint_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
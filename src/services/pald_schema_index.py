@@ -0,0 +1,296 @@
+"""
+Precompiled PALD schema index for GITTE system.
+Flattens a PALD JSON schema once into field paths, required paths and type
+checks so coverage, validation and diffing run in a single pass over the data.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any
+
+from jsonschema.validators import validator_for
+from jsonschema.exceptions import SchemaError, best_match
+
+from src.data.schemas import PALDCoverageMetrics, PALDDiff
+
+logger = logging.getLogger(__name__)
+
+# Keywords the single-pass checker implements; anything else falls back to jsonschema
+_CHECKED_KEYWORDS = {
+    "type", "properties", "required", "enum", "items",
+    "additionalProperties", "minimum", "maximum",
+}
+_ANNOTATION_KEYWORDS = {"$schema", "$id", "$comment", "title", "description", "default", "examples"}
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "null": lambda v: v is None,
+    "boolean": lambda v: isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (
+        (isinstance(v, int) and not isinstance(v, bool))
+        or (isinstance(v, float) and v.is_integer())
+    ),
+}
+
+
+def schema_checksum(schema: dict[str, Any]) -> str:
+    """Checksum of a schema (same as PALDSchemaRegistryService.get_schema_checksum)."""
+    schema_str = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(schema_str.encode("utf-8")).hexdigest()
+
+
+def _is_filled(value: Any) -> bool:
+    return value is not None and value != ""
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """Equality as JSON Schema defines it (booleans never equal numbers)."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    return a == b
+
+
+class _SchemaNode:
+    """Compiled form of one (sub)schema."""
+
+    __slots__ = (
+        "type_checks", "enum", "minimum", "maximum", "required", "additional_allowed",
+        "properties", "property_names", "items", "is_object", "checkable",
+    )
+
+    def __init__(self, schema: dict[str, Any], prefix: str, index: "PALDSchemaIndex", covered: bool):
+        schema_type = schema.get("type")
+        types = [schema_type] if isinstance(schema_type, str) else schema_type
+        unknown_keywords = set(schema) - _CHECKED_KEYWORDS - _ANNOTATION_KEYWORDS
+        additional = schema.get("additionalProperties", True)
+        items = schema.get("items")
+
+        self.checkable = (
+            not unknown_keywords
+            and (types is None or all(t in _TYPE_CHECKS for t in types))
+            and isinstance(additional, bool)
+            and (items is None or isinstance(items, dict))
+        )
+        self.type_checks = [_TYPE_CHECKS[t] for t in types] if self.checkable and types else None
+        self.enum = schema.get("enum")
+        self.minimum = schema.get("minimum")
+        self.maximum = schema.get("maximum")
+        self.required = tuple(schema.get("required", ()))
+        self.additional_allowed = additional is not False
+        # Coverage only descends into properties of nodes typed exactly "object"
+        self.is_object = schema_type == "object"
+
+        self.properties: list[tuple[str, str, _SchemaNode]] = []
+        for name, prop_schema in schema.get("properties", {}).items():
+            path = f"{prefix}.{name}" if prefix else name
+            child_covered = covered and self.is_object
+            if child_covered:
+                index.field_paths.append(path)
+                if name in self.required:
+                    index.required_paths.append(path)
+            self.properties.append(
+                (name, path, _SchemaNode(prop_schema, path, index, child_covered))
+            )
+        self.property_names = frozenset(name for name, _, _ in self.properties)
+        self.items = _SchemaNode(items, prefix, index, False) if isinstance(items, dict) else None
+
+        if not self.checkable:
+            index.fast_validation = False
+
+
+class PALDSchemaIndex:
+    """
+    Compiled PALD schema.
+
+    Precomputes the flattened field list used for coverage, the required paths
+    and a type-check tree. Schemas that only use the keywords PALD schemas need
+    are validated during the coverage walk; for any other schema the index keeps a
+    precompiled jsonschema validator. Error messages match ``jsonschema.validate``.
+    """
+
+    def __init__(self, schema: dict[str, Any], checksum: str | None = None):
+        """
+        Compile a schema.
+
+        Args:
+            schema: PALD JSON schema
+            checksum: Precomputed schema checksum
+        """
+        self.schema = schema
+        self.checksum = checksum or schema_checksum(schema)
+        self.field_paths: list[str] = []
+        self.required_paths: list[str] = []
+        self.fast_validation = True
+        self.schema_error: str | None = None
+
+        try:
+            # Same validator selection as jsonschema.validate ($schema, else latest draft)
+            validator_cls = validator_for(schema)
+            validator_cls.check_schema(schema)
+            self.validator: Any | None = validator_cls(schema)
+        except SchemaError as e:
+            self.validator = None
+            self.schema_error = str(e)
+
+        self.root = _SchemaNode(schema, "", self, covered=True)
+        self.sorted_field_paths = sorted(self.field_paths)
+        self.total_fields = len(self.field_paths)
+
+    def analyze(self, pald_data: dict[str, Any]) -> tuple[list[str], PALDCoverageMetrics]:
+        """
+        Validate and measure coverage of PALD data.
+
+        Returns:
+            (validation errors, coverage metrics); no errors means valid
+        """
+        completeness: dict[str, bool] = {}
+        filled: set[str] = set()
+        covering = self.root.is_object and isinstance(pald_data, dict)
+        valid = self._walk(self.root, pald_data, completeness, filled, covering)
+        return self._errors(pald_data, valid), self._coverage(completeness, filled)
+
+    def validate(self, pald_data: dict[str, Any]) -> list[str]:
+        """Validate PALD data; returns error messages (empty if valid)."""
+        if self.fast_validation and self.validator is not None:
+            valid = self._walk(self.root, pald_data, {}, set(), False)
+            return self._errors(pald_data, valid)
+        return self._errors(pald_data, False)
+
+    def coverage(self, pald_data: dict[str, Any]) -> PALDCoverageMetrics:
+        """Calculate coverage metrics for PALD data."""
+        return self.analyze(pald_data)[1]
+
+    def _walk(
+        self,
+        node: _SchemaNode,
+        value: Any,
+        completeness: dict[str, bool],
+        filled: set[str],
+        covering: bool,
+    ) -> bool:
+        """Check ``value`` against ``node``, recording coverage when ``covering``."""
+        valid = True
+
+        if node.type_checks is not None and not any(check(value) for check in node.type_checks):
+            valid = False
+        if node.enum is not None and not any(_json_equal(value, option) for option in node.enum):
+            valid = False
+        if (node.minimum is not None or node.maximum is not None) and _TYPE_CHECKS["number"](value):
+            if node.minimum is not None and value < node.minimum:
+                valid = False
+            if node.maximum is not None and value > node.maximum:
+                valid = False
+
+        if isinstance(value, dict):
+            for name in node.required:
+                if name not in value:
+                    valid = False
+            if not node.additional_allowed and not node.property_names.issuperset(value):
+                valid = False
+
+            for name, path, child in node.properties:
+                if name in value:
+                    child_value = value[name]
+                    child_covering = False
+                    if covering:
+                        is_filled = _is_filled(child_value)
+                        completeness[path] = is_filled
+                        if is_filled:
+                            filled.add(path)
+                            child_covering = child.is_object and isinstance(child_value, dict)
+                    if not self._walk(child, child_value, completeness, filled, child_covering):
+                        valid = False
+                elif covering:
+                    completeness[path] = False
+
+        elif isinstance(value, list) and node.items is not None:
+            for item in value:
+                if not self._walk(node.items, item, completeness, filled, False):
+                    valid = False
+
+        return valid
+
+    def _errors(self, pald_data: Any, fast_valid: bool) -> list[str]:
+        """Build error messages; only invalid data pays for full validation."""
+        if self.validator is None:
+            return [f"Unexpected validation error: {self.schema_error}"]
+        if self.fast_validation and fast_valid:
+            return []
+
+        try:
+            error = best_match(self.validator.iter_errors(pald_data))
+        except Exception as e:
+            return [f"Unexpected validation error: {str(e)}"]
+        if error is None:
+            return []
+        return [f"Validation error at {'.'.join(str(p) for p in error.absolute_path)}: {error.message}"]
+
+    def _coverage(self, completeness: dict[str, bool], filled: set[str]) -> PALDCoverageMetrics:
+        total_fields = self.total_fields
+        filled_fields = len(filled)
+        return PALDCoverageMetrics(
+            total_fields=total_fields,
+            filled_fields=filled_fields,
+            coverage_percentage=(filled_fields / total_fields * 100) if total_fields > 0 else 100.0,
+            missing_fields=[path for path in self.sorted_field_paths if path not in filled],
+            field_completeness=completeness,
+        )
+
+
+def diff_pald_data(pald_a: dict[str, Any], pald_b: dict[str, Any]) -> PALDDiff:
+    """
+    Compare two PALD data objects in a single pass over both.
+
+    Produces the same dotted-path classification as walking each side separately.
+    """
+    added: list[str] = []
+    removed: list[str] = []
+    modified: list[str] = []
+    unchanged: list[str] = []
+
+    def collect(data: dict[str, Any], prefix: str, into: list[str]) -> None:
+        for key, value in data.items():
+            path = f"{prefix}.{key}" if prefix else key
+            into.append(path)
+            if isinstance(value, dict):
+                collect(value, path, into)
+
+    def walk(a: dict[str, Any], b: dict[str, Any], prefix: str) -> None:
+        for key, value_a in a.items():
+            path = f"{prefix}.{key}" if prefix else key
+            if key not in b:
+                removed.append(path)
+                if isinstance(value_a, dict):
+                    collect(value_a, path, removed)
+                continue
+
+            value_b = b[key]
+            (unchanged if value_a == value_b else modified).append(path)
+            if isinstance(value_a, dict) and isinstance(value_b, dict):
+                walk(value_a, value_b, path)
+            elif isinstance(value_a, dict):
+                collect(value_a, path, removed)
+            elif isinstance(value_b, dict):
+                collect(value_b, path, added)
+
+        for key, value_b in b.items():
+            if key not in a:
+                path = f"{prefix}.{key}" if prefix else key
+                added.append(path)
+                if isinstance(value_b, dict):
+                    collect(value_b, path, added)
+
+    walk(pald_a, pald_b, "")
+
+    total_fields = len(added) + len(removed) + len(modified) + len(unchanged)
+    return PALDDiff(
+        added_fields=sorted(added),
+        removed_fields=sorted(removed),
+        modified_fields=sorted(modified),
+        unchanged_fields=sorted(unchanged),
+        similarity_score=len(unchanged) / total_fields if total_fields else 1.0,
+    )
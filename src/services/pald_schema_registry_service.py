@@ -3,22 +3,34 @@ PALD Schema Registry Service
 Service for managing PALD schema loading, caching, and versioning with runtime file support.
 """
 
-import hashlib
 import json
 import logging
 import os
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 from sqlalchemy.orm import Session
 
+from src.services.caching_service import invalidate_cache_tags, schema_cache_tag
+from src.services.pald_schema_index import PALDSchemaIndex, schema_checksum
+
 logger = logging.getLogger(__name__)
 
 
 class PALDSchemaRegistryService:
     """Service for managing PALD schema loading, caching, and versioning."""
     
+    # Compiled schema indexes are shared by all instances and keyed by checksum;
+    # schema dicts are treated as immutable once compiled
+    MAX_COMPILED_SCHEMAS = 32
+    _compiled_schemas: "OrderedDict[str, PALDSchemaIndex]" = OrderedDict()
+    _compiled_by_identity: dict[int, tuple[dict[str, Any], PALDSchemaIndex]] = {}
+    _compiled_by_version: dict[str, str] = {}
+    _compiled_lock = threading.Lock()
+    
     def __init__(self, db_session: Session = None, config=None):
         self.db_session = db_session
         self.config = config
@@ -107,6 +119,12 @@ class PALDSchemaRegistryService:
         """Cache schema with TTL and modification detection."""
         self._schema_cache[version] = schema
         self._cache_timestamps[version] = time.time()
+        previous_checksum = self._compiled_by_version.get(version)
+        compiled = self.get_compiled_schema(schema, version)
+        
+        # Schema content changed under the same version: drop results derived from it
+        if previous_checksum is not None and previous_checksum != compiled.checksum:
+            invalidate_cache_tags(schema_cache_tag(version), schema_cache_tag())
         
         # Store in database for persistence if available
         if self.db_session:
@@ -132,13 +150,74 @@ class PALDSchemaRegistryService:
                     
                     self.db_session.add(schema_version)
                     self.db_session.commit()
+                    invalidate_cache_tags(schema_cache_tag())
             except Exception as e:
                 logger.warning(f"Failed to store schema in database: {e}")
     
     def get_schema_checksum(self, schema: dict[str, Any]) -> str:
         """Calculate schema checksum for integrity verification."""
-        schema_str = json.dumps(schema, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(schema_str.encode('utf-8')).hexdigest()
+        return schema_checksum(schema)
+    
+    @classmethod
+    def get_compiled_schema(
+        cls, schema: dict[str, Any], version: str | None = None
+    ) -> PALDSchemaIndex:
+        """
+        Get the precompiled index for a schema, compiling it on first use.
+        
+        Args:
+            schema: PALD JSON schema
+            version: Schema version to associate with the compiled index
+            
+        Returns:
+            PALDSchemaIndex shared by every schema with the same checksum
+        """
+        with cls._compiled_lock:
+            entry = cls._compiled_by_identity.get(id(schema))
+            if entry is not None and entry[0] is schema:
+                if version is not None:
+                    cls._compiled_by_version[version] = entry[1].checksum
+                return entry[1]
+        
+        checksum = schema_checksum(schema)
+        with cls._compiled_lock:
+            index = cls._compiled_schemas.get(checksum)
+            if index is not None:
+                cls._compiled_schemas.move_to_end(checksum)
+        
+        if index is None:
+            index = PALDSchemaIndex(schema, checksum)
+            logger.debug(f"Compiled PALD schema index {checksum[:12]} ({index.total_fields} fields)")
+        
+        with cls._compiled_lock:
+            cls._compiled_schemas[checksum] = index
+            cls._compiled_schemas.move_to_end(checksum)
+            while len(cls._compiled_schemas) > cls.MAX_COMPILED_SCHEMAS:
+                cls._compiled_schemas.popitem(last=False)
+            
+            if len(cls._compiled_by_identity) >= cls.MAX_COMPILED_SCHEMAS:
+                cls._compiled_by_identity.clear()
+            # Keep a reference to the schema so its id cannot be reused
+            cls._compiled_by_identity[id(schema)] = (schema, index)
+            if version is not None:
+                cls._compiled_by_version[version] = checksum
+        
+        return index
+    
+    @classmethod
+    def get_compiled_schema_for_version(cls, version: str) -> PALDSchemaIndex | None:
+        """Get the compiled index previously associated with a schema version."""
+        with cls._compiled_lock:
+            checksum = cls._compiled_by_version.get(version)
+            return cls._compiled_schemas.get(checksum) if checksum else None
+    
+    @classmethod
+    def clear_compiled_schemas(cls) -> None:
+        """Drop all compiled schema indexes."""
+        with cls._compiled_lock:
+            cls._compiled_schemas.clear()
+            cls._compiled_by_identity.clear()
+            cls._compiled_by_version.clear()
     
     def detect_schema_file_changes(self, file_path: str) -> bool:
         """Detect if schema file has been modified since last load."""
@@ -10,12 +10,15 @@ from datetime import datetime
 from typing import Any
 
 import jsonschema
-from jsonschema import Draft7Validator, ValidationError, validate
+from jsonschema import Draft7Validator
 from sqlalchemy.orm import Session
 
 from config.config import config
 from src.data.models import PALDAttributeCandidate, PALDSchemaVersion
 from src.data.schemas import PALDCoverageMetrics, PALDDiff, PALDValidationResult
+from src.services.caching_service import invalidate_cache_tags, schema_cache_tag
+from src.services.pald_schema_index import diff_pald_data
+from src.services.pald_schema_registry_service import PALDSchemaRegistryService
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +88,7 @@ class PALDSchemaService:
         if is_active:
             self._current_schema_cache = None
             self._current_version_cache = None
+            invalidate_cache_tags(schema_cache_tag())
 
         logger.info(f"Created PALD schema version {version}, active: {is_active}")
         return schema_version
@@ -109,89 +113,20 @@ class PALDSchemaService:
         else:
             _, schema = self.get_current_schema()
 
-        errors = []
-        warnings = []
-
-        try:
-            validate(instance=pald_data, schema=schema)
-            is_valid = True
-        except ValidationError as e:
-            is_valid = False
-            errors.append(
-                f"Validation error at {'.'.join(str(p) for p in e.absolute_path)}: {e.message}"
-            )
-        except Exception as e:
-            is_valid = False
-            errors.append(f"Unexpected validation error: {str(e)}")
-
-        # Calculate coverage
-        coverage_metrics = self.calculate_coverage(pald_data, schema)
+        # Validation and coverage share one pass over the data
+        index = PALDSchemaRegistryService.get_compiled_schema(schema, schema_version)
+        errors, coverage_metrics = index.analyze(pald_data)
 
         return PALDValidationResult(
-            is_valid=is_valid,
+            is_valid=not errors,
             errors=errors,
-            warnings=warnings,
+            warnings=[],
             coverage_percentage=coverage_metrics.coverage_percentage,
         )
 
     def compare_pald_data(self, pald_a: dict[str, Any], pald_b: dict[str, Any]) -> PALDDiff:
         """Compare two PALD data objects and return differences."""
-
-        def get_all_keys(data: dict[str, Any], prefix: str = "") -> set:
-            """Recursively get all keys from nested dictionary."""
-            keys = set()
-            for key, value in data.items():
-                full_key = f"{prefix}.{key}" if prefix else key
-                keys.add(full_key)
-                if isinstance(value, dict):
-                    keys.update(get_all_keys(value, full_key))
-            return keys
-
-        def get_value_at_path(data: dict[str, Any], path: str) -> Any:
-            """Get value at nested path."""
-            keys = path.split(".")
-            current = data
-            for key in keys:
-                if isinstance(current, dict) and key in current:
-                    current = current[key]
-                else:
-                    return None
-            return current
-
-        keys_a = get_all_keys(pald_a)
-        keys_b = get_all_keys(pald_b)
-
-        added_fields = list(keys_b - keys_a)
-        removed_fields = list(keys_a - keys_b)
-        common_fields = keys_a & keys_b
-
-        modified_fields = []
-        unchanged_fields = []
-
-        for field in common_fields:
-            value_a = get_value_at_path(pald_a, field)
-            value_b = get_value_at_path(pald_b, field)
-
-            if value_a != value_b:
-                modified_fields.append(field)
-            else:
-                unchanged_fields.append(field)
-
-        # Calculate similarity score
-        total_fields = len(keys_a | keys_b)
-        if total_fields == 0:
-            similarity_score = 1.0
-        else:
-            unchanged_count = len(unchanged_fields)
-            similarity_score = unchanged_count / total_fields
-
-        return PALDDiff(
-            added_fields=sorted(added_fields),
-            removed_fields=sorted(removed_fields),
-            modified_fields=sorted(modified_fields),
-            unchanged_fields=sorted(unchanged_fields),
-            similarity_score=similarity_score,
-        )
+        return diff_pald_data(pald_a, pald_b)
 
     def calculate_coverage(
         self, pald_data: dict[str, Any], schema: dict[str, Any] | None = None
@@ -200,75 +135,7 @@ class PALDSchemaService:
         if schema is None:
             _, schema = self.get_current_schema()
 
-        def get_required_fields(schema_obj: dict[str, Any], prefix: str = "") -> set:
-            """Get all required fields from schema."""
-            fields = set()
-
-            if schema_obj.get("type") == "object":
-                properties = schema_obj.get("properties", {})
-                schema_obj.get("required", [])
-
-                for prop_name, prop_schema in properties.items():
-                    full_name = f"{prefix}.{prop_name}" if prefix else prop_name
-                    fields.add(full_name)
-
-                    if prop_schema.get("type") == "object":
-                        fields.update(get_required_fields(prop_schema, full_name))
-
-            return fields
-
-        def get_filled_fields(data: dict[str, Any], prefix: str = "") -> set:
-            """Get all filled fields from data."""
-            fields = set()
-            for key, value in data.items():
-                full_key = f"{prefix}.{key}" if prefix else key
-                if value is not None and value != "":
-                    fields.add(full_key)
-                    if isinstance(value, dict):
-                        fields.update(get_filled_fields(value, full_key))
-            return fields
-
-        def check_field_completeness(
-            data: dict[str, Any], schema_obj: dict[str, Any], prefix: str = ""
-        ) -> dict[str, bool]:
-            """Check completeness of each field."""
-            completeness = {}
-
-            if schema_obj.get("type") == "object":
-                properties = schema_obj.get("properties", {})
-
-                for prop_name, prop_schema in properties.items():
-                    full_name = f"{prefix}.{prop_name}" if prefix else prop_name
-                    value = data.get(prop_name)
-
-                    if value is not None and value != "":
-                        completeness[full_name] = True
-                        if isinstance(value, dict) and prop_schema.get("type") == "object":
-                            completeness.update(
-                                check_field_completeness(value, prop_schema, full_name)
-                            )
-                    else:
-                        completeness[full_name] = False
-
-            return completeness
-
-        total_fields_set = get_required_fields(schema)
-        filled_fields_set = get_filled_fields(pald_data)
-        field_completeness = check_field_completeness(pald_data, schema)
-
-        total_fields = len(total_fields_set)
-        filled_fields = len(filled_fields_set & total_fields_set)
-
-        coverage_percentage = (filled_fields / total_fields * 100) if total_fields > 0 else 100.0
-        missing_fields = list(total_fields_set - filled_fields_set)
-
-        return PALDCoverageMetrics(
-            total_fields=total_fields,
-            filled_fields=filled_fields,
-            coverage_percentage=coverage_percentage,
-            missing_fields=sorted(missing_fields),
-            field_completeness=field_completeness,
-        )
+        return PALDSchemaRegistryService.get_compiled_schema(schema).coverage(pald_data)
 
     def _get_default_schema(self) -> dict[str, Any]:
         """Get the default PALD schema."""
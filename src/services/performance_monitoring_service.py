@@ -7,15 +7,21 @@ import logging
 import time
 import threading
 from collections import defaultdict, deque
-from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 import psutil
 import asyncio
 
+from src.services.metrics_registry import (
+    HistogramSnapshot,
+    LabelSet,
+    MetricsRegistry,
+    start_metrics_server as _start_metrics_server,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +44,7 @@ class PerformanceMetric:
     unit: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class TimingResult:
     """Result of timing measurement."""
     operation: str
@@ -82,14 +88,13 @@ class PerformanceMonitoringService:
             thresholds: Performance thresholds for alerting
         """
         self.thresholds = thresholds or PerformanceThresholds()
-        self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
         self.timings: deque = deque(maxlen=10000)
         self.resource_history: deque = deque(maxlen=1440)  # 24 hours at 1-minute intervals
         
-        # Performance counters
-        self.counters: Dict[str, int] = defaultdict(int)
-        self.gauges: Dict[str, float] = defaultdict(float)
-        self.histograms: Dict[str, List[float]] = defaultdict(list)
+        # Pre-aggregated counters, gauges and histograms (lock-free per-thread buffers)
+        self.registry = MetricsRegistry()
+        self._timed_operations: Dict[str, None] = {}
+        self._status_label_sets: Dict[Tuple[LabelSet, bool], LabelSet] = {}
         
         # Monitoring state
         self._monitoring_active = False
@@ -148,93 +153,118 @@ class PerformanceMonitoringService:
             labels: Optional labels for the metric
             unit: Unit of measurement
         """
-        metric = PerformanceMetric(
-            name=name,
-            metric_type=metric_type,
-            value=value,
-            timestamp=datetime.now(),
-            labels=labels or {},
-            unit=unit
-        )
-        
-        with self._lock:
-            self.metrics[name].append(metric)
-            
-            # Update aggregated metrics
-            if metric_type == MetricType.COUNTER:
-                self.counters[name] += value
-            elif metric_type == MetricType.GAUGE:
-                self.gauges[name] = value
-            elif metric_type == MetricType.HISTOGRAM:
-                self.histograms[name].append(value)
-                # Keep only last 1000 values
-                if len(self.histograms[name]) > 1000:
-                    self.histograms[name] = self.histograms[name][-1000:]
+        if metric_type == MetricType.COUNTER:
+            self.registry.inc(name, value, labels)
+        elif metric_type == MetricType.GAUGE:
+            self.registry.set_gauge(name, value, labels, unit)
+        else:
+            self.registry.observe(name, value, labels, unit)
     
     def increment_counter(self, name: str, value: int = 1, labels: Dict[str, str] = None):
         """Increment a counter metric."""
-        self.record_metric(name, value, MetricType.COUNTER, labels)
+        self.registry.inc(name, value, labels)
     
     def set_gauge(self, name: str, value: float, labels: Dict[str, str] = None, unit: str = ""):
         """Set a gauge metric."""
-        self.record_metric(name, value, MetricType.GAUGE, labels, unit)
+        self.registry.set_gauge(name, value, labels, unit)
     
     def record_histogram(self, name: str, value: float, labels: Dict[str, str] = None, unit: str = ""):
         """Record a histogram value."""
-        self.record_metric(name, value, MetricType.HISTOGRAM, labels, unit)
+        self.registry.observe(name, value, labels, unit)
+    
+    @property
+    def counters(self) -> Dict[str, float]:
+        """Counter totals by name (summed over labels)."""
+        return defaultdict(int, self.registry.snapshot().counter_totals())
+    
+    @property
+    def gauges(self) -> Dict[str, float]:
+        """Gauge values by name."""
+        gauges = defaultdict(float)
+        for (name, _), value in self.registry.snapshot().gauges.items():
+            gauges[name] = value
+        return gauges
     
-    @contextmanager
-    def time_operation(self, operation: str, labels: Dict[str, str] = None):
+    @property
+    def histograms(self) -> Dict[str, HistogramSnapshot]:
+        """Histograms by name (merged over labels); ``len()`` is the sample count."""
+        return defaultdict(HistogramSnapshot, self.registry.snapshot().histogram_totals())
+    
+    def time_operation(self, operation: str, labels: Dict[str, str] = None) -> "_OperationTimer":
         """
         Context manager for timing operations.
         
+        Yields a metadata dict that is attached to the recorded TimingResult.
+        
         Args:
             operation: Name of the operation being timed
             labels: Optional labels for the timing metric
         """
-        start_time = time.time()
-        success = True
-        error = None
-        metadata = {}
+        return _OperationTimer(self, operation, labels)
+    
+    def record_timing(
+        self,
+        operation: str,
+        duration_ms: float,
+        success: bool = True,
+        labels: Dict[str, str] = None,
+        error: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Record a timed operation: a TimingResult, a duration histogram and a
+        success/failure counter.
         
-        try:
-            yield metadata
-        except Exception as e:
-            success = False
-            error = str(e)
-            raise
-        finally:
-            duration_ms = (time.time() - start_time) * 1000
-            
-            timing_result = TimingResult(
-                operation=operation,
-                duration_ms=duration_ms,
-                success=success,
-                error=error,
-                metadata=metadata
-            )
-            
-            with self._lock:
-                self.timings.append(timing_result)
-            
-            # Record as histogram metric
-            self.record_histogram(
-                f"{operation}_duration_ms",
-                duration_ms,
-                labels,
-                "milliseconds"
+        Args:
+            operation: Name of the operation
+            duration_ms: Duration in milliseconds
+            success: Whether the operation succeeded
+            labels: Optional labels for the metrics
+            error: Error message if the operation failed
+            metadata: Additional timing metadata
+        """
+        self.timings.append(TimingResult(
+            operation=operation,
+            duration_ms=duration_ms,
+            success=success,
+            error=error,
+            metadata=metadata if metadata is not None else {}
+        ))
+        
+        if operation not in self._timed_operations:
+            self._timed_operations[operation] = None
+            self.registry.observe(f"{operation}_duration_ms", duration_ms, labels, "milliseconds")
+        else:
+            label_set = self.registry.labels(labels)
+            self.registry.observe_interned(f"{operation}_duration_ms", duration_ms, label_set)
+        
+        self.registry.inc_interned(f"{operation}_total", 1, self._status_labels(labels, success))
+        
+        # Check performance thresholds
+        if duration_ms > self.thresholds.max_response_time_ms:
+            logger.warning(
+                f"Operation {operation} exceeded response time threshold: "
+                f"{duration_ms:.2f}ms > {self.thresholds.max_response_time_ms}ms"
             )
-            
-            # Record success/failure counter
-            status_labels = {**(labels or {}), "success": str(success)}
-            self.increment_counter(f"{operation}_total", 1, status_labels)
-            
-            # Check performance thresholds
-            if duration_ms > self.thresholds.max_response_time_ms:
-                logger.warning(
-                    f"Operation {operation} exceeded response time threshold: "
-                    f"{duration_ms:.2f}ms > {self.thresholds.max_response_time_ms}ms"
-                )
+    
+    def _status_labels(self, labels: Optional[Dict[str, str]], success: bool) -> LabelSet:
+        """Interned label set of an operation counter (labels plus success flag)."""
+        key = (self.registry.labels(labels), success)
+        label_set = self._status_label_sets.get(key)
+        if label_set is None:
+            label_set = self.registry.labels({**(labels or {}), "success": str(success)})
+            self._status_label_sets[key] = label_set
+        return label_set
+    
+    def render_prometheus(self, namespace: str = "gitte") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        return self.registry.render_prometheus(namespace)
+    
+    def reset_metrics(self):
+        """Drop all recorded metrics and timings."""
+        self.registry.clear()
+        self.timings.clear()
+        self._timed_operations.clear()
     
     def get_resource_usage(self) -> ResourceUsage:
         """Get current system resource usage."""
@@ -288,6 +318,10 @@ class PerformanceMonitoringService:
         """
         Get performance summary for the specified time period.
         
+        Timing statistics come from the pre-aggregated duration histograms and
+        cover every operation since the service started (or was reset); the
+        time period applies to resource statistics.
+        
         Args:
             hours: Number of hours to look back
             
@@ -296,28 +330,22 @@ class PerformanceMonitoringService:
         """
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
-        # Filter recent timings
-        recent_timings = [
-            t for t in self.timings 
-            if t.metadata.get('timestamp', datetime.now()) > cutoff_time
-        ]
-        
         # Calculate timing statistics
         timing_stats = {}
-        if recent_timings:
-            operations = defaultdict(list)
-            for timing in recent_timings:
-                operations[timing.operation].append(timing.duration_ms)
-            
-            for operation, durations in operations.items():
-                timing_stats[operation] = {
-                    "count": len(durations),
-                    "avg_ms": sum(durations) / len(durations),
-                    "min_ms": min(durations),
-                    "max_ms": max(durations),
-                    "p95_ms": self._percentile(durations, 95),
-                    "p99_ms": self._percentile(durations, 99)
-                }
+        histograms = self.registry.snapshot().histogram_totals()
+        for operation in list(self._timed_operations):
+            durations = histograms.get(f"{operation}_duration_ms")
+            if not durations:
+                continue
+            timing_stats[operation] = {
+                "count": durations.count,
+                "avg_ms": durations.mean,
+                "min_ms": durations.min,
+                "max_ms": durations.max,
+                "p50_ms": durations.percentile(50),
+                "p95_ms": durations.percentile(95),
+                "p99_ms": durations.percentile(99)
+            }
         
         # Get recent resource usage
         recent_resources = [
@@ -352,7 +380,7 @@ class PerformanceMonitoringService:
             "time_period_hours": hours,
             "timing_stats": timing_stats,
             "resource_stats": resource_stats,
-            "total_operations": len(recent_timings),
+            "total_operations": sum(stats["count"] for stats in timing_stats.values()),
             "cache_stats": self.get_cache_stats(),
             "thresholds": {
                 "max_response_time_ms": self.thresholds.max_response_time_ms,
@@ -450,16 +478,35 @@ class PerformanceMonitoringService:
         for key in expired_keys:
             self._cache.pop(key, None)
             self._cache_timestamps.pop(key, None)
+
+
+
+class _OperationTimer:
+    """Context manager returned by PerformanceMonitoringService.time_operation."""
     
-    def _percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile of values."""
-        if not values:
-            return 0.0
-        
-        sorted_values = sorted(values)
-        index = int((percentile / 100.0) * len(sorted_values))
-        index = min(index, len(sorted_values) - 1)
-        return sorted_values[index]
+    __slots__ = ("monitor", "operation", "labels", "metadata", "start_time")
+    
+    def __init__(self, monitor: PerformanceMonitoringService, operation: str, labels: Optional[Dict[str, str]]):
+        self.monitor = monitor
+        self.operation = operation
+        self.labels = labels
+    
+    def __enter__(self) -> Dict[str, Any]:
+        self.metadata: Dict[str, Any] = {}
+        self.start_time = time.perf_counter()
+        return self.metadata
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration_ms = (time.perf_counter() - self.start_time) * 1000
+        self.monitor.record_timing(
+            self.operation,
+            duration_ms,
+            success=exc_type is None,
+            labels=self.labels,
+            error=str(exc) if exc is not None else None,
+            metadata=self.metadata
+        )
+        return False
 
 
 # Global performance monitoring service instance
@@ -494,7 +541,7 @@ def monitor_async_performance(operation: str, labels: Dict[str, str] = None):
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             success = True
             error = None
             
@@ -506,19 +553,10 @@ def monitor_async_performance(operation: str, labels: Dict[str, str] = None):
                 error = str(e)
                 raise
             finally:
-                duration_ms = (time.time() - start_time) * 1000
-                
-                # Record timing
-                performance_monitor.record_histogram(
-                    f"{operation}_duration_ms",
-                    duration_ms,
-                    labels,
-                    "milliseconds"
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                performance_monitor.record_timing(
+                    operation, duration_ms, success=success, labels=labels, error=error
                 )
-                
-                # Record success/failure
-                status_labels = {**(labels or {}), "success": str(success)}
-                performance_monitor.increment_counter(f"{operation}_total", 1, status_labels)
         
         return wrapper
     return decorator
@@ -562,6 +600,16 @@ def get_performance_summary(hours: int = 1) -> Dict[str, Any]:
     return performance_monitor.get_performance_summary(hours)
 
 
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1"):
+    """
+    Serve the global metrics at ``http://<host>:<port>/metrics`` for Prometheus.
+    
+    Returns:
+        The running HTTP server; call ``shutdown()`` to stop it
+    """
+    return _start_metrics_server(performance_monitor.registry, port=port, host=host)
+
+
 def start_performance_monitoring(interval_seconds: int = 60):
     """Start continuous performance monitoring."""
     performance_monitor.start_monitoring(interval_seconds)
@@ -5,11 +5,14 @@ Handles user session creation, validation, and cleanup.
 
 import logging
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
 from config.config import config
+from src.services.session_store import SessionStore, SessionTouch, create_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +21,45 @@ class SessionManager:
     """
     Session management service.
 
-    In a production system, this would typically use Redis or another
-    persistent session store. For development, we use in-memory storage.
+    Sessions live in a pluggable store: in-memory for a single process, or the
+    database so that all application replicas share them. Access times and
+    sliding expiry refreshes are buffered and written in one batch per refresh
+    interval (immediately when a session is close to expiring), and expired
+    sessions are purged incrementally in bounded chunks.
     """
 
-    def __init__(self):
-        # In-memory session storage (use Redis in production)
-        self._sessions: dict[str, dict[str, Any]] = {}
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        refresh_interval_seconds: float | None = None,
+        cleanup_batch_size: int = 500,
+    ):
+        """
+        Initialize the session manager.
+
+        Args:
+            store: Session store; defaults to the one named by
+                ``config.security.session_store``
+            refresh_interval_seconds: Maximum delay before buffered access and
+                refresh updates are written to the store
+            cleanup_batch_size: Maximum expired sessions purged per cleanup pass
+        """
+        self._store = store or create_session_store(config.security.session_store)
         self._session_timeout = timedelta(hours=config.security.session_timeout_hours)
+        if refresh_interval_seconds is None:
+            refresh_interval_seconds = config.security.session_refresh_interval_seconds
+        self._refresh_interval = timedelta(seconds=refresh_interval_seconds)
+        self._cleanup_batch_size = cleanup_batch_size
+
+        self._lock = threading.Lock()
+        self._pending_touches: dict[str, SessionTouch] = {}
+        self._last_flush = time.monotonic()
+        self._last_cleanup = time.monotonic()
+
+    @property
+    def store(self) -> SessionStore:
+        """The session store."""
+        return self._store
 
     def create_session(self, user_id: UUID, user_role: str) -> dict[str, Any]:
         """
@@ -43,20 +77,22 @@ class SessionManager:
             session_id = self._generate_session_id()
 
             # Create session data
+            now = datetime.utcnow()
             session_data = {
                 "session_id": session_id,
                 "user_id": user_id,
                 "user_role": user_role,
-                "created_at": datetime.utcnow(),
-                "last_accessed": datetime.utcnow(),
-                "expires_at": datetime.utcnow() + self._session_timeout,
+                "created_at": now,
+                "last_accessed": now,
+                "expires_at": now + self._session_timeout,
             }
 
             # Store session
-            self._sessions[session_id] = session_data
+            self._store.add(session_data)
 
-            # Clean up expired sessions
-            self._cleanup_expired_sessions()
+            # Purge a chunk of expired sessions at most once per refresh interval
+            if time.monotonic() - self._last_cleanup >= self._refresh_interval.total_seconds():
+                self._cleanup_expired_sessions()
 
             logger.info(f"Session created for user {user_id}: {session_id}")
 
@@ -77,17 +113,21 @@ class SessionManager:
             Dict containing session data or None if invalid/expired
         """
         try:
-            session_data = self._sessions.get(session_id)
+            session_data = self._store.get(session_id)
             if not session_data:
                 return None
+            stored_expiry = session_data["expires_at"]
+            self._apply_pending(session_data)
 
             # Check if session is expired
-            if datetime.utcnow() > session_data["expires_at"]:
+            now = datetime.utcnow()
+            if now > session_data["expires_at"]:
                 self.invalidate_session(session_id)
                 return None
 
-            # Update last accessed time
-            session_data["last_accessed"] = datetime.utcnow()
+            # Update last accessed time (written with the next batch)
+            session_data["last_accessed"] = now
+            self._queue_touch(session_id, now, None, stored_expiry)
 
             return session_data
 
@@ -106,8 +146,9 @@ class SessionManager:
             bool: True if session was invalidated
         """
         try:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
+            with self._lock:
+                self._pending_touches.pop(session_id, None)
+            if self._store.delete(session_id):
                 logger.info(f"Session invalidated: {session_id}")
                 return True
             return False
@@ -127,13 +168,13 @@ class SessionManager:
             bool: True if session was refreshed
         """
         try:
-            session_data = self._sessions.get(session_id)
+            session_data = self._store.get(session_id)
             if not session_data:
                 return False
 
-            # Update expiration time
-            session_data["expires_at"] = datetime.utcnow() + self._session_timeout
-            session_data["last_accessed"] = datetime.utcnow()
+            # Update expiration time (written with the next batch)
+            now = datetime.utcnow()
+            self._queue_touch(session_id, now, now + self._session_timeout, session_data["expires_at"])
 
             logger.debug(f"Session refreshed: {session_id}")
             return True
@@ -153,17 +194,9 @@ class SessionManager:
             int: Number of sessions invalidated
         """
         try:
-            sessions_to_remove = []
-
-            for session_id, session_data in self._sessions.items():
-                if session_data["user_id"] == user_id:
-                    sessions_to_remove.append(session_id)
-
-            for session_id in sessions_to_remove:
-                del self._sessions[session_id]
-
-            logger.info(f"Invalidated {len(sessions_to_remove)} sessions for user {user_id}")
-            return len(sessions_to_remove)
+            removed = self._store.delete_user(user_id)
+            logger.info(f"Invalidated {removed} sessions for user {user_id}")
+            return removed
 
         except Exception as e:
             logger.error(f"Failed to invalidate sessions for user {user_id}: {e}")
@@ -177,8 +210,8 @@ class SessionManager:
             int: Number of active sessions
         """
         try:
-            self._cleanup_expired_sessions()
-            return len(self._sessions)
+            self.flush_pending_refreshes()
+            return self._store.count_active(datetime.utcnow())
 
         except Exception as e:
             logger.error(f"Failed to get active sessions count: {e}")
@@ -196,12 +229,13 @@ class SessionManager:
         """
         try:
             user_sessions = []
+            now = datetime.utcnow()
 
-            for session_data in self._sessions.values():
-                if session_data["user_id"] == user_id:
-                    # Check if session is still valid
-                    if datetime.utcnow() <= session_data["expires_at"]:
-                        user_sessions.append(session_data)
+            for session_data in self._store.get_user_sessions(user_id):
+                self._apply_pending(session_data)
+                # Check if session is still valid
+                if now <= session_data["expires_at"]:
+                    user_sessions.append(session_data)
 
             return user_sessions
 
@@ -219,28 +253,76 @@ class SessionManager:
         # Generate a cryptographically secure random session ID
         return secrets.token_urlsafe(32)
 
-    def _cleanup_expired_sessions(self) -> int:
+    def flush_pending_refreshes(self) -> int:
         """
-        Clean up expired sessions.
+        Write buffered access times and expiry refreshes to the store.
 
         Returns:
-            int: Number of sessions cleaned up
+            int: Number of sessions updated
         """
+        with self._lock:
+            touches, self._pending_touches = self._pending_touches, {}
+            self._last_flush = time.monotonic()
+        if not touches:
+            return 0
+
         try:
-            current_time = datetime.utcnow()
-            expired_sessions = []
+            return self._store.touch_many(touches)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(touches)} session refreshes: {e}")
+            # Keep the updates for the next flush unless newer ones arrived
+            with self._lock:
+                for session_id, touch in touches.items():
+                    self._pending_touches.setdefault(session_id, touch)
+            return 0
 
-            for session_id, session_data in self._sessions.items():
-                if current_time > session_data["expires_at"]:
-                    expired_sessions.append(session_id)
+    def _queue_touch(
+        self,
+        session_id: str,
+        last_accessed: datetime,
+        expires_at: datetime | None,
+        stored_expiry: datetime,
+    ) -> None:
+        """Buffer an access/refresh and flush if the batch is due or the session is about to expire."""
+        with self._lock:
+            pending = self._pending_touches.get(session_id)
+            if pending and pending[1] and (expires_at is None or pending[1] > expires_at):
+                expires_at = pending[1]
+            self._pending_touches[session_id] = (last_accessed, expires_at)
+            flush_due = time.monotonic() - self._last_flush >= self._refresh_interval.total_seconds()
+
+        # A refresh must reach the store before the stored expiry passes
+        expiring = expires_at is not None and stored_expiry - last_accessed <= self._refresh_interval
+        if flush_due or expiring:
+            self.flush_pending_refreshes()
+
+    def _apply_pending(self, session_data: dict[str, Any]) -> None:
+        """Overlay buffered updates onto session data read from the store."""
+        with self._lock:
+            pending = self._pending_touches.get(session_data["session_id"])
+        if pending:
+            last_accessed, expires_at = pending
+            session_data["last_accessed"] = max(session_data["last_accessed"], last_accessed)
+            if expires_at and expires_at > session_data["expires_at"]:
+                session_data["expires_at"] = expires_at
 
-            for session_id in expired_sessions:
-                del self._sessions[session_id]
+    def _cleanup_expired_sessions(self) -> int:
+        """
+        Clean up a bounded chunk of expired sessions.
+
+        Returns:
+            int: Number of sessions cleaned up
+        """
+        try:
+            # Pending refreshes may have extended sessions that look expired in the store
+            self.flush_pending_refreshes()
+            self._last_cleanup = time.monotonic()
+            removed = self._store.purge_expired(datetime.utcnow(), limit=self._cleanup_batch_size)
 
-            if expired_sessions:
-                logger.debug(f"Cleaned up {len(expired_sessions)} expired sessions")
+            if removed:
+                logger.debug(f"Cleaned up {removed} expired sessions")
 
-            return len(expired_sessions)
+            return removed
 
         except Exception as e:
             logger.error(f"Failed to cleanup expired sessions: {e}")
@@ -254,8 +336,9 @@ class SessionManager:
             int: Number of sessions cleaned up
         """
         try:
-            session_count = len(self._sessions)
-            self._sessions.clear()
+            with self._lock:
+                self._pending_touches.clear()
+            session_count = self._store.clear()
             logger.info(f"Cleaned up all {session_count} sessions")
             return session_count
 
@@ -0,0 +1,302 @@
+"""
+Session stores for GITTE system.
+Provides the in-memory store for single-process deployments and a database
+store (SQLite/PostgreSQL via SQLAlchemy) that all application replicas share.
+"""
+
+import heapq
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.engine import Engine
+
+from src.data.models import UserSession
+
+logger = logging.getLogger(__name__)
+
+# Touch tuple: (last_accessed, new expires_at or None to keep the current expiry)
+SessionTouch = tuple[datetime, datetime | None]
+
+
+class SessionStore(ABC):
+    """
+    Storage backend of the SessionManager.
+
+    Sessions are plain dicts with the keys session_id, user_id, user_role,
+    created_at, last_accessed and expires_at (naive UTC datetimes). Stores
+    return copies; changes only take effect through the store methods.
+    """
+
+    @abstractmethod
+    def add(self, session: dict[str, Any]) -> None:
+        """Store a new session."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        """Get a session (expired or not) by ID."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns True if it existed."""
+
+    @abstractmethod
+    def delete_user(self, user_id: Any) -> int:
+        """Delete all sessions of a user; returns how many were deleted."""
+
+    @abstractmethod
+    def get_user_sessions(self, user_id: Any) -> list[dict[str, Any]]:
+        """Get all sessions (expired or not) of a user."""
+
+    @abstractmethod
+    def touch_many(self, touches: dict[str, SessionTouch]) -> int:
+        """
+        Apply batched access/refresh updates.
+
+        Expiry times only ever move forward. Unknown session IDs are ignored.
+
+        Returns:
+            Number of sessions updated
+        """
+
+    @abstractmethod
+    def purge_expired(self, now: datetime, limit: int | None = None) -> int:
+        """Delete up to ``limit`` sessions that expired at ``now``; returns how many."""
+
+    @abstractmethod
+    def count_active(self, now: datetime) -> int:
+        """Count sessions that have not expired at ``now``."""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Delete all sessions; returns how many were deleted."""
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local session store.
+
+    Sessions are indexed by user ID, and expiry times are kept in a min-heap so
+    cleanup only touches sessions that actually expired. Refreshed sessions
+    leave stale heap entries behind, which are skipped when popped and dropped
+    when the heap is rebuilt.
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, dict[str, Any]] = {}
+        self._by_user: dict[Any, set[str]] = {}
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._lock = threading.RLock()
+
+    def add(self, session: dict[str, Any]) -> None:
+        with self._lock:
+            session_id = session["session_id"]
+            self._remove(session_id)
+            self._sessions[session_id] = dict(session)
+            self._by_user.setdefault(session["user_id"], set()).add(session_id)
+            heapq.heappush(self._expiry_heap, (session["expires_at"], session_id))
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return dict(session) if session else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._remove(session_id)
+
+    def delete_user(self, user_id: Any) -> int:
+        with self._lock:
+            session_ids = list(self._by_user.get(user_id, ()))
+            return sum(1 for session_id in session_ids if self._remove(session_id))
+
+    def get_user_sessions(self, user_id: Any) -> list[dict[str, Any]]:
+        with self._lock:
+            return [dict(self._sessions[session_id]) for session_id in self._by_user.get(user_id, ())]
+
+    def touch_many(self, touches: dict[str, SessionTouch]) -> int:
+        updated = 0
+        with self._lock:
+            for session_id, (last_accessed, expires_at) in touches.items():
+                session = self._sessions.get(session_id)
+                if session is None:
+                    continue
+                session["last_accessed"] = max(session["last_accessed"], last_accessed)
+                if expires_at is not None and expires_at > session["expires_at"]:
+                    session["expires_at"] = expires_at
+                    heapq.heappush(self._expiry_heap, (expires_at, session_id))
+                updated += 1
+
+            if len(self._expiry_heap) > 2 * len(self._sessions) + 1024:
+                self._expiry_heap = [
+                    (session["expires_at"], session_id)
+                    for session_id, session in self._sessions.items()
+                ]
+                heapq.heapify(self._expiry_heap)
+        return updated
+
+    def purge_expired(self, now: datetime, limit: int | None = None) -> int:
+        removed = 0
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now and (limit is None or removed < limit):
+                _, session_id = heapq.heappop(heap)
+                session = self._sessions.get(session_id)
+                # Skip stale entries of deleted or refreshed sessions
+                if session is not None and session["expires_at"] <= now:
+                    self._remove(session_id)
+                    removed += 1
+        return removed
+
+    def count_active(self, now: datetime) -> int:
+        with self._lock:
+            self.purge_expired(now)
+            return len(self._sessions)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._sessions)
+            self._sessions.clear()
+            self._by_user.clear()
+            self._expiry_heap.clear()
+            return count
+
+    def _remove(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        user_sessions = self._by_user.get(session["user_id"])
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._by_user[session["user_id"]]
+        return True
+
+
+class DatabaseSessionStore(SessionStore):
+    """
+    Session store backed by the ``user_sessions`` table.
+
+    Works with SQLite and PostgreSQL. Lookups use the primary key and the
+    user_id/expires_at indexes, batched refreshes are a single executemany
+    UPDATE and cleanup deletes expired rows in bounded chunks.
+    """
+
+    def __init__(self, engine: Engine | None = None, create_table: bool = False):
+        """
+        Initialize the database session store.
+
+        Args:
+            engine: SQLAlchemy engine; defaults to the application database
+            create_table: Create the sessions table if it does not exist
+                (normally the Alembic migration creates it)
+        """
+        self._engine = engine
+        self._table = UserSession.__table__
+        if create_table:
+            self._table.create(self.engine, checkfirst=True)
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from src.data.database import db_manager
+
+            self._engine = db_manager.engine
+        return self._engine
+
+    def add(self, session: dict[str, Any]) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(insert(self._table).values(**self._row(session)))
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(self._table).where(self._table.c.session_id == session_id)
+            ).first()
+        return dict(row._mapping) if row else None
+
+    def delete(self, session_id: str) -> bool:
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(self._table).where(self._table.c.session_id == session_id))
+        return result.rowcount > 0
+
+    def delete_user(self, user_id: Any) -> int:
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(self._table).where(self._table.c.user_id == user_id))
+        return result.rowcount
+
+    def get_user_sessions(self, user_id: Any) -> list[dict[str, Any]]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(self._table).where(self._table.c.user_id == user_id))
+            return [dict(row._mapping) for row in rows]
+
+    def touch_many(self, touches: dict[str, SessionTouch]) -> int:
+        if not touches:
+            return 0
+
+        table = self._table
+        new_expiry = bindparam("b_expires_at")
+        statement = (
+            update(table)
+            .where(table.c.session_id == bindparam("b_session_id"))
+            .values(
+                last_accessed=bindparam("b_last_accessed"),
+                # Only extend, never shorten (another replica may have refreshed further)
+                expires_at=case(
+                    (new_expiry.is_not(None) & (table.c.expires_at < new_expiry), new_expiry),
+                    else_=table.c.expires_at,
+                ),
+            )
+        )
+        params = [
+            {"b_session_id": session_id, "b_last_accessed": last_accessed, "b_expires_at": expires_at}
+            for session_id, (last_accessed, expires_at) in touches.items()
+        ]
+        with self.engine.begin() as conn:
+            result = conn.execute(statement, params)
+        return max(result.rowcount, 0)
+
+    def purge_expired(self, now: datetime, limit: int | None = None) -> int:
+        table = self._table
+        statement = delete(table)
+        if limit is None:
+            statement = statement.where(table.c.expires_at <= now)
+        else:
+            expired = select(table.c.session_id).where(table.c.expires_at <= now).limit(limit)
+            statement = statement.where(table.c.session_id.in_(expired))
+        with self.engine.begin() as conn:
+            return conn.execute(statement).rowcount
+
+    def count_active(self, now: datetime) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(self._table).where(self._table.c.expires_at > now)
+            ).scalar_one()
+
+    def clear(self) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(delete(self._table)).rowcount
+
+    def _row(self, session: dict[str, Any]) -> dict[str, Any]:
+        return {column.name: session[column.name] for column in self._table.columns}
+
+
+def create_session_store(kind: str) -> SessionStore:
+    """
+    Create a session store by name.
+
+    Args:
+        kind: "memory" or "database"
+
+    Raises:
+        ValueError: For unknown store names
+    """
+    kind = kind.lower()
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind in ("database", "db", "sql"):
+        return DatabaseSessionStore()
+    raise ValueError(f"Unknown session store: {kind}")
@@ -0,0 +1,202 @@
+"""
+Tests for the bias detector registry and its process-pool execution mode.
+"""
+
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.data.models import BiasAnalysisJob, BiasAnalysisJobStatus
+from src.services.bias_detectors import (
+    BiasDetectorRegistry,
+    DetectorExecutor,
+    detect_age_shift,
+    detect_gender_conformity,
+    detect_stereotype_keywords,
+    detector_registry,
+    pald_text,
+)
+from src.services.bias_worker import BiasWorker
+from src.services.job_queue import JobQueue
+
+
+def failing_detector(pald_data):
+    if pald_data.get("explode"):
+        raise ValueError("bad pald")
+    return detect_stereotype_keywords(pald_data)
+
+
+def synthetic_pald_corpus(n_documents, words_per_document, seed=7):
+    vocabulary = [
+        *("the", "agent", "is", "a", "young", "old", "caring", "strong", "teacher"),
+        *("she", "he", "always", "student", "helpful", "patient", "explains", "maths"),
+        *("with", "examples", "and", "stories", "senior"),
+    ]
+    rng = random.Random(seed)
+    return [
+        {
+            "global_design_level": {"type": "human", "description": " ".join(
+                rng.choice(vocabulary) for _ in range(words_per_document)
+            )},
+            "detailed_level": {"age": str(rng.randint(18, 80)), "clothing": "casual"},
+        }
+        for _ in range(n_documents)
+    ]
+
+
+class TestDetectors:
+    """Test the built-in detectors."""
+
+    def test_pald_text_collects_nested_strings(self):
+        text = pald_text({"a": "One", "b": {"c": ["Two", 3, {"d": "Three"}]}})
+
+        assert sorted(text.split()) == ["one", "three", "two"]
+
+    def test_stereotype_keywords(self):
+        stereotyped = detect_stereotype_keywords({"d": "A teacher with stereotypical views"})
+        assert stereotyped["bias_detected"]
+        assert not detect_stereotype_keywords({"d": "A friendly teacher"})["bias_detected"]
+
+    def test_age_shift_flags_mixed_age_groups(self):
+        mixed = detect_age_shift({"d": "a young teen who is also elderly and retired"})
+        consistent = detect_age_shift({"d": "an elderly retired teacher"})
+
+        assert mixed["bias_detected"] is True
+        assert set(mixed["bias_indicators"]["age_groups"]) >= {"teen", "senior"}
+        assert consistent["bias_detected"] is False
+
+    def test_age_shift_ignores_single_age_phrases(self):
+        middle_aged = detect_age_shift({"description": "A middle-aged teacher"})
+        student = detect_age_shift({"description": "A 25 year old student"})
+
+        assert middle_aged["bias_detected"] is False
+        assert middle_aged["analysis_details"]["token_count"] == 2
+        assert student["bias_detected"] is False
+        assert detect_age_shift({"d": "a 70-years-old senior"})["confidence_score"] == 0.0
+
+    def test_age_shift_needs_more_than_two_groups(self):
+        assert detect_age_shift({"d": "a young adult"})["bias_detected"] is False
+        assert detect_age_shift({"d": "a young adult who is elderly"})["bias_detected"] is True
+
+    def test_gender_conformity(self):
+        stereotyped = detect_gender_conformity({"d": "She is caring, gentle and emotional"})
+        neutral = detect_gender_conformity({"d": "She explains maths clearly"})
+
+        assert stereotyped["bias_detected"] is True
+        assert stereotyped["bias_indicators"]["gender"] == "female"
+        assert neutral["bias_detected"] is False
+
+
+class TestRegistryAndExecutor:
+    """Test detector lookup and execution modes."""
+
+    def test_unknown_types_use_default_detector(self):
+        registry = BiasDetectorRegistry()
+
+        assert registry.get("anything") is detect_stereotype_keywords
+        assert "age_shift" in detector_registry.analysis_types
+
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_inline(self):
+        corpus = synthetic_pald_corpus(10, 200)
+        jobs = [(pald, ["age_shift", "gender_conformity", "other"]) for pald in corpus]
+        pool = DetectorExecutor(processes=2, jobs_per_dispatch=3)
+
+        try:
+            pooled = await pool.analyze(jobs)
+        finally:
+            pool.shutdown()
+        inline = await DetectorExecutor().analyze(jobs)
+
+        assert [o["detections"] for o in pooled] == [o["detections"] for o in inline]
+        assert all(o["error"] is None for o in pooled)
+
+    @pytest.mark.asyncio
+    async def test_detector_errors_are_isolated_per_job(self):
+        registry = BiasDetectorRegistry(default=failing_detector)
+        executor = DetectorExecutor(registry=registry, processes=1, jobs_per_dispatch=4)
+
+        try:
+            outcomes = await executor.analyze(
+                [({"explode": True}, ["x"]), ({"d": "fine"}, ["x"])]
+            )
+        finally:
+            executor.shutdown()
+
+        assert "bad pald" in outcomes[0]["error"]
+        assert outcomes[1]["error"] is None
+
+
+class TestBiasWorkerProcessPool:
+    """Test BiasWorker dispatching a claimed batch to the process pool."""
+
+    @pytest.mark.asyncio
+    async def test_batch_analysis_in_pool(self):
+        jobs = [
+            BiasAnalysisJob(
+                id=uuid4(),
+                session_id=f"s{i}",
+                pald_data={"d": "She is caring and gentle, a stereotypical nurse"},
+                analysis_types=["gender_conformity", "stereotype_keywords"],
+                status=BiasAnalysisJobStatus.RUNNING.value,
+                scheduled_at=datetime.utcnow(),
+            )
+            for i in range(5)
+        ]
+        worker = BiasWorker(
+            JobQueue(session_factory=None),
+            batch_claims=True,
+            detector_processes=2,
+            jobs_per_dispatch=2,
+        )
+        latencies = {}
+
+        try:
+            outcomes = await worker._analyze_batch(jobs, latencies)
+        finally:
+            worker.close()
+
+        assert len(outcomes) == 5
+        assert all(len(results) == 2 for results in outcomes)
+        assert all(result.bias_detected for results in outcomes for result in results)
+        assert set(latencies) == {job.id for job in jobs}
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestDetectorScalingBenchmark:
+    """Throughput of detectors inline vs. in process pools on a synthetic corpus."""
+
+    def test_scaling_across_cores(self):
+        corpus = synthetic_pald_corpus(64, 5000)
+        analysis_types = ["age_shift", "gender_conformity", "stereotype_keywords"]
+        jobs = [(pald, analysis_types) for pald in corpus]
+        cores = os.cpu_count() or 1
+        timings = {}
+
+        for processes in sorted({0, 1, 2, min(4, cores), cores}):
+            executor = DetectorExecutor(processes=processes, jobs_per_dispatch=4)
+            try:
+                # Warm up the pool so process start-up is not measured
+                asyncio.run(executor.analyze(jobs[:processes or 1]))
+                start = time.perf_counter()
+                outcomes = asyncio.run(executor.analyze(jobs))
+                timings[processes] = time.perf_counter() - start
+            finally:
+                executor.shutdown()
+            assert all(o["error"] is None for o in outcomes)
+
+        print(
+            f"{len(jobs)} PALDs on {cores} core(s): "
+            + ", ".join(
+                f"{'inline' if p == 0 else f'{p} proc'}: {len(jobs) / t:.1f} jobs/s"
+                for p, t in timings.items()
+            )
+        )
+        if cores >= 2:
+            assert timings[2] < timings[0]
@@ -4,6 +4,7 @@ Integration tests for bias worker: job lifecycle, retry logic, DLQ handling, sta
 
 import asyncio
 import pytest
+import pytest_asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
@@ -16,7 +17,7 @@ from src.services.bias_worker import BiasWorker
 from src.services.job_queue import JobQueue
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def async_session():
     """Create async database session for testing."""
     engine = create_async_engine("sqlite+aiosqlite:///:memory:")
@@ -40,8 +41,8 @@ def job_queue(async_session):
 
 @pytest.fixture
 def bias_worker(job_queue):
-    """Create bias worker instance."""
-    return BiasWorker(job_queue, batch_size=5, max_concurrent=2)
+    """Create bias worker instance using per-job locking."""
+    return BiasWorker(job_queue, batch_size=5, max_concurrent=2, batch_claims=False)
 
 
 @pytest.fixture
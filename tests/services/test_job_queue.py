@@ -0,0 +1,347 @@
+"""
+Tests for batched job claiming and finalization in JobQueue against SQLite,
+plus a multi-process throughput benchmark of the bias worker CLI.
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.data.models import Base, BiasAnalysisJob, BiasAnalysisJobStatus, BiasAnalysisResult
+from src.services.bias_worker import BiasWorker
+from src.services.job_notifications import JobNotifier, PostgresJobNotifier, get_job_notifier
+from src.services.job_queue import JobFailure, JobQueue
+from src.services.performance_monitoring_service import performance_monitor
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BIAS_TABLES = [BiasAnalysisJob.__table__, BiasAnalysisResult.__table__]
+
+
+async def create_bias_tables(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("PRAGMA journal_mode=WAL"))
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=BIAS_TABLES))
+
+
+async def enqueue_jobs(session_factory, count, **overrides):
+    jobs = [
+        BiasAnalysisJob(
+            id=uuid4(),
+            session_id=f"session-{i}",
+            pald_data={"agent_description": "stereotype" if i % 2 else "neutral"},
+            analysis_types=["age_shift"],
+            priority=overrides.get("priority", 5),
+            status=overrides.get("status", BiasAnalysisJobStatus.PENDING.value),
+            scheduled_at=overrides.get("scheduled_at", datetime.utcnow() - timedelta(seconds=1)),
+        )
+        for i in range(count)
+    ]
+    async with session_factory() as session:
+        session.add_all(jobs)
+        await session.commit()
+    return jobs
+
+
+async def count_by_status(session_factory):
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(BiasAnalysisJob.status, func.count()).group_by(BiasAnalysisJob.status)
+        )
+        return dict(rows.all())
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    await create_bias_tables(engine)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestJobQueueClaiming:
+    """Test atomic batch claiming."""
+
+    @pytest.mark.asyncio
+    async def test_claim_marks_jobs_running(self, session_factory):
+        await enqueue_jobs(session_factory, 5)
+        queue = JobQueue(session_factory)
+
+        claimed = await queue.claim_jobs(limit=3)
+
+        assert len(claimed) == 3
+        assert all(job.status == BiasAnalysisJobStatus.RUNNING.value for job in claimed)
+        assert all(job.started_at is not None for job in claimed)
+        assert await count_by_status(session_factory) == {"running": 3, "pending": 2}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_never_overlap(self, session_factory):
+        await enqueue_jobs(session_factory, 40)
+        queues = [JobQueue(session_factory) for _ in range(8)]
+
+        batches = await asyncio.gather(*(queue.claim_jobs(limit=10) for queue in queues))
+
+        claimed_ids = [job.id for batch in batches for job in batch]
+        assert len(claimed_ids) == 40
+        assert len(set(claimed_ids)) == 40
+
+    @pytest.mark.asyncio
+    async def test_claim_respects_schedule_and_priority(self, session_factory):
+        await enqueue_jobs(session_factory, 2, priority=9)
+        urgent = await enqueue_jobs(session_factory, 1, priority=1)
+        await enqueue_jobs(session_factory, 3, scheduled_at=datetime.utcnow() + timedelta(hours=1))
+
+        claimed = await JobQueue(session_factory).claim_jobs(limit=10)
+
+        assert len(claimed) == 3
+        assert claimed[0].id == urgent[0].id
+
+    @pytest.mark.asyncio
+    async def test_due_retries_are_claimed(self, session_factory):
+        await enqueue_jobs(session_factory, 2, status=BiasAnalysisJobStatus.RETRY.value)
+
+        assert len(await JobQueue(session_factory).claim_jobs(limit=10)) == 2
+
+
+class TestJobQueueFinalization:
+    """Test bulk status transitions and result inserts."""
+
+    @pytest.mark.asyncio
+    async def test_finalize_batch(self, session_factory):
+        await enqueue_jobs(session_factory, 4)
+        queue = JobQueue(session_factory)
+        done, retry, dead, untouched = await queue.claim_jobs(limit=4)
+        result = BiasAnalysisResult(
+            job_id=done.id,
+            session_id=done.session_id,
+            analysis_type="age_shift",
+            bias_detected=False,
+            confidence_score=0.2,
+        )
+
+        await queue.finalize_jobs(
+            {done.id: [result]},
+            [
+                JobFailure(retry.id, "boom", retry_at=datetime.utcnow(), retry_count=0),
+                JobFailure(dead.id, "fatal", retry_count=3),
+            ],
+        )
+
+        assert await count_by_status(session_factory) == {
+            "completed": 1,
+            "retry": 1,
+            "dlq": 1,
+            "running": 1,
+        }
+        async with session_factory() as session:
+            retried = await session.get(BiasAnalysisJob, retry.id)
+            assert retried.retry_count == 1
+            assert retried.error_message == "boom"
+            results = await session.execute(select(func.count()).select_from(BiasAnalysisResult))
+            assert results.scalar() == 1
+
+
+class TestBiasWorkerBatchClaims:
+    """Test the worker's batched processing path end to end."""
+
+    @pytest.mark.asyncio
+    async def test_process_batch_completes_jobs(self, session_factory):
+        await enqueue_jobs(session_factory, 6)
+        worker = BiasWorker(JobQueue(session_factory), batch_size=4, max_concurrent=4, batch_claims=True)
+
+        assert await worker.process_batch() == 4
+        assert await worker.process_batch() == 2
+        assert await worker.process_batch() == 0
+        assert await count_by_status(session_factory) == {"completed": 6}
+
+    @pytest.mark.asyncio
+    async def test_failed_analysis_is_rescheduled(self, session_factory, monkeypatch):
+        await enqueue_jobs(session_factory, 2)
+        worker = BiasWorker(JobQueue(session_factory), batch_size=10, batch_claims=True)
+
+        async def failing_analysis(job):
+            raise RuntimeError("detector crashed")
+
+        monkeypatch.setattr(worker, "_analyze_bias", failing_analysis)
+
+        assert await worker.process_batch() == 0
+        assert await count_by_status(session_factory) == {"retry": 2}
+
+
+class RecordingNotifier(JobNotifier):
+    """Notifier that never fires and records the requested timeouts."""
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    async def wait(self, timeout):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(0)
+        return False
+
+
+class TestJobNotifier:
+    """Test the in-process enqueue channel."""
+
+    @pytest.mark.asyncio
+    async def test_notify_from_another_thread_wakes_waiter(self):
+        notifier = JobNotifier()
+        await notifier.start()
+
+        threading.Timer(0.05, notifier.notify).start()
+        start = time.perf_counter()
+
+        assert await notifier.wait(5) is True
+        assert time.perf_counter() - start < 1
+
+    @pytest.mark.asyncio
+    async def test_notification_while_busy_is_not_lost(self):
+        notifier = JobNotifier()
+        await notifier.start()
+        notifier.notify()
+        await asyncio.sleep(0)
+
+        assert await notifier.wait(0.01) is True
+        assert await notifier.wait(0.01) is False
+
+    def test_notifier_selection(self):
+        assert isinstance(get_job_notifier("postgresql+asyncpg://u@h/db"), PostgresJobNotifier)
+        assert not isinstance(get_job_notifier("sqlite+aiosqlite:///x.db"), PostgresJobNotifier)
+
+
+class TestBiasWorkerRunLoop:
+    """Test event-driven wakeup and adaptive idle backoff."""
+
+    @pytest.mark.asyncio
+    async def test_idle_backoff_doubles_up_to_max(self, session_factory):
+        notifier = RecordingNotifier()
+        worker = BiasWorker(JobQueue(session_factory, notifier=notifier), batch_claims=True)
+
+        await worker.run(
+            should_stop=lambda: len(notifier.timeouts) >= 6,
+            min_idle_seconds=0.1,
+            max_idle_seconds=1.0,
+        )
+
+        assert notifier.timeouts == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_enqueue_wakes_idle_worker(self, session_factory):
+        queue = JobQueue(session_factory, notifier=JobNotifier())
+        worker = BiasWorker(queue, batch_size=10, max_concurrent=10, batch_claims=True)
+        stop = asyncio.Event()
+        run_task = asyncio.create_task(
+            worker.run(stop.is_set, min_idle_seconds=30, max_idle_seconds=30)
+        )
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        jobs = [
+            BiasAnalysisJob(
+                session_id="wake", pald_data={}, analysis_types=["age_shift"],
+                scheduled_at=datetime.utcnow() - timedelta(seconds=1),
+            )
+        ]
+        await queue.enqueue_jobs(jobs)
+        while (await count_by_status(session_factory)).get("completed") != 1:
+            assert time.perf_counter() - start < 5, "worker was not woken by enqueue"
+            await asyncio.sleep(0.01)
+        latency = time.perf_counter() - start
+
+        stop.set()
+        queue.notifier.notify()
+        await run_task
+
+        # Polling alone would have waited the full 30s idle interval
+        assert latency < 2
+
+    @pytest.mark.asyncio
+    async def test_busy_queue_is_drained_without_waiting(self, session_factory):
+        await enqueue_jobs(session_factory, 25)
+        notifier = RecordingNotifier()
+        worker = BiasWorker(
+            JobQueue(session_factory, notifier=notifier), batch_size=10, max_concurrent=10, batch_claims=True
+        )
+
+        processed = await worker.run(should_stop=lambda: False, exit_when_idle=True)
+
+        assert processed == 25
+        assert notifier.timeouts == []
+        assert len(performance_monitor.histograms["bias_job_latency_ms"]) >= 25
+        assert performance_monitor.histograms["bias_job_wait_seconds"]
+        assert performance_monitor.gauges["bias_queue_depth"] == 0
+
+
+def _run_workers(db_path, n_workers, batch_claims):
+    flag = "--batch-claims" if batch_claims else "--no-batch-claims"
+    command = [
+        sys.executable, "-m", "src.cli.bias_worker",
+        "--database-url", f"sqlite+aiosqlite:///{db_path}",
+        "--batch-size", "10",
+        "--max-concurrent", "10",
+        "--poll-interval", "0",
+        "--exit-when-idle",
+        flag,
+    ]
+    processes = [
+        subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.wait(timeout=120)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestBiasWorkerThroughputBenchmark:
+    """Jobs/sec with 1, 4 and 16 concurrent worker processes."""
+
+    @pytest.mark.parametrize("n_workers", [1, 4, 16])
+    def test_jobs_per_second(self, tmp_path, n_workers):
+        n_jobs = 200
+        db_path = tmp_path / "bench.db"
+
+        async def seed():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            await create_bias_tables(engine)
+            await enqueue_jobs(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), n_jobs)
+            await engine.dispose()
+
+        async def collect():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            async with factory() as session:
+                window = await session.execute(
+                    select(func.min(BiasAnalysisJob.started_at), func.max(BiasAnalysisJob.completed_at))
+                )
+                results = await session.execute(select(func.count()).select_from(BiasAnalysisResult))
+                statuses = await count_by_status(factory)
+                first_start, last_completion = window.one()
+                result_count = results.scalar()
+            await engine.dispose()
+            return statuses, result_count, (last_completion - first_start).total_seconds()
+
+        asyncio.run(seed())
+        start = time.perf_counter()
+        _run_workers(db_path, n_workers, batch_claims=True)
+        wall_seconds = time.perf_counter() - start
+        statuses, result_count, busy_seconds = asyncio.run(collect())
+
+        print(
+            f"{n_workers} worker(s): {n_jobs / busy_seconds:.1f} jobs/s "
+            f"(processing window {busy_seconds:.2f}s, wall incl. startup {wall_seconds:.2f}s)"
+        )
+        # Every job processed exactly once
+        assert statuses == {"completed": n_jobs}
+        assert result_count == n_jobs
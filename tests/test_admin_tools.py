@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, Mock, patch
 from uuid import uuid4
 
 from src.services.admin_statistics_service import AdminStatisticsService
+from src.services.audit_rollup_service import OperationTotals
 from src.services.monitoring_service import HealthStatus, MonitoringService
 from src.ui.admin_ui import AdminUI
 
@@ -172,20 +173,16 @@ class TestAdminStatisticsService:
         mock_session = MagicMock()
         mock_db_session.return_value.__enter__.return_value = mock_session
 
-        # Mock query results
-        mock_session.execute.side_effect = [
-            Mock(scalar=lambda: 100),  # total users
-            Mock(scalar=lambda: 5),  # admin users
-            Mock(scalar=lambda: 95),  # participant users
-            Mock(scalar=lambda: 3),  # new users today
-            Mock(scalar=lambda: 12),  # new users this week
-            Mock(scalar=lambda: 25),  # new users this month
-            Mock(scalar=lambda: 15),  # active users today
-            Mock(scalar=lambda: 45),  # active users this week
-            Mock(scalar=lambda: 78),  # active users this month
-        ]
+        # Mock the single user count query: total, admins, participants,
+        # new today, new this week, new this month
+        mock_session.execute.return_value.one.return_value = (100, 5, 95, 3, 12, 25)
 
-        user_stats = stats_service.get_user_statistics()
+        with patch.object(
+            stats_service.rollups,
+            "active_user_counts",
+            return_value={"today": 15, "week": 45, "month": 78},
+        ):
+            user_stats = stats_service.get_user_statistics()
 
         assert user_stats.total_users == 100
         assert user_stats.admin_users == 5
@@ -202,19 +199,17 @@ class TestAdminStatisticsService:
         mock_session = MagicMock()
         mock_db_session.return_value.__enter__.return_value = mock_session
 
-        # Mock query results
-        mock_session.execute.side_effect = [
-            Mock(scalar=lambda: 250),  # chat sessions
-            Mock(scalar=lambda: 150),  # images generated
-            Mock(scalar=lambda: 75),  # pald records
-            Mock(scalar=lambda: 1000),  # audit logs
-            Mock(scalar=lambda: 100),  # consent records
-            Mock(scalar=lambda: 1500.0),  # avg response time
-            Mock(scalar=lambda: 1000),  # total operations
-            Mock(scalar=lambda: 25),  # error operations
-        ]
+        # Mock rollup totals per operation (1000 operations, 25 errors)
+        operation_totals = {
+            "chat": OperationTotals(250, 10, 250 * 1800, 250),
+            "image_generation": OperationTotals(150, 5, 150 * 1000, 150),
+            "pald_extraction": OperationTotals(600, 10, 600 * 1500, 600),
+        }
+        # Mock the PALD and consent record counts
+        mock_session.execute.return_value.one.return_value = (75, 100)
 
-        system_stats = stats_service.get_system_statistics()
+        with patch.object(stats_service.rollups, "operation_totals", return_value=operation_totals):
+            system_stats = stats_service.get_system_statistics()
 
         assert system_stats.total_chat_sessions == 250
         assert system_stats.total_images_generated == 150
@@ -0,0 +1,305 @@
+"""
+Tests for the async Ollama provider.
+Runs against a local stub HTTP server, so no Ollama installation is required.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.exceptions import LLMModelError
+from src.services.async_llm_provider import AsyncOllamaProvider, EventLoopThread
+from src.services.llm_provider import LLMRequest, OllamaProvider
+from src.services.llm_streaming import StreamBatchConfig
+from src.utils.circuit_breaker import reset_all_circuit_breakers
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class StubOllamaServer:
+    """Minimal Ollama-compatible HTTP server with configurable latency."""
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.generate_calls = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "llama3", "digest": "abc"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path == "/api/show":
+                    if payload.get("name") == "llama3":
+                        self._send_json(200, {"details": {"family": "llama"}})
+                    else:
+                        self._send_json(404, {"error": "model not found"})
+                    return
+
+                with stub._lock:
+                    stub.generate_calls += 1
+                time.sleep(stub.delay_s)
+                text = f"echo: {payload['prompt']}"
+
+                if payload.get("stream"):
+                    lines = [{"response": word + " ", "done": False} for word in text.split()]
+                    lines.append({"response": "", "done": True, "eval_count": len(lines)})
+                    data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send_json(200, {"response": text, "done": True, "eval_count": 3})
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _reset_breakers():
+    reset_all_circuit_breakers()
+    yield
+    reset_all_circuit_breakers()
+
+
+@pytest.fixture
+def stub_server():
+    with StubOllamaServer(delay_s=0.2) as server:
+        yield server
+
+
+@pytest.fixture
+def provider(stub_server):
+    provider = AsyncOllamaProvider(base_url=stub_server.url, timeout=5, max_retries=1)
+    yield provider
+    provider.close()
+
+
+class TestEventLoopThread:
+    """Test the sync-to-async bridge."""
+
+    def test_run_coroutine(self):
+        bridge = EventLoopThread()
+
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        try:
+            assert bridge.run(add(1, 2)) == 3
+        finally:
+            bridge.stop()
+
+    def test_restart_after_stop(self):
+        bridge = EventLoopThread()
+
+        async def value():
+            return "ok"
+
+        bridge.run(value())
+        bridge.stop()
+        assert bridge.run(value()) == "ok"
+        bridge.stop()
+
+
+class TestAsyncOllamaProvider:
+    """Test AsyncOllamaProvider against the stub server."""
+
+    def test_sync_generate_response(self, provider):
+        response = provider.generate_response(LLMRequest(prompt="hello", model="llama3"))
+
+        assert response.text == "echo: hello"
+        assert response.tokens_used == 3
+        assert response.latency_ms >= 0
+
+    def test_identical_concurrent_requests_are_coalesced(self, provider, stub_server):
+        requests = [LLMRequest(prompt="same", model="llama3") for _ in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(provider.generate_response, requests))
+
+        assert stub_server.generate_calls == 1
+        assert all(r.text == "echo: same" for r in responses)
+        # Every caller keeps its own request id
+        assert [r.request_id for r in responses] == [r.request_id for r in requests]
+        stats = provider.get_pool_stats()
+        assert stats["coalesced_requests"] == 7
+        assert stats["upstream_requests"] == 1
+
+    def test_different_parameters_are_not_coalesced(self, provider, stub_server):
+        requests = [
+            LLMRequest(prompt="same", model="llama3", parameters={"temperature": t})
+            for t in (0.0, 0.5)
+        ]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(provider.generate_response, requests))
+
+        assert stub_server.generate_calls == 2
+
+    def test_coalescing_can_be_disabled(self, stub_server):
+        provider = AsyncOllamaProvider(base_url=stub_server.url, coalesce_requests=False)
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                list(
+                    executor.map(
+                        provider.generate_response,
+                        [LLMRequest(prompt="same", model="llama3") for _ in range(3)],
+                    )
+                )
+        finally:
+            provider.close()
+
+        assert stub_server.generate_calls == 3
+
+    def test_async_api_on_caller_loop(self, stub_server):
+        provider = AsyncOllamaProvider(base_url=stub_server.url)
+
+        async def run():
+            try:
+                return await asyncio.gather(
+                    *(
+                        provider.agenerate_response(LLMRequest(prompt=f"p{i}", model="llama3"))
+                        for i in range(4)
+                    )
+                )
+            finally:
+                await provider.aclose()
+
+        responses = asyncio.run(run())
+
+        assert sorted(r.text for r in responses) == [f"echo: p{i}" for i in range(4)]
+
+    def test_streaming_response(self, provider):
+        request = LLMRequest(
+            prompt="stream me", model="llama3", stream=True, batching=StreamBatchConfig(max_chars=6)
+        )
+        response = provider.generate_streaming_response(request)
+        text = "".join(response.text_stream)
+
+        assert text == "echo: stream me "
+        metrics = response.metadata["stream_metrics"]
+        assert metrics.done is True
+        # Covers the server's delay before the response headers
+        assert metrics.time_to_first_token_ms >= 200
+
+    def test_client_of_previous_loop_is_closed(self, provider):
+        provider.list_models()
+        bridge_client = provider._client
+
+        async def run():
+            try:
+                return await provider.alist_models()
+            finally:
+                await provider.aclose()
+
+        assert asyncio.run(run())["count"] == 1
+
+        deadline = time.monotonic() + 5
+        while not bridge_client.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert bridge_client.is_closed
+
+    def test_list_models_and_health(self, provider):
+        models = provider.list_models()
+
+        assert models["count"] == 1
+        assert models["models"]["llama3"]["digest"] == "abc"
+        assert provider.health_check() is True
+
+    def test_model_info_not_found(self, provider):
+        assert provider.get_model_info("llama3")["details"] == {"family": "llama"}
+        with pytest.raises(LLMModelError):
+            provider.get_model_info("missing")
+
+    def test_health_check_unreachable(self):
+        provider = AsyncOllamaProvider(base_url="http://127.0.0.1:9", timeout=1, max_retries=1)
+        try:
+            assert provider.health_check() is False
+        finally:
+            provider.close()
+
+
+@pytest.mark.performance
+class TestAsyncProviderBenchmark:
+    """Compare the blocking provider with the async provider on a stub server."""
+
+    def test_throughput_and_coalescing(self):
+        n_requests = 32
+
+        with StubOllamaServer(delay_s=0.05) as server:
+            sync_provider = OllamaProvider(base_url=server.url, timeout=5, max_retries=1)
+            async_provider = AsyncOllamaProvider(base_url=server.url, timeout=5)
+            distinct = [LLMRequest(prompt=f"p{i}", model="llama3") for i in range(n_requests)]
+            identical = [LLMRequest(prompt="same", model="llama3") for _ in range(n_requests)]
+
+            try:
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(sync_provider.generate_response, distinct))
+                sync_seconds = time.perf_counter() - start
+
+                async def gather(requests):
+                    return await asyncio.gather(
+                        *(async_provider.agenerate_response(r) for r in requests)
+                    )
+
+                start = time.perf_counter()
+                async_provider._bridge.run(gather(distinct))
+                async_seconds = time.perf_counter() - start
+
+                calls_before = server.generate_calls
+                start = time.perf_counter()
+                async_provider._bridge.run(gather(identical))
+                coalesced_seconds = time.perf_counter() - start
+                coalesced_calls = server.generate_calls - calls_before
+            finally:
+                async_provider.close()
+
+        print(
+            f"sync(8 threads): {n_requests / sync_seconds:.1f} req/s, "
+            f"async: {n_requests / async_seconds:.1f} req/s, "
+            f"identical via coalescing: {coalesced_seconds * 1000:.0f}ms "
+            f"with {coalesced_calls} upstream call(s)"
+        )
+        assert coalesced_calls == 1
+        assert async_seconds < sync_seconds
@@ -0,0 +1,336 @@
+"""
+Tests for the incrementally maintained audit log rollups behind the admin
+dashboard statistics, plus a dashboard latency benchmark with 1M audit rows.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from src.data.models import (
+    AuditLog,
+    AuditLogRollup,
+    AuditRollupState,
+    Base,
+    ConsentRecord,
+    PALDAttributeCandidate,
+    PALDData,
+    PALDSchemaVersion,
+    User,
+    UserDailyActivity,
+)
+from src.services import admin_statistics_service
+from src.services.admin_statistics_service import AdminStatisticsService
+from src.services.audit_rollup_service import DAY, HOUR, AuditRollupService
+
+STATISTICS_TABLES = [
+    model.__table__
+    for model in (
+        User,
+        AuditLog,
+        ConsentRecord,
+        PALDSchemaVersion,
+        PALDAttributeCandidate,
+        PALDData,
+        AuditLogRollup,
+        UserDailyActivity,
+        AuditRollupState,
+    )
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(engine, tables=STATISTICS_TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_scope(engine):
+    @contextmanager
+    def scope():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    return scope
+
+
+@pytest.fixture
+def stats_service(session_scope):
+    with (
+        patch("src.services.admin_statistics_service.get_session", session_scope),
+        patch("src.services.admin_statistics_service.get_audit_service"),
+    ):
+        service = AdminStatisticsService()
+        service.rollups = AuditRollupService(settle_seconds=0, refresh_interval_seconds=0)
+        yield service
+
+
+def add_user(session, role="participant", created_at=None):
+    user = User(
+        id=uuid4(),
+        username=uuid4().hex,
+        password_hash="x",
+        role=role,
+        pseudonym=uuid4().hex,
+        created_at=created_at or datetime.utcnow(),
+    )
+    session.add(user)
+    return user
+
+
+def add_log(session, operation, created_at, user_id=None, status="completed", latency_ms=None):
+    session.add(
+        AuditLog(
+            request_id=uuid4().hex,
+            user_id=user_id,
+            operation=operation,
+            status=status,
+            latency_ms=latency_ms,
+            created_at=created_at,
+        )
+    )
+
+
+class TestAuditRollupService:
+    """Test incremental rollup maintenance and reads."""
+
+    def test_refresh_is_incremental(self, session_scope):
+        rollups = AuditRollupService(settle_seconds=60)
+        now = datetime(2026, 10, 16, 12, 30)
+        with session_scope() as session:
+            add_log(session, "chat", now - timedelta(hours=3), latency_ms=100)
+            add_log(session, "chat", now - timedelta(hours=3), status="failed", latency_ms=300)
+            add_log(session, "image_generation", now - timedelta(days=1))
+            # Not settled yet
+            add_log(session, "chat", now - timedelta(seconds=10))
+
+        with session_scope() as session:
+            assert rollups.refresh(session, now=now) == 3
+        with session_scope() as session:
+            assert rollups.refresh(session, now=now) == 0
+        with session_scope() as session:
+            assert rollups.refresh(session, now=now + timedelta(minutes=5)) == 1
+
+        with session_scope() as session:
+            rows = session.execute(
+                select(
+                    AuditLogRollup.bucket_start,
+                    AuditLogRollup.request_count,
+                    AuditLogRollup.error_count,
+                    AuditLogRollup.latency_sum_ms,
+                    AuditLogRollup.latency_count,
+                )
+                .where(AuditLogRollup.granularity == HOUR, AuditLogRollup.operation == "chat")
+                .order_by(AuditLogRollup.bucket_start)
+            ).all()
+
+        assert [tuple(row) for row in rows] == [
+            (datetime(2026, 10, 16, 9), 2, 1, 400, 2),
+            (datetime(2026, 10, 16, 12), 1, 0, 0, 0),
+        ]
+
+    def test_totals_include_rows_not_rolled_up(self, session_scope):
+        rollups = AuditRollupService(settle_seconds=300)
+        now = datetime.utcnow()
+        with session_scope() as session:
+            add_log(session, "chat", now - timedelta(days=2), latency_ms=100)
+            add_log(session, "chat", now - timedelta(hours=2), status="failed", latency_ms=200)
+            add_log(session, "chat", now - timedelta(seconds=30), latency_ms=600)
+            add_log(session, "image_generation", now - timedelta(minutes=1))
+
+        with session_scope() as session:
+            rollups.refresh(session, now=now)
+        with session_scope() as session:
+            all_time = rollups.operation_totals(session)
+            recent = rollups.operation_totals(session, since=now - timedelta(hours=24))
+
+        assert all_time["chat"].requests == 3
+        assert all_time["chat"].errors == 1
+        assert all_time["chat"].avg_latency_ms == 300
+        assert all_time["image_generation"].requests == 1
+        assert recent["chat"].requests == 2
+        assert recent["chat"].error_rate_percent == 50
+
+    def test_daily_rollups_sum_hours(self, session_scope):
+        rollups = AuditRollupService(settle_seconds=0)
+        day = datetime(2026, 10, 14)
+        with session_scope() as session:
+            for hour in range(0, 24, 3):
+                add_log(session, "chat", day + timedelta(hours=hour, minutes=15))
+
+        with session_scope() as session:
+            rollups.refresh(session, now=datetime(2026, 10, 16))
+        with session_scope() as session:
+            daily = session.execute(
+                select(AuditLogRollup.bucket_start, AuditLogRollup.request_count).where(
+                    AuditLogRollup.granularity == DAY
+                )
+            ).all()
+
+        assert [tuple(row) for row in daily] == [(day, 8)]
+
+    def test_active_user_counts(self, session_scope):
+        rollups = AuditRollupService(settle_seconds=300)
+        now = datetime(2026, 10, 16, 12)
+        first, second, third = uuid4(), uuid4(), uuid4()
+        with session_scope() as session:
+            add_log(session, "chat", now - timedelta(days=10), user_id=first)
+            add_log(session, "chat", now - timedelta(days=1), user_id=first)
+            add_log(session, "chat", now - timedelta(hours=1), user_id=second)
+            add_log(session, "chat", now - timedelta(hours=1), user_id=second)
+            # Only in the tail
+            add_log(session, "chat", now - timedelta(minutes=1), user_id=third)
+            add_log(session, "chat", now - timedelta(minutes=1))
+
+        with session_scope() as session:
+            rollups.refresh(session, now=now)
+        with session_scope() as session:
+            counts = rollups.active_user_counts(
+                session,
+                {
+                    "today": now.date(),
+                    "two_days": (now - timedelta(days=1)).date(),
+                    "month": now.date().replace(day=1),
+                },
+            )
+
+        assert counts == {"today": 2, "two_days": 3, "month": 3}
+
+
+class TestAdminStatisticsFromRollups:
+    """Test the dashboard statistics against a real database."""
+
+    def test_user_statistics(self, stats_service, session_scope):
+        now = datetime.utcnow()
+        with session_scope() as session:
+            admin = add_user(session, role="admin", created_at=now - timedelta(days=400))
+            participant = add_user(session, created_at=now)
+            add_user(session, created_at=now - timedelta(days=400))
+            add_log(session, "chat", now, user_id=admin.id)
+            add_log(session, "chat", now, user_id=participant.id)
+
+        user_stats = stats_service.get_user_statistics()
+
+        assert user_stats.total_users == 3
+        assert user_stats.admin_users == 1
+        assert user_stats.participant_users == 2
+        assert user_stats.new_users_today == 1
+        assert user_stats.new_users_this_month == 1
+        assert user_stats.active_users_today == 2
+
+    def test_dashboard_statistics(self, stats_service, session_scope):
+        now = datetime.utcnow()
+        with session_scope() as session:
+            user = add_user(session)
+            for i in range(8):
+                add_log(session, "chat", now - timedelta(hours=i), user_id=user.id, latency_ms=1000)
+            add_log(session, "image_generation", now - timedelta(hours=1), status="failed")
+            add_log(session, "pald_extraction", now - timedelta(days=3))
+
+        dashboard = stats_service.get_dashboard_statistics()
+
+        assert dashboard["users"]["total"] == 1
+        assert dashboard["system"]["chat_sessions"] == 8
+        assert dashboard["system"]["images_generated"] == 1
+        assert dashboard["system"]["audit_logs"] == 10
+        assert dashboard["system"]["error_rate_percent"] == 10
+        assert dashboard["performance"]["avg_llm_response_time_ms"] == 1000
+        assert dashboard["performance"]["error_rate_by_operation"] == {
+            "chat": 0,
+            "image_generation": 100,
+        }
+        # The window starts on the hour, 24 to 25 hours ago
+        assert 9 / 25 <= dashboard["performance"]["requests_per_hour"] <= 9 / 24
+
+    def test_requests_per_hour_over_hour_aligned_window(
+        self, stats_service, session_scope, monkeypatch
+    ):
+        now = datetime.utcnow().replace(minute=30, second=0, microsecond=0)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def utcnow(cls):
+                return now
+
+        monkeypatch.setattr(admin_statistics_service, "datetime", FrozenDatetime)
+        with session_scope() as session:
+            # 24h20m ago: outside a plain 24 hour window, inside the hour-aligned one
+            add_log(session, "chat", now - timedelta(hours=24, minutes=20))
+            add_log(session, "chat", now - timedelta(hours=2))
+            add_log(session, "chat", now - timedelta(hours=26))
+
+        performance = stats_service.get_performance_statistics()
+
+        assert performance.requests_per_hour == pytest.approx(2 / 24.5)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestDashboardStatisticsBenchmark:
+    """Dashboard latency with 1M audit rows once the rollups are current."""
+
+    def test_dashboard_reads_rollups_under_100ms(self, engine, stats_service):
+        n_rows, n_users = 1_000_000, 1000
+        with engine.begin() as conn:
+            conn.execute(
+                User.__table__.insert(),
+                [
+                    {
+                        "id": uuid4(),
+                        "username": f"user-{i}",
+                        "password_hash": "x",
+                        "role": "participant",
+                        "pseudonym": f"pseudonym-{i}",
+                        "created_at": datetime.utcnow(),
+                        "updated_at": datetime.utcnow(),
+                        "is_active": True,
+                    }
+                    for i in range(n_users)
+                ],
+            )
+            # 1M rows spread over the last 90 days
+            conn.execute(
+                text(
+                    """
+                    WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows)
+                    INSERT INTO audit_logs (id, request_id, user_id, operation, latency_ms, status, created_at)
+                    SELECT lower(hex(randomblob(16))), 'req-' || n,
+                           (SELECT id FROM users WHERE rowid = 1 + n % :users),
+                           CASE n % 4 WHEN 0 THEN 'image_generation' ELSE 'chat' END,
+                           n % 3000,
+                           CASE WHEN n % 50 = 0 THEN 'failed' ELSE 'completed' END,
+                           strftime('%Y-%m-%d %H:%M:%f', 'now', '-' || (n % 129600) || ' minutes',
+                                    '-10 minutes')
+                    FROM seq
+                    """
+                ),
+                {"rows": n_rows, "users": n_users},
+            )
+
+        start = time.perf_counter()
+        assert stats_service.refresh_rollups() == n_rows
+        print(f"\ninitial rollup of {n_rows:,} audit rows: {time.perf_counter() - start:.2f}s")
+
+        stats_service.rollups.refresh_interval_seconds = 60
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            dashboard = stats_service.get_dashboard_statistics()
+            timings.append(time.perf_counter() - start)
+
+        latency_ms = sorted(timings)[len(timings) // 2] * 1000
+        print(f"dashboard statistics: {latency_ms:.1f}ms (median of 5)")
+        assert dashboard["system"]["audit_logs"] == n_rows
+        assert dashboard["system"]["chat_sessions"] == n_rows * 3 // 4
+        assert dashboard["users"]["active_this_month"] > 0
+        assert latency_ms < 100
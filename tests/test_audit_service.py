@@ -401,24 +401,8 @@ class TestAuditService:
         child2_log.finalized_at = datetime.utcnow()
 
         # Mock repository responses
-        def mock_get_by_id(log_id):
-            if log_id == root_id:
-                return root_log
-            elif log_id == child1_id:
-                return child1_log
-            elif log_id == child2_id:
-                return child2_log
-            return None
-
-        def mock_get_filtered(filters):
-            if filters.parent_log_id == root_id:
-                return [child1_log]
-            elif filters.parent_log_id == child1_id:
-                return [child2_log]
-            return []
-
-        mock_repository.get_by_id.side_effect = mock_get_by_id
-        mock_repository.get_filtered.side_effect = mock_get_filtered
+        mock_repository.get_thread_roots.return_value = {child1_id: root_id}
+        mock_repository.get_threads.return_value = {root_id: [root_log, child1_log, child2_log]}
 
         thread = service.get_conversation_thread(child1_id)
 
@@ -426,6 +410,8 @@ class TestAuditService:
         assert thread[0].id == root_id
         assert thread[1].id == child1_id
         assert thread[2].id == child2_id
+        mock_repository.get_thread_roots.assert_called_once_with([child1_id])
+        mock_repository.get_threads.assert_called_once_with([root_id])
 
     def test_export_audit_data_json(self):
         """Test exporting audit data as JSON."""
@@ -453,14 +439,18 @@ class TestAuditService:
         service = AuditService(db_session=mock_session)
         service.repository = mock_repository
 
+        # Both logs are roots of their own thread
+        mock_repository.get_thread_roots.return_value = {log1.id: log1.id, log2.id: log2.id}
+        mock_repository.get_threads.return_value = {log1.id: [log1], log2.id: [log2]}
+
         # Mock the conversion to AuditLogResponse
-        with patch.object(service, "get_conversation_thread") as mock_get_thread:
+        with patch.object(service, "_to_response") as mock_to_response:
             mock_response1 = Mock()
             mock_response1.dict.return_value = {"id": str(log1.id), "operation": "llm_generation"}
             mock_response2 = Mock()
             mock_response2.dict.return_value = {"id": str(log2.id), "operation": "image_generation"}
 
-            mock_get_thread.side_effect = [[mock_response1], [mock_response2]]
+            mock_to_response.side_effect = [mock_response1, mock_response2]
 
             result = service.export_audit_data(format="json")
 
@@ -469,6 +459,7 @@ class TestAuditService:
             assert "export_timestamp" in data
             assert data["total_records"] == 2
             assert "audit_logs" in data
+            mock_repository.get_threads.assert_called_once_with([log1.id, log2.id])
 
     def test_export_audit_data_csv(self):
         """Test exporting audit data as CSV."""
@@ -538,17 +529,12 @@ class TestAuditService:
         mock_session = Mock()
         mock_repository = Mock(spec=AuditLogRepository)
 
-        # Create mock audit logs
-        logs = []
-        for i in range(5):
-            log = Mock()
-            log.status = "completed" if i < 4 else "failed"
-            log.operation = "llm_generation" if i < 3 else "image_generation"
-            log.latency_ms = 1000 + i * 100
-            log.token_usage = 50 + i * 10
-            logs.append(log)
-
-        mock_repository.get_filtered.return_value = logs
+        # Aggregated rows: operation, model, status, count, latency sum/count, tokens
+        mock_repository.get_statistics.return_value = [
+            ("llm_generation", "llama3.2", "completed", 3, 3300, 3, 180),
+            ("image_generation", "sd-1.5", "completed", 1, 1300, 1, 80),
+            ("image_generation", "sd-1.5", "failed", 1, 1400, 1, 90),
+        ]
 
         service = AuditService(db_session=mock_session)
         service.repository = mock_repository
@@ -567,7 +553,7 @@ class TestAuditService:
         """Test getting audit statistics with no logs."""
         mock_session = Mock()
         mock_repository = Mock(spec=AuditLogRepository)
-        mock_repository.get_filtered.return_value = []
+        mock_repository.get_statistics.return_value = []
 
         service = AuditService(db_session=mock_session)
         service.repository = mock_repository
@@ -581,6 +567,34 @@ class TestAuditService:
         assert stats["average_latency_ms"] == 0.0
         assert stats["total_tokens"] == 0
 
+    def test_get_audit_statistics_cached_per_window(self):
+        """Test that statistics are cached per time window."""
+        mock_repository = Mock(spec=AuditLogRepository)
+        mock_repository.get_statistics.return_value = [
+            ("llm_generation", "llama3.2", "finalized", 2, 200, 2, 20)
+        ]
+
+        service = AuditService(db_session=Mock())
+        service.repository = mock_repository
+
+        window_start = datetime(2026, 10, 1)
+        first = service.get_audit_statistics(start_date=window_start)
+        second = service.get_audit_statistics(start_date=window_start)
+        service.get_audit_statistics(start_date=window_start + timedelta(days=1))
+
+        assert first == second
+        assert first["completeness_percentage"] == 100
+        assert mock_repository.get_statistics.call_count == 2
+
+        # Callers get copies, so mutating one does not change the cached entry
+        first["status_breakdown"]["finalized"] = 99
+        assert service.get_audit_statistics(start_date=window_start) == second
+        assert mock_repository.get_statistics.call_count == 2
+
+        with patch("src.services.audit_service.STATISTICS_CACHE_TTL_SECONDS", 0):
+            service.get_audit_statistics(start_date=window_start)
+        assert mock_repository.get_statistics.call_count == 3
+
 
 class TestAuditServiceGlobalFunctions:
     """Test global audit service functions."""
@@ -0,0 +1,196 @@
+"""
+Tests for audit statistics aggregated in the database, plus a benchmark with
+2M audit rows.
+"""
+
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.data.models import AuditLog, Base, User
+from src.data.repositories import AuditLogRepository
+from src.data.schemas import AuditLogFilters
+from src.services import audit_service as audit_service_module
+from src.services.audit_service import AuditService
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, AuditLog.__table__])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def add_log(session, operation, model_used, latency_ms, status="completed", tokens=None, **kwargs):
+    session.add(
+        AuditLog(
+            request_id=uuid4().hex,
+            operation=operation,
+            model_used=model_used,
+            latency_ms=latency_ms,
+            status=status,
+            token_usage=tokens,
+            created_at=kwargs.get("created_at", datetime.utcnow()),
+        )
+    )
+
+
+class TestAuditStatisticsAggregation:
+    """Test statistics computed with GROUP BY queries."""
+
+    def test_statistics_match_logs(self, session):
+        for latency in (100, 200, 300):
+            add_log(session, "llm_generation", "llama3.2", latency, tokens=10)
+        add_log(session, "llm_generation", "llama3.2", None, status="failed")
+        add_log(session, "image_generation", "sd-1.5", 0, status="finalized", tokens=5)
+        session.flush()
+
+        stats = AuditService(db_session=session).get_audit_statistics()
+
+        assert stats["total_logs"] == 5
+        assert stats["status_breakdown"] == {"completed": 3, "failed": 1, "finalized": 1}
+        assert stats["operation_breakdown"] == {"llm_generation": 4, "image_generation": 1}
+        assert stats["completeness_percentage"] == 20
+        # Logs without a recorded latency are not averaged
+        assert stats["average_latency_ms"] == 200
+        assert stats["total_tokens"] == 35
+        assert "latency_percentiles" not in stats
+
+    def test_statistics_respect_window(self, session):
+        now = datetime(2026, 10, 16, 12)
+        add_log(session, "llm_generation", "llama3.2", 100, created_at=now - timedelta(days=2))
+        add_log(session, "llm_generation", "llama3.2", 300, created_at=now)
+        session.flush()
+
+        stats = AuditService(db_session=session).get_audit_statistics(
+            start_date=now - timedelta(days=1), end_date=now
+        )
+
+        assert stats["total_logs"] == 1
+        assert stats["average_latency_ms"] == 300
+        assert stats["period_start"] == "2026-10-15T12:00:00"
+
+    def test_latency_percentiles_per_operation_and_model(self, session):
+        for latency in range(1, 101):
+            add_log(session, "llm_generation", "llama3.2", latency)
+        for latency in (10, 20, 30):
+            add_log(session, "llm_generation", "mistral", latency)
+        add_log(session, "image_generation", None, 500)
+        session.flush()
+
+        stats = AuditService(db_session=session).get_audit_statistics(include_percentiles=True)
+
+        assert [
+            (row["operation"], row["model_used"], row["p50"], row["p95"], row["p99"])
+            for row in stats["latency_percentiles"]
+        ] == [
+            ("image_generation", None, 500, 500, 500),
+            ("llm_generation", "llama3.2", 50, 95, 99),
+            ("llm_generation", "mistral", 20, 30, 30),
+        ]
+
+    def test_cached_statistics_are_copies(self, session):
+        add_log(session, "chat", "llama3.2", 100)
+        session.flush()
+        service = AuditService(db_session=session)
+
+        service.get_audit_statistics()["status_breakdown"]["completed"] = 99
+
+        assert service.get_audit_statistics()["status_breakdown"] == {"completed": 1}
+
+    def test_statistics_cache_expires_and_is_bounded(self, session, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(audit_service_module.time, "monotonic", lambda: clock[0])
+        add_log(session, "chat", "llama3.2", 100)
+        session.flush()
+        service = AuditService(db_session=session)
+        start = datetime(2026, 10, 16)
+
+        for minutes in range(audit_service_module.STATISTICS_CACHE_MAX_ENTRIES + 10):
+            service.get_audit_statistics(start_date=start + timedelta(minutes=minutes))
+        assert len(service._statistics_cache) == audit_service_module.STATISTICS_CACHE_MAX_ENTRIES
+
+        # Expired windows are recomputed and pruned on the next insert
+        add_log(session, "chat", "llama3.2", 300)
+        session.flush()
+        clock[0] += audit_service_module.STATISTICS_CACHE_TTL_SECONDS
+        assert service.get_audit_statistics()["total_logs"] == 2
+        assert list(service._statistics_cache) == [(None, None, False)]
+
+    def test_repository_percentiles_with_filters(self, session):
+        for latency in (5, 1, 4, 2, 3):
+            add_log(session, "chat", "llama3.2", latency)
+        add_log(session, "chat", "llama3.2", 1000, status="failed")
+        session.flush()
+
+        percentiles = AuditLogRepository(session).get_latency_percentiles(
+            AuditLogFilters(status="completed"), (20, 50, 100)
+        )
+
+        assert percentiles == {("chat", "llama3.2"): {20: 1, 50: 3, 100: 5}}
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestAuditStatisticsBenchmark:
+    """Statistics latency over multi-million-row audit tables."""
+
+    def test_statistics_under_one_second(self, session):
+        n_rows = 2_000_000
+        session.execute(
+            text(
+                """
+                WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows)
+                INSERT INTO audit_logs
+                    (id, request_id, operation, model_used, latency_ms, token_usage, status,
+                     created_at)
+                SELECT 'log-' || n, 'req-' || n,
+                       CASE n % 4 WHEN 0 THEN 'image_generation' ELSE 'llm_generation' END,
+                       CASE n % 3 WHEN 0 THEN 'llama3.2' WHEN 1 THEN 'mistral' ELSE 'sd-1.5' END,
+                       n % 3000, n % 200,
+                       CASE WHEN n % 50 = 0 THEN 'failed' ELSE 'finalized' END,
+                       strftime('%Y-%m-%d %H:%M:%f', 'now', '-' || (n % 129600) || ' minutes')
+                FROM seq
+                """
+            ),
+            {"rows": n_rows},
+        )
+        # Planner statistics, as kept current by autovacuum on PostgreSQL
+        session.execute(text("ANALYZE"))
+        session.commit()
+
+        service = AuditService(db_session=session)
+        start = time.perf_counter()
+        stats = service.get_audit_statistics()
+        elapsed = time.perf_counter() - start
+        print(f"\naudit statistics over {n_rows:,} rows: {elapsed * 1000:.0f}ms")
+
+        assert stats["total_logs"] == n_rows
+        assert stats["status_breakdown"]["failed"] == n_rows // 50
+        assert elapsed < 1.0
+
+        start = time.perf_counter()
+        stats_start = datetime.utcnow() - timedelta(days=30)
+        stats = service.get_audit_statistics(start_date=stats_start)
+        elapsed = time.perf_counter() - start
+        print(f"last 30 days: {elapsed * 1000:.0f}ms")
+        assert 0 < stats["total_logs"] < n_rows
+        assert elapsed < 1.0
+
+        # Served from the per-window cache afterwards
+        start = time.perf_counter()
+        assert service.get_audit_statistics(start_date=stats_start) == stats
+        assert time.perf_counter() - start < 0.01
+
+        start = time.perf_counter()
+        stats = service.get_audit_statistics(
+            start_date=datetime.utcnow() - timedelta(days=7), include_percentiles=True
+        )
+        print(f"percentiles over the last 7 days: {(time.perf_counter() - start) * 1000:.0f}ms")
+        assert len(stats["latency_percentiles"]) == 6
@@ -0,0 +1,138 @@
+"""
+Tests for conversation thread retrieval with recursive queries and the
+batched thread export of the audit service.
+"""
+
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from src.data.models import AuditLog, Base, User
+from src.services import audit_service as audit_service_module
+from src.services.audit_service import AuditService
+
+START = datetime(2026, 10, 16, 9)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'threads.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, AuditLog.__table__])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def add_log(session, parent=None, minutes=0, operation="chat"):
+    log = AuditLog(
+        id=uuid4(),
+        request_id=uuid4().hex,
+        operation=operation,
+        status="completed",
+        parent_log_id=parent.id if parent else None,
+        created_at=START + timedelta(minutes=minutes),
+    )
+    session.add(log)
+    session.flush()
+    return log
+
+
+class TestConversationThreads:
+    """Test thread resolution and ordering."""
+
+    def test_thread_from_any_member(self, session):
+        root = add_log(session)
+        first = add_log(session, root, minutes=1)
+        second = add_log(session, root, minutes=2)
+        nested = add_log(session, first, minutes=3)
+        add_log(session)  # Unrelated thread
+        service = AuditService(db_session=session)
+
+        thread = service.get_conversation_thread(nested.id)
+
+        # Depth first, newest children first
+        assert [log.id for log in thread] == [root.id, second.id, first.id, nested.id]
+        assert [log.id for log in service.get_conversation_thread(root.id)] == [
+            log.id for log in thread
+        ]
+
+    def test_parent_cycle_lists_each_log_once(self, session):
+        first = add_log(session)
+        second = add_log(session, first, minutes=1)
+        third = add_log(session, second, minutes=2)
+        first.parent_log_id = third.id
+        session.flush()
+        service = AuditService(db_session=session)
+
+        thread = service.get_conversation_thread(second.id)
+
+        assert sorted(log.id for log in thread) == sorted([first.id, second.id, third.id])
+        assert len(service.get_conversation_thread(third.id)) == 3
+
+    def test_missing_log(self, session):
+        assert AuditService(db_session=session).get_conversation_thread(uuid4()) == []
+
+    def test_thread_costs_two_queries(self, session, count_queries):
+        root = add_log(session)
+        parent = root
+        for i in range(50):
+            parent = add_log(session, parent, minutes=i + 1)
+        service = AuditService(db_session=session)
+
+        count_queries.clear()
+        thread = service.get_conversation_thread(parent.id)
+
+        assert len(thread) == 51
+        assert thread[0].id == root.id
+        assert len(count_queries) == 2
+
+
+class TestThreadExport:
+    """Test exporting audit logs with their conversation context."""
+
+    def test_export_includes_each_thread_once(self, session):
+        root = add_log(session, operation="start")
+        child = add_log(session, root, minutes=1)
+        other = add_log(session, minutes=2, operation="image_generation")
+        service = AuditService(db_session=session)
+
+        data = json.loads(service.export_audit_data(format="json"))
+
+        # Logs are listed newest first, so the single-log thread comes first
+        assert [log["id"] for log in data["audit_logs"]] == [
+            str(other.id),
+            str(root.id),
+            str(child.id),
+        ]
+
+    def test_export_queries_scale_with_batches(self, session, count_queries, monkeypatch):
+        monkeypatch.setattr(audit_service_module, "EXPORT_BATCH_SIZE", 100)
+        for i in range(100):
+            root = add_log(session, minutes=i)
+            parent = root
+            for j in range(4):
+                parent = add_log(session, parent, minutes=i + j + 1)
+        service = AuditService(db_session=session)
+
+        count_queries.clear()
+        data = json.loads(service.export_audit_data(format="json"))
+
+        assert data["total_records"] == 500
+        # One query for the logs, then at most two per batch of 100 logs
+        assert len(count_queries) <= 1 + 2 * 5
@@ -0,0 +1,216 @@
+"""
+Tests for tag-based cache invalidation across the memory and disk tiers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from src.data.models import ConsentType
+from src.logic.pald import PALDManager
+from src.services import caching_service
+from src.services.caching_service import (
+    CacheEntry,
+    CacheLevel,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    MultiLevelCachingService,
+    cached,
+    invalidate_cache_tags,
+    model_cache_tag,
+    schema_cache_tag,
+    user_cache_tag,
+)
+from src.services.consent_service import ConsentService
+from src.services.performance_monitoring_service import performance_monitor
+
+
+def make_entry(key, value, tags=()):
+    return CacheEntry(
+        key=key,
+        value=value,
+        created_at=datetime.now(),
+        last_accessed=datetime.now(),
+        access_count=0,
+        ttl_seconds=3600,
+        size_bytes=0,
+        tags=tuple(tags),
+    )
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    service = MultiLevelCachingService(disk_cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(caching_service, "cache_service", service)
+    yield service
+    service.disk_cache.close()
+
+
+class TestBackendTagIndex:
+    """Test the tag -> keys index of each backend."""
+
+    def test_memory_delete_tag(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", make_entry("a", 1, ["user:1"]))
+        backend.set("b", make_entry("b", 2, ["user:1", "pald_schema"]))
+        backend.set("c", make_entry("c", 3, ["user:2"]))
+
+        assert backend.delete_tag("user:1") == 2
+        assert backend.get("a") is None and backend.get("b") is None
+        assert backend.get("c").value == 3
+        assert backend.delete_tag("pald_schema") == 0
+        assert backend.get_stats().entry_count == 1
+
+    def test_memory_index_follows_replacement_and_eviction(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", make_entry("a", 1, ["old"]))
+        backend.set("a", make_entry("a", 2, ["new"]))
+        backend.set("b", make_entry("b", 3, ["new"]))
+        backend.set("c", make_entry("c", 4, ["new"]))  # evicts "a"
+
+        assert "old" not in backend._tag_index
+        assert backend._tag_index["new"] == {"b", "c"}
+        assert backend.delete_tag("new") == 2
+        assert backend._tag_index == {}
+
+    def test_disk_delete_tag_survives_reopen(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        backend = DiskCacheBackend(cache_dir=cache_dir)
+        backend.set("a", make_entry("a", 1, ["user:1"]))
+        backend.set("b", make_entry("b", 2, ["user:2"]))
+        # Replacing an entry replaces its tags
+        backend.set("b", make_entry("b", 3, ["user:1"]))
+        backend.close()
+
+        reopened = DiskCacheBackend(cache_dir=cache_dir)
+        assert reopened.get("a").tags == ("user:1",)
+        assert reopened.delete_tag("user:2") == 0
+        assert reopened.delete_tag("user:1") == 2
+        assert reopened.get_stats().entry_count == 0
+        assert reopened._db.execute("SELECT COUNT(*) FROM entry_tags").fetchone()[0] == 0
+        reopened.close()
+
+
+class TestInvalidateTag:
+    """Test invalidation through the multi-level service and @cached."""
+
+    def test_invalidates_both_tiers(self, cache):
+        cache.set("memory", "m", cache_level=CacheLevel.MEMORY, tags=[user_cache_tag(7)])
+        cache.set(
+            "disk", "d", cache_level=CacheLevel.DISK, tags=[user_cache_tag(7), schema_cache_tag()]
+        )
+        cache.set("other", "o", cache_level=CacheLevel.MEMORY, tags=[user_cache_tag(8)])
+
+        assert invalidate_cache_tags(user_cache_tag(7)) == 2
+        assert cache.get("memory") is None and cache.get("disk") is None
+        assert cache.get("other") == "o"
+        assert performance_monitor.counters["cache_tag_invalidations"] >= 1
+
+    def test_cached_with_tag_function(self, cache):
+        calls = []
+
+        @cached(
+            key_func=lambda user_id: f"summary:{user_id}",
+            ttl_seconds=86400,
+            tags=lambda user_id: [user_cache_tag(user_id)],
+        )
+        def user_summary(user_id):
+            calls.append(user_id)
+            return {"user": user_id, "version": len(calls)}
+
+        assert user_summary(1)["version"] == 1
+        assert user_summary(1)["version"] == 1
+        invalidate_cache_tags(user_cache_tag(1))
+        assert user_summary(1)["version"] == 2
+
+    def test_result_invalidated_while_computing_is_not_stored(self, cache):
+        started, release = threading.Event(), threading.Event()
+        versions = iter(range(1, 100))
+
+        @cached(key_func=lambda: "model_list", ttl_seconds=86400, tags=[model_cache_tag("abc")])
+        def list_models():
+            started.set()
+            release.wait(5)
+            return next(versions)
+
+        worker = threading.Thread(target=list_models)
+        worker.start()
+        started.wait(5)
+        invalidate_cache_tags(model_cache_tag("abc"))
+        release.set()
+        worker.join()
+
+        # The stale computation was not cached, so this call recomputes
+        assert list_models() == 2
+
+    def test_invalidation_errors_do_not_propagate(self, monkeypatch):
+        broken = MagicMock()
+        broken.invalidate_tags.side_effect = RuntimeError("disk gone")
+        monkeypatch.setattr(caching_service, "cache_service", broken)
+
+        assert invalidate_cache_tags(user_cache_tag(1)) == 0
+
+
+class TestMutationHooks:
+    """Test that PALD and consent mutations invalidate the user's entries."""
+
+    def test_pald_update_invalidates_user_tag(self, cache):
+        user_id = uuid4()
+        cache.set("pald_summary", {"x": 1}, tags=[user_cache_tag(user_id)])
+        manager = PALDManager(MagicMock())
+        existing = MagicMock(user_id=user_id, pald_content={}, schema_version="1.0.0")
+        manager.repository = MagicMock()
+        manager.repository.get_by_id.return_value = existing
+        manager.schema_service = MagicMock()
+        manager.schema_service.validate_pald_data.return_value = MagicMock(is_valid=True, errors=[])
+
+        with patch("src.logic.pald.PALDDataResponse.model_validate"):
+            manager.update_pald_data(uuid4(), user_id, MagicMock(pald_content={"a": 1}))
+
+        assert cache.get("pald_summary") is None
+
+    def test_consent_withdrawal_invalidates_user_tag(self, cache):
+        user_id = uuid4()
+        cache.set("consent_status", {"data_processing": True}, tags=[user_cache_tag(user_id)])
+
+        @contextmanager
+        def fake_session():
+            yield MagicMock()
+
+        service = ConsentService()
+        with patch("src.services.consent_service.get_session", fake_session), patch.object(
+            ConsentService, "_get_consent_logic"
+        ) as get_logic:
+            get_logic.return_value.withdraw_consent.return_value = True
+            assert service.withdraw_consent(user_id, ConsentType.DATA_PROCESSING) is True
+
+        assert cache.get("consent_status") is None
+
+
+@pytest.mark.performance
+class TestTagInvalidationBenchmark:
+    """Cost of invalidating one user's entries among many."""
+
+    def test_invalidate_one_tag_among_many(self, cache):
+        users, entries_per_user = 1000, 10
+        for user in range(users):
+            for i in range(entries_per_user):
+                cache.set(
+                    f"u{user}:{i}", i, cache_level=CacheLevel.DISK, tags=[user_cache_tag(user)]
+                )
+
+        start = time.perf_counter()
+        removed = cache.invalidate_tag(user_cache_tag(500))
+        invalidate_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"invalidate 1 user among {users * entries_per_user} disk entries: "
+            f"{removed} removed in {invalidate_ms:.2f} ms"
+        )
+        assert removed == entries_per_user
+        assert invalidate_ms < 500
@@ -0,0 +1,186 @@
+"""
+Tests for single-flight, stale-while-revalidate and early expiry in @cached.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.services import caching_service
+from src.services.caching_service import MultiLevelCachingService, cached
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    service = MultiLevelCachingService(disk_cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(caching_service, "cache_service", service)
+    yield service
+    service.disk_cache.close()
+
+
+def run_concurrently(func, threads):
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+    errors = [None] * threads
+
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = func()
+        except Exception as e:
+            errors[i] = e
+
+    workers = [threading.Thread(target=call, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results, errors
+
+
+def wait_for_refresh(key, timeout=5.0):
+    deadline = time.time() + timeout
+    while caching_service._single_flight.in_flight(key) and time.time() < deadline:
+        time.sleep(0.005)
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent misses."""
+
+    def test_concurrent_misses_compute_once(self, cache):
+        calls = []
+
+        @cached(key_func=lambda: "stats", ttl_seconds=60)
+        def load_stats():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"users": 3}
+
+        results, errors = run_concurrently(load_stats, 8)
+
+        assert len(calls) == 1
+        assert results == [{"users": 3}] * 8
+        assert errors == [None] * 8
+        assert cache.get_stats()["decorator"].coalesced == 7
+
+    def test_leader_error_reaches_waiting_callers(self, cache):
+        calls = []
+
+        @cached(key_func=lambda: "broken", ttl_seconds=60)
+        def broken():
+            calls.append(1)
+            time.sleep(0.1)
+            raise RuntimeError("backend down")
+
+        _, errors = run_concurrently(broken, 4)
+
+        assert len(calls) == 1
+        assert all(isinstance(e, RuntimeError) for e in errors)
+        with pytest.raises(RuntimeError):
+            broken()
+        assert len(calls) == 2
+
+    def test_single_flight_can_be_disabled(self, cache):
+        calls = []
+
+        @cached(key_func=lambda: "each", ttl_seconds=60, single_flight=False)
+        def each():
+            calls.append(1)
+            time.sleep(0.05)
+            return 1
+
+        run_concurrently(each, 4)
+
+        assert len(calls) == 4
+
+
+class TestStaleWhileRevalidate:
+    """Test serving expired values during a background refresh."""
+
+    def test_stale_value_served_while_refreshing(self, cache):
+        version = iter(range(1, 100))
+
+        @cached(key_func=lambda: "schema", ttl_seconds=0, stale_ttl_seconds=60)
+        def load_schema():
+            time.sleep(0.02)
+            return next(version)
+
+        assert load_schema() == 1
+        # Expired immediately (ttl 0): served stale while a refresh runs
+        assert load_schema() == 1
+        wait_for_refresh("schema")
+        assert load_schema() == 2
+        assert cache.get_stats()["decorator"].stale_served == 2
+
+    def test_failed_refresh_keeps_stale_value(self, cache):
+        calls = []
+
+        @cached(key_func=lambda: "flaky", ttl_seconds=0, stale_ttl_seconds=60)
+        def flaky():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("refresh failed")
+            return "first"
+
+        assert flaky() == "first"
+        assert flaky() == "first"
+        wait_for_refresh("flaky")
+        assert flaky() == "first"
+
+
+class TestEarlyExpiry:
+    """Test probabilistic early recomputation."""
+
+    def test_large_beta_refreshes_before_expiry(self, cache):
+        values = iter(range(1, 100))
+
+        @cached(key_func=lambda: "models", ttl_seconds=60, early_expiry_beta=1e9)
+        def list_models():
+            time.sleep(0.001)
+            return next(values)
+
+        assert list_models() == 1
+        assert list_models() == 2
+        assert cache.get_stats()["decorator"].early_refreshes == 1
+
+    def test_no_early_refresh_by_default(self, cache):
+        values = iter(range(1, 100))
+
+        @cached(key_func=lambda: "plain", ttl_seconds=60)
+        def plain():
+            return next(values)
+
+        assert [plain() for _ in range(5)] == [1] * 5
+        assert cache.get_stats()["decorator"].early_refreshes == 0
+
+
+@pytest.mark.performance
+class TestDogpileBenchmark:
+    """Recomputations of an expiring hot key with and without single-flight."""
+
+    def test_expiring_hot_key(self, cache):
+        outcomes = {}
+        for single_flight in (False, True):
+            calls = []
+
+            @cached(
+                key_func=lambda: f"hot:{single_flight}",
+                ttl_seconds=60,
+                single_flight=single_flight,
+            )
+            def admin_stats():
+                calls.append(1)
+                time.sleep(0.05)
+                return {"total": 1}
+
+            start = time.perf_counter()
+            run_concurrently(admin_stats, 32)
+            outcomes[single_flight] = (len(calls), time.perf_counter() - start)
+
+        print(
+            f"32 concurrent misses: {outcomes[False][0]} computations without single-flight, "
+            f"{outcomes[True][0]} with ({outcomes[True][1] * 1000:.0f} ms)"
+        )
+        assert outcomes[True][0] == 1
+        assert outcomes[False][0] > 1
@@ -0,0 +1,171 @@
+"""
+Tests for token-budgeted conversation context management.
+"""
+
+import time
+from uuid import uuid4
+
+import pytest
+
+from src.logic.conversation_context import (
+    ConversationContextManager,
+    estimate_tokens,
+    summarize_turns,
+)
+from src.logic.llm import LLMLogic
+from src.services.llm_provider import MockLLMProvider
+from src.services.llm_service import LLMService
+
+
+class TestHelpers:
+    """Test token estimation and extractive summaries."""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+    def test_summarize_keeps_first_sentence(self):
+        summary = summarize_turns(
+            [{"role": "user", "content": "I like maths. Also physics and more."}]
+        )
+
+        assert summary == "User: I like maths."
+
+    def test_summarize_truncates_long_turns(self):
+        summary = summarize_turns([{"role": "assistant", "content": "x" * 500}], 50)
+
+        assert len(summary) <= len("Assistant: ") + 50
+        assert summary.endswith("...")
+
+
+class TestConversationContextManager:
+    """Test the bounded conversation window."""
+
+    def test_history_stays_within_budget(self):
+        manager = ConversationContextManager(history_token_budget=100, summary_token_budget=50)
+
+        for i in range(50):
+            manager.add_exchange("c1", f"question {i} " * 10, f"answer {i} " * 10)
+
+        stats = manager.get_conversation_stats("c1")
+        assert stats["history_tokens"] <= 100
+        assert stats["folded_messages"] > 0
+        assert stats["total_messages"] == 100
+        # Summary never grows beyond budget plus the newest folded line
+        assert 0 < stats["summary_tokens"] <= 50 + 100
+
+    def test_folded_turns_appear_in_summary(self):
+        manager = ConversationContextManager(max_turns=2)
+
+        manager.add_exchange("c1", "My name is Ada.", "Nice to meet you.")
+        manager.add_exchange("c1", "I study physics.", "Great choice.")
+
+        history = manager.render_history("c1")
+        assert "Summary of earlier conversation: User: My name is Ada." in history
+        assert "\nUser: I study physics." in history
+        assert len(manager.get_turns("c1")) == 2
+
+    def test_history_text_is_cached_until_change(self):
+        manager = ConversationContextManager()
+        manager.add_exchange("c1", "hi", "hello")
+
+        first = manager.render_history("c1")
+        assert manager.render_history("c1") is first
+
+        manager.add_exchange("c1", "again", "sure")
+        assert manager.render_history("c1") is not first
+
+    def test_system_prompt_rebuilt_only_on_context_change(self):
+        manager = ConversationContextManager()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return "system"
+
+        manager.get_system_prompt("c1", "fp1", build)
+        manager.get_system_prompt("c1", "fp1", build)
+        manager.get_system_prompt("c1", "fp2", build)
+
+        assert len(builds) == 2
+
+    def test_idle_conversations_are_evicted(self):
+        manager = ConversationContextManager(ttl_seconds=0.05)
+        manager.add_exchange("old", "a", "b")
+        time.sleep(0.1)
+        manager.add_exchange("new", "c", "d")
+
+        assert manager.get_turns("old") == []
+        assert len(manager.get_turns("new")) == 2
+        assert manager.get_stats()["evicted"] == 1
+
+    def test_max_conversations_cap(self):
+        manager = ConversationContextManager(max_conversations=3)
+        for i in range(5):
+            manager.add_exchange(f"c{i}", "a", "b")
+
+        assert manager.get_stats()["conversations"] == 3
+        assert manager.get_turns("c0") == []
+
+    def test_clear(self):
+        manager = ConversationContextManager()
+        manager.add_exchange("c1", "a", "b")
+
+        assert manager.clear("c1") is True
+        assert manager.clear("c1") is False
+
+
+class TestLLMLogicContextWindow:
+    """Test LLMLogic prompt assembly over long sessions."""
+
+    @pytest.fixture
+    def logic(self):
+        provider = MockLLMProvider(
+            responses={"default": "That is a thoughtful point about learning. " * 5},
+            latency_ms=0,
+        )
+        service = LLMService(provider=provider, response_cache=None)
+        manager = ConversationContextManager(history_token_budget=400, summary_token_budget=100)
+        return LLMLogic(llm_service=service, context_manager=manager), provider
+
+    def test_prompt_length_is_bounded_in_long_sessions(self, logic):
+        llm_logic, provider = logic
+        user_id = uuid4()
+        prompt_lengths = []
+
+        for i in range(100):
+            llm_logic.generate_embodiment_response(
+                user_message=f"Message {i}: tell me more about study technique number {i}.",
+                user_id=user_id,
+                embodiment_context={"personality": {"tone": "warm"}},
+            )
+            prompt_lengths.append(len(provider.last_request.prompt))
+
+        # Prompts stop growing once the window is full
+        assert max(prompt_lengths[50:]) <= max(prompt_lengths[:50]) * 1.2
+        summary = llm_logic.get_conversation_summary(str(user_id))
+        assert summary["folded_messages"] > 0
+        assert summary["last_prompt_tokens"] > 0
+        assert summary["last_turn_latency_ms"] is not None
+
+    def test_prompt_contains_embodiment_context_and_history(self, logic):
+        llm_logic, provider = logic
+        user_id = uuid4()
+
+        llm_logic.generate_embodiment_response("Hi", user_id, {"personality": {"tone": "warm"}})
+        llm_logic.generate_embodiment_response("Again", user_id, {"personality": {"tone": "warm"}})
+
+        prompt = provider.last_request.prompt
+        assert "Personality traits: tone: warm" in prompt
+        assert "Conversation history:\nUser: Hi" in prompt
+        assert prompt.endswith("User: Again\nAssistant:")
+
+    def test_clear_conversation_context(self, logic):
+        llm_logic, _ = logic
+        user_id = uuid4()
+        llm_logic.generate_embodiment_response("Hi", user_id)
+
+        llm_logic.clear_conversation_context(str(user_id))
+
+        assert llm_logic.get_conversation_summary(str(user_id))["message_count"] == 0
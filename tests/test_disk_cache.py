@@ -0,0 +1,261 @@
+"""
+Tests for the indexed, sharded disk cache backend and its payload encoding.
+"""
+
+import os
+import pickle
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.services.caching_service import CacheEntry, DiskCacheBackend
+
+
+def make_entry(key, value, ttl_seconds=60):
+    return CacheEntry(
+        key=key,
+        value=value,
+        created_at=datetime.now(),
+        last_accessed=datetime.now(),
+        access_count=0,
+        ttl_seconds=ttl_seconds,
+        size_bytes=0,
+    )
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskCacheBackend(cache_dir=str(tmp_path / "cache"), max_size_mb=1)
+    yield cache
+    cache.close()
+
+
+class TestDiskCacheBackend:
+    """Test index bookkeeping, eviction and persistence."""
+
+    def test_entries_are_sharded(self, disk_cache):
+        disk_cache.set("alpha", make_entry("alpha", "value"))
+
+        file_path = disk_cache._get_file_path("alpha")
+        shard = os.path.basename(os.path.dirname(file_path))
+
+        assert os.path.exists(file_path)
+        assert shard == os.path.basename(file_path)[:2]
+        assert disk_cache.get("alpha").value == "value"
+
+    def test_replacing_entry_keeps_totals_consistent(self, disk_cache):
+        disk_cache.set("key", make_entry("key", "x" * 1000))
+        disk_cache.set("key", make_entry("key", "y"))
+
+        stats = disk_cache.get_stats()
+
+        assert stats.entry_count == 1
+        assert stats.size_bytes == os.path.getsize(disk_cache._get_file_path("key"))
+        assert disk_cache.get("key").value == "y"
+
+    def test_evicts_least_recently_used(self, disk_cache):
+        payload = "x" * 100_000
+        for i in range(8):
+            disk_cache.set(f"k{i}", make_entry(f"k{i}", payload))
+            time.sleep(0.001)
+        # Reading k0 makes k1 the least recently used entry
+        assert disk_cache.get("k0") is not None
+
+        for i in range(8, 12):
+            disk_cache.set(f"k{i}", make_entry(f"k{i}", payload))
+
+        stats = disk_cache.get_stats()
+        assert stats.evictions > 0
+        assert stats.size_bytes <= disk_cache.max_size_bytes
+        assert disk_cache.get("k0") is not None
+        assert disk_cache.get("k1") is None
+        assert not os.path.exists(disk_cache._get_file_path("k1"))
+
+    def test_expired_entries(self, disk_cache):
+        disk_cache.set("gone", make_entry("gone", 1, ttl_seconds=0))
+        disk_cache.set("stays", make_entry("stays", 2))
+
+        assert disk_cache.purge_expired() == 1
+        assert disk_cache.get("gone") is None
+        assert disk_cache.get_stats().entry_count == 1
+
+    def test_failed_write_keeps_previous_entry(self, disk_cache):
+        disk_cache.set("key", make_entry("key", "old"))
+
+        with patch("src.services.caching_service.os.replace", side_effect=OSError("disk full")):
+            assert disk_cache.set("key", make_entry("key", "new")) is False
+
+        assert disk_cache.get("key").value == "old"
+        shard = os.path.dirname(disk_cache._get_file_path("key"))
+        assert not [name for name in os.listdir(shard) if name.endswith(".tmp")]
+
+    def test_reopen_reads_totals_without_scanning(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        cache = DiskCacheBackend(cache_dir=cache_dir)
+        for i in range(20):
+            cache.set(f"k{i}", make_entry(f"k{i}", i))
+        expected = cache.get_stats()
+        cache.close()
+
+        with patch("src.services.caching_service.os.scandir", side_effect=AssertionError("scanned")):
+            reopened = DiskCacheBackend(cache_dir=cache_dir)
+
+        stats = reopened.get_stats()
+        assert (stats.entry_count, stats.size_bytes) == (expected.entry_count, expected.size_bytes)
+        assert reopened.get("k7").value == 7
+        assert reopened.clear() == 20
+        reopened.close()
+
+    def test_discards_pickled_files_from_older_formats(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        key_hash = DiskCacheBackend._hash_key(None, "legacy")
+        with open(cache_dir / f"{key_hash}.cache", "wb") as f:
+            pickle.dump(make_entry("legacy", "old format"), f)
+
+        with patch("src.services.cache_payloads.pickle.loads") as loads, patch("pickle.load") as load:
+            cache = DiskCacheBackend(cache_dir=str(cache_dir))
+            assert cache.get("legacy") is None
+
+        loads.assert_not_called()
+        load.assert_not_called()
+        assert not (cache_dir / f"{key_hash}.cache").exists()
+        assert cache.get_stats().entry_count == 0
+        cache.close()
+
+
+class TestDiskCachePayloads:
+    """Test typed payload encoding and zero-copy reads."""
+
+    def test_json_values_round_trip_without_pickle(self, disk_cache):
+        value = {"text": "hi", "tokens": [1, 2, 3], "nested": {"ok": True, "none": None}}
+
+        with patch("src.services.cache_payloads.pickle") as pickle_module:
+            disk_cache.set("doc", make_entry("doc", value))
+            entry = disk_cache.get("doc")
+
+        pickle_module.dumps.assert_not_called()
+        pickle_module.loads.assert_not_called()
+        assert entry.value == value
+        assert entry.ttl_seconds == 60
+        assert entry.access_count == 1
+
+    def test_large_bytes_are_memory_mapped(self, disk_cache):
+        payload = os.urandom(200_000)
+        disk_cache.set("blob", make_entry("blob", payload))
+        disk_cache.set("small", make_entry("small", b"tiny"))
+
+        blob = disk_cache.get("blob").value
+
+        assert isinstance(blob, memoryview) and blob.readonly
+        assert blob == payload
+        assert disk_cache.get("small").value == b"tiny"
+
+    def test_numpy_arrays_are_memory_mapped(self, disk_cache):
+        np = pytest.importorskip("numpy")
+        array = np.arange(100_000, dtype=np.float32).reshape(100, 1000)
+
+        disk_cache.set("array", make_entry("array", array))
+        cached = disk_cache.get("array").value
+
+        assert isinstance(cached, np.memmap)
+        assert not cached.flags.writeable
+        assert np.array_equal(cached, array)
+
+    def test_pickle_is_opt_in(self, tmp_path):
+        strict = DiskCacheBackend(cache_dir=str(tmp_path / "strict"))
+        permissive = DiskCacheBackend(cache_dir=str(tmp_path / "permissive"), allow_pickle=True)
+        value = {"a_set": {1, 2}}
+
+        assert strict.set("obj", make_entry("obj", value)) is False
+        assert permissive.set("obj", make_entry("obj", value)) is True
+        assert permissive.get("obj").value == value
+        permissive.close()
+
+        # A strict cache never unpickles entries, even ones written by a permissive one
+        shared = DiskCacheBackend(cache_dir=str(tmp_path / "permissive"))
+        assert shared.get("obj") is None
+        assert shared.get_stats().entry_count == 0
+        shared.close()
+        strict.close()
+
+    def test_access_counts_persist(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        cache = DiskCacheBackend(cache_dir=cache_dir)
+        cache.set("key", make_entry("key", "value"))
+        for _ in range(3):
+            cache.get("key")
+        cache.close()
+
+        reopened = DiskCacheBackend(cache_dir=cache_dir)
+        assert reopened.get("key").access_count == 4
+        reopened.close()
+
+
+@pytest.mark.performance
+class TestDiskCacheBenchmark:
+    """set/get/evict throughput of the indexed disk cache."""
+
+    @pytest.mark.parametrize(
+        "entries", [10_000, pytest.param(100_000, marks=pytest.mark.slow)]
+    )
+    def test_set_get_evict(self, tmp_path, entries):
+        payload = b"x" * 512
+        cache = DiskCacheBackend(cache_dir=str(tmp_path / "cache"), max_size_mb=1000)
+
+        start = time.perf_counter()
+        for i in range(entries):
+            cache.set(f"key_{i}", make_entry(f"key_{i}", payload))
+        set_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, entries, 10):
+            assert cache.get(f"key_{i}") is not None
+        get_seconds = time.perf_counter() - start
+
+        # Shrink the budget so every further set has to evict
+        cache.max_size_bytes = cache.get_stats().size_bytes
+        start = time.perf_counter()
+        for i in range(1000):
+            cache.set(f"new_{i}", make_entry(f"new_{i}", payload))
+        evict_seconds = time.perf_counter() - start
+
+        cache.close()
+        start = time.perf_counter()
+        reopened = DiskCacheBackend(cache_dir=str(tmp_path / "cache"), max_size_mb=1000)
+        open_seconds = time.perf_counter() - start
+
+        stats = reopened.get_stats()
+        reopened.close()
+
+        print(
+            f"{entries} entries: set {entries / set_seconds:.0f}/s, "
+            f"get {entries / 10 / get_seconds:.0f}/s, "
+            f"set+evict {1000 / evict_seconds:.0f}/s, reopen {open_seconds * 1000:.1f} ms"
+        )
+        assert stats.entry_count == entries
+        assert open_seconds < 1.0
+
+    def test_large_payload_reads_are_zero_copy(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        array = np.random.default_rng(0).random((2048, 2048))  # 32 MiB
+        cache = DiskCacheBackend(cache_dir=str(tmp_path / "cache"))
+        cache.set("array", make_entry("array", array))
+        pickled = pickle.dumps(make_entry("array", array))
+
+        start = time.perf_counter()
+        for _ in range(20):
+            pickle.loads(pickled)
+        pickle_ms = (time.perf_counter() - start) / 20 * 1000
+
+        start = time.perf_counter()
+        for _ in range(20):
+            cached = cache.get("array").value
+        mmap_ms = (time.perf_counter() - start) / 20 * 1000
+        cache.close()
+
+        print(f"32 MiB array get: pickle {pickle_ms:.2f} ms, mmap {mmap_ms:.2f} ms")
+        assert np.array_equal(cached, array)
+        assert mmap_ms < pickle_ms
@@ -0,0 +1,71 @@
+"""
+Tests for the shared image analysis context.
+"""
+
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.services.image_analysis_context import ImageAnalysisContext
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (64, 48, 3), dtype=np.uint8)
+    path = tmp_path / "image.png"
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+def test_decodes_lazily_and_once(image_path):
+    with patch("cv2.imread", wraps=cv2.imread) as mock_imread:
+        context = ImageAnalysisContext(image_path)
+        assert mock_imread.call_count == 0
+
+        context.gray
+        context.edges
+        context.gradient_magnitude
+        context.hsv
+        context.pil_image
+
+    assert mock_imread.call_count == 1
+
+
+def test_planes_match_direct_computation(image_path):
+    image = cv2.imread(image_path)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    context = ImageAnalysisContext(image_path)
+
+    assert np.array_equal(context.gray, gray)
+    assert np.array_equal(context.edges, cv2.Canny(gray, 50, 150))
+    assert np.array_equal(context.hsv, cv2.cvtColor(image, cv2.COLOR_BGR2HSV))
+    assert np.array_equal(np.asarray(context.pil_image), image[:, :, ::-1])
+    assert context.pil_image.size == (48, 64)
+    assert context.gray is context.gray
+
+
+def test_uses_provided_image():
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    with patch("cv2.imread") as mock_imread:
+        context = ImageAnalysisContext("unused.png", image=image)
+
+        assert context.image is image
+        assert context.gray.shape == (8, 8)
+    mock_imread.assert_not_called()
+
+
+def test_of_reuses_context(image_path):
+    context = ImageAnalysisContext(image_path)
+
+    assert ImageAnalysisContext.of(context) is context
+    assert ImageAnalysisContext.of(image_path).path == image_path
+
+
+def test_undecodable_file(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+
+    assert ImageAnalysisContext(path).image is None
@@ -4,6 +4,7 @@ Tests core isolation functionality, quality analysis, and configuration handling
 """
 
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -12,6 +13,7 @@ import numpy as np
 import pytest
 from PIL import Image
 
+from src.services.image_analysis_context import ImageAnalysisContext
 from src.services.image_isolation_service import (
     ImageIsolationConfig,
     ImageIsolationService,
@@ -68,6 +70,32 @@ def isolation_service(isolation_config):
     return ImageIsolationService(isolation_config)
 
 
+def reference_person_mask(height, width, bounding_boxes):
+    """Per-pixel mask construction the vectorized version must reproduce exactly."""
+    mask = np.zeros((height, width), dtype=np.float32)
+    if bounding_boxes:
+        for (x, y, w, h), weight in bounding_boxes:
+            center_x, center_y = x + w // 2, y + h // 2
+            for i in range(max(0, y), min(height, y + h)):
+                for j in range(max(0, x), min(width, x + w)):
+                    dx = (j - center_x) / (w / 2)
+                    dy = (i - center_y) / (h / 2)
+                    distance = np.sqrt(dx * dx + dy * dy)
+                    if distance <= 1.0:
+                        mask[i, j] = max(mask[i, j], max(0, 1.0 - distance * 0.3))
+    else:
+        center_x, center_y = width // 2, height // 2
+        radius_x, radius_y = width // 3, height // 3
+        for i in range(height):
+            for j in range(width):
+                dx = (j - center_x) / radius_x
+                dy = (i - center_y) / radius_y
+                distance = np.sqrt(dx * dx + dy * dy)
+                if distance <= 1.0:
+                    mask[i, j] = max(0, 1.0 - distance * 0.5)
+    return mask
+
+
 class TestImageIsolationConfig:
     """Test image isolation configuration."""
     
@@ -238,6 +266,26 @@ class TestImageIsolationService:
         else:
             assert result.error_message is not None
     
+    def test_isolate_person_reuses_analysis_context(self, isolation_service, test_image_path):
+        """Test that isolation does not decode an image the context already holds."""
+        isolation_service._detect_person = lambda image: {
+            "detected": True,
+            "confidence": 0.8,
+            "count": 1,
+            "bounding_boxes": [((25, 25, 50, 50), 0.8)]
+        }
+        context = ImageAnalysisContext(test_image_path)
+        context.image  # Decoded by an earlier stage
+        
+        with patch("cv2.imread") as mock_imread, patch("PIL.Image.open") as mock_open:
+            result = isolation_service.isolate_person(context)
+        
+        mock_imread.assert_not_called()
+        mock_open.assert_not_called()
+        assert result.success
+        assert result.original_image_path == test_image_path
+        Path(result.isolated_image_path).unlink(missing_ok=True)
+    
     def test_analyze_image_quality_invalid_image(self, isolation_service):
         """Test quality analysis with invalid image."""
         result = isolation_service.analyze_image_quality("nonexistent.jpg")
@@ -349,6 +397,55 @@ class TestImageIsolationService:
         edge_value = mask[10, 10]
         assert center_value >= edge_value
     
+    @pytest.mark.parametrize(
+        "size, boxes",
+        [
+            ((100, 100), [((25, 25, 50, 50), 0.8)]),
+            ((120, 90), [((-10, 5, 40, 70), 0.9), ((30, 60, 45, 80), 0.7), ((20, 20, 33, 31), 0.6)]),
+            ((64, 48), [((np.int32(3), np.int32(7), np.int32(21), np.int32(45)), 1.2)]),
+            ((101, 77), []),
+            ((64, 48), None),
+        ],
+    )
+    def test_create_person_mask_matches_per_pixel_reference(self, isolation_config, size, boxes):
+        """Test that the vectorized mask equals the per-pixel construction exactly."""
+        isolation_config.edge_refinement_enabled = False
+        service = ImageIsolationService(isolation_config)
+        height, width = size
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        detection = {"detected": True} if boxes is None else {"bounding_boxes": boxes}
+        
+        mask = service._create_person_mask(image, detection)
+        
+        assert mask.dtype == np.float32
+        assert np.array_equal(mask, reference_person_mask(height, width, boxes))
+    
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_create_person_mask_speedup(self, isolation_config):
+        """Benchmark vectorized mask construction against the per-pixel loops."""
+        isolation_config.edge_refinement_enabled = False
+        service = ImageIsolationService(isolation_config)
+        
+        for size in (256, 512, 1024):
+            image = np.zeros((size, size, 3), dtype=np.uint8)
+            box = ((size // 4, size // 8, size // 2, size * 3 // 4), 0.9)
+            for label, boxes in (("box", [box]), ("fallback", [])):
+                start = time.perf_counter()
+                mask = service._create_person_mask(image, {"bounding_boxes": boxes})
+                vectorized = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                expected = reference_person_mask(size, size, boxes)
+                loops = time.perf_counter() - start
+                
+                print(
+                    f"\n{size}x{size} {label}: {loops * 1000:.0f}ms -> "
+                    f"{vectorized * 1000:.2f}ms ({loops / vectorized:.0f}x)"
+                )
+                assert np.array_equal(mask, expected)
+                assert vectorized * 10 < loops
+    
     def test_assess_image_quality(self, isolation_service):
         """Test image quality assessment."""
         # Create test image with known characteristics
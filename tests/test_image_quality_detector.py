@@ -2,7 +2,9 @@
 Tests for Image Quality Detection Service.
 """
 
+import os
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
@@ -12,6 +14,7 @@ import numpy as np
 import pytest
 from PIL import Image
 
+from src.services.image_analysis_context import ImageAnalysisContext
 from src.services.image_quality_detector import (
     ImageQualityDetector,
     QualityDetectionConfig,
@@ -448,6 +451,177 @@ class TestImageQualityDetector(unittest.TestCase):
             self.assertTrue(result.is_faulty)
             self.assertGreater(len(result.recommendations), 0)
             self.assertIn("person", result.recommendations[0].lower())
+    
+    def test_detection_decodes_image_once(self):
+        """Test that all detection stages share one decoded image."""
+        image_path = self._create_test_image("decode_once.png")
+        
+        with patch('cv2.imread', wraps=cv2.imread) as mock_imread:
+            with patch.object(
+                self.detector, 'detect_people', wraps=self.detector.detect_people
+            ) as mock_detect:
+                result = self.detector.detect_faulty_image(image_path)
+        
+        self.assertEqual(mock_imread.call_count, 1)
+        # Subject validation reuses the person detection result
+        self.assertEqual(mock_detect.call_count, 1)
+        self.assertIn("overall_quality_score", result.quality_metrics)
+    
+    def test_detection_accepts_analysis_context(self):
+        """Test that a shared context gives the same result as a path."""
+        image_path = self._create_test_image("context.png", color=(90, 140, 200))
+        context = ImageAnalysisContext(image_path)
+        
+        from_context = self.detector.detect_faulty_image(context)
+        from_path = self.detector.detect_faulty_image(image_path)
+        
+        self.assertEqual(from_context.quality_metrics, from_path.quality_metrics)
+        self.assertEqual(from_context.reasons, from_path.reasons)
+        self.assertIsNotNone(context.__dict__.get("image"))
+
+    
+    def test_detection_reports_stage_timings(self):
+        """Test that detection reports the time spent in each stage."""
+        image_path = self._create_test_image("stages.png")
+        
+        result = self.detector.detect_faulty_image(image_path)
+        
+        self.assertEqual(
+            list(result.stage_timings),
+            ["validation", "decode", "person_detection", "subject_validation", "quality_assessment"],
+        )
+        self.assertTrue(all(seconds >= 0 for seconds in result.stage_timings.values()))
+    
+    def _create_batch_images(self, count: int) -> list:
+        rng = np.random.default_rng(7)
+        paths = []
+        for i in range(count):
+            image = rng.integers(0, 256, (256, 256, 3), dtype=np.uint8)
+            image[64:192, 96:160] = (40 * i) % 256
+            path = str(self.temp_path / f"batch_{i}.png")
+            cv2.imwrite(path, image)
+            paths.append(path)
+        return paths
+    
+    def _assert_same_results(self, results: dict, expected: dict):
+        self.assertEqual(results.keys(), expected.keys())
+        for path, result in results.items():
+            self.assertEqual(result.reasons, expected[path].reasons)
+            self.assertEqual(result.quality_metrics, expected[path].quality_metrics)
+    
+    def test_batch_thread_pool_matches_sequential(self):
+        """Test that concurrent batch analysis gives the sequential results."""
+        image_paths = self._create_batch_images(6)
+        expected = {path: self.detector.detect_faulty_image(path) for path in image_paths}
+        detector = ImageQualityDetector(QualityDetectionConfig(batch_workers=3))
+        
+        try:
+            results = dict(detector.iter_batch_results(image_paths))
+            batch = detector.analyze_batch_processing(image_paths)
+        finally:
+            detector.shutdown()
+        
+        self._assert_same_results(results, expected)
+        self.assertEqual(batch.analyzed_images, 6)
+        self.assertFalse(batch.stopped_early)
+        self.assertEqual(batch.faulty_images, sum(r.is_faulty for r in expected.values()))
+        self.assertIn("person_detection", batch.stage_timings)
+    
+    def test_batch_process_pool_matches_sequential(self):
+        """Test batch analysis in worker processes."""
+        image_paths = self._create_batch_images(2)
+        expected = {path: self.detector.detect_faulty_image(path) for path in image_paths}
+        detector = ImageQualityDetector(
+            QualityDetectionConfig(batch_workers=2, batch_backend="process")
+        )
+        
+        try:
+            results = dict(detector.iter_batch_results(image_paths))
+        finally:
+            detector.shutdown()
+        
+        self._assert_same_results(results, expected)
+    
+    def test_batch_early_stop_once_regeneration_is_certain(self):
+        """Test that the batch stops once NO_PERSON_DETECTED is certain to be common."""
+        detector = ImageQualityDetector(QualityDetectionConfig(batch_early_stop=True))
+        no_person = DetectionResult(
+            is_faulty=True, reasons=[FaultyImageReason.NO_PERSON_DETECTED],
+            confidence_score=0.1, quality_metrics={}, person_count=0,
+            processing_time=0.1, recommendations=[]
+        )
+        
+        with patch.object(detector, 'detect_faulty_image', return_value=no_person) as mock_detect:
+            result = detector.analyze_batch_processing([f"/img/{i}.png" for i in range(10)])
+        
+        # Three of at most ten faulty images reach the 30% threshold
+        self.assertEqual(mock_detect.call_count, 3)
+        self.assertTrue(result.stopped_early)
+        self.assertTrue(result.should_regenerate)
+        self.assertEqual(result.total_images, 10)
+        self.assertEqual(result.analyzed_images, 3)
+        self.assertEqual(result.faulty_percentage, 100.0)
+    
+    def test_batch_early_stop_analyzes_undecided_batches(self):
+        """Test that a batch which might pass is analyzed completely."""
+        detector = ImageQualityDetector(QualityDetectionConfig(batch_early_stop=True))
+        results = [
+            DetectionResult(
+                is_faulty=i % 2 == 0,
+                reasons=[FaultyImageReason.IMAGE_TOO_BLURRY] if i % 2 == 0 else [],
+                confidence_score=0.8, quality_metrics={}, person_count=1,
+                processing_time=0.1, recommendations=[]
+            )
+            for i in range(6)
+        ]
+        
+        with patch.object(detector, 'detect_faulty_image', side_effect=results):
+            result = detector.analyze_batch_processing([f"/img/{i}.png" for i in range(6)])
+        
+        self.assertFalse(result.stopped_early)
+        self.assertEqual(result.analyzed_images, 6)
+        self.assertFalse(result.should_regenerate)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestBatchAnalysisThroughput:
+    """Batch analysis throughput on a directory of test images, 1 to N workers."""
+    
+    @pytest.mark.parametrize("backend", ["thread", "process"])
+    def test_throughput_by_worker_count(self, tmp_path, backend):
+        rng = np.random.default_rng(0)
+        image_paths = []
+        for i in range(24):
+            image = cv2.GaussianBlur(rng.integers(0, 256, (512, 512, 3), dtype=np.uint8), (5, 5), 0)
+            path = str(tmp_path / f"variation_{i}.png")
+            cv2.imwrite(path, image)
+            image_paths.append(path)
+        
+        throughput = {}
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            detector = ImageQualityDetector(
+                QualityDetectionConfig(batch_workers=workers, batch_backend=backend)
+            )
+            try:
+                # Start the pool before timing
+                list(detector.iter_batch_results(image_paths[:workers]))
+                start = time.perf_counter()
+                result = detector.analyze_batch_processing(image_paths)
+                elapsed = time.perf_counter() - start
+            finally:
+                detector.shutdown()
+            
+            assert result.analyzed_images == len(image_paths)
+            throughput[workers] = len(image_paths) / elapsed
+            stages = ", ".join(
+                f"{stage} {seconds * 1000 / len(image_paths):.1f}ms"
+                for stage, seconds in result.stage_timings.items()
+            )
+            print(f"\n{backend} x{workers}: {throughput[workers]:.1f} images/s ({stages})")
+        
+        if (os.cpu_count() or 1) >= 2:
+            assert throughput[2] > throughput[1] * 1.2
 
 
 if __name__ == '__main__':
@@ -0,0 +1,190 @@
+"""
+Tests for the content-addressed result cache of image quality detection and
+isolation.
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.services.image_analysis_context import ImageAnalysisContext
+from src.services.image_isolation_service import ImageIsolationConfig, ImageIsolationService
+from src.services.image_quality_detector import ImageQualityDetector, QualityDetectionConfig
+from src.services.image_result_cache import ImageResultCache, config_fingerprint
+
+PERSON = {
+    "detected": True,
+    "confidence": 0.8,
+    "count": 1,
+    "bounding_boxes": [((80, 40, 96, 200), 0.8)],
+}
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    cache = ImageResultCache(cache_dir=str(tmp_path / "cache"), max_size_mb=10)
+    yield cache
+    cache.close()
+
+
+def write_image(path, seed=0):
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (256, 256, 3), dtype=np.uint8), (5, 5), 0)
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+class TestImageResultCache:
+    """Test keys and eviction of the result cache."""
+
+    def test_content_hash_follows_file_bytes(self, tmp_path):
+        path = write_image(tmp_path / "avatar.png")
+        first = ImageAnalysisContext(path).content_hash
+
+        assert ImageAnalysisContext(path).content_hash == first
+        write_image(path, seed=1)
+        assert ImageAnalysisContext(path).content_hash != first
+        assert ImageAnalysisContext(tmp_path / "missing.png").content_hash is None
+
+    def test_fingerprint_covers_selected_fields(self):
+        config = QualityDetectionConfig()
+
+        assert config_fingerprint(config, ["blur_threshold"]) == config_fingerprint(
+            QualityDetectionConfig(batch_workers=4), ["blur_threshold"]
+        )
+        assert config_fingerprint(config) != config_fingerprint(
+            QualityDetectionConfig(blur_threshold=0.5)
+        )
+
+    def test_size_bounded_lru_eviction(self, tmp_path):
+        cache = ImageResultCache(cache_dir=str(tmp_path / "lru"), max_size_mb=1)
+        payload = bytes(400 * 1024)
+        try:
+            cache.set("output", "a", "cfg", payload)
+            cache.set("output", "b", "cfg", payload)
+            assert cache.get("output", "a", "cfg") is not None  # "b" is now least recent
+            cache.set("output", "c", "cfg", payload)
+
+            assert cache.get("output", "b", "cfg") is None
+            assert bytes(cache.get("output", "a", "cfg")) == payload
+            assert cache.get_stats().size_bytes <= 1024 * 1024
+        finally:
+            cache.close()
+
+    def test_unreadable_images_are_not_cached(self, result_cache):
+        assert result_cache.set("detection", None, "cfg", {"x": 1}) is False
+        assert result_cache.get("detection", None, "cfg") is None
+
+
+class TestCachedQualityDetection:
+    """Test detection results reused by image content."""
+
+    def test_detection_reused_for_same_bytes(self, tmp_path, result_cache):
+        path = write_image(tmp_path / "avatar.png")
+        detector = ImageQualityDetector(QualityDetectionConfig(), result_cache=result_cache)
+        expected = detector.detect_faulty_image(path)
+
+        # A copy under another name has the same content
+        copy = tmp_path / "reloaded.png"
+        copy.write_bytes(Path(path).read_bytes())
+        with patch("cv2.imread") as mock_imread:
+            cached = detector.detect_faulty_image(str(copy))
+
+        mock_imread.assert_not_called()
+        assert cached.reasons == expected.reasons
+        assert cached.quality_metrics == expected.quality_metrics
+        assert cached.confidence_score == expected.confidence_score
+        assert "cache" in cached.stage_timings
+
+    def test_modified_file_is_analyzed_again(self, tmp_path, result_cache):
+        path = write_image(tmp_path / "avatar.png")
+        detector = ImageQualityDetector(QualityDetectionConfig(), result_cache=result_cache)
+        first = detector.detect_faulty_image(path)
+
+        write_image(path, seed=1)
+        second = detector.detect_faulty_image(path)
+
+        assert "decode" in second.stage_timings
+        assert second.quality_metrics != first.quality_metrics
+
+    def test_settings_change_misses(self, tmp_path, result_cache):
+        path = write_image(tmp_path / "avatar.png")
+        detector = ImageQualityDetector(QualityDetectionConfig(), result_cache=result_cache)
+        detector.detect_faulty_image(path)
+
+        stricter = ImageQualityDetector(
+            QualityDetectionConfig(min_quality_score=0.9), result_cache=result_cache
+        )
+        assert "decode" in stricter.detect_faulty_image(path).stage_timings
+
+
+class TestCachedIsolation:
+    """Test isolation outputs and masks reused by image content."""
+
+    @pytest.fixture
+    def make_service(self, result_cache):
+        def make(**overrides):
+            config = ImageIsolationConfig(
+                **{"background_removal_method": "transparent", **overrides}
+            )
+            service = ImageIsolationService(config, result_cache=result_cache)
+            service._detect_person = lambda image: dict(PERSON)
+            return service
+
+        return make
+
+    def test_isolated_output_restored_for_same_bytes(self, tmp_path, make_service):
+        path = write_image(tmp_path / "avatar.png")
+        service = make_service()
+        first = service.isolate_person(path)
+        output = Path(first.isolated_image_path).read_bytes()
+
+        copy = tmp_path / "regenerated.png"
+        copy.write_bytes(Path(path).read_bytes())
+        with patch.object(service, "_create_person_mask") as mock_mask:
+            second = service.isolate_person(str(copy))
+
+        mock_mask.assert_not_called()
+        assert second.success
+        assert second.isolated_image_path == str(tmp_path / "regenerated_isolated.png")
+        assert Path(second.isolated_image_path).read_bytes() == output
+        assert second.confidence_score == first.confidence_score
+
+    def test_mask_reused_for_other_background(self, tmp_path, make_service):
+        path = write_image(tmp_path / "avatar.png")
+        make_service().isolate_person(path)
+
+        uniform = make_service(background_removal_method="uniform")
+        with patch.object(uniform, "_create_person_mask") as mock_mask:
+            result = uniform.isolate_person(path)
+
+        mock_mask.assert_not_called()
+        assert result.isolated_image_path.endswith("avatar_uniform_bg.png")
+
+    def test_modified_file_is_isolated_again(self, tmp_path, make_service):
+        path = write_image(tmp_path / "avatar.png")
+        service = make_service()
+        service.isolate_person(path)
+
+        write_image(path, seed=1)
+        with patch.object(
+            service, "_create_person_mask", wraps=service._create_person_mask
+        ) as mock_mask:
+            service.isolate_person(path)
+
+        mock_mask.assert_called_once()
+
+    def test_quality_analysis_keyed_by_content(self, tmp_path, make_service):
+        path = write_image(tmp_path / "avatar.png")
+        service = make_service()
+        first = service.analyze_image_quality(path)
+
+        with patch("cv2.imread") as mock_imread:
+            assert service.analyze_image_quality(path) == first
+        mock_imread.assert_not_called()
+
+        write_image(path, seed=1)
+        assert service.analyze_image_quality(path).confidence_scores != first.confidence_scores
@@ -19,6 +19,7 @@ from src.services.image_provider import (
     ImageResult,
     MockImageProvider,
     ModelLoadError,
+    StableDiffusionProvider,
     Text2ImageProvider,
 )
 from src.services.image_service import ImageService, get_image_service, set_image_service
@@ -48,6 +49,29 @@ class TestImageService:
                 service = ImageService()
                 assert service.provider is not None
 
+    def test_default_provider_is_warmed_up(self):
+        """Test that the default Stable Diffusion provider is warmed up on start."""
+        with patch("src.services.image_service.config") as mock_config:
+            mock_config.environment = "production"
+            mock_config.image_provider_type = "stable_diffusion"
+            mock_config.image_generation.warm_up_on_start = True
+
+            with patch("src.services.image_service.StableDiffusionProvider") as mock_sd:
+                service = ImageService()
+
+        mock_sd.return_value.warm_up.assert_called_once()
+        assert service.provider is mock_sd.return_value
+
+    def test_warm_up(self):
+        """Test warm-up results for providers with and without a pipeline."""
+        provider = Mock(spec=StableDiffusionProvider)
+        assert ImageService(provider=provider).warm_up() is True
+        provider.warm_up.assert_called_once()
+
+        provider.warm_up.side_effect = ModelLoadError("Failed to load model")
+        assert ImageService(provider=provider).warm_up() is False
+        assert ImageService(provider=MockImageProvider()).warm_up() is False
+
     def test_image_service_creation_test_environment(self):
         """Test creating image service in test environment."""
         with patch("src.services.image_service.config") as mock_config:
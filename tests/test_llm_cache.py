@@ -0,0 +1,152 @@
+"""
+Tests for the deterministic LLM response cache.
+"""
+
+import pytest
+
+from src.services.caching_service import MultiLevelCachingService
+from src.services.llm_cache import LLMResponseCache, is_deterministic, normalize_parameters
+from src.services.llm_provider import LLMRequest, MockLLMProvider
+from src.services.llm_service import LLMService
+
+
+class DigestMockProvider(MockLLMProvider):
+    """Mock provider that reports model digests like Ollama."""
+
+    def __init__(self, digest: str = "sha256:aaa", **kwargs):
+        super().__init__(**kwargs)
+        self.digest = digest
+        self.list_calls = 0
+
+    def list_models(self):
+        self.list_calls += 1
+        return {
+            "models": {"llama3:latest": {"name": "llama3:latest", "digest": self.digest}},
+            "count": 1,
+        }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MultiLevelCachingService(disk_cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def provider():
+    return DigestMockProvider(responses={"default": "cached answer"}, latency_ms=20)
+
+
+@pytest.fixture
+def service(provider, cache):
+    return LLMService(provider=provider, response_cache=LLMResponseCache(cache=cache))
+
+
+class TestParameterNormalization:
+    """Test parameter normalization and determinism detection."""
+
+    def test_options_are_flattened_and_numbers_normalized(self):
+        params = normalize_parameters({"options": {"temperature": 0, "seed": 7}, "stream": False})
+
+        assert params == {"seed": 7.0, "temperature": 0.0}
+
+    def test_equivalent_parameters_normalize_equal(self):
+        assert normalize_parameters({"temperature": 0}) == normalize_parameters(
+            {"options": {"temperature": 0.0}}
+        )
+
+    def test_determinism(self):
+        assert is_deterministic({"temperature": 0.0})
+        assert is_deterministic({"temperature": 0.9, "seed": 1.0})
+        assert not is_deterministic({})
+        assert not is_deterministic({"temperature": 0.7})
+
+
+class TestLLMResponseCacheKeys:
+    """Test cache key construction."""
+
+    def test_non_deterministic_requests_have_no_key(self, cache):
+        response_cache = LLMResponseCache(cache=cache)
+        request = LLMRequest(prompt="p", model="llama3", parameters={"temperature": 0.7})
+
+        assert response_cache.make_key(request, "sha256:aaa") is None
+
+    def test_missing_digest_has_no_key(self, cache):
+        response_cache = LLMResponseCache(cache=cache)
+        request = LLMRequest(prompt="p", model="llama3", parameters={"temperature": 0})
+
+        assert response_cache.make_key(request, None) is None
+
+    def test_digest_is_part_of_key(self, cache):
+        response_cache = LLMResponseCache(cache=cache)
+        request = LLMRequest(prompt="p", model="llama3", parameters={"temperature": 0})
+
+        assert response_cache.make_key(request, "sha256:aaa") != response_cache.make_key(
+            request, "sha256:bbb"
+        )
+
+
+class TestLLMServiceResponseCache:
+    """Test response caching through LLMService."""
+
+    def test_repeated_deterministic_call_is_served_from_cache(self, service, provider):
+        first = service.generate_response("hello", model="llama3", parameters={"temperature": 0})
+        second = service.generate_response("hello", model="llama3", parameters={"temperature": 0})
+
+        assert provider.call_count == 1
+        assert second.text == first.text == "cached answer"
+        assert second.metadata["cache_hit"] is True
+        assert second.request_id != first.request_id
+
+        stats = service.response_cache.get_stats()
+        assert stats.hits == 1
+        assert stats.misses == 1
+        assert stats.stores == 1
+        assert stats.latency_saved_ms >= 0
+
+    def test_non_deterministic_calls_bypass_cache(self, service, provider):
+        service.generate_response("hello", model="llama3", parameters={"temperature": 0.8})
+        service.generate_response("hello", model="llama3", parameters={"temperature": 0.8})
+
+        assert provider.call_count == 2
+        assert service.response_cache.get_stats().skipped == 2
+
+    def test_digest_change_invalidates_entries(self, service, provider):
+        service.generate_response("hello", model="llama3", parameters={"temperature": 0})
+
+        # Model re-pulled: new digest becomes visible once the model list is refreshed
+        provider.digest = "sha256:bbb"
+        service.residency.invalidate()
+        service.generate_response("hello", model="llama3", parameters={"temperature": 0})
+
+        assert provider.call_count == 2
+
+    def test_model_list_is_not_refetched_within_ttl(self, service, provider):
+        for _ in range(3):
+            service.generate_response("hello", model="llama3", parameters={"temperature": 0})
+
+        assert provider.list_calls == 1
+
+    def test_entries_persist_on_disk(self, provider, tmp_path):
+        cache_dir = str(tmp_path / "persistent")
+        first_service = LLMService(
+            provider=provider,
+            response_cache=LLMResponseCache(MultiLevelCachingService(disk_cache_dir=cache_dir)),
+        )
+        first_service.generate_response("hello", model="llama3", parameters={"seed": 42})
+
+        second_service = LLMService(
+            provider=provider,
+            response_cache=LLMResponseCache(MultiLevelCachingService(disk_cache_dir=cache_dir)),
+        )
+        response = second_service.generate_response(
+            "hello", model="llama3", parameters={"seed": 42}
+        )
+
+        assert provider.call_count == 1
+        assert response.metadata["cache_hit"] is True
+
+    def test_service_status_reports_cache_stats(self, service):
+        status = service.get_service_status()
+
+        assert "response_cache" in status
+        assert status["response_cache"]["hits"] == 0
@@ -0,0 +1,148 @@
+"""
+Tests for Ollama model residency tracking and warm-up.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config.config import config
+from src.services.llm_provider import MockLLMProvider
+from src.services.llm_service import LLMService, ModelResidencyManager
+
+
+class ResidentMockProvider(MockLLMProvider):
+    """Mock provider that reports available and loaded models like Ollama."""
+
+    def __init__(self, available=("llama3", "mistral"), running=(), **kwargs):
+        super().__init__(latency_ms=0, **kwargs)
+        self.available = list(available)
+        self.running = list(running)
+        self.list_calls = 0
+        self.ps_calls = 0
+
+    def list_models(self):
+        self.list_calls += 1
+        models = {f"{name}:latest": {"name": f"{name}:latest", "digest": name} for name in self.available}
+        return {"models": models, "count": len(models)}
+
+    def list_running_models(self):
+        self.ps_calls += 1
+        expires_at = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+        return {
+            f"{name}:latest": {"name": f"{name}:latest", "expires_at": expires_at}
+            for name in self.running
+        }
+
+
+@pytest.fixture
+def provider():
+    return ResidentMockProvider()
+
+
+@pytest.fixture
+def manager(provider):
+    manager = ModelResidencyManager(provider, tags_ttl_seconds=60, keep_alive_seconds=600)
+    manager.enabled = True
+    return manager
+
+
+class TestModelResidencyManager:
+    """Test residency tracking, model choice and warm-up."""
+
+    def test_model_list_is_cached(self, manager, provider):
+        assert manager.is_available("llama3")
+        assert manager.is_available("mistral:latest")
+        assert not manager.is_available("phi3")
+
+        assert provider.list_calls == 1
+        manager.invalidate()
+        manager.is_available("llama3")
+        assert provider.list_calls == 2
+
+    def test_keep_alive_hint_is_added(self, manager):
+        assert manager.request_parameters(None) == {"keep_alive": 600}
+        assert manager.request_parameters({"keep_alive": 5}) == {"keep_alive": 5}
+
+    def test_mock_provider_gets_no_hints(self):
+        manager = ModelResidencyManager(MockLLMProvider())
+
+        assert manager.enabled is False
+        assert manager.request_parameters({"temperature": 0}) == {"temperature": 0}
+
+    def test_running_models_mark_residency(self, manager, provider):
+        provider.running = ["mistral"]
+        manager.refresh_running(force=True)
+
+        assert manager.is_resident("mistral")
+        assert not manager.is_resident("llama3")
+        assert manager.choose_model(["llama3", "mistral"]) == "mistral"
+
+    def test_choose_model_falls_back_to_available(self, manager):
+        assert manager.choose_model(["phi3", "llama3"]) == "llama3"
+        assert manager.choose_model(["phi3", "gemma"]) == "phi3"
+
+    def test_cold_and_warm_latencies_are_tracked(self, manager):
+        manager.record_request("llama3", 900.0, was_resident=False)
+        assert manager.is_resident("llama3")
+        manager.record_request("llama3", 100.0, was_resident=True)
+        manager.record_request("llama3:latest", 120.0, was_resident=True)
+
+        status = manager.get_status()["models"]["llama3"]
+        assert status["cold_starts"] == 1
+        assert status["warm_requests"] == 2
+        assert status["avg_cold_latency_ms"] == 900.0
+        assert status["avg_warm_latency_ms"] == 110.0
+
+    def test_warm_up_loads_models(self, manager, provider):
+        results = manager.warm_up(["llama3", "mistral"])
+
+        assert set(results) == {"llama3", "mistral"}
+        assert all(latency is not None for latency in results.values())
+        assert provider.last_request.parameters == {"keep_alive": 600}
+        assert manager.is_resident("mistral")
+
+    def test_warmup_loop_starts_and_stops(self, manager, provider):
+        manager.start_warmup_loop(lambda: ["llama3"], interval_seconds=60)
+        try:
+            assert manager.get_status()["warmup_running"] is True
+        finally:
+            manager.stop_warmup_loop()
+
+        assert provider.call_count >= 1
+        assert manager.get_status()["warmup_running"] is False
+
+
+class TestLLMServiceModelSelection:
+    """Test alias resolution with fallbacks through LLMService."""
+
+    @pytest.fixture
+    def service(self, provider, monkeypatch):
+        monkeypatch.setitem(config.llm.models, "default", "llama3")
+        monkeypatch.setitem(config.llm.model_fallbacks, "default", ["mistral"])
+        service = LLMService(provider=provider, response_cache=None)
+        service.residency.enabled = True
+        return service
+
+    def test_default_alias_prefers_resident_fallback(self, service, provider):
+        provider.running = ["mistral"]
+
+        response = service.generate_response("hello")
+
+        assert response.model == "mistral"
+        assert provider.last_request.parameters["keep_alive"] == config.llm.keep_alive_seconds
+
+    def test_default_alias_uses_primary_when_nothing_is_loaded(self, service):
+        assert service.generate_response("hello").model == "llama3"
+
+    def test_model_list_is_not_refetched_per_request(self, service, provider):
+        for _ in range(5):
+            service.generate_response("hello", model="llama3")
+
+        assert provider.list_calls == 1
+
+    def test_service_status_reports_residency(self, service):
+        service.generate_response("hello", model="llama3")
+
+        residency = service.get_service_status()["model_residency"]
+        assert residency["models"]["llama3"]["cold_starts"] == 1
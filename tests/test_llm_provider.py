@@ -392,11 +392,11 @@ class TestOllamaProvider:
         """Test streaming response generation with llama3.2."""
         # Mock streaming response
         mock_response = Mock()
-        mock_response.iter_lines.return_value = [
-            '{"response": "Hello", "done": false}',
-            '{"response": " from", "done": false}',
-            '{"response": " Llama", "done": false}',
-            '{"response": " 3.2!", "done": true}',
+        mock_response.iter_content.return_value = [
+            b'{"response": "Hello", "done": false}\n{"response": " fr',
+            b'om", "done": false}\n',
+            b'{"response": " Llama", "done": false}\n',
+            b'{"response": " 3.2!", "done": true, "eval_count": 4}\n',
         ]
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
@@ -413,20 +413,46 @@ class TestOllamaProvider:
         streamed_chunks = list(stream_response.text_stream)
         assert streamed_chunks == ["Hello", " from", " Llama", " 3.2!"]
 
+        metrics = stream_response.metadata["stream_metrics"]
+        assert metrics.done is True
+        assert metrics.tokens == 4
+        assert metrics.time_to_first_token_ms is not None
+
         # Verify request was made correctly
         mock_post.assert_called_once()
         call_args = mock_post.call_args
         assert call_args[1]["json"]["stream"] is True
         assert call_args[1]["stream"] is True
 
+    @patch("requests.Session.post")
+    def test_ollama_streaming_ttft_includes_header_wait(self, mock_post):
+        """Test that time to first token covers the wait for response headers."""
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b'{"response": "Hi", "done": true}\n']
+        mock_response.raise_for_status.return_value = None
+
+        def slow_post(*args, **kwargs):
+            time.sleep(0.05)  # Model load and prompt evaluation before headers
+            return mock_response
+
+        mock_post.side_effect = slow_post
+
+        provider = OllamaProvider()
+        stream_response = provider.generate_streaming_response(
+            LLMRequest(prompt="Hello", model="llama3.2", stream=True)
+        )
+        list(stream_response.text_stream)
+
+        assert stream_response.metadata["stream_metrics"].time_to_first_token_ms >= 50
+
     @patch("requests.Session.post")
     def test_ollama_generate_streaming_response_mistral(self, mock_post):
         """Test streaming response generation with Mistral."""
         mock_response = Mock()
-        mock_response.iter_lines.return_value = [
-            '{"response": "Bonjour", "done": false}',
-            '{"response": " mon", "done": false}',
-            '{"response": " ami!", "done": true}',
+        mock_response.iter_content.return_value = [
+            b'{"response": "Bonjour", "done": false}\n',
+            b'{"response": " mon", "done": false}\n',
+            b'{"response": " ami!", "done": true}\n',
         ]
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
@@ -0,0 +1,222 @@
+"""
+Tests for the LLM streaming engine.
+Covers NDJSON framing, fragment coalescing, stream metrics and provider integration.
+"""
+
+import json
+import time
+
+import pytest
+
+from src.exceptions import LLMProviderError
+from src.services.llm_provider import LLMRequest, MockLLMProvider
+from src.services.llm_streaming import (
+    StreamBatchConfig,
+    StreamMetrics,
+    coalesce_fragments,
+    iter_ndjson_records,
+    iter_ollama_fragments,
+    ollama_text_stream,
+)
+
+
+def _ndjson(records):
+    return b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in records)
+
+
+def _chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNDJSONFraming:
+    """Test record framing from raw chunks."""
+
+    def test_records_split_across_chunks(self):
+        data = _ndjson([{"response": "a"}, {"response": "b"}, {"response": "c", "done": True}])
+        records = list(iter_ndjson_records(_chunked(data, 7)))
+
+        assert [r["response"] for r in records] == ["a", "b", "c"]
+
+    def test_multibyte_utf8_split_across_chunks(self):
+        data = json.dumps({"response": "Grüße 👋"}, ensure_ascii=False).encode("utf-8") + b"\n"
+        records = list(iter_ndjson_records(_chunked(data, 3)))
+
+        assert records == [{"response": "Grüße 👋"}]
+
+    def test_trailing_record_without_newline(self):
+        records = list(iter_ndjson_records([b'{"response": "x"}\n{"response": "y"}']))
+
+        assert [r["response"] for r in records] == ["x", "y"]
+
+    def test_malformed_lines_are_skipped_and_counted(self):
+        metrics = StreamMetrics()
+        chunks = [b'{"response": "ok"}\nnot json\n\n{"response": "fine"}\n']
+        records = list(iter_ndjson_records(chunks, metrics))
+
+        assert [r["response"] for r in records] == ["ok", "fine"]
+        assert metrics.records == 2
+        assert metrics.malformed_records == 1
+        assert metrics.bytes_read == len(chunks[0])
+
+    def test_string_chunks_are_accepted(self):
+        records = list(iter_ndjson_records(['{"response": "a"}\n', '{"response": "b"}\n']))
+
+        assert len(records) == 2
+
+
+class TestOllamaFragments:
+    """Test extraction of text fragments from Ollama records."""
+
+    def test_stops_at_done_and_copies_statistics(self):
+        metrics = StreamMetrics()
+        records = [
+            {"response": "Hi", "done": False},
+            {"response": "!", "done": True, "eval_count": 2, "eval_duration": 500_000_000},
+            {"response": "ignored"},
+        ]
+        fragments = list(iter_ollama_fragments(records, metrics))
+
+        assert fragments == ["Hi", "!"]
+        assert metrics.done is True
+        assert metrics.eval_count == 2
+        assert metrics.server_tokens_per_second == pytest.approx(4.0)
+
+    def test_error_record_raises(self):
+        with pytest.raises(LLMProviderError):
+            list(iter_ollama_fragments([{"error": "model not found"}]))
+
+
+class TestCoalescing:
+    """Test size- and time-bounded fragment batching."""
+
+    def test_passthrough_by_default(self):
+        metrics = StreamMetrics()
+        batches = list(coalesce_fragments(["a", "b", "c"], metrics=metrics))
+
+        assert batches == ["a", "b", "c"]
+        assert metrics.batches == 3
+        assert metrics.finished_at is not None
+
+    def test_size_bounded_batches(self):
+        config = StreamBatchConfig(max_chars=4)
+        batches = list(coalesce_fragments(["ab", "cd", "ef", "g"], config))
+
+        assert batches == ["abcd", "efg"]
+
+    def test_time_bounded_batches(self):
+        clock = FakeClock()
+
+        def fragments():
+            yield "a"
+            clock.now = 0.01
+            yield "b"
+            clock.now = 0.06
+            yield "c"
+            yield "d"
+
+        config = StreamBatchConfig(max_delay_ms=50)
+        batches = list(coalesce_fragments(fragments(), config, clock=clock))
+
+        assert batches == ["abc", "d"]
+
+    def test_coalescing_preserves_text(self):
+        fragments = [f"tok{i} " for i in range(1000)]
+        config = StreamBatchConfig(max_chars=64, max_delay_ms=50)
+        metrics = StreamMetrics()
+        batches = list(coalesce_fragments(fragments, config, metrics))
+
+        assert "".join(batches) == "".join(fragments)
+        assert metrics.fragments == 1000
+        assert metrics.batches == len(batches)
+        assert metrics.batches < 200
+
+    def test_invalid_config_rejected(self):
+        with pytest.raises(ValueError):
+            StreamBatchConfig(max_chars=-1)
+        with pytest.raises(ValueError):
+            StreamBatchConfig(read_chunk_size=0)
+
+
+class TestStreamMetrics:
+    """Test per-stream metrics."""
+
+    def test_pipeline_reports_ttft_and_throughput(self):
+        data = _ndjson([{"response": "x"}] * 10 + [{"response": "", "done": True}])
+        metrics = StreamMetrics()
+        text = "".join(ollama_text_stream(_chunked(data, 32), metrics=metrics))
+
+        assert text == "x" * 10
+        assert metrics.time_to_first_token_ms is not None
+        assert metrics.tokens == 10
+        assert metrics.to_dict()["done"] is True
+
+    def test_metrics_before_first_token(self):
+        metrics = StreamMetrics()
+
+        assert metrics.time_to_first_token_ms is None
+        assert metrics.tokens_per_second is None
+
+
+class TestMockProviderStreaming:
+    """Test streaming engine integration with the mock provider."""
+
+    def test_mock_stream_with_batching(self):
+        provider = MockLLMProvider(responses={"default": "one two three four"}, stream_delay_ms=0)
+        request = LLMRequest(
+            prompt="p", model="mock-model", stream=True, batching=StreamBatchConfig(max_chars=8)
+        )
+        response = provider.generate_streaming_response(request)
+        batches = list(response.text_stream)
+
+        assert "".join(batches) == "one two three four "
+        assert len(batches) < 4
+        metrics = response.metadata["stream_metrics"]
+        assert metrics.fragments == 4
+        assert metrics.finished_at is not None
+
+
+@pytest.mark.performance
+class TestStreamingBenchmark:
+    """Benchmark chunked framing against per-line decoding."""
+
+    def test_chunked_pipeline_throughput(self):
+        records = [{"response": f" tok{i}", "done": False} for i in range(20000)]
+        records.append({"response": "", "done": True, "eval_count": 20000})
+        data = _ndjson(records)
+        lines = data.decode("utf-8").splitlines()
+
+        start = time.perf_counter()
+        per_line = []
+        for line in lines:
+            record = json.loads(line)
+            if record.get("response"):
+                per_line.append(record["response"])
+        per_line_seconds = time.perf_counter() - start
+
+        metrics = StreamMetrics()
+        start = time.perf_counter()
+        batches = list(
+            ollama_text_stream(
+                _chunked(data, 64 * 1024), StreamBatchConfig(max_chars=256), metrics
+            )
+        )
+        engine_seconds = time.perf_counter() - start
+
+        assert "".join(batches) == "".join(per_line)
+        # Coalescing must cut the number of UI updates by at least an order of magnitude
+        assert metrics.batches * 10 < len(per_line)
+        print(
+            f"per-line: {per_line_seconds * 1000:.1f}ms, "
+            f"engine: {engine_seconds * 1000:.1f}ms, "
+            f"fragments={metrics.fragments}, batches={metrics.batches}"
+        )
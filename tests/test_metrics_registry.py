@@ -0,0 +1,335 @@
+"""
+Tests for the pre-aggregated metrics registry and its Prometheus exposition.
+"""
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+
+from src.services.metrics_registry import (
+    MetricsRegistry,
+    bucket_index,
+    bucket_midpoint,
+    start_metrics_server,
+)
+from src.services.performance_monitoring_service import (
+    MetricType,
+    PerformanceMetric,
+    PerformanceMonitoringService,
+)
+
+
+def run_threads(target, threads):
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class LegacyRecorder:
+    """The previous record_metric implementation (one object and a global lock per sample)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = defaultdict(list)
+        self.counters = defaultdict(int)
+        self.histograms = defaultdict(list)
+
+    def record(self, name, value, metric_type, labels=None):
+        metric = PerformanceMetric(name, metric_type, value, datetime.now(), labels or {})
+        with self._lock:
+            self.metrics[name].append(metric)
+            if len(self.metrics[name]) > 1000:
+                self.metrics[name] = self.metrics[name][-1000:]
+            if metric_type == MetricType.COUNTER:
+                self.counters[name] += value
+            else:
+                self.histograms[name].append(value)
+                if len(self.histograms[name]) > 1000:
+                    self.histograms[name] = self.histograms[name][-1000:]
+
+
+class TestHistogram:
+    """Test the log-linear histogram."""
+
+    def test_bucket_midpoint_is_close_to_value(self):
+        for value in [1e-6, 0.003, 0.5, 1.0, 7.3, 1000.0, 123456.789]:
+            assert bucket_midpoint(bucket_index(value)) == pytest.approx(value, rel=0.01)
+        assert bucket_midpoint(bucket_index(0.0)) == 0.0
+
+    def test_percentiles_match_exact_values(self):
+        rng = random.Random(5)
+        values = [rng.lognormvariate(3, 1.2) for _ in range(20000)]
+        registry = MetricsRegistry()
+        for value in values:
+            registry.observe("latency_ms", value)
+
+        histogram = registry.snapshot().histograms[("latency_ms", ())]
+        ordered = sorted(values)
+
+        assert histogram.count == len(values)
+        assert histogram.total == pytest.approx(sum(values))
+        assert (histogram.min, histogram.max) == (ordered[0], ordered[-1])
+        for percentile in (50, 90, 95, 99, 99.9):
+            exact = ordered[int(percentile / 100 * len(ordered)) - 1]
+            assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.02)
+
+    def test_memory_is_bounded_by_value_range(self):
+        registry = MetricsRegistry()
+        for i in range(100000):
+            registry.observe("ms", 1 + (i % 1000))
+
+        histogram = registry.snapshot().histograms[("ms", ())]
+        # ~10 powers of two at 64 buckets each, independent of the sample count
+        assert len(histogram.buckets) <= 10 * 64
+
+
+class TestMetricsRegistry:
+    """Test per-thread buffers, label interning and merging."""
+
+    def test_thread_buffers_are_merged_on_scrape(self):
+        registry = MetricsRegistry()
+        ready = threading.Barrier(8)
+
+        def work(i):
+            ready.wait()
+            for _ in range(5000):
+                registry.inc("requests", labels={"worker": str(i % 2)})
+                registry.observe("latency_ms", 2.0)
+
+        run_threads(work, 8)
+        snapshot = registry.snapshot()
+
+        assert snapshot.counters[("requests", (("worker", "0"),))] == 20000
+        assert snapshot.counters[("requests", (("worker", "1"),))] == 20000
+        assert snapshot.counter_totals()["requests"] == 40000
+        assert snapshot.histograms[("latency_ms", ())].count == 40000
+
+    def test_finished_threads_are_retired(self):
+        registry = MetricsRegistry()
+
+        for _ in range(3):
+            run_threads(lambda i: registry.inc("jobs"), 4)
+            assert registry.snapshot().counter_totals()["jobs"] > 0
+
+        assert registry.snapshot().counter_totals()["jobs"] == 12
+        assert registry._shards == []
+
+    def test_shards_stay_bounded_without_scrapes(self):
+        registry = MetricsRegistry()
+
+        # One short-lived thread per rerun, and nobody takes a snapshot
+        for _ in range(200):
+            run_threads(lambda i: registry.observe("rerun_ms", 5.0), 1)
+
+        assert len(registry._shards) <= 1
+        assert registry.snapshot().histograms[("rerun_ms", ())].count == 200
+
+    def test_scrape_during_writes_never_goes_backwards(self):
+        registry = MetricsRegistry()
+        stop = threading.Event()
+
+        def write(_):
+            while not stop.is_set():
+                registry.inc("events")
+                registry.observe("size", 3)
+
+        writers = [threading.Thread(target=write, args=(i,)) for i in range(2)]
+        for writer in writers:
+            writer.start()
+        previous = 0
+        for _ in range(50):
+            snapshot = registry.snapshot()
+            total = snapshot.counter_totals().get("events", 0)
+            assert total >= previous
+            previous = total
+            histogram = snapshot.histograms.get(("size", ()))
+            if histogram:
+                assert sum(histogram.buckets.values()) == histogram.count
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+    def test_label_sets_are_interned(self):
+        registry = MetricsRegistry()
+
+        first = registry.labels({"b": "2", "a": "1"})
+        second = registry.labels({"a": "1", "b": "2"})
+
+        assert first == (("a", "1"), ("b", "2"))
+        assert first is second
+        assert registry.labels(None) == ()
+
+    def test_clear(self):
+        registry = MetricsRegistry()
+        registry.inc("a")
+        registry.set_gauge("g", 1)
+
+        registry.clear()
+        registry.inc("b")
+
+        snapshot = registry.snapshot()
+        assert snapshot.counter_totals() == {"b": 1}
+        assert snapshot.gauges == {}
+
+
+class TestPrometheusExposition:
+    """Test the text exposition format and the HTTP endpoint."""
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.inc("chat_turns_total", 3, {"model": 'llama"3'})
+        registry.set_gauge("queue depth", 4)
+        registry.observe("queue depth", 4)
+        for value in (10, 20, 30):
+            registry.observe("llm_latency_ms", value, unit="milliseconds")
+
+        text = registry.render_prometheus()
+
+        assert "# TYPE gitte_chat_turns_total counter\n" in text
+        assert 'gitte_chat_turns_total{model="llama\\"3"} 3\n' in text
+        assert "# TYPE gitte_queue_depth gauge\ngitte_queue_depth 4\n" in text
+        assert "# TYPE gitte_queue_depth_distribution summary\n" in text
+        assert "# TYPE gitte_llm_latency_ms summary\n" in text
+        assert 'gitte_llm_latency_ms{quantile="0.5"} ' in text
+        assert "gitte_llm_latency_ms_sum 60\n" in text
+        assert "gitte_llm_latency_ms_count 3\n" in text
+
+    def test_metrics_endpoint(self):
+        registry = MetricsRegistry()
+        registry.inc("scrapes_test")
+        server = start_metrics_server(registry, port=0)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{base_url}/other", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "gitte_scrapes_test 1" in body
+
+
+class TestPerformanceMonitoringService:
+    """Test the service API on top of the registry."""
+
+    def test_time_operation_records_histogram_and_counters(self):
+        monitor = PerformanceMonitoringService()
+
+        for _ in range(3):
+            with monitor.time_operation("render", {"page": "chat"}):
+                pass
+        with pytest.raises(ValueError):
+            with monitor.time_operation("render", {"page": "chat"}):
+                raise ValueError("boom")
+
+        snapshot = monitor.registry.snapshot()
+        assert snapshot.counters[("render_total", (("page", "chat"), ("success", "True")))] == 3
+        assert snapshot.counters[("render_total", (("page", "chat"), ("success", "False")))] == 1
+        assert len(monitor.histograms["render_duration_ms"]) == 4
+        assert monitor.counters["render_total"] == 4
+        assert monitor.timings[-1].error == "boom"
+
+        stats = monitor.get_performance_summary()["timing_stats"]["render"]
+        assert stats["count"] == 4
+        assert stats["min_ms"] <= stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+    def test_legacy_views(self):
+        monitor = PerformanceMonitoringService()
+        monitor.increment_counter("hits", 2, {"operation": "a"})
+        monitor.increment_counter("hits", 1, {"operation": "b"})
+        monitor.set_gauge("depth", 7)
+        monitor.record_metric("size", 5, MetricType.HISTOGRAM)
+
+        assert monitor.counters["hits"] == 3
+        assert monitor.counters["missing"] == 0
+        assert monitor.gauges["depth"] == 7
+        assert "size" in monitor.histograms and not monitor.histograms["missing"]
+        assert "gitte_hits" in monitor.render_prometheus()
+
+        monitor.reset_metrics()
+        assert monitor.counters == {} and len(monitor.timings) == 0
+
+
+@pytest.mark.performance
+class TestMetricsOverheadBenchmark:
+    """Per-sample overhead of the registry vs. the previous implementation."""
+
+    def test_recording_overhead(self):
+        iterations = 50000
+        legacy = LegacyRecorder()
+        monitor = PerformanceMonitoringService()
+        labels = {"operation": "chat"}
+
+        def per_call_us(func):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            return (time.perf_counter() - start) / iterations * 1e6
+
+        results = {
+            "counter": (
+                per_call_us(lambda: legacy.record("hits", 1, MetricType.COUNTER, labels)),
+                per_call_us(lambda: monitor.increment_counter("hits", 1, labels)),
+            ),
+            "histogram": (
+                per_call_us(lambda: legacy.record("ms", 1.5, MetricType.HISTOGRAM, labels)),
+                per_call_us(lambda: monitor.record_histogram("ms", 1.5, labels)),
+            ),
+        }
+
+        def timed():
+            with monitor.time_operation("op"):
+                pass
+
+        time_operation_us = per_call_us(timed)
+
+        for metric, (legacy_us, registry_us) in results.items():
+            print(f"{metric}: legacy {legacy_us:.2f} us, registry {registry_us:.2f} us")
+        print(f"time_operation: {time_operation_us:.2f} us")
+        assert results["counter"][1] < results["counter"][0]
+        assert results["histogram"][1] < results["histogram"][0]
+
+    def test_contended_recording(self):
+        threads, per_thread = 8, 20000
+        legacy = LegacyRecorder()
+        registry = MetricsRegistry()
+
+        def timed_run(target):
+            start = time.perf_counter()
+            run_threads(target, threads)
+            return time.perf_counter() - start
+
+        def legacy_work(_):
+            for _ in range(per_thread):
+                legacy.record("ms", 1.5, MetricType.HISTOGRAM)
+
+        def registry_work(_):
+            for _ in range(per_thread):
+                registry.observe("ms", 1.5)
+
+        legacy_seconds = timed_run(legacy_work)
+        registry_seconds = timed_run(registry_work)
+
+        start = time.perf_counter()
+        registry.render_prometheus()
+        scrape_ms = (time.perf_counter() - start) * 1000
+
+        samples = threads * per_thread
+        print(
+            f"{threads} threads: legacy {samples / legacy_seconds:.0f}/s, "
+            f"registry {samples / registry_seconds:.0f}/s, scrape {scrape_ms:.2f} ms"
+        )
+        assert registry.snapshot().histograms[("ms", ())].count == samples
+        assert registry_seconds < legacy_seconds
@@ -0,0 +1,162 @@
+"""
+Tests for the streaming PALD schema migration.
+"""
+
+import os
+import time
+import tracemalloc
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.data.models import Base, PALDData, PALDSchemaVersion
+from src.logic.pald import PALDManager
+
+OLD_SCHEMA = {"type": "object"}
+NEW_SCHEMA = {
+    "type": "object",
+    "properties": {"appearance": {"type": "object"}},
+    "required": ["appearance"],
+}
+
+
+def seed_pald_rows(session, count, invalid_every=4):
+    session.execute(
+        insert(PALDData),
+        [
+            {
+                "id": uuid4(),
+                "user_id": uuid4(),
+                "pald_content": (
+                    {"personality": {"tone": "warm"}}
+                    if i % invalid_every == 0
+                    else {"appearance": {"age_range": "adult"}, "note": "x" * 50}
+                ),
+                "schema_version": "1.0.0",
+            }
+            for i in range(count)
+        ],
+    )
+    session.commit()
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pald.db'}")
+    Base.metadata.create_all(
+        bind=engine, tables=[PALDSchemaVersion.__table__, PALDData.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        [
+            PALDSchemaVersion(version="1.0.0", schema_content=OLD_SCHEMA, is_active=True),
+            PALDSchemaVersion(version="2.0.0", schema_content=NEW_SCHEMA),
+        ]
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+class TestPALDMigration:
+    """Test chunked migration, dry runs and checkpoints."""
+
+    def test_migrates_all_rows_in_chunks(self, db_session):
+        seed_pald_rows(db_session, 50)
+        progress_updates = []
+
+        result = PALDManager(db_session).migrate_pald_data_to_new_schema(
+            "2.0.0", chunk_size=7, progress_callback=lambda p: progress_updates.append(p.processed)
+        )
+
+        assert result["total_records"] == 50
+        assert result["successful_migrations"] == 50
+        assert result["invalid_records"] == 13
+        assert result["failed_migrations"] == 0
+        assert result["chunks"] == 8
+        assert progress_updates == [7, 14, 21, 28, 35, 42, 49, 50]
+
+        rows = db_session.execute(
+            select(PALDData.schema_version, PALDData.is_validated, PALDData.validation_errors)
+        ).all()
+        assert {row.schema_version for row in rows} == {"2.0.0"}
+        invalid = [row for row in rows if not row.is_validated]
+        assert len(invalid) == 13
+        assert "'appearance' is a required property" in invalid[0].validation_errors["errors"][0]
+
+    def test_dry_run_writes_nothing(self, db_session):
+        seed_pald_rows(db_session, 20)
+
+        result = PALDManager(db_session).migrate_pald_data_to_new_schema(
+            "2.0.0", chunk_size=6, dry_run=True
+        )
+
+        assert result["dry_run"] is True
+        assert result["processed"] == 20
+        assert result["invalid_records"] == 5
+        versions = db_session.execute(select(PALDData.schema_version)).scalars().all()
+        assert set(versions) == {"1.0.0"}
+
+    def test_resume_from_checkpoint(self, db_session, tmp_path):
+        seed_pald_rows(db_session, 30)
+        checkpoint = str(tmp_path / "migration.json")
+        manager = PALDManager(db_session)
+
+        def interrupt(progress):
+            if progress.chunks == 2:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            manager.migrate_pald_data_to_new_schema(
+                "2.0.0", chunk_size=5, checkpoint_path=checkpoint, progress_callback=interrupt
+            )
+        assert os.path.exists(checkpoint)
+
+        result = manager.migrate_pald_data_to_new_schema(
+            "2.0.0", chunk_size=5, checkpoint_path=checkpoint
+        )
+
+        assert result["processed"] == 30
+        assert result["successful_migrations"] == 30
+        assert result["total_records"] == 30
+        assert not os.path.exists(checkpoint)
+
+    def test_unknown_target_version(self, db_session):
+        with pytest.raises(ValueError):
+            PALDManager(db_session).migrate_pald_data_to_new_schema("9.9.9")
+
+
+@pytest.mark.performance
+class TestPALDMigrationBenchmark:
+    """Throughput and memory of the streaming migration."""
+
+    def test_memory_is_constant_in_row_count(self, db_session):
+        peaks = {}
+        for count in (2000, 20000):
+            db_session.execute(PALDData.__table__.delete())
+            db_session.commit()
+            seed_pald_rows(db_session, count)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = PALDManager(db_session).migrate_pald_data_to_new_schema("2.0.0", chunk_size=500)
+            seconds = time.perf_counter() - start
+            _, peaks[count] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert result["processed"] == count
+            print(
+                f"{count} rows: {count / seconds:.0f} rows/s, "
+                f"peak traced memory {peaks[count] / 1024:.0f} KiB"
+            )
+            # Reset for the next round
+            db_session.execute(PALDData.__table__.update().values(schema_version="1.0.0"))
+            db_session.commit()
+
+        # 10x the rows must not need anywhere near 10x the memory
+        assert peaks[20000] < peaks[2000] * 2
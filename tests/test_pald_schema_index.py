@@ -0,0 +1,285 @@
+"""
+Tests for the precompiled PALD schema index.
+Checks parity with the previous recursive implementation and benchmarks both.
+"""
+
+import random
+import time
+
+import pytest
+from jsonschema import ValidationError, validate
+
+from src.data.schemas import PALDCoverageMetrics, PALDDiff
+from src.services.pald_schema_index import PALDSchemaIndex, diff_pald_data
+from src.services.pald_schema_registry_service import PALDSchemaRegistryService
+from src.services.pald_service import PALDSchemaService
+
+DEFAULT_SCHEMA = PALDSchemaService._get_default_schema(None)
+
+STRICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "appearance": {
+            "type": "object",
+            "properties": {
+                "age": {"type": "integer", "minimum": 0, "maximum": 120},
+                "gender": {"type": ["string", "null"], "enum": ["male", "female", None]},
+                "details": {"type": "object", "properties": {"hat": {"type": "boolean"}}},
+            },
+            "required": ["age"],
+            "additionalProperties": False,
+        },
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "score": {"type": "number"},
+    },
+    "required": ["appearance"],
+}
+
+# "pattern" is not checked by the index itself, so validation falls back to jsonschema
+PATTERN_SCHEMA = {
+    "type": "object",
+    "properties": {"code": {"type": "string", "pattern": "^[A-Z]+$"}, "meta": {"type": "object"}},
+}
+
+SCHEMAS = [DEFAULT_SCHEMA, STRICT_SCHEMA, PATTERN_SCHEMA, {"type": ["object", "null"]}]
+
+
+def legacy_validate(pald_data, schema):
+    try:
+        validate(instance=pald_data, schema=schema)
+        return []
+    except ValidationError as e:
+        return [f"Validation error at {'.'.join(str(p) for p in e.absolute_path)}: {e.message}"]
+    except Exception as e:
+        return [f"Unexpected validation error: {str(e)}"]
+
+
+def legacy_coverage(pald_data, schema):
+    def get_required_fields(schema_obj, prefix=""):
+        fields = set()
+        if schema_obj.get("type") == "object":
+            for prop_name, prop_schema in schema_obj.get("properties", {}).items():
+                full_name = f"{prefix}.{prop_name}" if prefix else prop_name
+                fields.add(full_name)
+                if prop_schema.get("type") == "object":
+                    fields.update(get_required_fields(prop_schema, full_name))
+        return fields
+
+    def get_filled_fields(data, prefix=""):
+        fields = set()
+        for key, value in data.items():
+            full_key = f"{prefix}.{key}" if prefix else key
+            if value is not None and value != "":
+                fields.add(full_key)
+                if isinstance(value, dict):
+                    fields.update(get_filled_fields(value, full_key))
+        return fields
+
+    def check_field_completeness(data, schema_obj, prefix=""):
+        completeness = {}
+        if schema_obj.get("type") == "object":
+            for prop_name, prop_schema in schema_obj.get("properties", {}).items():
+                full_name = f"{prefix}.{prop_name}" if prefix else prop_name
+                value = data.get(prop_name)
+                if value is not None and value != "":
+                    completeness[full_name] = True
+                    if isinstance(value, dict) and prop_schema.get("type") == "object":
+                        completeness.update(check_field_completeness(value, prop_schema, full_name))
+                else:
+                    completeness[full_name] = False
+        return completeness
+
+    total = get_required_fields(schema)
+    filled = get_filled_fields(pald_data)
+    filled_fields = len(filled & total)
+    return PALDCoverageMetrics(
+        total_fields=len(total),
+        filled_fields=filled_fields,
+        coverage_percentage=(filled_fields / len(total) * 100) if total else 100.0,
+        missing_fields=sorted(total - filled),
+        field_completeness=check_field_completeness(pald_data, schema),
+    )
+
+
+def legacy_diff(pald_a, pald_b):
+    def get_all_keys(data, prefix=""):
+        keys = set()
+        for key, value in data.items():
+            full_key = f"{prefix}.{key}" if prefix else key
+            keys.add(full_key)
+            if isinstance(value, dict):
+                keys.update(get_all_keys(value, full_key))
+        return keys
+
+    def get_value_at_path(data, path):
+        current = data
+        for key in path.split("."):
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            else:
+                return None
+        return current
+
+    keys_a, keys_b = get_all_keys(pald_a), get_all_keys(pald_b)
+    common = keys_a & keys_b
+    modified = [f for f in common if get_value_at_path(pald_a, f) != get_value_at_path(pald_b, f)]
+    unchanged = [f for f in common if f not in modified]
+    total = len(keys_a | keys_b)
+    return PALDDiff(
+        added_fields=sorted(keys_b - keys_a),
+        removed_fields=sorted(keys_a - keys_b),
+        modified_fields=sorted(modified),
+        unchanged_fields=sorted(unchanged),
+        similarity_score=len(unchanged) / total if total else 1.0,
+    )
+
+
+def random_value(rng, schema, depth=0):
+    """Random, mostly schema-conforming value with occasional type errors."""
+    if depth and rng.random() < 0.05:
+        return rng.choice([None, "", 42, "bogus", {"x": 1}, [1], True, 3.5])
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = rng.choice(schema_type)
+    if "enum" in schema and rng.random() < 0.9:
+        return rng.choice(schema["enum"])
+    if schema_type == "object" or "properties" in schema:
+        obj = {
+            name: random_value(rng, prop, depth + 1)
+            for name, prop in schema.get("properties", {}).items()
+            if rng.random() < 0.8
+        }
+        if rng.random() < 0.1:
+            obj[f"extra_{depth}"] = "value"
+        return obj
+    if schema_type == "array":
+        return [random_value(rng, schema.get("items", {}), depth + 1) for _ in range(rng.randint(0, 3))]
+    if schema_type == "integer":
+        return rng.randint(-10, 150)
+    if schema_type == "number":
+        return rng.uniform(-1, 1)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema_type == "null":
+        return None
+    return rng.choice(["ABC", "abc", "", "Teacher"])
+
+
+def synthetic_paldas(schema, count, seed=11):
+    rng = random.Random(seed)
+    return [random_value(rng, schema) for _ in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled_schemas():
+    PALDSchemaRegistryService.clear_compiled_schemas()
+    yield
+    PALDSchemaRegistryService.clear_compiled_schemas()
+
+
+class TestPALDSchemaIndex:
+    """Test the compiled index against the previous implementation."""
+
+    def test_flattened_fields_and_required_paths(self):
+        index = PALDSchemaIndex(STRICT_SCHEMA)
+
+        assert index.field_paths == [
+            "appearance", "appearance.age", "appearance.gender", "appearance.details",
+            "appearance.details.hat", "tags", "score",
+        ]
+        assert index.required_paths == ["appearance", "appearance.age"]
+        assert index.fast_validation is True
+        assert PALDSchemaIndex(PATTERN_SCHEMA).fast_validation is False
+
+    @pytest.mark.parametrize("schema", SCHEMAS)
+    def test_matches_legacy_validation_and_coverage(self, schema):
+        index = PALDSchemaIndex(schema)
+        paldas = synthetic_paldas(schema if "properties" in schema else DEFAULT_SCHEMA, 400)
+        invalid = 0
+
+        for pald in paldas:
+            errors, coverage = index.analyze(pald)
+            assert errors == legacy_validate(pald, schema)
+            assert index.validate(pald) == errors
+            assert coverage == legacy_coverage(pald, schema)
+            invalid += bool(errors)
+
+        assert 0 < invalid < len(paldas) or "properties" not in schema
+
+    def test_invalid_schema_reports_error(self):
+        index = PALDSchemaIndex({"type": "nonsense"})
+
+        errors = index.validate({})
+
+        assert errors == legacy_validate({}, {"type": "nonsense"})
+        assert errors[0].startswith("Unexpected validation error")
+
+    def test_diff_matches_legacy(self):
+        paldas = synthetic_paldas(DEFAULT_SCHEMA, 300, seed=3)
+        pairs = list(zip(paldas, paldas[1:])) + [(p, p) for p in paldas[:20]]
+        pairs.append(({"a": {"b": 1}}, {"a": 5, "c": {"d": {"e": 2}}}))
+        pairs.append(({}, {}))
+
+        for pald_a, pald_b in pairs:
+            assert diff_pald_data(pald_a, pald_b) == legacy_diff(pald_a, pald_b)
+
+
+class TestCompiledSchemaCache:
+    """Test caching of compiled indexes in the schema registry."""
+
+    def test_cached_by_checksum_and_version(self):
+        first = PALDSchemaRegistryService.get_compiled_schema(STRICT_SCHEMA, "1.0.0")
+        copy = PALDSchemaRegistryService.get_compiled_schema(dict(STRICT_SCHEMA))
+
+        assert first is copy
+        assert first is PALDSchemaRegistryService.get_compiled_schema(STRICT_SCHEMA)
+        assert PALDSchemaRegistryService.get_compiled_schema_for_version("1.0.0") is first
+        assert first.checksum == PALDSchemaRegistryService().get_schema_checksum(STRICT_SCHEMA)
+        assert PALDSchemaRegistryService.get_compiled_schema(DEFAULT_SCHEMA) is not first
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(PALDSchemaRegistryService, "MAX_COMPILED_SCHEMAS", 3)
+
+        for i in range(10):
+            PALDSchemaRegistryService.get_compiled_schema({"type": "object", "title": str(i)})
+
+        assert len(PALDSchemaRegistryService._compiled_schemas) == 3
+
+
+@pytest.mark.performance
+class TestPALDSchemaIndexBenchmark:
+    """Compiled index vs. the previous per-call implementation."""
+
+    def test_benchmark_against_legacy(self):
+        paldas = synthetic_paldas(DEFAULT_SCHEMA, 5000)
+
+        start = time.perf_counter()
+        for pald in paldas:
+            legacy_validate(pald, DEFAULT_SCHEMA)
+            legacy_coverage(pald, DEFAULT_SCHEMA)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for pald in paldas:
+            PALDSchemaRegistryService.get_compiled_schema(DEFAULT_SCHEMA).analyze(pald)
+        indexed_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for pald_a, pald_b in zip(paldas, paldas[1:]):
+            legacy_diff(pald_a, pald_b)
+        legacy_diff_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for pald_a, pald_b in zip(paldas, paldas[1:]):
+            diff_pald_data(pald_a, pald_b)
+        indexed_diff_seconds = time.perf_counter() - start
+
+        print(
+            f"{len(paldas)} PALDs validate+coverage: legacy {len(paldas) / legacy_seconds:.0f}/s, "
+            f"indexed {len(paldas) / indexed_seconds:.0f}/s "
+            f"({legacy_seconds / indexed_seconds:.1f}x); diff: legacy "
+            f"{len(paldas) / legacy_diff_seconds:.0f}/s, indexed "
+            f"{len(paldas) / indexed_diff_seconds:.0f}/s"
+        )
+        assert indexed_seconds < legacy_seconds
+        assert indexed_diff_seconds < legacy_diff_seconds
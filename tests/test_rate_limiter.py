@@ -0,0 +1,144 @@
+"""
+Tests for the sliding-window rate limiter backends.
+"""
+
+import time
+
+import pytest
+
+from src.security.rate_limiter import (
+    MemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    create_rate_limit_backend,
+)
+
+
+class TestMemoryRateLimitBackend:
+    """Test the sliding-window counter and idle purging."""
+
+    def test_limit_within_window(self):
+        backend = MemoryRateLimitBackend()
+
+        assert all(backend.hit("user", 5, 60, 1000.0) for _ in range(5))
+        assert not backend.hit("user", 5, 60, 1000.5)
+        # Other identifiers are unaffected
+        assert backend.hit("other", 5, 60, 1000.5)
+
+    def test_rejected_requests_are_not_counted(self):
+        backend = MemoryRateLimitBackend()
+        for _ in range(5):
+            backend.hit("user", 5, 60, 960.0)
+        for _ in range(100):
+            assert not backend.hit("user", 5, 60, 961.0)
+
+        # Halfway through the next window half of the previous window still counts
+        assert all(backend.hit("user", 5, 60, 1050.0) for _ in range(3))
+        assert not backend.hit("user", 5, 60, 1050.0)
+
+    def test_previous_window_weight_decays(self):
+        backend = MemoryRateLimitBackend()
+        for _ in range(10):
+            backend.hit("user", 10, 60, 959.0)
+
+        # Just after the boundary the previous window counts almost fully
+        assert backend.hit("user", 10, 60, 960.5)
+        assert not backend.hit("user", 10, 60, 960.5)
+        # After two windows nothing is left
+        assert all(backend.hit("user", 10, 60, 1081.0) for _ in range(10))
+
+    def test_reset(self):
+        backend = MemoryRateLimitBackend()
+        backend.hit("user", 1, 60, 1000.0)
+        assert not backend.hit("user", 1, 60, 1000.0)
+
+        backend.reset("user")
+
+        assert backend.hit("user", 1, 60, 1000.0)
+
+    def test_limits_with_different_windows_are_independent(self):
+        backend = MemoryRateLimitBackend()
+
+        allowed = [
+            backend.hit("user", 5, window, 1000.0 + i * 0.1)
+            for i in range(100)
+            for window in (60, 3600)
+        ]
+
+        # Five requests under each limit, not every request
+        assert sum(allowed) == 10
+        assert not backend.hit("user", 5, 60, 1020.0)
+        assert not backend.hit("user", 5, 3600, 1020.0)
+
+    def test_reset_clears_every_limit(self):
+        backend = MemoryRateLimitBackend()
+        backend.hit("user", 1, 60, 1000.0)
+        backend.hit("user", 1, 3600, 1000.0)
+        backend.hit("other", 1, 60, 1000.0)
+
+        backend.reset("user")
+
+        assert backend.hit("user", 1, 60, 1000.0)
+        assert backend.hit("user", 1, 3600, 1000.0)
+        assert not backend.hit("other", 1, 60, 1000.0)
+
+    def test_idle_identifiers_are_purged(self):
+        backend = MemoryRateLimitBackend(purge_interval=10)
+        for i in range(100):
+            backend.hit(f"ip_{i}", 5, 60, 1000.0)
+        backend.hit("active", 5, 60, 1100.0)
+
+        assert backend.tracked_identifiers() == 101
+
+        # Purge runs from within hit once the interval has passed
+        backend.hit("active", 5, 60, 1121.0)
+
+        assert backend.tracked_identifiers() == 1
+        assert backend.purge_idle(1121.0) == 0
+
+    def test_purge_keeps_recently_used_identifiers(self):
+        backend = MemoryRateLimitBackend()
+        backend.hit("a", 5, 60, 1000.0)
+        backend.hit("b", 5, 60, 1000.0)
+        backend.hit("a", 5, 60, 1100.0)
+
+        assert backend.purge_idle(1121.0) == 1
+        assert backend.tracked_identifiers() == 1
+
+    def test_throughput_with_100k_identifiers(self):
+        backend = MemoryRateLimitBackend()
+        identifiers = [f"ip_{i}" for i in range(100_000)]
+        now = 1000.0
+
+        start = time.perf_counter()
+        for _ in range(3):
+            for identifier in identifiers:
+                backend.hit(identifier, 100, 60, now)
+            now += 1
+        elapsed = time.perf_counter() - start
+
+        checks_per_second = 300_000 / elapsed
+        print(f"\n{checks_per_second:,.0f} rate limit checks/s at 100k identifiers")
+        assert backend.tracked_identifiers() == 100_000
+        assert checks_per_second > 50_000
+
+        # Everything goes idle and is dropped in one purge
+        assert backend.purge_idle(now + 121) == 100_000
+        assert backend.tracked_identifiers() == 0
+
+
+class TestCreateRateLimitBackend:
+    """Test backend selection."""
+
+    def test_memory(self):
+        assert isinstance(create_rate_limit_backend("Memory"), MemoryRateLimitBackend)
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            create_rate_limit_backend("memcached")
+
+    def test_redis(self):
+        pytest.importorskip("redis")
+        # The client connects lazily, so no server is needed here
+        backend = create_rate_limit_backend("redis", "redis://localhost:6379/15")
+        assert isinstance(backend, RedisRateLimitBackend)
+        assert backend.tracked_identifiers() is None
@@ -0,0 +1,248 @@
+"""
+Tests for the session stores and batched session refreshes in SessionManager.
+"""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.data.models import Base, UserSession
+from src.services.session_manager import SessionManager
+from src.services.session_store import (
+    DatabaseSessionStore,
+    MemorySessionStore,
+    create_session_store,
+)
+
+
+def make_session(user_id, expires_in=timedelta(hours=1), session_id=None):
+    now = datetime.utcnow()
+    return {
+        "session_id": session_id or uuid4().hex,
+        "user_id": user_id,
+        "user_role": "participant",
+        "created_at": now,
+        "last_accessed": now,
+        "expires_at": now + expires_in,
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    Base.metadata.create_all(engine, tables=[UserSession.__table__])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, engine):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return DatabaseSessionStore(engine)
+
+
+class TestSessionStores:
+    """Behaviour shared by all stores."""
+
+    def test_add_get_delete(self, store):
+        user_id = uuid4()
+        session = make_session(user_id)
+
+        store.add(session)
+
+        assert store.get(session["session_id"]) == session
+        assert store.get("missing") is None
+        assert store.delete(session["session_id"]) is True
+        assert store.delete(session["session_id"]) is False
+        assert store.get(session["session_id"]) is None
+
+    def test_user_index(self, store):
+        user_id, other_user_id = uuid4(), uuid4()
+        for _ in range(3):
+            store.add(make_session(user_id))
+        store.add(make_session(other_user_id))
+
+        assert len(store.get_user_sessions(user_id)) == 3
+        assert store.delete_user(user_id) == 3
+        assert store.get_user_sessions(user_id) == []
+        assert len(store.get_user_sessions(other_user_id)) == 1
+
+    def test_touch_many_only_extends_expiry(self, store):
+        session = make_session(uuid4())
+        store.add(session)
+        later = session["expires_at"] + timedelta(hours=1)
+        accessed = session["last_accessed"] + timedelta(seconds=5)
+
+        assert store.touch_many({session["session_id"]: (accessed, later), "missing": (accessed, later)}) == 1
+        assert store.get(session["session_id"])["expires_at"] == later
+
+        store.touch_many({session["session_id"]: (accessed, session["expires_at"])})
+        store.touch_many({session["session_id"]: (accessed, None)})
+        stored = store.get(session["session_id"])
+        assert stored["expires_at"] == later
+        assert stored["last_accessed"] == accessed
+
+    def test_purge_expired_in_chunks(self, store):
+        now = datetime.utcnow()
+        for _ in range(5):
+            store.add(make_session(uuid4(), expires_in=timedelta(seconds=-10)))
+        active = make_session(uuid4())
+        store.add(active)
+
+        assert store.purge_expired(now, limit=2) == 2
+        assert store.purge_expired(now, limit=10) == 3
+        assert store.purge_expired(now) == 0
+        assert store.count_active(now) == 1
+        assert store.get(active["session_id"]) is not None
+
+    def test_clear(self, store):
+        store.add(make_session(uuid4()))
+        store.add(make_session(uuid4()))
+
+        assert store.clear() == 2
+        assert store.count_active(datetime.utcnow()) == 0
+
+
+class TestMemorySessionStore:
+    """Expiry heap details of the in-memory store."""
+
+    def test_refreshed_session_survives_stale_heap_entry(self):
+        store = MemorySessionStore()
+        session = make_session(uuid4(), expires_in=timedelta(seconds=1))
+        store.add(session)
+        store.touch_many({session["session_id"]: (datetime.utcnow(), datetime.utcnow() + timedelta(hours=1))})
+
+        assert store.purge_expired(datetime.utcnow() + timedelta(minutes=1)) == 0
+        assert store.get(session["session_id"]) is not None
+
+    def test_heap_is_compacted(self):
+        store = MemorySessionStore()
+        session = make_session(uuid4())
+        store.add(session)
+        for i in range(5000):
+            store.touch_many({session["session_id"]: (datetime.utcnow(), session["expires_at"] + timedelta(seconds=i + 1))})
+
+        assert len(store._expiry_heap) <= 2 * 1 + 1024 + 1
+
+    def test_create_session_store(self):
+        assert isinstance(create_session_store("memory"), MemorySessionStore)
+        assert isinstance(create_session_store("database"), DatabaseSessionStore)
+        with pytest.raises(ValueError):
+            create_session_store("redis")
+
+
+class TestSessionManagerBatching:
+    """Buffered refreshes and incremental cleanup in SessionManager."""
+
+    def test_accesses_are_batched(self):
+        store = MemorySessionStore()
+        manager = SessionManager(store=store, refresh_interval_seconds=3600)
+        session = manager.create_session(uuid4(), "participant")
+
+        with patch.object(store, "touch_many", wraps=store.touch_many) as touch_many:
+            for _ in range(100):
+                assert manager.get_session(session["session_id"]) is not None
+            assert manager.refresh_session(session["session_id"]) is True
+            refreshed = manager.get_session(session["session_id"])
+            assert touch_many.call_count == 0
+
+            # Reads see the buffered refresh before it is written
+            assert refreshed["expires_at"] > session["expires_at"]
+
+            assert manager.flush_pending_refreshes() == 1
+            assert touch_many.call_count == 1
+        assert store.get(session["session_id"])["expires_at"] == refreshed["expires_at"]
+
+    def test_refresh_near_expiry_is_written_through(self):
+        store = MemorySessionStore()
+        manager = SessionManager(store=store, refresh_interval_seconds=3600)
+        session = make_session(uuid4(), expires_in=timedelta(minutes=5))
+        store.add(session)
+
+        assert manager.refresh_session(session["session_id"]) is True
+
+        assert store.get(session["session_id"])["expires_at"] > session["expires_at"] + timedelta(minutes=30)
+        assert manager._pending_touches == {}
+
+    def test_invalidate_drops_pending_refresh(self):
+        manager = SessionManager(store=MemorySessionStore(), refresh_interval_seconds=3600)
+        session = manager.create_session(uuid4(), "participant")
+        manager.refresh_session(session["session_id"])
+
+        assert manager.invalidate_session(session["session_id"]) is True
+        assert manager.get_session(session["session_id"]) is None
+        assert manager._pending_touches == {}
+
+    def test_expired_sessions_are_purged_in_chunks(self):
+        store = MemorySessionStore()
+        manager = SessionManager(store=store, refresh_interval_seconds=0, cleanup_batch_size=10)
+        for _ in range(25):
+            store.add(make_session(uuid4(), expires_in=timedelta(seconds=-1)))
+
+        manager.create_session(uuid4(), "participant")
+        assert len(store._sessions) == 16
+
+        assert manager._cleanup_expired_sessions() == 10
+        assert manager._cleanup_expired_sessions() == 5
+        assert manager.get_active_sessions_count() == 1
+
+    def test_replicas_share_database_sessions(self, engine):
+        first = SessionManager(store=DatabaseSessionStore(engine), refresh_interval_seconds=3600)
+        second = SessionManager(store=DatabaseSessionStore(engine), refresh_interval_seconds=3600)
+        user_id = uuid4()
+
+        session = first.create_session(user_id, "admin")
+        seen = second.get_session(session["session_id"])
+
+        assert seen["user_id"] == user_id and seen["user_role"] == "admin"
+        assert second.get_active_sessions_count() == 1
+        assert second.invalidate_user_sessions(user_id) == 1
+        assert first.get_session(session["session_id"]) is None
+
+
+@pytest.mark.performance
+class TestSessionManagerBenchmark:
+    """Cost of session operations with many live sessions."""
+
+    def test_many_sessions(self):
+        sessions, lookups = 100000, 20000
+        store = MemorySessionStore()
+        manager = SessionManager(store=store, refresh_interval_seconds=60)
+        users = [uuid4() for _ in range(sessions // 10)]
+        for i in range(sessions):
+            store.add(make_session(users[i % len(users)], expires_in=timedelta(seconds=3600 + i)))
+        session_ids = list(store._sessions)
+
+        start = time.perf_counter()
+        manager.create_session(users[0], "participant")
+        create_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(lookups):
+            manager.get_session(session_ids[i])
+            manager.refresh_session(session_ids[i])
+        lookup_us = (time.perf_counter() - start) / lookups * 1e6
+
+        start = time.perf_counter()
+        manager.invalidate_user_sessions(users[1])
+        invalidate_ms = (time.perf_counter() - start) * 1000
+
+        # Previous implementation: a full scan of all sessions on every create
+        legacy = dict(store._sessions)
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        expired = [session_id for session_id, data in legacy.items() if now > data["expires_at"]]
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{sessions} sessions: create {create_ms:.2f} ms (full scan {scan_ms:.2f} ms), "
+            f"get+refresh {lookup_us:.1f} us, invalidate user {invalidate_ms:.2f} ms"
+        )
+        assert expired == []
+        assert create_ms < scan_ms
+        assert invalidate_ms < scan_ms